@@ -0,0 +1,318 @@
+"""
+Shared, pre-warmed process pool for Parselmouth formant analysis.
+
+One pool serves every CPU-bound Praat job of the formant endpoints —
+``/phonemes/analyze-formants``, ``/level-test/score`` and the teacher-clip
+reference extraction. Parselmouth holds the GIL for the whole analysis, so
+a job must never run on the event loop thread.
+
+* Warm: ``start_analysis_pool()`` (app startup) spawns every worker; each
+  worker's initializer imports parselmouth and runs one dummy analysis, so
+  the first real take pays neither interpreter start-up nor Praat warm-up.
+  Replacement workers (after a crash) warm themselves the same way.
+* Bounded: at most ``workers + max_queue`` jobs in flight. Past that
+  ``run`` raises ``PoolSaturated`` → HTTP 429 with ``Retry-After``.
+* Per-job timeout → HTTP 503. A timed-out job still pending in the queue is
+  cancelled; a running (or already dispatched) one cannot be pre-empted in a
+  ``ProcessPoolExecutor``, so it keeps occupying its worker (and keeps
+  counting as busy) until it really finishes — the backpressure reflects
+  what the CPUs are actually doing.
+* Batches: a batch request runs its takes inside ``batch_slots()``, which
+  lets it hold at most ``workers`` jobs in flight at once — a full batch
+  neither saturates the pool on its own nor starves single-take requests.
+* Jobs receive spool-file paths (``routers.audio_ingest``), never audio
+  bytes: only a short string is pickled per job.
+* Metrics (queue length, busy workers, latency histogram, counters) on
+  ``GET /api/admin/analysis-pool``.
+
+Env: ANALYSIS_POOL_WORKERS (falls back to LEVEL_TEST_POOL_WORKERS, 2),
+ANALYSIS_POOL_MAX_QUEUE (8), ANALYSIS_POOL_JOB_TIMEOUT_S (30),
+ANALYSIS_BATCH_MAX_TAKES (12 — per batch request, capped at the pool
+capacity, see ``parse_batch_takes``).
+"""
+from __future__ import annotations
+
+import os
+import json
+import time
+import asyncio
+import logging
+import tempfile
+import contextlib
+import multiprocessing as mp
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from routers.audio_ingest import spool_usage
+
+logger = logging.getLogger(__name__)
+
+_WORKERS = int(os.environ.get("ANALYSIS_POOL_WORKERS",
+                              os.environ.get("LEVEL_TEST_POOL_WORKERS", "2")))
+_MAX_QUEUE = int(os.environ.get("ANALYSIS_POOL_MAX_QUEUE", "8"))
+_JOB_TIMEOUT_S = float(os.environ.get("ANALYSIS_POOL_JOB_TIMEOUT_S", "30"))
+BATCH_MAX_TAKES = int(os.environ.get("ANALYSIS_BATCH_MAX_TAKES", "12"))
+# Upper bounds (seconds) of the job-latency histogram; the last bucket is +Inf.
+_LATENCY_BUCKETS_S = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 16.0, 32.0)
+
+_MSG_SATURATED = "Troppe analisi in corso. Riprova tra qualche secondo."
+_MSG_TIMEOUT = "Analisi non completata in tempo. Riprova con una registrazione più breve."
+
+
+# Set by ``batch_slots()`` for the duration of a batch request; the takes'
+# tasks inherit it, so ``run_analysis`` can bound the batch as a whole.
+_batch_slots: ContextVar[Optional[asyncio.Semaphore]] = ContextVar("analysis_batch_slots",
+                                                                   default=None)
+
+
+class PoolSaturated(Exception):
+    """Every worker is busy and the wait queue is full."""
+
+
+def _warm_worker() -> None:
+    """Worker initializer: import parselmouth and run one dummy analysis on a
+    synthetic 120 Hz voiced buzz, so Praat's first-call costs are paid here."""
+    try:
+        import numpy as np
+        import parselmouth
+        from routers.phoneme_formants import _measure_all_ceilings
+
+        sr = 16000
+        t = np.arange(int(0.4 * sr)) / sr
+        buzz = sum(np.sin(2 * np.pi * 120.0 * k * t) / k for k in range(1, 30))
+        snd = parselmouth.Sound(0.1 * buzz, sampling_frequency=sr)
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tf:
+            path = tf.name
+        try:
+            snd.save(path, parselmouth.SoundFileFormat.WAV)
+            _measure_all_ceilings(path)
+        finally:
+            os.unlink(path)
+    except Exception:  # noqa: BLE001
+        logger.exception("analysis-pool: worker warm-up failed (worker still usable)")
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class AnalysisPool:
+    def __init__(self, workers: int, max_queue: int, job_timeout_s: float):
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.job_timeout_s = job_timeout_s
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._warm = False
+        self._started_at: Optional[str] = None
+        self._counters = {"submitted": 0, "completed": 0, "failed": 0,
+                          "rejected": 0, "timeouts": 0, "cancelled": 0, "restarts": 0}
+        self._hist = [0] * (len(_LATENCY_BUCKETS_S) + 1)
+        self._latency_sum = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.max_queue
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # 'spawn' → clean workers that don't inherit the asyncio loop / Mongo
+            # client from the parent (safe under fork-averse async servers).
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=mp.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+        return self._executor
+
+    def _reset(self, broken: ProcessPoolExecutor) -> None:
+        """Drop a broken executor (a worker died); the next job respawns it.
+        Every job in flight on ``broken`` reports the crash, so only the
+        first one resets — later ones must not tear down the replacement."""
+        if broken is not self._executor:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._executor = None
+        self._warm = False
+        self._counters["restarts"] += 1
+
+    async def start(self) -> float:
+        """Spawn and warm every worker now. Returns the warm-up time (s)."""
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        t0 = time.perf_counter()
+        await asyncio.gather(*(loop.run_in_executor(executor, _ping)
+                               for _ in range(self.workers)))
+        self._warm = True
+        self._started_at = datetime.now(timezone.utc).isoformat()
+        return round(time.perf_counter() - t0, 2)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _release(self, fut, t0: float) -> None:
+        # Runs on the event loop (call_soon_threadsafe) → no locking needed.
+        self._in_flight -= 1
+        if fut.cancelled():
+            return
+        if fut.exception() is not None:
+            self._counters["failed"] += 1
+            return
+        elapsed = time.perf_counter() - t0
+        self._counters["completed"] += 1
+        self._latency_sum += elapsed
+        idx = next((i for i, b in enumerate(_LATENCY_BUCKETS_S) if elapsed <= b),
+                   len(_LATENCY_BUCKETS_S))
+        self._hist[idx] += 1
+
+    async def run(self, fn: Callable, *args):
+        """Run ``fn(*args)`` in a worker. Raises ``PoolSaturated`` when full,
+        ``asyncio.TimeoutError`` past ``job_timeout_s``."""
+        if self._in_flight >= self.capacity:
+            self._counters["rejected"] += 1
+            raise PoolSaturated(f"{self._in_flight} jobs in flight (capacity {self.capacity})")
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        try:
+            cfut = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._reset(executor)
+            executor = self._get_executor()
+            cfut = executor.submit(fn, *args)
+        self._in_flight += 1
+        self._counters["submitted"] += 1
+        t0 = time.perf_counter()
+        cfut.add_done_callback(lambda f: loop.call_soon_threadsafe(self._release, f, t0))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(cfut), self.job_timeout_s)
+        except asyncio.TimeoutError:
+            self._counters["timeouts"] += 1
+            # Still pending (not yet fed to a worker) → drop it: the caller is
+            # about to remove its spool file, the job could only fail on it.
+            if cfut.cancel():
+                self._counters["cancelled"] += 1
+            raise
+        except BrokenProcessPool:
+            self._reset(executor)
+            raise
+
+    def metrics(self) -> dict:
+        cumulative, acc = [], 0
+        for bound, n in zip(list(_LATENCY_BUCKETS_S) + ["+Inf"], self._hist):
+            acc += n
+            cumulative.append({"le": bound, "count": acc})
+        done = self._counters["completed"]
+        return {
+            "workers": self.workers,
+            "busy_workers": min(self._in_flight, self.workers),
+            "queue_length": max(0, self._in_flight - self.workers),
+            "max_queue": self.max_queue,
+            "in_flight": self._in_flight,
+            "capacity": self.capacity,
+            "job_timeout_s": self.job_timeout_s,
+            "warm": self._warm,
+            "started_at": self._started_at,
+            **self._counters,
+            "latency_s": {
+                "buckets": cumulative,
+                "count": done,
+                "sum": round(self._latency_sum, 3),
+                "mean": round(self._latency_sum / done, 3) if done else None,
+            },
+        }
+
+
+_pool: Optional[AnalysisPool] = None
+
+
+def get_analysis_pool() -> AnalysisPool:
+    global _pool
+    if _pool is None:
+        _pool = AnalysisPool(_WORKERS, _MAX_QUEUE, _JOB_TIMEOUT_S)
+    return _pool
+
+
+async def start_analysis_pool() -> dict:
+    pool = get_analysis_pool()
+    warm_s = await pool.start()
+    return {"workers": pool.workers, "warm_s": warm_s}
+
+
+def shutdown_analysis_pool() -> None:
+    if _pool is not None:
+        _pool.shutdown()
+
+
+@contextlib.contextmanager
+def batch_slots():
+    """Bound the analysis jobs of one batch request to ``workers`` at a time.
+    Takes past that wait here for one of the batch's own jobs to finish
+    instead of queueing in (and saturating) the shared pool."""
+    token = _batch_slots.set(asyncio.Semaphore(get_analysis_pool().workers))
+    try:
+        yield
+    finally:
+        _batch_slots.reset(token)
+
+
+async def run_analysis(fn: Callable, *args):
+    """``get_analysis_pool().run`` with the HTTP mapping shared by every
+    endpoint: saturated → 429 (+ Retry-After), per-job timeout → 503.
+    Inside ``batch_slots()`` the job first waits for a slot of its batch."""
+    pool = get_analysis_pool()
+    try:
+        async with _batch_slots.get() or contextlib.nullcontext():
+            return await pool.run(fn, *args)
+    except PoolSaturated:
+        logger.warning("analysis-pool: SATURATED %s", pool.metrics()["in_flight"])
+        raise HTTPException(status_code=429, detail=_MSG_SATURATED,
+                            headers={"Retry-After": "2"})
+    except asyncio.TimeoutError:
+        logger.warning("analysis-pool: job %s timed out after %ss",
+                       getattr(fn, "__name__", fn), pool.job_timeout_s)
+        raise HTTPException(status_code=503, detail=_MSG_TIMEOUT)
+
+
+def batch_max_takes() -> int:
+    """``ANALYSIS_BATCH_MAX_TAKES``, never above what the pool admits."""
+    return min(BATCH_MAX_TAKES, get_analysis_pool().capacity)
+
+
+def parse_batch_takes(takes: str, n_files: int, defaults: dict) -> list[dict]:
+    """Validate the ``takes`` JSON of a batch scoring request: one object per
+    uploaded file, ``phoneme_ipa`` required, other keys from ``defaults``."""
+    try:
+        specs = json.loads(takes or "")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="takes non valido (JSON atteso)")
+    if not isinstance(specs, list) or not specs:
+        raise HTTPException(status_code=400, detail="takes deve essere una lista non vuota")
+    if len(specs) != n_files:
+        raise HTTPException(status_code=400,
+                            detail=f"takes ({len(specs)}) e file ({n_files}) non corrispondono")
+    max_takes = batch_max_takes()
+    if len(specs) > max_takes:
+        raise HTTPException(status_code=413,
+                            detail=f"Troppe registrazioni in un lotto (max {max_takes})")
+    out = []
+    for i, spec in enumerate(specs):
+        if not isinstance(spec, dict) or not spec.get("phoneme_ipa"):
+            raise HTTPException(status_code=400, detail=f"takes[{i}]: phoneme_ipa mancante")
+        out.append({**defaults, **{k: v for k, v in spec.items() if k in defaults or k == "phoneme_ipa"}})
+    return out
+
+
+def build_analysis_pool_router(get_admin_user: Callable) -> APIRouter:
+    router = APIRouter(tags=["analysis-pool"])
+
+    @router.get("/admin/analysis-pool")
+    async def analysis_pool_metrics(admin: dict = Depends(get_admin_user)):
+        return {**get_analysis_pool().metrics(), "spool": spool_usage()}
+
+    return router
@@ -0,0 +1,275 @@
+"""
+Streaming ingestion of uploaded takes (scoring + recording endpoints).
+
+``await file.read()`` materialised every take as one ``bytes`` object, which
+was then written to a temp file by the analysis worker (after being pickled
+across the process boundary), again by Whisper, and walked sample by sample
+in pure Python for the instrumentation stats. Instead, ``spool_upload``
+copies the upload ONCE, in ``SPOOL_CHUNK_BYTES`` chunks and off the event
+loop, into a single temp file, and while doing so:
+
+* hashes the content (BLAKE2b — the measurement-cache key, no second pass);
+* checks the RIFF/WAVE signature of the first chunk;
+* stops copying as soon as the size limit is exceeded (``too_large``).
+
+Every consumer then works from that path: the analysis-pool job receives
+the path string (Praat reads the file), Whisper streams it, and
+``SpooledTake.stats()`` memory-maps the ``data`` chunk and reduces it in
+blocks with NumPy. The take owns the file — use it as a context manager.
+
+Non-WAV uploads are not rejected here: Praat decides whether it can read the
+take, exactly as before; ``stats()`` reports ``wav_parse_error`` for them.
+
+Spool files live in the system temp dir, or in ``AUDIO_SPOOL_DIR`` when set
+— e.g. ``/dev/shm``, so handing a take to a worker is a page-cache read, not
+a disk round trip. Opt-in only: a container's ``/dev/shm`` is 64 MB by
+default and one batch may need 12 × 15 MB. A take that may not fit in the
+configured dir's free space (or hits ENOSPC while copying) is spooled to
+the temp dir instead. Lifecycle: the request owns the
+file and removes it on exit, also on a pool timeout or a crashed worker; a
+timed-out job still queued is cancelled by the pool; files orphaned by a
+killed app process are removed at startup by ``sweep_stale_spools``.
+"""
+from __future__ import annotations
+
+import io
+import os
+import time
+import shutil
+import struct
+import errno
+import contextlib
+import asyncio
+import hashlib
+import tempfile
+from typing import BinaryIO, Optional
+
+import numpy as np
+
+SPOOL_CHUNK_BYTES = int(os.environ.get("AUDIO_SPOOL_CHUNK_BYTES", str(1024 * 1024)))
+MAX_TAKE_BYTES = 15 * 1024 * 1024
+# Samples reduced per NumPy block in ``wav_stats`` (bounded temporaries).
+_STATS_BLOCK = 1 << 20
+_SPOOL_PREFIX = "vf-spool-"
+
+
+SPOOL_DIR = os.environ.get("AUDIO_SPOOL_DIR") or None  # None → tempfile's default
+
+
+def content_digest(data: bytes) -> str:
+    """Hex BLAKE2b digest of a clip — the same value ``spool_upload`` computes
+    incrementally."""
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def parse_wav_header(fh: BinaryIO, file_size: int) -> dict:
+    """Walk the RIFF chunks up to ``data``. Returns the format fields plus the
+    byte offset/length of the sample data; ``ValueError`` if not a PCM WAV."""
+    head = fh.read(12)
+    if len(head) < 12 or head[:4] != b"RIFF" or head[8:12] != b"WAVE":
+        raise ValueError("file does not start with RIFF/WAVE id")
+    fmt = None
+    while True:
+        hdr = fh.read(8)
+        if len(hdr) < 8:
+            raise ValueError("data chunk not found")
+        cid, size = hdr[:4], struct.unpack("<I", hdr[4:])[0]
+        if cid == b"fmt ":
+            body = fh.read(size)
+            if len(body) < 16:
+                raise ValueError("fmt chunk too short")
+            tag, ch, sr, _, align, bits = struct.unpack("<HHIIHH", body[:16])
+            if tag not in (1, 0xFFFE):  # PCM / WAVE_FORMAT_EXTENSIBLE
+                raise ValueError(f"unknown format: {tag}")
+            fmt = {"channels": ch, "sample_rate": sr, "block_align": align,
+                   "sample_width": bits // 8}
+            if size & 1:
+                fh.seek(1, os.SEEK_CUR)
+        elif cid == b"data":
+            if fmt is None:
+                raise ValueError("data chunk before fmt chunk")
+            offset = fh.tell()
+            # Streaming writers leave a placeholder size; trust the file.
+            fmt.update(data_offset=offset, data_bytes=min(size, max(0, file_size - offset)))
+            return fmt
+        else:
+            fh.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def wav_stats(path: str, size: Optional[int] = None) -> dict:
+    """Cheap acoustic stats of a WAV on disk — bytes, duration, RMS and peak
+    amplitude (0..1) to tell apart an empty / truncated / silent take. The
+    16-bit samples are memory-mapped, never copied whole."""
+    size = os.path.getsize(path) if size is None else size
+    try:
+        with open(path, "rb") as fh:
+            h = parse_wav_header(fh, size)
+        sr, ch, sw = h["sample_rate"], h["channels"], h["sample_width"]
+        n = h["data_bytes"] // h["block_align"] if h["block_align"] else 0
+        dur = round(n / sr, 3) if sr else 0.0
+        rms = peak = None
+        count = n * ch
+        if sw == 2 and count:
+            a = np.memmap(path, dtype="<i2", mode="r", offset=h["data_offset"], shape=(count,))
+            top = bottom = 0
+            squares = 0
+            for i in range(0, count, _STATS_BLOCK):
+                block = a[i:i + _STATS_BLOCK]
+                top, bottom = max(top, int(block.max())), min(bottom, int(block.min()))
+                b64 = block.astype(np.int64)
+                squares += int(np.dot(b64, b64))
+            del a
+            peak = round(max(top, -bottom) / 32768.0, 5)
+            rms = round((squares / count) ** 0.5 / 32768.0, 5)
+        return {"bytes": size, "duration_s": dur, "sample_rate": sr,
+                "channels": ch, "frames": n, "rms": rms, "peak": peak}
+    except Exception as e:  # noqa: BLE001
+        return {"bytes": size, "wav_parse_error": str(e)}
+
+
+class SpooledTake:
+    """An upload spooled to disk. ``path`` stays valid until ``close()``."""
+
+    def __init__(self, path: str, size: int, digest: str, is_wav: bool, too_large: bool):
+        self.path = path
+        self.size = size
+        self.digest = digest
+        self.is_wav = is_wav
+        self.too_large = too_large
+        self._stats: Optional[dict] = None
+
+    def stats(self) -> dict:
+        if self._stats is None:
+            self._stats = wav_stats(self.path, self.size)
+        return self._stats
+
+    def read_bytes(self) -> bytes:
+        with open(self.path, "rb") as fh:
+            return fh.read()
+
+    def move_to(self, dest) -> None:
+        """Hand the file over to permanent storage (rename when possible)."""
+        shutil.move(self.path, str(dest))
+
+    def close(self) -> None:
+        try:
+            os.unlink(self.path)
+        except OSError:
+            pass
+
+    def __enter__(self) -> "SpooledTake":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _spool_dir(max_bytes: int) -> Optional[str]:
+    """``SPOOL_DIR`` if a take of up to ``max_bytes`` fits in its free space,
+    else ``None`` (the temp dir)."""
+    if SPOOL_DIR is None:
+        return None
+    try:
+        if shutil.disk_usage(SPOOL_DIR).free > max_bytes:
+            return SPOOL_DIR
+    except OSError:
+        pass
+    return None
+
+
+def _spool(src: BinaryIO, max_bytes: int, suffix: str) -> SpooledTake:
+    spool_dir = _spool_dir(max_bytes)
+    start = src.tell()
+    try:
+        return _spool_to(spool_dir, src, max_bytes, suffix)
+    except OSError as exc:
+        # Concurrent takes filled the dir after the free-space check.
+        if exc.errno != errno.ENOSPC or spool_dir is None:
+            raise
+        src.seek(start)
+        return _spool_to(None, src, max_bytes, suffix)
+
+
+def _spool_to(spool_dir: Optional[str], src: BinaryIO, max_bytes: int,
+              suffix: str) -> SpooledTake:
+    h = hashlib.blake2b(digest_size=20)
+    size, is_wav, too_large = 0, False, False
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix, prefix=_SPOOL_PREFIX,
+                                     dir=spool_dir) as dst:
+        try:
+            while True:
+                chunk = src.read(SPOOL_CHUNK_BYTES)
+                if not chunk:
+                    break
+                if not size:
+                    is_wav = chunk[:4] == b"RIFF" and chunk[8:12] == b"WAVE"
+                size += len(chunk)
+                if size > max_bytes:
+                    too_large = True
+                    break
+                h.update(chunk)
+                dst.write(chunk)
+            dst.flush()  # surface ENOSPC here, where the file is removed
+        except BaseException:
+            with contextlib.suppress(OSError):
+                dst.close()
+            os.unlink(dst.name)
+            raise
+    if too_large:
+        dst_path = dst.name
+        os.truncate(dst_path, 0)
+        return SpooledTake(dst_path, size, "", False, True)
+    return SpooledTake(dst.name, size, h.hexdigest(), is_wav, False)
+
+
+async def spool_upload(file, max_bytes: int = MAX_TAKE_BYTES, suffix: str = ".wav") -> SpooledTake:
+    """Copy an ``UploadFile`` to a temp file in chunks (in a worker thread).
+    Size checks stay with the caller: ``size == 0`` is an empty take and
+    ``too_large`` means copying stopped past ``max_bytes``."""
+    await file.seek(0)
+    return await asyncio.to_thread(_spool, file.file, max_bytes, suffix)
+
+
+def spool_bytes(data: bytes, suffix: str = ".wav") -> SpooledTake:
+    """Spool in-memory bytes (a downloaded teacher clip) so a worker can be
+    handed the path instead of a pickled copy."""
+    return _spool(io.BytesIO(data), len(data), suffix)
+
+
+def _spool_files() -> list[str]:
+    """Spool files in ``SPOOL_DIR`` and in the temp dir it falls back to."""
+    out = []
+    for root in dict.fromkeys(d for d in (SPOOL_DIR, tempfile.gettempdir()) if d):
+        try:
+            names = os.listdir(root)
+        except OSError:
+            continue
+        out.extend(os.path.join(root, n) for n in names if n.startswith(_SPOOL_PREFIX))
+    return out
+
+
+def sweep_stale_spools(max_age_s: float = 3600) -> int:
+    """Remove spool files older than ``max_age_s`` — left behind only when an
+    app process was killed mid-request. Returns the number removed."""
+    cutoff, removed = time.time() - max_age_s, 0
+    for path in _spool_files():
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.unlink(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def spool_usage() -> dict:
+    """Spool directory occupancy (admin metrics): a growing count means
+    files are leaking."""
+    files, total = 0, 0
+    for path in _spool_files():
+        try:
+            total += os.path.getsize(path)
+            files += 1
+        except OSError:
+            pass
+    return {"dir": SPOOL_DIR or tempfile.gettempdir(), "files": files, "bytes": total}
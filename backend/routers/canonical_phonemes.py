@@ -10,6 +10,11 @@ Contents:
   ``canonical_data/*.md`` files in this repo.
 * ``GET /canonical/phonemes``     — public read; ``?dialect=GenAm|RP&kind=vowel|consonant|diphthong``
 * ``GET /canonical/phonemes/{ipa}?dialect=`` — single lookup by IPA symbol
+* ``canonical_version(db)`` — version stamp in ``canonical_phonemes_meta``,
+  bumped by the seed on any real change; derived data persisted elsewhere
+  (the phoneme cards' readiness badge) compares against it.
+* ``canonical_inventory`` — the in-process index every reader goes through
+  (reloaded by the seed, by a version bump, or when another process bumps).
 
 Design decisions
 ----------------
@@ -34,9 +39,16 @@ Design decisions
 
 from __future__ import annotations
 
-from typing import Optional
+import os
+import copy
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Optional
 from fastapi import APIRouter, HTTPException
 
+_CANONICAL_META = "canonical_phonemes_meta"
+_INVENTORY_REFRESH_S = float(os.environ.get("CANONICAL_INVENTORY_REFRESH_S", "60"))
+
 
 # --------------------------------------------------------------------------- #
 # CONTROLLED VOCABULARY — enforced by admin dropdowns
@@ -183,17 +195,129 @@ async def ensure_canonical_seed(db) -> dict:
     )
 
     seed = _build_seed_docs()
-    upserted = 0
+    upserted = changed = 0
     for doc in seed:
-        await db.canonical_phonemes.update_one(
+        res = await db.canonical_phonemes.update_one(
             {"dialect": doc["dialect"], "ipa": doc["ipa"]},
             {"$set": doc, "$setOnInsert": {"seeded": True}},
             upsert=True,
         )
         upserted += 1
+        changed += int(res.upserted_id is not None) + res.modified_count
+    if changed:
+        await bump_canonical_version(db)
 
     total = await db.canonical_phonemes.count_documents({})
-    return {"upserted": upserted, "total": total}
+    await canonical_inventory.load(db)
+    return {"upserted": upserted, "changed": changed, "total": total,
+            "version": canonical_inventory.version}
+
+
+async def bump_canonical_version(db) -> None:
+    await db[_CANONICAL_META].update_one(
+        {"_id": "version"},
+        {"$inc": {"version": 1},
+         "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}},
+        upsert=True,
+    )
+    canonical_inventory.invalidate()
+
+
+async def canonical_version(db) -> int:
+    doc = await db[_CANONICAL_META].find_one({"_id": "version"})
+    return int((doc or {}).get("version", 0))
+
+
+# --------------------------------------------------------------------------- #
+# In-process inventory
+# --------------------------------------------------------------------------- #
+# The inventory is ~90 rows that change only when the seed changes, yet the
+# rule engines (muscles, overlay, hotspots, pronunciation), readiness, autofill,
+# AI drafting and the frequency chart each resolved it with one find_one per
+# IPA-equivalent candidate. ``canonical_inventory`` holds every row in memory,
+# indexed by (dialect, ipa), by ipa alone (first row in natural order — what
+# the dialect-less ``find_one({"ipa": …})`` returned) and by (dialect, kind)
+# ranked on ``frequency_rank``. Other processes notice a seed change through
+# the ``canonical_version`` stamp, re-read at most every
+# CANONICAL_INVENTORY_REFRESH_S seconds (default 60); in this process
+# ``bump_canonical_version`` invalidates it at once. ``version`` is the stamp
+# the loaded rows belong to — dependent caches (readiness badges) key on it.
+def _rank_key(row: dict):
+    return (row.get("frequency_rank") is None, row.get("frequency_rank") or 999)
+
+
+class CanonicalInventory:
+    def __init__(self, refresh_s: float):
+        self.refresh_s = refresh_s
+        self.version: Optional[int] = None
+        self._rows: list = []
+        self._by_key: dict = {}      # (dialect, ipa) → row
+        self._by_ipa: dict = {}      # ipa → first row, any dialect
+        self._ranked: dict = {}      # (dialect, kind) → rows with a rank, by rank
+        self._checked_at = 0.0
+        self._loaded = False
+
+    def invalidate(self) -> None:
+        self._loaded = False
+
+    async def load(self, db) -> int:
+        """(Re)load every row. Returns the number of rows indexed."""
+        version = await canonical_version(db)
+        rows = await db.canonical_phonemes.find({}, {"_id": 0}).to_list(length=None)
+        by_key: dict = {}
+        by_ipa: dict = {}
+        ranked: dict = {}
+        for r in rows:
+            by_key.setdefault((r.get("dialect"), r.get("ipa")), r)
+            by_ipa.setdefault(r.get("ipa"), r)
+            if r.get("frequency_rank") is not None:
+                ranked.setdefault((r.get("dialect"), r.get("kind")), []).append(r)
+        for bucket in ranked.values():
+            bucket.sort(key=lambda r: r["frequency_rank"])
+        self._rows, self._by_key, self._by_ipa, self._ranked = rows, by_key, by_ipa, ranked
+        self.version, self._loaded = version, True
+        self._checked_at = time.monotonic()
+        return len(rows)
+
+    async def _fresh(self, db) -> None:
+        if not self._loaded:
+            await self.load(db)
+        elif time.monotonic() - self._checked_at >= self.refresh_s:
+            self._checked_at = time.monotonic()
+            if await canonical_version(db) != self.version:
+                await self.load(db)
+
+    async def current_version(self, db) -> int:
+        await self._fresh(db)
+        return self.version
+
+    async def find(self, db, candidates: Iterable[str],
+                   dialect: Optional[str] = None) -> Optional[dict]:
+        """Row of the first candidate symbol present for ``dialect`` (any
+        dialect when None), as a private copy; None if no candidate is."""
+        await self._fresh(db)
+        for c in candidates:
+            row = self._by_key.get((dialect, c)) if dialect else self._by_ipa.get(c)
+            if row is not None:
+                return copy.deepcopy(row)
+        return None
+
+    async def ranked(self, db, dialect: str, kind: str) -> list[dict]:
+        """Rows of ``dialect``/``kind`` with a ``frequency_rank``, rank ascending."""
+        await self._fresh(db)
+        return copy.deepcopy(self._ranked.get((dialect, kind), []))
+
+    async def rows(self, db, dialect: Optional[str] = None,
+                   kind: Optional[str] = None) -> list[dict]:
+        """Every row, optionally filtered, rank ascending (unranked last)."""
+        await self._fresh(db)
+        docs = [r for r in self._rows
+                if (not dialect or r.get("dialect") == dialect)
+                and (not kind or r.get("kind") == kind)]
+        return copy.deepcopy(sorted(docs, key=_rank_key))
+
+
+canonical_inventory = CanonicalInventory(_INVENTORY_REFRESH_S)
 
 
 # --------------------------------------------------------------------------- #
@@ -221,9 +345,8 @@ def build_canonical_phonemes_router(db) -> APIRouter:
             if kind not in ("vowel", "diphthong", "consonant"):
                 raise HTTPException(status_code=400, detail="kind must be vowel, diphthong or consonant")
             q["kind"] = kind
-        docs = await db.canonical_phonemes.find(q, {"_id": 0}).to_list(1000)
-        # Sort by frequency_rank when present (None sorts last)
-        docs.sort(key=lambda d: (d.get("frequency_rank") is None, d.get("frequency_rank") or 999))
+        # Sorted by frequency_rank when present (None sorts last)
+        docs = await canonical_inventory.rows(db, q.get("dialect"), q.get("kind"))
         return {
             "count": len(docs),
             "items": docs,
@@ -244,9 +367,7 @@ def build_canonical_phonemes_router(db) -> APIRouter:
         """Single lookup by (dialect, ipa). Used by autofill (Phase D)."""
         if dialect not in ("GenAm", "RP"):
             raise HTTPException(status_code=400, detail="dialect must be GenAm or RP")
-        doc = await db.canonical_phonemes.find_one(
-            {"dialect": dialect, "ipa": ipa}, {"_id": 0},
-        )
+        doc = await canonical_inventory.find(db, [ipa], dialect)
         if not doc:
             raise HTTPException(status_code=404, detail=f"Canonical phoneme not found: {dialect}/{ipa}")
         return doc
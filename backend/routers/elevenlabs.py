@@ -17,18 +17,26 @@ free of top-level imports from ``server.py`` (no circular deps).
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
 import os
+import random
 import re
+import time
+import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Awaitable, Callable, Optional
 from urllib.parse import urlparse, unquote
 
 import httpx
 from fastapi import APIRouter, Body, Depends, HTTPException, UploadFile, File, Form
 from pydantic import BaseModel
 
+from utils.storage_ledger import record_put, stored_remotely
+
 
 # --------------------------------------------------------------------------- #
 # Pydantic models
@@ -48,6 +56,8 @@ class ElevenLabsTTSRequest(BaseModel):
     # engine still scans ``text`` for inline /…/ fragments and wraps each
     # in an SSML tag (auto model switch applies as soon as any wrap occurs).
     ipa_phoneme: Optional[str] = None
+    # False → skip the dedup cache and record a fresh take for this request.
+    use_cache: bool = True
 
 
 class FetchExternalAudioRequest(BaseModel):
@@ -75,46 +85,11 @@ def _get_elevenlabs_client():
 # Reusable synth+persist helper — used by /tts endpoint AND by the phoneme
 # mass-audio batch runner. Kept at module scope so any router can import it.
 # --------------------------------------------------------------------------- #
-def synthesize_and_store(
-    text: str,
-    voice_id: str,
-    *,
-    emergent_put: Callable[[str, bytes, str], bool],
-    uploads_dir: Path,
-    stability: float = 0.45,
-    similarity_boost: float = 0.85,
-    style: float = 0.0,
-    use_speaker_boost: bool = True,
-    model_id: str = "eleven_multilingual_v2",
-    output_format: str = "mp3_44100_128",
-    filename_hint: Optional[str] = None,
-    ipa_phoneme: Optional[str] = None,
-) -> dict:
-    """Synthesise ``text`` with ElevenLabs and persist the audio to storage.
-
-    ⚙️ ``ipa_phoneme`` (07/07/2026): when set, the text is wrapped in an
-    SSML ``<phoneme alphabet="ipa" ph="…">…</phoneme>`` tag so the model
-    pronounces the exact IPA transcription rather than the surface
-    spelling. This is REQUIRED for isolated phoneme clips ("say /ʌ/")
-    where scientific accuracy trumps naturalness. Because ElevenLabs
-    SSML phoneme tags only work with v2 English models, we AUTO-SWITCH
-    to ``eleven_turbo_v2`` when an IPA hint is present (unless the caller
-    explicitly overrides ``model_id``).
-
-    Returns ``{url, relative_url, filename, voice_id, content_type, size_bytes,
-    ssml_used, ipa_phoneme}``.
+def _prepare_tts_text(text: str, ipa_phoneme: Optional[str], model_id: str):
+    """Turn the caller's ``text`` / ``ipa_phoneme`` into the payload sent to
+    ElevenLabs. Returns ``(final_text, model_id, ssml_used, ipa_clean,
+    inline_ipa_hits)`` — shared by the sync and async synthesis paths.
     """
-    if not (text or "").strip():
-        raise RuntimeError("text vuoto")
-
-    client = _get_elevenlabs_client()
-    if not client:
-        raise RuntimeError("ElevenLabs non configurato (ELEVENLABS_API_KEY mancante)")
-
-    vid = (voice_id or os.environ.get("ELEVENLABS_DEFAULT_VOICE_ID", "")).strip()
-    if not vid:
-        raise RuntimeError("voice_id mancante")
-
     # SSML IPA wrapping + auto-switch to SSML-compatible English model.
     # We first strip any surrounding /…/ notation the caller may have
     # passed as raw input (``/ʌ/`` → ``ʌ``).
@@ -197,6 +172,133 @@ def synthesize_and_store(
     # tags — in that specific case we fall back to multilingual_v2.
     if ssml_used and (model_id or "").startswith("eleven_v3"):
         model_id = "eleven_multilingual_v2"
+    return final_text, model_id, ssml_used, ipa_clean, inline_ipa_hits
+
+
+def _audio_format(output_format: str) -> tuple[str, str]:
+    """``(extension, content_type)`` for an ElevenLabs ``output_format``."""
+    fmt = (output_format or "").lower()
+    if fmt.startswith("mp3"):
+        return "mp3", "audio/mpeg"
+    if fmt.startswith("pcm"):
+        return "pcm", "audio/L16"
+    if fmt.startswith("ulaw"):
+        return "ulaw", "audio/basic"
+    return "mp3", "audio/mpeg"
+
+
+def _public_urls(filename: str) -> dict:
+    base = os.environ.get("FRONTEND_URL", "").rstrip("/")
+    return {
+        "url":          f"{base}/api/uploads/{filename}" if base else f"/api/uploads/{filename}",
+        "relative_url": f"/api/uploads/{filename}",
+    }
+
+
+def _audio_filename(vid: str, output_format: str, filename_hint: Optional[str]) -> tuple[str, str]:
+    ext, content_type = _audio_format(output_format)
+    safe_hint = re.sub(r"[^a-zA-Z0-9_-]+", "_", (filename_hint or "tts"))[:48].strip("_") or "tts"
+    ts = int(datetime.now(timezone.utc).timestamp())
+    # The suffix keeps two takes of one clip within the same second apart: a
+    # regenerated clip must never reuse (and overwrite) the previous take's key.
+    return f"elevenlabs/{safe_hint}_{vid[:8]}_{ts}_{uuid.uuid4().hex[:6]}.{ext}", content_type
+
+
+def _write_local(uploads_dir: Path, filename: str, data: bytes) -> None:
+    local_path = uploads_dir / filename
+    local_path.parent.mkdir(parents=True, exist_ok=True)
+    local_path.write_bytes(data)
+
+
+def _stored_result(filename: str, vid: str, content_type: str, audio_data: bytes) -> dict:
+    return {
+        **_public_urls(filename),
+        "filename":     filename,
+        "voice_id":     vid,
+        "content_type": content_type,
+        "size_bytes":   len(audio_data),
+    }
+
+
+def _store_audio(
+    audio_data: bytes,
+    *,
+    vid: str,
+    output_format: str,
+    filename_hint: Optional[str],
+    emergent_put: Callable[[str, bytes, str], bool],
+    uploads_dir: Path,
+) -> dict:
+    """Persist synthesised audio (Emergent storage, local fallback) and
+    return the ``url`` / ``filename`` half of the synthesis result."""
+    filename, content_type = _audio_filename(vid, output_format, filename_hint)
+    if not emergent_put(filename, audio_data, content_type):
+        _write_local(uploads_dir, filename, audio_data)
+    return _stored_result(filename, vid, content_type, audio_data)
+
+
+async def _store_audio_async(
+    audio_data: bytes,
+    *,
+    vid: str,
+    output_format: str,
+    filename_hint: Optional[str],
+    emergent_put: Callable[[str, bytes, str], Awaitable[bool]],
+    uploads_dir: Path,
+) -> dict:
+    """``_store_audio`` with an awaited storage put (pooled client)."""
+    filename, content_type = _audio_filename(vid, output_format, filename_hint)
+    if not await emergent_put(filename, audio_data, content_type):
+        await asyncio.to_thread(_write_local, uploads_dir, filename, audio_data)
+        await record_put(filename, len(audio_data))
+    return _stored_result(filename, vid, content_type, audio_data)
+
+
+def synthesize_and_store(
+    text: str,
+    voice_id: str,
+    *,
+    emergent_put: Callable[[str, bytes, str], bool],
+    uploads_dir: Path,
+    stability: float = 0.45,
+    similarity_boost: float = 0.85,
+    style: float = 0.0,
+    use_speaker_boost: bool = True,
+    model_id: str = "eleven_multilingual_v2",
+    output_format: str = "mp3_44100_128",
+    filename_hint: Optional[str] = None,
+    ipa_phoneme: Optional[str] = None,
+) -> dict:
+    """Synthesise ``text`` with ElevenLabs and persist the audio to storage.
+
+    ⚙️ ``ipa_phoneme`` (07/07/2026): when set, the text is wrapped in an
+    SSML ``<phoneme alphabet="ipa" ph="…">…</phoneme>`` tag so the model
+    pronounces the exact IPA transcription rather than the surface
+    spelling. This is REQUIRED for isolated phoneme clips ("say /ʌ/")
+    where scientific accuracy trumps naturalness. Because ElevenLabs
+    SSML phoneme tags only work with v2 English models, we AUTO-SWITCH
+    to ``eleven_turbo_v2`` when an IPA hint is present (unless the caller
+    explicitly overrides ``model_id``).
+
+    Blocking (SDK + ``requests``): meant for scripts. Request handlers use
+    ``synthesize_and_store_async`` so the event loop is never frozen.
+
+    Returns ``{url, relative_url, filename, voice_id, content_type, size_bytes,
+    ssml_used, ipa_phoneme}``.
+    """
+    if not (text or "").strip():
+        raise RuntimeError("text vuoto")
+
+    client = _get_elevenlabs_client()
+    if not client:
+        raise RuntimeError("ElevenLabs non configurato (ELEVENLABS_API_KEY mancante)")
+
+    vid = (voice_id or os.environ.get("ELEVENLABS_DEFAULT_VOICE_ID", "")).strip()
+    if not vid:
+        raise RuntimeError("voice_id mancante")
+
+    final_text, model_id, ssml_used, ipa_clean, inline_ipa_hits = \
+        _prepare_tts_text(text, ipa_phoneme, model_id)
 
     from elevenlabs import VoiceSettings
     settings = VoiceSettings(
@@ -216,48 +318,388 @@ def synthesize_and_store(
     if not audio_data:
         raise RuntimeError("ElevenLabs ha restituito audio vuoto")
 
-    fmt = (output_format or "").lower()
-    if fmt.startswith("mp3"):
-        ext, content_type = "mp3", "audio/mpeg"
-    elif fmt.startswith("pcm"):
-        ext, content_type = "pcm", "audio/L16"
-    elif fmt.startswith("ulaw"):
-        ext, content_type = "ulaw", "audio/basic"
-    else:
-        ext, content_type = "mp3", "audio/mpeg"
+    res = _store_audio(audio_data, vid=vid, output_format=output_format,
+                       filename_hint=filename_hint, emergent_put=emergent_put,
+                       uploads_dir=uploads_dir)
+    res.update({
+        "ssml_used":    ssml_used,
+        "ipa_phoneme":  ipa_clean or None,
+        "inline_ipa_hits": inline_ipa_hits or None,
+        "model_id":     model_id,
+    })
+    return res
 
-    safe_hint = re.sub(r"[^a-zA-Z0-9_-]+", "_", (filename_hint or "tts"))[:48].strip("_") or "tts"
-    ts = int(datetime.now(timezone.utc).timestamp())
-    filename = f"elevenlabs/{safe_hint}_{vid[:8]}_{ts}.{ext}"
 
-    ok = emergent_put(filename, audio_data, content_type)
-    if not ok:
-        local_path = uploads_dir / filename
-        local_path.parent.mkdir(parents=True, exist_ok=True)
-        local_path.write_bytes(audio_data)
+# --------------------------------------------------------------------------- #
+# Async synthesis engine — REST calls over ``httpx`` behind a process-wide
+# concurrency cap and token bucket sized on the ElevenLabs plan, retrying
+# 429 / 5xx with exponential backoff. ``ELEVENLABS_API_BASE`` lets tests
+# (and local dev) point it at a fake TTS server.
+# --------------------------------------------------------------------------- #
+class ElevenLabsHTTPError(RuntimeError):
+    """Non-2xx answer from the text-to-speech API."""
+
+    def __init__(self, status_code: int, detail: str = "",
+                 retry_after: Optional[float] = None):
+        super().__init__(f"ElevenLabs HTTP {status_code}: {detail[:200]}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status_code == 429 or self.status_code >= 500
+
+
+class TokenBucket:
+    """Classic token bucket: ``rate`` tokens/s, at most ``capacity`` saved up."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(capacity))
+        self.tokens = self.capacity
+        self.stamp = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+                self.stamp = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class TTSEngine:
+    """Shared limits for every async synthesis in the process.
+
+    ``concurrency`` caps in-flight requests (the plan's concurrent-request
+    quota), ``rate_per_s`` / ``burst`` feed the token bucket. Limits are
+    bound to the running event loop and rebuilt if the loop changes.
+    """
+
+    def __init__(self, *, concurrency: int, rate_per_s: float, burst: float,
+                 max_retries: int, backoff_s: float, timeout_s: float):
+        self.concurrency = max(1, int(concurrency))
+        self.rate_per_s = float(rate_per_s)
+        self.burst = burst
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_s = float(backoff_s)
+        self.timeout_s = float(timeout_s)
+        self._loop = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._bucket: Optional[TokenBucket] = None
+
+    @classmethod
+    def from_env(cls) -> "TTSEngine":
+        concurrency = int(os.environ.get("ELEVENLABS_CONCURRENCY", "4"))
+        return cls(
+            concurrency=concurrency,
+            rate_per_s=float(os.environ.get("ELEVENLABS_RATE_PER_S", "2")),
+            burst=float(os.environ.get("ELEVENLABS_BURST", str(concurrency))),
+            max_retries=int(os.environ.get("ELEVENLABS_MAX_RETRIES", "4")),
+            backoff_s=float(os.environ.get("ELEVENLABS_BACKOFF_S", "1.0")),
+            timeout_s=float(os.environ.get("ELEVENLABS_TIMEOUT_S", "60")),
+        )
+
+    def _limits(self) -> tuple[asyncio.Semaphore, Optional[TokenBucket]]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._sem = asyncio.Semaphore(self.concurrency)
+            self._bucket = TokenBucket(self.rate_per_s, self.burst) if self.rate_per_s > 0 else None
+        return self._sem, self._bucket
+
+    def _delay(self, attempt: int, exc: Exception) -> float:
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after is not None:
+            return min(retry_after, 60.0)
+        return self.backoff_s * (2 ** attempt) * (0.5 + random.random() / 2)
+
+    async def convert(
+        self,
+        http: httpx.AsyncClient,
+        *,
+        text: str,
+        voice_id: str,
+        model_id: str,
+        voice_settings: dict,
+        output_format: str,
+    ) -> tuple[bytes, int]:
+        """POST one text-to-speech request; returns ``(audio, attempts)``."""
+        api_key = os.environ.get("ELEVENLABS_API_KEY", "").strip()
+        if not api_key:
+            raise RuntimeError("ElevenLabs non configurato (ELEVENLABS_API_KEY mancante)")
+        base = os.environ.get("ELEVENLABS_API_BASE", "https://api.elevenlabs.io").rstrip("/")
+        sem, bucket = self._limits()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                async with sem:
+                    if bucket:
+                        await bucket.acquire()
+                    r = await http.post(
+                        f"{base}/v1/text-to-speech/{voice_id}",
+                        params={"output_format": output_format},
+                        headers={"xi-api-key": api_key, "Accept": "audio/*"},
+                        json={"text": text, "model_id": model_id,
+                              "voice_settings": voice_settings},
+                        timeout=self.timeout_s,
+                    )
+                if r.status_code >= 400:
+                    ra = r.headers.get("retry-after")
+                    raise ElevenLabsHTTPError(
+                        r.status_code, r.text,
+                        float(ra) if ra and ra.replace(".", "", 1).isdigit() else None)
+                return r.content, attempt
+            except (ElevenLabsHTTPError, httpx.TransportError) as exc:
+                retryable = getattr(exc, "retryable", True)
+                if not retryable or attempt > self.max_retries:
+                    raise
+                delay = self._delay(attempt - 1, exc)
+                logging.warning(f"ElevenLabs retry {attempt}/{self.max_retries} "
+                                f"in {delay:.2f}s: {exc}")
+                await asyncio.sleep(delay)
+
+
+tts_engine = TTSEngine.from_env()
 
-    base = os.environ.get("FRONTEND_URL", "").rstrip("/")
-    public_url = f"{base}/api/uploads/{filename}" if base else f"/api/uploads/{filename}"
+
+# --------------------------------------------------------------------------- #
+# TTS dedup cache — content-addressed on what ElevenLabs actually receives
+# (final SSML text, voice, model, output format, voice settings). A hit
+# reuses the stored object: no latency, no paid characters. Identical
+# requests already in flight are coalesced onto the first one. Counters in
+# ``tts_cache_stats`` feed ``GET /admin/elevenlabs/cache-stats``.
+# --------------------------------------------------------------------------- #
+_TTS_CACHE = "tts_cache"
+_TTS_CACHE_STATS = "tts_cache_stats"
+_tts_inflight: dict[str, asyncio.Future] = {}
+
+
+def tts_cache_key(text: str, voice_id: str, model_id: str, output_format: str,
+                  voice_settings: dict) -> str:
+    """sha256 over the exact synthesis request (``text`` is the final SSML)."""
+    payload = json.dumps({
+        "text": text, "voice_id": voice_id, "model_id": model_id,
+        "output_format": output_format,
+        "voice_settings": {k: (round(v, 4) if isinstance(v, float) else v)
+                           for k, v in sorted(voice_settings.items())},
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+async def _count_tts(db, field: str, chars: int) -> None:
+    inc = {field: 1, "charsSaved" if field == "hits" else "charsBilled": chars}
+    await db[_TTS_CACHE_STATS].update_one({"id": "global"}, {"$inc": inc}, upsert=True)
+
+
+async def tts_cache_stats(db) -> dict:
+    """Lifetime hit/miss counters, hit rate and the cache's footprint."""
+    st = await db[_TTS_CACHE_STATS].find_one({"id": "global"}, {"_id": 0}) or {}
+    hits, misses = st.get("hits", 0), st.get("misses", 0)
     return {
-        "url":          public_url,
-        "relative_url": f"/api/uploads/{filename}",
-        "filename":     filename,
-        "voice_id":     vid,
-        "content_type": content_type,
-        "size_bytes":   len(audio_data),
+        "entries":     await db[_TTS_CACHE].count_documents({}),
+        "hits":        hits,
+        "misses":      misses,
+        "hitRate":     round(hits / (hits + misses), 4) if hits + misses else None,
+        "charsSaved":  st.get("charsSaved", 0),
+        "charsBilled": st.get("charsBilled", 0),
+    }
+
+
+async def _cached_object_exists(filename: str, uploads_dir: Path) -> bool:
+    """A cache entry's object is still served: a local copy under
+    ``uploads_dir`` (fallback writes), or a key the storage ledger records in
+    object storage. Trusted while the ledger is unbound."""
+    if await asyncio.to_thread((uploads_dir / filename).is_file):
+        return True
+    return await stored_remotely(filename) is not False
+
+
+async def synthesize_and_store_async(
+    text: str,
+    voice_id: str,
+    *,
+    emergent_put: Callable[[str, bytes, str], Awaitable[bool]],
+    uploads_dir: Path,
+    stability: float = 0.45,
+    similarity_boost: float = 0.85,
+    style: float = 0.0,
+    use_speaker_boost: bool = True,
+    model_id: str = "eleven_multilingual_v2",
+    output_format: str = "mp3_44100_128",
+    filename_hint: Optional[str] = None,
+    ipa_phoneme: Optional[str] = None,
+    http: Optional[httpx.AsyncClient] = None,
+    db=None,
+    use_cache: bool = True,
+) -> dict:
+    """Async twin of ``synthesize_and_store`` (same SSML rules, same result
+    keys plus ``characters``, ``attempts`` and ``cached``) going through
+    ``tts_engine``. The storage upload is an awaited ``emergent_put``
+    (``put_object_async`` on the pooled client); only the local-disk
+    fallback write runs in a worker thread. Pass ``http`` to reuse one
+    connection pool across a batch.
+
+    With ``db`` the dedup cache is consulted first; ``use_cache=False``
+    forces a fresh take and makes it the cached object for that key. An
+    entry whose object is gone (local copy lost on redeploy, deleted key) is
+    evicted and synthesised again.
+    """
+    if not (text or "").strip():
+        raise RuntimeError("text vuoto")
+    vid = (voice_id or os.environ.get("ELEVENLABS_DEFAULT_VOICE_ID", "")).strip()
+    if not vid:
+        raise RuntimeError("voice_id mancante")
+
+    final_text, model_id, ssml_used, ipa_clean, inline_ipa_hits = \
+        _prepare_tts_text(text, ipa_phoneme, model_id)
+    settings = {
+        "stability":         float(stability),
+        "similarity_boost":  float(similarity_boost),
+        "style":             float(style),
+        "use_speaker_boost": bool(use_speaker_boost),
+    }
+    meta = {
         "ssml_used":    ssml_used,
         "ipa_phoneme":  ipa_clean or None,
         "inline_ipa_hits": inline_ipa_hits or None,
         "model_id":     model_id,
     }
+    key = tts_cache_key(final_text, vid, model_id, output_format, settings)
+    chars = len(final_text)
+
+    if db is not None and use_cache:
+        hit = await db[_TTS_CACHE].find_one({"key": key}, {"_id": 0})
+        if hit is not None and not await _cached_object_exists(hit["filename"], uploads_dir):
+            logging.warning(f"TTS cache: {hit['filename']} is gone, evicting {key[:12]}")
+            await db[_TTS_CACHE].delete_one({"key": key, "filename": hit["filename"]})
+            hit = None
+        if hit is None and key in _tts_inflight:
+            leading = _tts_inflight[key]
+            try:
+                hit = dict(await asyncio.shield(leading))
+            except asyncio.CancelledError:
+                if not leading.cancelled():
+                    raise               # this request was cancelled, not the leader
+                hit = None
+            except Exception:  # noqa: BLE001 — the leader reports its own failure
+                hit = None
+        if hit is not None:
+            await db[_TTS_CACHE].update_one({"key": key}, {
+                "$inc": {"hits": 1},
+                "$set": {"lastHitAt": datetime.now(timezone.utc).isoformat()}})
+            await _count_tts(db, "hits", chars)
+            return {**_public_urls(hit["filename"]),
+                    "filename": hit["filename"], "voice_id": vid,
+                    "content_type": hit["content_type"], "size_bytes": hit["size_bytes"],
+                    **meta, "characters": chars, "attempts": 0, "cached": True}
+
+    leader: Optional[asyncio.Future] = None
+    if db is not None and key not in _tts_inflight:
+        leader = asyncio.get_running_loop().create_future()
+        _tts_inflight[key] = leader
+    try:
+        if http is None:
+            async with httpx.AsyncClient() as own:
+                audio_data, attempts = await tts_engine.convert(
+                    own, text=final_text, voice_id=vid, model_id=model_id,
+                    voice_settings=settings, output_format=output_format)
+        else:
+            audio_data, attempts = await tts_engine.convert(
+                http, text=final_text, voice_id=vid, model_id=model_id,
+                voice_settings=settings, output_format=output_format)
+        if not audio_data:
+            raise RuntimeError("ElevenLabs ha restituito audio vuoto")
+
+        res = await _store_audio_async(
+            audio_data, vid=vid, output_format=output_format,
+            filename_hint=filename_hint, emergent_put=emergent_put,
+            uploads_dir=uploads_dir)
+        if db is not None:
+            await db[_TTS_CACHE].update_one({"key": key}, {"$set": {
+                "key": key, "filename": res["filename"],
+                "content_type": res["content_type"], "size_bytes": res["size_bytes"],
+                "voice_id": vid, "model_id": model_id, "output_format": output_format,
+                "chars": chars, "createdAt": datetime.now(timezone.utc).isoformat(),
+            }, "$setOnInsert": {"hits": 0}}, upsert=True)
+            await _count_tts(db, "misses", chars)
+    except BaseException as exc:
+        if leader is not None:
+            if isinstance(exc, asyncio.CancelledError):
+                leader.cancel()
+            else:
+                leader.set_exception(exc)
+                leader.exception()   # mark retrieved: followers may not exist
+        raise
+    else:
+        if leader is not None:
+            leader.set_result(res)
+    finally:
+        if leader is not None:
+            _tts_inflight.pop(key, None)
+    res.update(meta, characters=chars, attempts=attempts, cached=False)
+    return res
+
+
+async def run_tts_batch(
+    clips: list[dict],
+    *,
+    emergent_put: Callable[[str, bytes, str], Awaitable[bool]],
+    uploads_dir: Path,
+    on_done: Callable[[dict, Optional[dict], Optional[Exception]], Awaitable[None]],
+    workers: Optional[int] = None,
+    db=None,
+    use_cache: bool = True,
+) -> None:
+    """Synthesise ``clips`` on a pool of ``workers`` (default: the engine's
+    concurrency). Each clip is ``{"key", "kwargs"}`` where ``kwargs`` are
+    ``synthesize_and_store_async`` arguments; ``on_done(clip, result, error)``
+    is awaited as each clip completes (with ``clip["elapsed_ms"]`` set), so
+    callers persist results and emit progress without waiting for the whole
+    batch. A failing clip never stops the others. ``db`` / ``use_cache`` are
+    handed to every clip (dedup cache).
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    for clip in clips:
+        queue.put_nowait(clip)
+    size = max(1, min(workers or tts_engine.concurrency, len(clips)))
+
+    async with httpx.AsyncClient() as http:
+        async def worker() -> None:
+            while True:
+                try:
+                    clip = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                t0 = time.perf_counter()
+                try:
+                    res = await synthesize_and_store_async(
+                        **clip["kwargs"], emergent_put=emergent_put,
+                        uploads_dir=uploads_dir, http=http, db=db,
+                        use_cache=use_cache)
+                except Exception as exc:  # noqa: BLE001
+                    res, err = None, exc
+                else:
+                    err = None
+                clip["elapsed_ms"] = round((time.perf_counter() - t0) * 1000, 1)
+                await on_done(clip, res, err)
+
+        if clips:
+            await asyncio.gather(*(worker() for _ in range(size)))
 
 
 # --------------------------------------------------------------------------- #
 # Router factory
 # --------------------------------------------------------------------------- #
 def build_elevenlabs_router(
+    db,
     get_admin_user: Callable,
-    emergent_put: Callable[[str, bytes, str], bool],
+    emergent_put: Callable[[str, bytes, str], Awaitable[bool]],
     uploads_dir: Path,
 ) -> APIRouter:
     """
@@ -265,12 +707,14 @@ def build_elevenlabs_router(
 
     Parameters
     ----------
+    db:
+        Motor database — backs the TTS dedup cache and its stats.
     get_admin_user:
         FastAPI dependency from ``server.py`` that enforces
         ``role == "admin"``.
     emergent_put:
-        Callable ``(key, data, content_type) -> bool`` for uploading to
-        Emergent Object Storage.
+        Coroutine function ``(key, data, content_type) -> bool`` for
+        uploading to Emergent Object Storage (``put_object_async``).
     uploads_dir:
         Local ``Path`` used as a fallback when Emergent storage upload
         fails (or is unavailable).
@@ -314,7 +758,7 @@ def build_elevenlabs_router(
         the result to Emergent Object Storage. Returns a public URL ready to be
         set as ``voiceClone.url`` in the VocalLab profiles or referenced elsewhere.
 
-        Uses the shared ``synthesize_and_store`` helper so it benefits from
+        Uses the shared ``synthesize_and_store_async`` helper so it benefits from
         the same SSML IPA logic (auto-wrap of ``/ʌ/`` fragments, explicit
         ``ipa_phoneme`` override, auto model-switch to ``eleven_turbo_v2``
         when SSML is used).
@@ -322,7 +766,7 @@ def build_elevenlabs_router(
         if not (req.text or "").strip():
             raise HTTPException(status_code=400, detail="text obbligatorio")
         try:
-            res = synthesize_and_store(
+            res = await synthesize_and_store_async(
                 text=req.text,
                 voice_id=req.voice_id or "",
                 emergent_put=emergent_put,
@@ -335,13 +779,16 @@ def build_elevenlabs_router(
                 output_format=req.output_format,
                 filename_hint=req.filename_hint,
                 ipa_phoneme=req.ipa_phoneme,
+                db=db,
+                use_cache=req.use_cache,
             )
             # Enrich with echo fields for backward-compat with older callers
             res["text"]          = req.text
             res["output_format"] = req.output_format
             return res
         except RuntimeError as e:
-            # ``synthesize_and_store`` raises RuntimeError for config or empty-audio
+            # ``synthesize_and_store_async`` raises RuntimeError for config,
+            # empty-audio or an HTTP error left after the retries
             raise HTTPException(status_code=502, detail=str(e))
         except HTTPException:
             raise
@@ -349,6 +796,12 @@ def build_elevenlabs_router(
             logging.exception("ElevenLabs TTS failed")
             raise HTTPException(status_code=502, detail=f"ElevenLabs error: {e}")
 
+    @router.get("/admin/elevenlabs/cache-stats")
+    async def elevenlabs_cache_stats(_admin: dict = Depends(get_admin_user)):
+        """Dedup cache effectiveness: entries, lifetime hits / misses, hit
+        rate and the characters saved vs billed."""
+        return await tts_cache_stats(db)
+
     # ------------------------------------------------------------------ #
     # Manual audio upload — accepts a file from the Voice Lab (drag & drop
     # or file picker) or a URL fetched from a scientific IPA repository
@@ -394,11 +847,12 @@ def build_elevenlabs_router(
         ts = int(datetime.now(timezone.utc).timestamp())
         filename = f"manual/{safe_hint}_{ts}.{ext}"
 
-        ok = emergent_put(filename, raw, content_type)
+        ok = await emergent_put(filename, raw, content_type)
         if not ok:
             local_path = uploads_dir / filename
             local_path.parent.mkdir(parents=True, exist_ok=True)
             local_path.write_bytes(raw)
+            await record_put(filename, len(raw))
 
         base = os.environ.get("FRONTEND_URL", "").rstrip("/")
         public_url   = f"{base}/api/uploads/{filename}" if base else f"/api/uploads/{filename}"
@@ -504,11 +958,12 @@ def build_elevenlabs_router(
             "m4a": "audio/mp4", "flac": "audio/flac", "aac": "audio/aac",
         }.get(ext, "audio/mpeg")
 
-        ok = emergent_put(filename, data, content_type_out)
+        ok = await emergent_put(filename, data, content_type_out)
         if not ok:
             local_path = uploads_dir / filename
             local_path.parent.mkdir(parents=True, exist_ok=True)
             local_path.write_bytes(data)
+            await record_put(filename, len(data))
 
         base = os.environ.get("FRONTEND_URL", "").rstrip("/")
         public_url   = f"{base}/api/uploads/{filename}" if base else f"/api/uploads/{filename}"
@@ -8,8 +8,9 @@ weights) from ``phoneme_formants`` WITHOUT auth/consent and WITHOUT persisting
 the audio (transient analysis only — privacy-friendly for anonymous leads).
 
 Architectural constraints (Emergent Support):
-* Parselmouth is CPU-bound → the measurement runs in a ProcessPoolExecutor
-  worker (one analysis ≈ one core), never inline in the async handler.
+* Parselmouth is CPU-bound → the measurement runs in the shared, pre-warmed
+  analysis pool (``routers.analysis_pool``; one analysis ≈ one core), never
+  inline in the async handler.
 * No server-side session state: this endpoint is fully STATELESS. Any test
   progress lives client-side (React) or, at the gate step, in MongoDB.
 """
@@ -17,18 +18,13 @@ from __future__ import annotations
 
 import os
 import re
-import io
-import wave
-import array
 import time
 import uuid
 import asyncio
 import logging
-import tempfile
 import difflib
-import multiprocessing as mp
+import contextlib
 from datetime import datetime, timezone
-from concurrent.futures import ProcessPoolExecutor
 
 from fastapi import APIRouter, Body, Depends, File, Form, HTTPException, UploadFile
 from pydantic import BaseModel
@@ -79,12 +75,16 @@ class LeadIn(BaseModel):
 from routers.phoneme_formants import (
     _measure_all_ceilings,
     find_reference,
-    fetch_and_extract,
     compute_formant_score,
     score_against_reference,
     _cefr_band,
 )
 import routers.phoneme_formants as pf
+from routers.analysis_pool import batch_slots, parse_batch_takes, run_analysis
+from routers.audio_ingest import MAX_TAKE_BYTES, SpooledTake, spool_upload
+from routers.measurement_cache import get_measurement_cache
+from routers.teacher_references import resolve_teacher_reference, schedule_reference_index
+from utils.storage_ledger import record_put
 
 try:
     from emergentintegrations.llm.openai import OpenAISpeechToText
@@ -135,9 +135,6 @@ _OPENAI_KEY = os.environ.get("OPENAI_API_KEY", "")
 _ASR_KEY = _EMERGENT_KEY or (_OPENAI_KEY if _OPENAI_KEY and _OPENAI_KEY != "REPLACE_IN_PANEL" else "")
 _ASR_READY = bool(OpenAISpeechToText) and bool(_ASR_KEY)
 
-_MAX_WORKERS = int(os.environ.get("LEVEL_TEST_POOL_WORKERS", "2"))
-_pool: ProcessPoolExecutor | None = None
-
 # Vowel-coherence gate (option b) — TUNABLE. The Level Test is an EXAM: the user
 # may produce the WRONG vowel, so we trust ONLY the HIGHEST LPC ceiling (where
 # F1 tracking is most reliable). A take that is implausible at the top ceiling
@@ -180,31 +177,6 @@ def _coherence_ok(result: dict) -> bool:
     )
 
 
-def _get_pool() -> ProcessPoolExecutor:
-    global _pool
-    if _pool is None:
-        # 'spawn' → clean workers that don't inherit the asyncio loop / Mongo
-        # client from the parent (safe under fork-averse async servers).
-        _pool = ProcessPoolExecutor(
-            max_workers=_MAX_WORKERS, mp_context=mp.get_context("spawn")
-        )
-    return _pool
-
-
-def _measure_from_bytes(raw: bytes):
-    """Runs INSIDE a worker process: write bytes to a temp WAV and measure."""
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tf:
-        tf.write(raw)
-        path = tf.name
-    try:
-        return _measure_all_ceilings(path)
-    finally:
-        try:
-            os.unlink(path)
-        except OSError:
-            pass
-
-
 # --------------------------------------------------------------------------- #
 # ASR (Whisper) + lexical correctness — Signal A of the V2 combined verdict.
 # --------------------------------------------------------------------------- #
@@ -255,37 +227,13 @@ def _lexicon_for(lexicon: dict, expected: str) -> set:
     return set(entry.get("block") or [])
 
 
-def _wav_stats(raw: bytes) -> dict:
-    """Cheap acoustic stats of the received WAV — STABLE instrumentation so an
-    error branch is never blind again (a 422 in prod must not be invisible).
-    Reports bytes, duration, RMS and peak amplitude (0..1) to tell apart an
-    empty / truncated / silent take."""
-    try:
-        with wave.open(io.BytesIO(raw), "rb") as w:
-            n, sr, sw, ch = w.getnframes(), w.getframerate(), w.getsampwidth(), w.getnchannels()
-            frames = w.readframes(n)
-        dur = round(n / sr, 3) if sr else 0.0
-        rms = peak = None
-        if sw == 2 and frames:
-            a = array.array("h"); a.frombytes(frames)
-            if len(a):
-                peak = round(max(abs(x) for x in a) / 32768.0, 5)
-                rms = round((sum(x * x for x in a) / len(a)) ** 0.5 / 32768.0, 5)
-        return {"bytes": len(raw), "duration_s": dur, "sample_rate": sr,
-                "channels": ch, "frames": n, "rms": rms, "peak": peak}
-    except Exception as e:  # noqa: BLE001
-        return {"bytes": len(raw), "wav_parse_error": str(e)}
-
-
-async def _transcribe(raw: bytes) -> str | None:
-    """Outbound HTTPS to Whisper (thin-client). Returns transcript text, or None
-    if ASR is unavailable/failed (caller degrades gracefully). language='en'
-    forced so an Italian word is transcribed as (wrong) English, not 'recognised'."""
+async def _transcribe(path: str) -> str | None:
+    """Outbound HTTPS to Whisper (thin-client), streaming the spooled take.
+    Returns transcript text, or None if ASR is unavailable/failed (caller
+    degrades gracefully). language='en' forced so an Italian word is
+    transcribed as (wrong) English, not 'recognised'."""
     if not _ASR_READY:
         return None
-    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tf:
-        tf.write(raw)
-        path = tf.name
     try:
         stt = OpenAISpeechToText(api_key=_ASR_KEY)
         with open(path, "rb") as fh:
@@ -300,11 +248,6 @@ async def _transcribe(raw: bytes) -> str | None:
     except Exception:  # noqa: BLE001
         logger.exception("level-test: Whisper transcription failed")
         return None
-    finally:
-        try:
-            os.unlink(path)
-        except OSError:
-            pass
 
 
 def _lexical_word(transcript: str | None, expected: str, block: set) -> dict:
@@ -442,11 +385,12 @@ def build_level_test_router(db, get_admin_user=None, emergent_put=None, uploads_
             raise HTTPException(status_code=404, detail="Slot parola-esempio inesistente")
         if not url:
             # Fallback synthesis: PLAIN WORD, natural voice (no SSML phoneme).
-            from routers.elevenlabs import synthesize_and_store
-            res = synthesize_and_store(
+            from routers.elevenlabs import synthesize_and_store_async
+            res = await synthesize_and_store_async(
                 slot["word"], os.environ.get("ELEVENLABS_DEFAULT_VOICE_ID", ""),
                 emergent_put=emergent_put, uploads_dir=uploads_dir,
                 filename_hint=f"leveltest_word_{slot['label']}_{dialect}",
+                db=db,
             )
             url = res.get("relative_url") or res.get("url", "")
         await db.phoneme_cards.update_one(
@@ -454,6 +398,7 @@ def build_level_test_router(db, get_admin_user=None, emergent_put=None, uploads_
             {"$set": {f"audio.{dialect}.wordExample": {
                 "word": slot["word"], "ipa": slot["ipa"], "url": url}}},
         )
+        schedule_reference_index(db, [url])
         return {"phoneme": phoneme, "dialect": dialect, "url": url, "state": "ready"}
 
     @router.post("/admin/word-examples/upload")
@@ -485,17 +430,19 @@ def build_level_test_router(db, get_admin_user=None, emergent_put=None, uploads_
         ctype = {"mp3": "audio/mpeg", "wav": "audio/wav", "ogg": "audio/ogg",
                  "m4a": "audio/mp4", "flac": "audio/flac", "aac": "audio/aac"}.get(ext, "audio/mpeg")
         filename = f"leveltest/{slot['label']}_{dialect}_{int(time.time())}.{ext}"
-        ok = emergent_put(filename, raw, ctype)
+        ok = await emergent_put(filename, raw, ctype)
         if not ok and uploads_dir:
             p = uploads_dir / filename
             p.parent.mkdir(parents=True, exist_ok=True)
             p.write_bytes(raw)
+            await record_put(filename, len(raw))
         url = f"/api/uploads/{filename}"
         await db.phoneme_cards.update_one(
             {"id": slot["card_id"]},
             {"$set": {f"audio.{dialect}.wordExample": {
                 "word": slot["word"], "ipa": slot["ipa"], "url": url}}},
         )
+        schedule_reference_index(db, [url])
         return {"phoneme": phoneme, "dialect": dialect, "url": url, "state": "ready"}
 
     # ------------------------------------------------------------------ #
@@ -548,26 +495,22 @@ def build_level_test_router(db, get_admin_user=None, emergent_put=None, uploads_
         )
         return {"approved": approved}
 
-    @router.post("/score")
-    async def score(
-        file: UploadFile = File(...),
-        phoneme_ipa: str = Form(...),
-        expected: str = Form(""),
-        kind: str = Form("word"),
-        dialect: str = Form(""),
-        reference_url: str = Form(""),
-        session_id: str = Form(""),
-    ):
-        raw = await file.read()
-        if not raw:
+    def _check_take(take: SpooledTake, phoneme_ipa: str, expected: str) -> None:
+        if not take.size:
             logger.warning("level-test/score EMPTY-BODY phoneme=%s expected=%r (0 bytes received)",
                            phoneme_ipa, expected)
             raise HTTPException(status_code=400, detail="Audio vuoto")
-        if len(raw) > 15 * 1024 * 1024:
+        if take.too_large:
             raise HTTPException(status_code=413, detail="Audio troppo grande")
 
+    async def _measure_take(take: SpooledTake, phoneme_ipa: str, expected: str,
+                            kind: str, dialect: str) -> dict:
+        """Phase 1 of a take — the slow part, independent of every other take:
+        Whisper, the lexical bouncer and the formant measurement. Returns
+        ``{"done": result}`` when the take is already decided (phrase, wrong
+        word), else the context for ``_score_measured_take``."""
         # ---- Signal A: ASR (Whisper) — what did the user actually say? -----
-        transcript = await _transcribe(raw)
+        transcript = await _transcribe(take.path)
 
         # ===================== PHRASE (lexical only) ========================
         if kind == "phrase":
@@ -579,8 +522,8 @@ def build_level_test_router(db, get_admin_user=None, emergent_put=None, uploads_
             phrase_score = round((acc["accuracy"] or 0.0) * 100, 1) if acc["accuracy"] is not None else None
             logger.info("level-test/score PHRASE expected=%r transcript=%r accuracy=%s score=%s",
                         expected, transcript, acc["accuracy"], phrase_score)
-            return {"kind": "phrase", "lexical": acc, "phrase_score": phrase_score,
-                    "asr_available": _ASR_READY}
+            return {"done": {"kind": "phrase", "lexical": acc, "phrase_score": phrase_score,
+                             "asr_available": _ASR_READY}}
 
         # ---- Signal A: BOUNCER lexical check (block-only, binary) -----------
         if expected:
@@ -612,28 +555,50 @@ def build_level_test_router(db, get_admin_user=None, emergent_put=None, uploads_
         # vowel quality. Short-circuit: no need to measure formants.
         if lexical["status"] == "wrong":
             logger.info("level-test/score WRONG-WORD phoneme=%s expected=%r transcript=%r -> A1 audio=%s",
-                        phoneme_ipa, expected, transcript, _wav_stats(raw))
-            return _wrong_word_result({}, None)
+                        phoneme_ipa, expected, transcript, take.stats())
+            return {"done": _wrong_word_result({}, None)}
 
         # ============== Signal B: formant measurement ======================
-        loop = asyncio.get_running_loop()
+        # Content-addressed cache first: a retried take is measured once. This
+        # path scores an EAGER measurement, so a partial (lazy) snapshot left
+        # by /phonemes/analyze-formants is re-measured and upgraded.
+        cache = get_measurement_cache()
+        cache_key = pf.take_cache_key(take)
+        snap = await cache.get(cache_key)
         try:
-            meas = await loop.run_in_executor(_get_pool(), _measure_from_bytes, raw)
+            if snap and snap["complete"]:
+                meas = snap["meas"]
+            else:
+                meas = await run_analysis(_measure_all_ceilings, take.path)
+                await cache.put(cache_key, "take", pf._snapshot(meas))
+        except HTTPException:
+            raise  # pool saturated (429) / job timeout (503)
         except Exception:  # noqa: BLE001
             logger.exception("level-test/score: measurement worker failed")
             raise HTTPException(status_code=500, detail="Errore di analisi")
         if not meas:
             logger.warning("level-test/score NO-FORMANTS phoneme=%s expected=%r audio=%s",
-                           phoneme_ipa, expected, _wav_stats(raw))
+                           phoneme_ipa, expected, take.stats())
             raise HTTPException(
                 status_code=422,
                 detail="Impossibile estrarre le formanti. Registra di nuovo in un ambiente silenzioso.",
             )
+        return {"take": take, "phoneme_ipa": phoneme_ipa, "expected": expected,
+                "shown": shown, "other": other, "lexical": lexical,
+                "transcript": transcript, "meas": meas}
+
+    async def _score_measured_take(ctx: dict, reference_url: str, session_id: str) -> dict:
+        """Phase 2: references, session gender lock, gates and the bidialectal
+        score. Reads/writes the session lock, so takes of one session must
+        pass through here in order."""
+        take, phoneme_ipa, expected = ctx["take"], ctx["phoneme_ipa"], ctx["expected"]
+        shown, other, meas = ctx["shown"], ctx["other"], ctx["meas"]
+        lexical, transcript = ctx["lexical"], ctx["transcript"]
 
         refs_shown = await find_reference(db, phoneme_ipa, shown)
         teacher_ref = None
         if not refs_shown and reference_url:
-            teacher_ref = await fetch_and_extract(reference_url)
+            teacher_ref = await resolve_teacher_reference(db, reference_url)
         if not refs_shown and not teacher_ref:
             raise HTTPException(status_code=422, detail={
                 "message": "Riferimento non disponibile per questo suono.", "reason": "no_reference"})
@@ -643,7 +608,7 @@ def build_level_test_router(db, get_admin_user=None, emergent_put=None, uploads_
             hint = f" Riprova pronunciando \"{word}\"." if word else " Riprova, tenendo il suono fermo 1-2 secondi."
             logger.warning(
                 "level-test/score INCOHERENT phoneme=%s expected=%r reason=%s transcript=%r audio=%s",
-                phoneme_ipa, expected, reason, transcript, _wav_stats(raw),
+                phoneme_ipa, expected, reason, transcript, take.stats(),
             )
             return HTTPException(status_code=422, detail={
                 "message": f"Non ho riconosciuto chiaramente il suono.{hint}",
@@ -654,7 +619,7 @@ def build_level_test_router(db, get_admin_user=None, emergent_put=None, uploads_
         # (169 Hz on a male → 'But' inflated to 85.6). Lock the group per session
         # on the first RELIABLE take (f0 present AND ≥1.0s); default 'men' until.
         _f0m = meas.get("f0_global")
-        _dur_s = _wav_stats(raw).get("duration_s") or 0
+        _dur_s = take.stats().get("duration_s") or 0
         _reliable = bool(_f0m) and _dur_s >= 1.0
         _locked = None
         if session_id:
@@ -683,7 +648,7 @@ def build_level_test_router(db, get_admin_user=None, emergent_put=None, uploads_
             phoneme_ipa, shown, primary["student_formants"].get("F0"), primary.get("reference_group"),
             primary["composite_score"], _coherence_ok(primary),
             [(a.get("ceiling_hz"), a.get("F1"), a.get("F2"), a.get("plausible")) for a in diag.get("attempts", [])],
-            lexical["status"], transcript, _wav_stats(raw),
+            lexical["status"], transcript, take.stats(),
         )
         if not _coherence_ok(primary):
             raise _incoherent_error("vowel_incoherence")
@@ -741,6 +706,76 @@ def build_level_test_router(db, get_admin_user=None, emergent_put=None, uploads_
             "cefr": final_cefr, "rhoticity": rhoticity, "asr_available": _ASR_READY,
         }
 
+    @router.post("/score")
+    async def score(
+        file: UploadFile = File(...),
+        phoneme_ipa: str = Form(...),
+        expected: str = Form(""),
+        kind: str = Form("word"),
+        dialect: str = Form(""),
+        reference_url: str = Form(""),
+        session_id: str = Form(""),
+    ):
+        with await spool_upload(file, MAX_TAKE_BYTES) as take:
+            _check_take(take, phoneme_ipa, expected)
+            ctx = await _measure_take(take, phoneme_ipa, expected, kind, dialect)
+            if "done" in ctx:
+                return ctx["done"]
+            return await _score_measured_take(ctx, reference_url, session_id)
+
+    @router.post("/score-batch")
+    async def score_batch(
+        files: list[UploadFile] = File(...),
+        takes: str = Form(...),
+        session_id: str = Form(""),
+    ):
+        """Several takes in one request. ``takes`` is a JSON array, one object
+        per file in the same order, with the ``/score`` form fields
+        (``phoneme_ipa`` required; ``expected``, ``kind``, ``dialect``,
+        ``reference_url`` optional).
+
+        Whisper + measurement of every take run concurrently (the measurements
+        at most one per pool worker at a time, ``batch_slots``); the scoring phase then runs take by take,
+        in order, so the session gender lock evolves exactly as if the takes
+        had been posted one by one. Each entry of ``results`` is
+        ``{index, ok, result}`` or ``{index, ok: false, status_code, detail}``
+        — one failed take never fails the batch."""
+        specs = parse_batch_takes(takes, len(files), {
+            "expected": "", "kind": "word", "dialect": "", "reference_url": ""})
+        # Every take is spooled to its own temp file; the stack removes them
+        # once the whole batch is answered.
+        with contextlib.ExitStack() as stack:
+            spooled = [stack.enter_context(await spool_upload(f, MAX_TAKE_BYTES)) for f in files]
+
+            async def _phase1(i: int) -> dict:
+                spec = specs[i]
+                _check_take(spooled[i], spec["phoneme_ipa"], spec["expected"])
+                return await _measure_take(spooled[i], spec["phoneme_ipa"], spec["expected"],
+                                           spec["kind"], spec["dialect"])
+
+            with batch_slots():
+                prepared = await asyncio.gather(*(_phase1(i) for i in range(len(spooled))),
+                                                return_exceptions=True)
+            results = []
+            for i, ctx in enumerate(prepared):
+                try:
+                    if isinstance(ctx, BaseException):
+                        raise ctx
+                    res = ctx["done"] if "done" in ctx else await _score_measured_take(
+                        ctx, specs[i]["reference_url"], session_id)
+                    results.append({"index": i, "ok": True, "result": res})
+                except HTTPException as exc:
+                    results.append({"index": i, "ok": False,
+                                    "status_code": exc.status_code, "detail": exc.detail})
+                except Exception:  # noqa: BLE001
+                    logger.exception("level-test/score-batch: take %s failed", i)
+                    results.append({"index": i, "ok": False,
+                                    "status_code": 500, "detail": "Errore di analisi"})
+            failed = sum(1 for r in results if not r["ok"])
+            logger.info("level-test/score-batch takes=%s failed=%s session=%s",
+                        len(results), failed, session_id or "-")
+            return {"results": results, "count": len(results), "failed": failed}
+
     # ======================= COMBINED VERDICT ==============================
     @router.post("/verdict")
     async def verdict(body: VerdictIn = Body(...)):
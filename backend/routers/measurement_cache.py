@@ -0,0 +1,187 @@
+"""
+Content-addressed cache for formant measurements.
+
+Students re-submit byte-identical takes (retry after a 422, frontend network
+retries) and every diphthong/consonant request re-analyses the same teacher
+clip. Both are keyed here by
+``BLAKE2b(BLAKE2b(audio bytes) ‖ analysis parameters)`` so an identical take
+— or reference clip — is analysed by Praat once.
+
+Two tiers, both read-through:
+
+* in-process LRU (``FORMANT_CACHE_LRU_SIZE`` entries, default 256);
+* MongoDB ``formant_measurement_cache`` with a TTL index on ``created_at``
+  (``FORMANT_CACHE_TTL_S``, default 7 days) — shared by every app process
+  and survives restarts. A DB hit is promoted into the LRU.
+
+The analysis parameters (LPC ceilings, frame step, engine, FormantPath mode)
+are part of the key, so changing any of them never serves a stale result.
+Values are plain JSON-able dicts and are treated as read-only by callers.
+
+Admin: ``GET /api/admin/formant-cache`` (hit/miss counters, sizes) and
+``DELETE /api/admin/formant-cache[?kind=take|reference]`` (purge both tiers).
+``FORMANT_CACHE_ENABLED=false`` turns the cache into a no-op.
+"""
+from __future__ import annotations
+
+import os
+import hashlib
+import logging
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from fastapi import APIRouter, Depends
+
+from routers.audio_ingest import content_digest
+
+logger = logging.getLogger(__name__)
+
+CACHE_ENABLED = os.environ.get("FORMANT_CACHE_ENABLED", "true").lower() != "false"
+_LRU_SIZE = int(os.environ.get("FORMANT_CACHE_LRU_SIZE", "256"))
+CACHE_TTL_S = int(os.environ.get("FORMANT_CACHE_TTL_S", str(7 * 24 * 3600)))
+_COLLECTION = "formant_measurement_cache"
+
+
+def digest_measurement_key(digest: str, kind: str, params: str) -> str:
+    """Hex BLAKE2b of the content digest + the analysis parameters. Spooled
+    uploads hash their bytes while being written (``audio_ingest``), so the
+    key never needs the bytes in memory."""
+    h = hashlib.blake2b(digest_size=20)
+    h.update(kind.encode())
+    h.update(b"\0")
+    h.update(params.encode())
+    h.update(b"\0")
+    h.update(digest.encode())
+    return h.hexdigest()
+
+
+def measurement_key(data: bytes, kind: str, params: str) -> str:
+    """Cache key of in-memory audio bytes (e.g. a downloaded teacher clip)."""
+    return digest_measurement_key(content_digest(data), kind, params)
+
+
+class MeasurementCache:
+    def __init__(self, lru_size: int, enabled: bool = True):
+        self.lru_size = max(0, lru_size)
+        self.enabled = enabled
+        self._db = None
+        self._lru: "OrderedDict[str, dict]" = OrderedDict()
+        self._counters = {"hits_memory": 0, "hits_db": 0, "misses": 0,
+                          "stores": 0, "db_errors": 0}
+
+    def attach_db(self, db) -> None:
+        self._db = db
+
+    def _remember(self, key: str, value: dict) -> None:
+        if not self.lru_size:
+            return
+        self._lru[key] = value
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.lru_size:
+            self._lru.popitem(last=False)
+
+    async def get(self, key: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        value = self._lru.get(key)
+        if value is not None:
+            self._lru.move_to_end(key)
+            self._counters["hits_memory"] += 1
+            return value
+        if self._db is not None:
+            try:
+                doc = await self._db[_COLLECTION].find_one({"_id": key}, {"value": 1})
+            except Exception:  # noqa: BLE001
+                self._counters["db_errors"] += 1
+                logger.exception("formant-cache: DB read failed")
+                doc = None
+            if doc:
+                self._counters["hits_db"] += 1
+                self._remember(key, doc["value"])
+                return doc["value"]
+        self._counters["misses"] += 1
+        return None
+
+    async def put(self, key: str, kind: str, value: dict) -> None:
+        if not self.enabled:
+            return
+        self._remember(key, value)
+        self._counters["stores"] += 1
+        if self._db is None:
+            return
+        try:
+            await self._db[_COLLECTION].replace_one(
+                {"_id": key},
+                {"_id": key, "kind": kind, "value": value,
+                 "created_at": datetime.now(timezone.utc)},
+                upsert=True,
+            )
+        except Exception:  # noqa: BLE001
+            self._counters["db_errors"] += 1
+            logger.exception("formant-cache: DB write failed")
+
+    async def purge(self, kind: Optional[str] = None) -> dict:
+        """Drop every entry (or only those of ``kind``) from both tiers. LRU
+        entries carry no kind, so a kind-filtered purge clears the whole LRU —
+        it refills from the DB tier on the next hits."""
+        memory = len(self._lru)
+        self._lru.clear()
+        db_deleted = 0
+        if self._db is not None:
+            res = await self._db[_COLLECTION].delete_many({"kind": kind} if kind else {})
+            db_deleted = res.deleted_count
+        logger.info("formant-cache: purged kind=%s memory=%s db=%s", kind, memory, db_deleted)
+        return {"memory_purged": memory, "db_purged": db_deleted}
+
+    async def stats(self) -> dict:
+        hits = self._counters["hits_memory"] + self._counters["hits_db"]
+        lookups = hits + self._counters["misses"]
+        db_entries = None
+        if self._db is not None:
+            try:
+                db_entries = await self._db[_COLLECTION].estimated_document_count()
+            except Exception:  # noqa: BLE001
+                pass
+        return {
+            "enabled": self.enabled,
+            "memory_entries": len(self._lru),
+            "memory_capacity": self.lru_size,
+            "db_entries": db_entries,
+            "ttl_s": CACHE_TTL_S,
+            **self._counters,
+            "hit_rate": round(hits / lookups, 3) if lookups else None,
+        }
+
+
+_cache: Optional[MeasurementCache] = None
+
+
+def get_measurement_cache() -> MeasurementCache:
+    global _cache
+    if _cache is None:
+        _cache = MeasurementCache(_LRU_SIZE, CACHE_ENABLED)
+    return _cache
+
+
+async def ensure_measurement_cache_indexes(db) -> None:
+    """TTL index on ``created_at``. Changing FORMANT_CACHE_TTL_S on an existing
+    deployment needs a ``collMod`` (Mongo won't redefine a TTL in place)."""
+    await db[_COLLECTION].create_index("created_at", expireAfterSeconds=CACHE_TTL_S)
+    await db[_COLLECTION].create_index("kind")
+
+
+def build_measurement_cache_router(db, get_admin_user: Callable) -> APIRouter:
+    router = APIRouter(tags=["formant-cache"])
+    get_measurement_cache().attach_db(db)
+
+    @router.get("/admin/formant-cache")
+    async def formant_cache_stats(admin: dict = Depends(get_admin_user)):
+        return await get_measurement_cache().stats()
+
+    @router.delete("/admin/formant-cache")
+    async def purge_formant_cache(kind: Optional[str] = None,
+                                  admin: dict = Depends(get_admin_user)):
+        return await get_measurement_cache().purge(kind)
+
+    return router
@@ -24,15 +24,23 @@ but only return ``published == True`` documents.
 """
 
 from datetime import datetime, timezone
+from pathlib import Path
 from typing import Any, Dict, List, Optional
+import asyncio
+import copy
+import hashlib
 import json as json_mod
 import logging
 import os
 import re
+import time
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel, Field
+from pymongo import UpdateOne
+
+from .canonical_phonemes import canonical_inventory
 
 # --------------------------------------------------------------------------- #
 # Pydantic models
@@ -228,41 +236,21 @@ async def compute_frequency_chart(
     heights are linearly normalised from rank 1 (100) to rank max (30) so the
     chart is visually meaningful without fabricating percentages.
 
-    This function is the single source of truth for the chart — the stored
-    ``frequencyChart`` field in Mongo is ignored on read (Phase C lockdown).
+    This function is the single source of truth for the chart — a stored
+    ``frequencyChart`` is only served while its ``frequencyChartKey`` still
+    matches these inputs (see ``materialise_chart``; Phase C lockdown).
     """
     if category not in ("vowel", "consonant", "diphthong"):
         return []
 
-    # Pick the card's dialect with explicit precedence:
-    #   GenAm wins if present (default American), else RP if present, else GenAm.
-    if dialects and "GenAm" in dialects:
-        dialect_val = "GenAm"
-    elif dialects and "AmE" in dialects:
-        dialect_val = "GenAm"  # AmE is the label used on cards for GenAm
-    elif dialects and "RP" in dialects:
-        dialect_val = "RP"
-    else:
-        dialect_val = "GenAm"
-
-    docs = await db.canonical_phonemes.find(
-        {"dialect": dialect_val, "kind": category, "frequency_rank": {"$ne": None}},
-        {"_id": 0, "ipa": 1, "frequency_rank": 1},
-    ).to_list(100)
-    docs.sort(key=lambda d: d.get("frequency_rank") or 999)
+    dialect_val = _chart_dialect(dialects)
+    docs = await canonical_inventory.ranked(db, dialect_val, category)
 
     top = docs[:n]
 
     # Force-include the target ipa if outside top-N (swap in for the last slot)
     if ipa and not any(d["ipa"] == ipa for d in top):
-        target = None
-        for candidate in _ipa_equivalents(ipa):
-            target = await db.canonical_phonemes.find_one(
-                {"dialect": dialect_val, "ipa": candidate},
-                {"_id": 0, "ipa": 1, "frequency_rank": 1},
-            )
-            if target:
-                break
+        target = await _canonical_row(db, ipa, dialect_val)
         if target:
             top = top[:-1] + [target] if top else [target]
 
@@ -283,21 +271,86 @@ async def compute_frequency_chart(
     return bars
 
 
-async def _inject_computed_chart(db, doc: dict) -> dict:
-    """Overwrite the stored ``frequencyChart`` with the canonical-computed one."""
+def _chart_dialect(dialects: List[str] | None) -> str:
+    # Pick the card's dialect with explicit precedence:
+    #   GenAm wins if present (default American), else RP if present, else GenAm.
+    if dialects and "GenAm" in dialects:
+        return "GenAm"
+    if dialects and "AmE" in dialects:
+        return "GenAm"  # AmE is the label used on cards for GenAm
+    if dialects and "RP" in dialects:
+        return "RP"
+    return "GenAm"
+
+
+# The chart depends only on the canonical inventory and the card's
+# ipa / category / chart dialect, so it is materialised on the card together
+# with the key it was computed from. Reads serve the stored bars while the key
+# matches; a card edit touching those fields or a new canonical version makes
+# it stale, and it is recomputed (from the in-memory inventory) and persisted
+# by the writer, the startup sweep or — as a last resort — the next read.
+_CHART_KEY_FIELD = "frequencyChartKey"
+
+
+def _chart_key(doc: dict, version: int) -> Dict[str, Any]:
+    return {
+        "canonicalVersion": version,
+        "ipa": doc.get("ipa", ""),
+        "category": doc.get("category", "vowel"),
+        "dialect": _chart_dialect(doc.get("dialects") or []),
+    }
+
+
+async def materialise_chart(db, doc: dict, version: Optional[int] = None) -> bool:
+    """Recompute ``frequencyChart`` (and its key) into ``doc`` if stale.
+    Returns True when the doc was changed and needs persisting."""
+    if version is None:
+        version = await canonical_inventory.current_version(db)
+    key = _chart_key(doc, version)
+    if doc.get(_CHART_KEY_FIELD) == key:
+        return False
+    doc["frequencyChart"] = await compute_frequency_chart(
+        db, ipa=key["ipa"], category=key["category"], dialects=doc.get("dialects") or [],
+    )
+    doc[_CHART_KEY_FIELD] = key
+    return True
+
+
+async def _inject_computed_chart(db, doc: dict, persist: bool = True) -> dict:
+    """Make sure ``doc`` carries the canonical-computed ``frequencyChart``,
+    writing it back to the card when it had to be recomputed."""
     try:
-        doc["frequencyChart"] = await compute_frequency_chart(
-            db,
-            ipa=doc.get("ipa", ""),
-            category=doc.get("category", "vowel"),
-            dialects=doc.get("dialects") or [],
-        )
+        if await materialise_chart(db, doc) and persist and doc.get("id"):
+            await db.phoneme_cards.update_one(
+                {"id": doc["id"]},
+                {"$set": {"frequencyChart": doc["frequencyChart"],
+                          _CHART_KEY_FIELD: doc[_CHART_KEY_FIELD]}},
+            )
     except Exception:  # noqa: BLE001 — never break the read path
         # keep whatever is in Mongo as fallback
         pass
     return doc
 
 
+async def refresh_stale_charts(db) -> int:
+    """Materialise the chart of every card whose key is stale (startup, after
+    the canonical seed). Returns the number of cards rewritten."""
+    version = await canonical_inventory.current_version(db)
+    docs = await db.phoneme_cards.find(
+        {}, {"_id": 0, "id": 1, "ipa": 1, "category": 1, "dialects": 1, _CHART_KEY_FIELD: 1},
+    ).to_list(1000)
+    n = 0
+    for doc in docs:
+        if await materialise_chart(db, doc, version):
+            await db.phoneme_cards.update_one(
+                {"id": doc["id"]},
+                {"$set": {"frequencyChart": doc["frequencyChart"],
+                          _CHART_KEY_FIELD: doc[_CHART_KEY_FIELD]}},
+            )
+            n += 1
+    return n
+
+
 # --------------------------------------------------------------------------- #
 # Phase D — Deterministic autofill from canonical inventory
 # --------------------------------------------------------------------------- #
@@ -407,26 +460,36 @@ def _ipa_equivalents(ipa: str) -> List[str]:
     return candidates
 
 
+async def _canonical_row(db, ipa: str, dialect: Optional[str] = None) -> Optional[dict]:
+    """Canonical row of the first IPA equivalent found for ``dialect`` (any
+    dialect when None) — served by the in-process ``canonical_inventory``."""
+    return await canonical_inventory.find(db, _ipa_equivalents(ipa), dialect)
+
+
+# Default for the rule engines' ``canonical`` argument: look the row up. Bulk
+# callers resolve it once per card and hand the same row (or None) to every rule.
+_LOOKUP: Any = object()
+
+
 # --------------------------------------------------------------------------- #
 # §3.1 Facial-muscle rule wiring (DERIVED — non-LLM, per Spec §1)
 # --------------------------------------------------------------------------- #
-async def _resolve_canonical_kind(db, ipa: str, category: str) -> str:
+async def _resolve_canonical_kind(db, ipa: str, category: str, canonical: Any = _LOOKUP) -> str:
     """Best-effort ``kind`` lookup for the §3.1 muscle rule.
 
     Order: 1) canonical_phonemes row matching any IPA equivalent (any dialect)
            2) fallback to the card's own ``category`` field
            3) ``"vowel"`` as last-resort so the rule never crashes.
     """
-    for cand in _ipa_equivalents(ipa):
-        row = await db.canonical_phonemes.find_one({"ipa": cand}, {"_id": 0, "kind": 1})
-        if row and row.get("kind"):
-            return row["kind"]
+    row = await _canonical_row(db, ipa) if canonical is _LOOKUP else canonical
+    if row and row.get("kind"):
+        return row["kind"]
     if category in ("vowel", "consonant", "diphthong"):
         return category
     return "vowel"
 
 
-async def apply_muscle_rule_to_doc(db, doc: dict) -> List[Dict[str, str]]:
+async def apply_muscle_rule_to_doc(db, doc: dict, canonical: Any = _LOOKUP) -> List[Dict[str, str]]:
     """Compute and write the 5-muscle DERIVED list into ``doc`` in place.
 
     Uses the §3.1 mapping from ``phoneme_batch_v2.compose_facial_muscles``.
@@ -442,13 +505,13 @@ async def apply_muscle_rule_to_doc(db, doc: dict) -> List[Dict[str, str]]:
     ipa = (doc.get("ipa") or "").strip()
     if not ipa:
         return doc.get("facialMuscles") or []
-    kind = await _resolve_canonical_kind(db, ipa, doc.get("category", "vowel"))
+    kind = await _resolve_canonical_kind(db, ipa, doc.get("category", "vowel"), canonical)
     muscles = compose_facial_muscles(ipa, kind)
     doc["facialMuscles"] = muscles
     return muscles
 
 
-async def apply_overlay_rule_to_doc(db, doc: dict) -> Dict[str, Any]:
+async def apply_overlay_rule_to_doc(db, doc: dict, canonical: Any = _LOOKUP) -> Dict[str, Any]:
     """Compute and write the DERIVED overlay bundle (§3.2) into ``doc``.
 
     Populates ``anatomicalLabels``, ``airflowArrows`` and ``voicing``
@@ -460,11 +523,8 @@ async def apply_overlay_rule_to_doc(db, doc: dict) -> Dict[str, Any]:
     ipa = (doc.get("ipa") or "").strip()
     if not ipa:
         return {}
-    canonical = None
-    for cand in _ipa_equivalents(ipa):
-        canonical = await db.canonical_phonemes.find_one({"ipa": cand}, {"_id": 0})
-        if canonical:
-            break
+    if canonical is _LOOKUP:
+        canonical = await _canonical_row(db, ipa)
     if not canonical:
         canonical = {"kind": doc.get("category", "vowel"), "manner": "", "place": "", "voicing": "Voiceless"}
     bundle = compute_overlay(canonical)
@@ -474,7 +534,7 @@ async def apply_overlay_rule_to_doc(db, doc: dict) -> Dict[str, Any]:
     return bundle
 
 
-async def apply_hotspot_rule_to_doc(db, doc: dict) -> List[Dict[str, Any]]:
+async def apply_hotspot_rule_to_doc(db, doc: dict, canonical: Any = _LOOKUP) -> List[Dict[str, Any]]:
     """Compute and write the DERIVED hotspot list (§3.4) into ``doc``.
 
     Uses ``phoneme_hotspot_rule.generate_hotspots_for_canonical`` — a fully
@@ -496,11 +556,8 @@ async def apply_hotspot_rule_to_doc(db, doc: dict) -> List[Dict[str, Any]]:
     ipa = (doc.get("ipa") or "").strip()
     if not ipa:
         return doc.get("hotspots") or []
-    canonical = None
-    for cand in _ipa_equivalents(ipa):
-        canonical = await db.canonical_phonemes.find_one({"ipa": cand}, {"_id": 0})
-        if canonical:
-            break
+    if canonical is _LOOKUP:
+        canonical = await _canonical_row(db, ipa)
     if not canonical:
         # No canonical row → keep whatever the doc has (do not blank it out).
         return doc.get("hotspots") or []
@@ -509,7 +566,8 @@ async def apply_hotspot_rule_to_doc(db, doc: dict) -> List[Dict[str, Any]]:
     return hotspots
 
 
-async def apply_pronunciation_rule_to_doc(db, doc: dict, preserve_body: bool = True) -> Dict[str, Any]:
+async def apply_pronunciation_rule_to_doc(db, doc: dict, preserve_body: bool = True,
+                                          canonical: Any = _LOOKUP) -> Dict[str, Any]:
     """§3.5 · Compose the 6-step "Vocal Fitness articulatory protocol"
     from canonical features (height/backness/rounding for vowels;
     place/manner/voicing for consonants).
@@ -529,11 +587,8 @@ async def apply_pronunciation_rule_to_doc(db, doc: dict, preserve_body: bool = T
     ipa = (doc.get("ipa") or "").strip()
     if not ipa:
         return doc.get("pronunciationGuide") or {}
-    canonical = None
-    for cand in _ipa_equivalents(ipa):
-        canonical = await db.canonical_phonemes.find_one({"ipa": cand}, {"_id": 0})
-        if canonical:
-            break
+    if canonical is _LOOKUP:
+        canonical = await _canonical_row(db, ipa)
     if not canonical:
         return doc.get("pronunciationGuide") or {}
 
@@ -712,13 +767,8 @@ async def build_autofill_payload(db, ipa: str, dialect: str) -> Dict[str, Any]:
     if not ipa:
         raise HTTPException(status_code=400, detail="ipa obbligatorio")
 
-    for candidate in _ipa_equivalents(ipa):
-        doc = await db.canonical_phonemes.find_one(
-            {"dialect": dialect, "ipa": candidate}, {"_id": 0},
-        )
-        if doc:
-            break
-    else:
+    doc = await _canonical_row(db, ipa, dialect)
+    if not doc:
         raise HTTPException(
             status_code=404,
             detail=f"Fonema '{ipa}' non presente nell'inventario canonical per dialetto {dialect}.",
@@ -811,11 +861,9 @@ async def build_readiness_report(db, card: dict) -> Dict[str, Any]:
             cd = _CARD_DIALECT_TO_CANONICAL.get(d)
             if not cd:
                 continue
-            for candidate in _ipa_equivalents(card_ipa):
-                row = await db.canonical_phonemes.find_one({"dialect": cd, "ipa": candidate}, {"_id": 0})
-                if row:
-                    canonical_docs[cd] = row
-                    break
+            row = await _canonical_row(db, card_ipa, cd)
+            if row:
+                canonical_docs[cd] = row
         if not canonical_docs:
             checks.append(_check(
                 "canonical.match", "canonical", "fail",
@@ -944,8 +992,7 @@ async def build_readiness_report(db, card: dict) -> Dict[str, Any]:
                 other = b if a == card_ipa else a
                 found_other = False
                 for cd in canonical_docs.keys():
-                    r = await db.canonical_phonemes.find_one({"dialect": cd, "ipa": other}, {"_id": 0, "ipa": 1})
-                    if r:
+                    if await canonical_inventory.find(db, [other], cd):
                         found_other = True
                         break
                 if found_other:
@@ -1105,6 +1152,632 @@ async def build_readiness_report(db, card: dict) -> Dict[str, Any]:
     }
 
 
+# --------------------------------------------------------------------------- #
+# Phase E — persisted readiness badge (admin list)
+# --------------------------------------------------------------------------- #
+# ``admin_list`` used to run build_readiness_report for every card: several
+# canonical_phonemes lookups per dialect × IPA equivalent, i.e. hundreds of
+# sequential round trips for ~80 cards. The badge is now persisted on the card
+# under ``readiness`` and recomputed only when one of its inputs changes:
+#   * the card — its ``updatedAt`` no longer matches ``readiness.cardUpdatedAt``
+#     (writers that don't bump ``updatedAt`` ``$unset`` the field instead);
+#   * the canonical inventory — ``ensure_canonical_seed`` bumps
+#     ``canonical_version`` on any real change (read through
+#     ``canonical_inventory.current_version``).
+# Writes that already hold the fresh doc (update, batch runs) persist it
+# eagerly; anything still stale is recomputed by the next list.
+_READINESS_FIELD = "readiness"
+_LIST_PROJECTION = {
+    "_id": 0, "id": 1, "ipa": 1, "displayIpa": 1, "category": 1, "subcategory": 1,
+    "examples": 1, "published": 1, "order": 1, "audio": 1, "videoLesson.id": 1,
+    "hotspots": 1, "commonWords": 1, "updatedAt": 1, "createdAt": 1,
+    "dialects": 1, _READINESS_FIELD: 1,
+}
+
+
+def _readiness_badge(report: Dict[str, Any], card: dict, version: int) -> Dict[str, Any]:
+    digest = hashlib.blake2b(
+        json_mod.dumps(report["checks"], sort_keys=True, ensure_ascii=False).encode(),
+        digest_size=12,
+    ).hexdigest()
+    return {
+        "score": report["score"],
+        "ready": report["ready"],
+        "failCount": report["summary"]["fail"],
+        "hash": digest,
+        "cardUpdatedAt": card.get("updatedAt"),
+        "canonicalVersion": version,
+        "computedAt": _now_iso(),
+    }
+
+
+def _readiness_stale(card: dict, version: int) -> bool:
+    badge = card.get(_READINESS_FIELD)
+    return (not isinstance(badge, dict)
+            or badge.get("canonicalVersion") != version
+            or badge.get("cardUpdatedAt") != card.get("updatedAt"))
+
+
+async def store_readiness(db, card: dict, report: Dict[str, Any],
+                          version: Optional[int] = None) -> Dict[str, Any]:
+    """Persist the badge of an already-computed report (``card`` must be the
+    doc the report was built from, as stored)."""
+    if version is None:
+        version = await canonical_inventory.current_version(db)
+    badge = _readiness_badge(report, card, version)
+    await db.phoneme_cards.update_one({"id": card["id"]}, {"$set": {_READINESS_FIELD: badge}})
+    return badge
+
+
+async def refresh_card_readiness(db, card: dict, version: Optional[int] = None) -> Dict[str, Any]:
+    """Build the report for a stored card doc and persist its badge."""
+    report = await build_readiness_report(db, card)
+    await store_readiness(db, card, report, version)
+    return report
+
+
+async def refresh_stale_readiness(db, card_ids: Optional[List[str]] = None,
+                                  version: Optional[int] = None) -> Dict[str, Dict[str, Any]]:
+    """Recompute the badge of every stale card (or of ``card_ids``). Returns
+    ``{card_id: badge}`` for the cards refreshed; a card whose report fails
+    is logged and left stale (retried next time)."""
+    if version is None:
+        version = await canonical_inventory.current_version(db)
+    query: Dict[str, Any] = {"id": {"$in": card_ids}} if card_ids is not None else {}
+    docs = await db.phoneme_cards.find(query, {"_id": 0}).to_list(1000)
+    fresh: Dict[str, Dict[str, Any]] = {}
+    for doc in docs:
+        if card_ids is None and not _readiness_stale(doc, version):
+            continue
+        try:
+            report = await build_readiness_report(db, doc)
+            fresh[doc["id"]] = await store_readiness(db, doc, report, version)
+        except Exception:  # noqa: BLE001 — never break the list on a bad card
+            logging.exception("readiness: report failed for card %s", doc.get("id"))
+    return fresh
+
+
+# --------------------------------------------------------------------------- #
+# Batch regenerate-derived — background job
+# --------------------------------------------------------------------------- #
+# Regenerating every card's DERIVED fields used to run inside one HTTP request,
+# card after card with an update_one each — long enough to hit proxy timeouts.
+# It now runs as a background job over chunks of PHONEME_REGEN_FLUSH_EVERY
+# cards (default 25): up to PHONEME_REGEN_CONCURRENCY cards (default 4) in
+# flight, the canonical row resolved once per card and handed to every rule,
+# the chunk's changed cards written with one unordered ``bulk_write``. Job
+# status and progress live in ``phoneme_regen_jobs`` (polled by the
+# dashboard); a dry run writes nothing and records per-card diffs instead.
+_REGEN_JOBS = "phoneme_regen_jobs"
+_REGEN_CONCURRENCY = max(1, int(os.environ.get("PHONEME_REGEN_CONCURRENCY", "4")))
+_REGEN_FLUSH_EVERY = max(1, int(os.environ.get("PHONEME_REGEN_FLUSH_EVERY", "25")))
+_DERIVED_DEFAULTS: Dict[str, Any] = {
+    "facialMuscles": [], "anatomicalLabels": [], "airflowArrows": [], "voicing": "",
+    "hotspots": [], "commonWords": [], "spellings": [], "pronunciationGuide": {},
+}
+_regen_tasks: Dict[str, asyncio.Task] = {}
+
+
+async def regenerate_card_derived(db, card: dict) -> Dict[str, Any]:
+    """Run every DERIVED rule on ``card`` in place, honouring the lock flags.
+    Returns the per-card entry ``{id, ipa, applied, skipped}``."""
+    entry: Dict[str, Any] = {"id": card.get("id"), "ipa": card.get("ipa"),
+                             "applied": [], "skipped": []}
+    ipa = (card.get("ipa") or "").strip()
+    canonical = await _canonical_row(db, ipa) if ipa else None
+
+    try:
+        await apply_muscle_rule_to_doc(db, card, canonical)
+        entry["applied"].append("muscles")
+    except Exception as exc:  # noqa: BLE001
+        entry["skipped"].append(f"muscles({type(exc).__name__})")
+
+    try:
+        await apply_overlay_rule_to_doc(db, card, canonical)
+        entry["applied"].append("overlay")
+    except Exception as exc:  # noqa: BLE001
+        entry["skipped"].append(f"overlay({type(exc).__name__})")
+
+    if card.get("hotspots_locked"):
+        entry["skipped"].append("hotspots(locked)")
+    else:
+        try:
+            await apply_hotspot_rule_to_doc(db, card, canonical)
+            entry["applied"].append("hotspots")
+        except Exception as exc:  # noqa: BLE001
+            entry["skipped"].append(f"hotspots({type(exc).__name__})")
+
+    if card.get("lexicon_locked"):
+        entry["skipped"].append("lexicon(locked)")
+    else:
+        try:
+            await apply_lexicon_rule_to_doc(db, card, preserve_audio=True)
+            entry["applied"].append("lexicon")
+        except Exception as exc:  # noqa: BLE001
+            entry["skipped"].append(f"lexicon({type(exc).__name__})")
+
+    # §3.5 pronunciation protocol
+    if card.get("pronunciation_locked"):
+        entry["skipped"].append("pronunciation(locked)")
+    else:
+        try:
+            await apply_pronunciation_rule_to_doc(db, card, preserve_body=True,
+                                                  canonical=canonical)
+            entry["applied"].append("pronunciation")
+        except Exception as exc:  # noqa: BLE001
+            entry["skipped"].append(f"pronunciation({type(exc).__name__})")
+    return entry
+
+
+def _derived_fields(card: dict) -> Dict[str, Any]:
+    return {f: card.get(f) or copy.deepcopy(empty) for f, empty in _DERIVED_DEFAULTS.items()}
+
+
+def _derived_diff(before: dict, after: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    old = _derived_fields(before)
+    return {f: {"before": old[f], "after": v} for f, v in after.items() if old[f] != v}
+
+
+async def run_regenerate_derived_job(db, job_id: str, username: Optional[str],
+                                     dry_run: bool = False) -> None:
+    jobs, coll = db[_REGEN_JOBS], db.phoneme_cards
+    await jobs.update_one({"id": job_id}, {"$set": {"status": "running", "startedAt": _now_iso()}})
+    try:
+        cards = await coll.find({}, {"_id": 0}).to_list(None)
+        todo = [c for c in cards if c.get("id")]
+        await jobs.update_one({"id": job_id}, {"$set": {
+            "total": len(todo), "skipped": len(cards) - len(todo)}})
+        sem = asyncio.Semaphore(_REGEN_CONCURRENCY)
+
+        async def one(card: dict) -> Dict[str, Any]:
+            async with sem:
+                before = copy.deepcopy(card)
+                entry = await regenerate_card_derived(db, card)
+                fields = _derived_fields(card)
+                diff = _derived_diff(before, fields)
+                entry["changed"] = sorted(diff)
+                if dry_run:
+                    entry["diff"] = diff
+                entry["_set"] = fields if diff else None
+                return entry
+
+        processed = written = 0
+        for start in range(0, len(todo), _REGEN_FLUSH_EVERY):
+            chunk = todo[start:start + _REGEN_FLUSH_EVERY]
+            outcomes = await asyncio.gather(*(one(c) for c in chunk), return_exceptions=True)
+            results: List[Dict[str, Any]] = []
+            errors: List[str] = []
+            ops, ids = [], []
+            now = _now_iso()
+            for card, out in zip(chunk, outcomes):
+                if isinstance(out, BaseException):
+                    logging.error("regenerate-derived: card %s failed: %r", card["id"], out)
+                    errors.append(f"{card['id']}: {type(out).__name__}")
+                    continue
+                fields = out.pop("_set")
+                if fields is not None and not dry_run:
+                    ops.append(UpdateOne({"id": card["id"]}, {"$set": {
+                        **fields, "updatedAt": now, "updatedBy": username}}))
+                    ids.append(card["id"])
+                results.append(out)
+            if ops:
+                await coll.bulk_write(ops, ordered=False)
+                await refresh_stale_readiness(db, ids)
+            processed += len(chunk)
+            written += len(ops)
+            await jobs.update_one({"id": job_id}, {
+                "$set": {"processed": processed, "written": written},
+                "$push": {"results": {"$each": results}, "errors": {"$each": errors}},
+            })
+        await jobs.update_one({"id": job_id}, {"$set": {"status": "done", "finishedAt": _now_iso()}})
+    except Exception as exc:  # noqa: BLE001
+        logging.exception("regenerate-derived: job %s failed", job_id)
+        await jobs.update_one({"id": job_id}, {"$set": {
+            "status": "failed", "error": f"{type(exc).__name__}: {exc}", "finishedAt": _now_iso()}})
+
+
+async def start_regenerate_derived_job(db, username: Optional[str],
+                                       dry_run: bool = False) -> Dict[str, Any]:
+    """Record a new job and run it in the background. One job at a time."""
+    running = next((jid for jid, t in _regen_tasks.items() if not t.done()), None)
+    if running:
+        raise HTTPException(status_code=409,
+                            detail=f"Rigenerazione già in corso (job {running}).")
+    job = {
+        "id": str(uuid.uuid4()), "kind": "regenerate-derived", "status": "queued",
+        "dryRun": dry_run, "total": None, "processed": 0, "written": 0, "skipped": 0,
+        "results": [], "errors": [], "createdAt": _now_iso(), "createdBy": username,
+        "startedAt": None, "finishedAt": None,
+    }
+    await db[_REGEN_JOBS].insert_one(dict(job))
+    task = asyncio.get_running_loop().create_task(
+        run_regenerate_derived_job(db, job["id"], username, dry_run))
+    _regen_tasks[job["id"]] = task
+    task.add_done_callback(lambda t, jid=job["id"]: _regen_tasks.pop(jid, None))
+    return job
+
+
+async def fail_interrupted_regen_jobs(db) -> List[str]:
+    """Startup: close regenerate-derived jobs a restart left ``queued`` /
+    ``running`` (their task died with the process). The job keeps no
+    checkpoint — re-running it is idempotent — so they are marked failed
+    rather than resumed."""
+    jobs = await db[_REGEN_JOBS].find(
+        {"status": {"$in": ["queued", "running"]}}, {"_id": 0, "id": 1}).to_list(None)
+    for job in jobs:
+        await db[_REGEN_JOBS].update_one({"id": job["id"]}, {"$set": {
+            "status": "failed", "error": "Interrotto dal riavvio del server: rilancia la rigenerazione.",
+            "finishedAt": _now_iso()}})
+    return [job["id"] for job in jobs]
+
+
+# --------------------------------------------------------------------------- #
+# Audio clips — the item taxonomy, per-clip synthesis arguments and the
+# write-back into a card, shared by the per-card ``batch-audio`` endpoint and
+# the catalogue-wide audio job.
+# --------------------------------------------------------------------------- #
+# Per-card ``batch-audio`` runs: one document per card (the latest run) with
+# counters and a per-clip event log, updated as clips complete.
+_AUDIO_RUNS = "phoneme_audio_runs"
+# ``uploads_dir`` fallback for local write on emergent storage failure
+_AUDIO_UPLOADS_DIR = Path("/app/backend/uploads")
+
+
+def _compute_card_audio_items(card: dict, words_limit: int,
+                                include_words_rp: bool) -> List[dict]:
+    """Return the list of audio items for a single card. Includes an
+    ``ipa`` field per item — set on ``group='isolated'`` clips so the
+    TTS pipeline wraps them in SSML for scientifically accurate IPA
+    pronunciation (see ``synthesize_and_store``).
+    """
+    items: List[dict] = []
+    display_ipa = card.get("displayIpa") or f"/{card.get('ipa','')}/"
+    # For isolated clips we emit ONLY the pure phoneme; the SSML
+    # wrapping in ``synthesize_and_store`` turns this into the exact
+    # IPA sound instead of "the letter U" or an approximate spelling.
+    ipa_symbol = (card.get("ipa") or "").strip()
+    isolated_text = ipa_symbol or (display_ipa.strip("/") if display_ipa else "")
+
+    audio = card.get("audio") or {}
+    for dialect in ("AmE", "RP"):
+        cur = ((audio.get(dialect) or {}).get("isolated") or "")
+        items.append({
+            "key": f"isolated-{dialect}", "group": "isolated",
+            "dialect": dialect, "text": isolated_text,
+            "current_url": cur,
+            "path": ["audio", dialect, "isolated"],
+            "filename_slug": f"{card.get('id','card')}_isolated_{dialect}",
+            "ipa": ipa_symbol,
+        })
+
+    for i, ex in enumerate(card.get("exampleSentences") or []):
+        txt = (ex or {}).get("text") or ""
+        if not txt.strip():
+            continue
+        for dialect in ("AmE", "RP"):
+            cur = (((audio.get(dialect) or {}).get("examples") or [])[i]
+                   if i < len((audio.get(dialect) or {}).get("examples") or []) else "")
+            items.append({
+                "key": f"example-{dialect}-{i}", "group": "examples",
+                "dialect": dialect, "text": txt, "current_url": cur,
+                "path": ["audio", dialect, "examples", i],
+                "filename_slug": f"{card.get('id','card')}_example_{dialect}_{i+1}",
+                "ipa": "",
+            })
+
+    mn = card.get("mnemonic") or {}
+    if (mn.get("phrase") or "").strip():
+        items.append({
+            "key": "mnemonic", "group": "mnemonic", "dialect": "default",
+            "text": mn.get("phrase"),
+            "current_url": mn.get("audio") or mn.get("audioAmE") or "",
+            "path": ["mnemonic", "audio"],
+            "filename_slug": f"{card.get('id','card')}_mnemonic",
+            "ipa": "",
+        })
+
+    # Common words — top N by list order (already zipf-sorted from lexicon)
+    for i, w in enumerate((card.get("commonWords") or [])[:max(0, words_limit)]):
+        word = (w or {}).get("w", "").strip()
+        if not word:
+            continue
+        items.append({
+            "key": f"word-{i}-AmE", "group": "words", "dialect": "AmE",
+            "text": word,
+            "current_url": (w.get("audioAmE") or w.get("audio") or ""),
+            "path": ["commonWords", i, "audioAmE"],
+            "filename_slug": f"{card.get('id','card')}_word_{re.sub(r'[^a-z0-9]+','_', word.lower())}_AmE",
+            "ipa": "",
+        })
+        if include_words_rp:
+            items.append({
+                "key": f"word-{i}-RP", "group": "words", "dialect": "RP",
+                "text": word,
+                "current_url": (w.get("audioRP") or ""),
+                "path": ["commonWords", i, "audioRP"],
+                "filename_slug": f"{card.get('id','card')}_word_{re.sub(r'[^a-z0-9]+','_', word.lower())}_RP",
+                "ipa": "",
+            })
+    return items
+
+
+def _audio_clip_kwargs(it: dict, settings: Dict[str, Any],
+                       text_override: Optional[Dict[str, str]] = None,
+                       ipa_override: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+    """``synthesize_and_store_async`` arguments for audio item ``it``.
+    ``settings`` carries the batch request fields (voices + voice settings)."""
+    voice_map = {
+        "AmE":     (settings.get("voice_ame") or "").strip(),
+        "RP":      (settings.get("voice_rp") or "").strip(),
+        "default": (settings.get("voice_default") or "").strip(),
+    }
+    voice_id = voice_map.get(it["dialect"]) or voice_map.get("default")
+    # Apply per-clip overrides if the caller provided them (Audio Studio).
+    item_text = (text_override or {}).get(it["key"]) if text_override else None
+    item_text = item_text if item_text is not None else it["text"]
+    item_ipa  = (ipa_override or {}).get(it["key"]) if ipa_override else None
+    if item_ipa is None:
+        # Auto-detect: if the text is a bare /…/ IPA token, treat as isolated phoneme.
+        stripped = (item_text or "").strip()
+        if len(stripped) >= 3 and stripped.startswith("/") and stripped.endswith("/"):
+            item_ipa = stripped.strip("/").strip()
+    # Fall back to the item's baked-in IPA hint (only set for isolated).
+    item_ipa = item_ipa if item_ipa is not None else it.get("ipa") or None
+    return {
+        "text":              item_text,
+        "voice_id":          voice_id,
+        "stability":         settings["stability"],
+        "similarity_boost":  settings["similarity_boost"],
+        "style":             settings["style"],
+        "use_speaker_boost": settings["use_speaker_boost"],
+        "model_id":          settings["model_id"],
+        "output_format":     settings["output_format"],
+        "filename_hint":     it["filename_slug"],
+        "ipa_phoneme":       item_ipa,
+    }
+
+
+def _audio_work(doc: dict) -> Dict[str, Any]:
+    """IN-MEMORY working copies of a card's audio-bearing fields. Changes are
+    re-serialised per top-level field, which avoids MongoDB's "dotted-key
+    array-index creates a subdocument instead of an array" trap when the
+    field doesn't pre-exist as an array on the doc."""
+    work_audio = dict(doc.get("audio") or {})
+    for d in ("AmE", "RP"):
+        entry = dict(work_audio.get(d) or {})
+        # Normalise "examples": accept legacy dict-with-numeric-keys shape
+        ex_raw = entry.get("examples") or []
+        if isinstance(ex_raw, dict):
+            ex_raw = [ex_raw.get(str(k), "") for k in sorted(ex_raw.keys(), key=lambda s: int(s) if str(s).isdigit() else 0)]
+        entry["examples"] = list(ex_raw)
+        work_audio[d] = entry
+    return {
+        "audio":       work_audio,
+        "mnemonic":    dict(doc.get("mnemonic") or {}),
+        "commonWords": [dict(w) for w in (doc.get("commonWords") or [])],
+    }
+
+
+def _set_audio_url(work: Dict[str, Any], path: list, rel_url: str) -> str:
+    """Write ``rel_url`` into ``work`` at item ``path`` — arrays are preserved
+    as arrays, dicts as dicts. Returns the top-level field that changed."""
+    if path[0] == "audio":
+        dialect, kind = path[1], path[2]
+        dentry = work["audio"][dialect]
+        if kind == "isolated":
+            dentry["isolated"] = rel_url
+        elif kind == "examples":
+            idx = path[3]
+            arr = dentry.get("examples") or []
+            while len(arr) <= idx:
+                arr.append("")
+            arr[idx] = rel_url
+            dentry["examples"] = arr
+        work["audio"][dialect] = dentry
+        return "audio"
+    if path[0] == "mnemonic":
+        work["mnemonic"]["audio"] = rel_url
+        return "mnemonic"
+    idx = path[1]
+    key = path[2]  # audioAmE or audioRP
+    while len(work["commonWords"]) <= idx:
+        work["commonWords"].append({})
+    work["commonWords"][idx][key] = rel_url
+    return "commonWords"
+
+
+# --------------------------------------------------------------------------- #
+# Filling the catalogue's audio used to take one ``batch-audio`` request per
+# card. The catalogue job plans every MISSING clip across all cards, merges
+# clips whose synthesis request is identical (same text, voice and settings
+# on several cards → one paid call, its URL written into every slot) and runs
+# them on the shared TTS engine, whose concurrency cap and token bucket are
+# process-wide. A clip is written into its cards before it is counted, so the
+# cards are the checkpoint: a job left ``running`` by a restart is resumed at
+# startup, re-planning yields exactly the clips still missing, and counters,
+# ETA and characters consumed carry on from the job document in
+# ``phoneme_audio_jobs``. PHONEME_AUDIO_JOB_WORKERS (0 → the engine's
+# concurrency) sizes the worker pool.
+_AUDIO_JOBS = "phoneme_audio_jobs"
+_AUDIO_JOB_WORKERS = int(os.environ.get("PHONEME_AUDIO_JOB_WORKERS", "0"))
+_AUDIO_JOB_ERRORS_KEPT = 200
+_audio_tasks: Dict[str, asyncio.Task] = {}
+
+
+def plan_catalogue_audio(cards: List[dict], settings: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Missing clips of ``cards`` grouped by identical synthesis request.
+
+    Each group is ``{key, kwargs, chars, targets}`` with ``targets`` the
+    ``{cardId, key, path}`` slots it fills, in card order; the first target
+    names the stored file.
+    """
+    groups: Dict[str, Dict[str, Any]] = {}
+    for card in cards:
+        if not card.get("id"):
+            continue
+        items = _compute_card_audio_items(card, settings["words_limit"],
+                                          settings["include_words_rp"])
+        for it in items:
+            if it["current_url"]:
+                continue
+            kwargs = _audio_clip_kwargs(it, settings)
+            ident = {k: v for k, v in kwargs.items() if k != "filename_hint"}
+            key = hashlib.sha1(json_mod.dumps(ident, sort_keys=True, ensure_ascii=False)
+                               .encode("utf-8")).hexdigest()
+            group = groups.setdefault(key, {"key": key, "kwargs": kwargs,
+                                            "chars": len(kwargs["text"] or ""), "targets": []})
+            group["targets"].append({"cardId": card["id"], "key": it["key"], "path": it["path"]})
+    return list(groups.values())
+
+
+async def _fill_card_slots(coll, card_id: str, slots: List[dict], text: str, url: str,
+                           settings: Dict[str, Any], username: Optional[str]) -> List[dict]:
+    """Write ``url`` into ``slots`` of one card, merged into the card as it is
+    NOW — re-read, so admin edits made while the job ran (common words, a
+    per-card batch, a patched URL) survive. A slot filled meanwhile, or whose
+    text no longer matches the synthesised clip, is left alone. Callers hold
+    the job lock. Returns the slots written."""
+    card = await coll.find_one({"id": card_id}, {"_id": 0})
+    if not card:
+        return []
+    current = {it["key"]: it for it in _compute_card_audio_items(
+        card, settings["words_limit"], settings["include_words_rp"])}
+    work = _audio_work(card)
+    names, written = set(), []
+    for t in slots:
+        it = current.get(t["key"])
+        if it is None or it["current_url"] or it["text"] != text:
+            continue
+        names.add(_set_audio_url(work, it["path"], url))
+        written.append(t)
+    if names:
+        await coll.update_one({"id": card_id}, {"$set": {
+            **{f: work[f] for f in names}, "updatedAt": _now_iso(), "updatedBy": username}})
+    return written
+
+
+async def run_catalogue_audio_job(db, job_id: str) -> None:
+    from .elevenlabs import run_tts_batch
+    from utils.storage_ledger import tracked_put as _emergent_put
+
+    jobs, coll = db[_AUDIO_JOBS], db.phoneme_cards
+    job = await jobs.find_one({"id": job_id}, {"_id": 0})
+    settings, username = job["settings"], job.get("createdBy")
+    now = _now_iso()
+    await jobs.update_one({"id": job_id}, {
+        "$set": {"status": "running", "startedAt": job.get("startedAt") or now,
+                 "resumedAt": now if job.get("startedAt") else None,
+                 "clipsFailed": 0, "errors": []},
+        "$inc": {"runs": 1}})
+    try:
+        cards = await coll.find({}, {"_id": 0}).sort("order", 1).to_list(None)
+        plan = plan_catalogue_audio(cards, settings)
+        planned = {"clipsRemaining": len(plan), "eta_s": None}
+        if job.get("clipsPlanned") is None:
+            planned.update(clipsPlanned=len(plan),
+                           slotsPlanned=sum(len(g["targets"]) for g in plan),
+                           charsPlanned=sum(g["chars"] for g in plan))
+        await jobs.update_one({"id": job_id}, {"$set": planned})
+
+        reference_urls: List[str] = []
+        lock = asyncio.Lock()
+        started = time.monotonic()
+        finished = 0
+
+        async def on_done(clip: dict, res: Optional[dict], exc: Optional[Exception]) -> None:
+            nonlocal finished
+            targets = clip["targets"]
+            update: Dict[str, Any] = {}
+            async with lock:
+                finished += 1
+                if exc is None:
+                    url = res["relative_url"]
+                    by_card: Dict[str, List[dict]] = {}
+                    for t in targets:
+                        by_card.setdefault(t["cardId"], []).append(t)
+                    written: List[dict] = []
+                    for card_id, slots in by_card.items():
+                        written += await _fill_card_slots(
+                            coll, card_id, slots, clip["kwargs"]["text"], url, settings, username)
+                    if any(t["key"].startswith(("isolated-", "word-")) for t in written):
+                        reference_urls.append(url)
+                    update["$inc"] = {
+                        "clipsDone": 1, "slotsFilled": len(written),
+                        "slotsSkipped": len(targets) - len(written),
+                        "cacheHits": int(bool(res.get("cached"))),
+                        "charsConsumed": 0 if res.get("cached") else res.get("characters", 0)}
+                else:
+                    update["$inc"] = {"clipsFailed": 1}
+                    update["$push"] = {"errors": {"$each": [{
+                        "slots": [f"{t['cardId']}:{t['key']}" for t in targets],
+                        "text":  (clip["kwargs"]["text"] or "")[:60],
+                        "error": f"{type(exc).__name__}: {str(exc)[:200]}",
+                    }], "$slice": -_AUDIO_JOB_ERRORS_KEPT}}
+                left = len(plan) - finished
+                elapsed = time.monotonic() - started
+                update["$set"] = {"clipsRemaining": left,
+                                  "eta_s": round(left * elapsed / finished, 1)}
+                await jobs.update_one({"id": job_id}, update)
+
+        clips = [{"key": g["key"], "kwargs": g["kwargs"], "targets": g["targets"]} for g in plan]
+        await run_tts_batch(clips, emergent_put=_emergent_put,
+                            uploads_dir=_AUDIO_UPLOADS_DIR, on_done=on_done,
+                            workers=_AUDIO_JOB_WORKERS or None,
+                            db=db, use_cache=settings.get("use_cache", True))
+        if reference_urls:
+            from .teacher_references import schedule_reference_index
+            schedule_reference_index(db, reference_urls)
+        if plan:
+            await refresh_stale_readiness(db, sorted({t["cardId"] for g in plan for t in g["targets"]}))
+        await jobs.update_one({"id": job_id}, {"$set": {
+            "status": "done", "eta_s": 0, "finishedAt": _now_iso()}})
+    except Exception as exc:  # noqa: BLE001
+        logging.exception("catalogue audio: job %s failed", job_id)
+        await jobs.update_one({"id": job_id}, {"$set": {
+            "status": "failed", "error": f"{type(exc).__name__}: {exc}", "finishedAt": _now_iso()}})
+
+
+def _spawn_audio_job(db, job_id: str) -> None:
+    task = asyncio.get_running_loop().create_task(run_catalogue_audio_job(db, job_id))
+    _audio_tasks[job_id] = task
+    task.add_done_callback(lambda t, jid=job_id: _audio_tasks.pop(jid, None))
+
+
+async def start_catalogue_audio_job(db, username: Optional[str],
+                                    settings: Dict[str, Any]) -> Dict[str, Any]:
+    """Record a new catalogue audio job and run it in the background. One
+    job at a time."""
+    running = next((jid for jid, t in _audio_tasks.items() if not t.done()), None)
+    if running:
+        raise HTTPException(status_code=409,
+                            detail=f"Generazione audio del catalogo già in corso (job {running}).")
+    job = {
+        "id": str(uuid.uuid4()), "kind": "catalogue-audio", "status": "queued",
+        "settings": settings, "runs": 0,
+        "clipsPlanned": None, "slotsPlanned": None, "charsPlanned": None,
+        "clipsDone": 0, "slotsFilled": 0, "slotsSkipped": 0, "clipsFailed": 0, "cacheHits": 0,
+        "charsConsumed": 0, "clipsRemaining": None, "eta_s": None, "errors": [],
+        "createdAt": _now_iso(), "createdBy": username,
+        "startedAt": None, "resumedAt": None, "finishedAt": None,
+    }
+    await db[_AUDIO_JOBS].insert_one(dict(job))
+    _spawn_audio_job(db, job["id"])
+    return job
+
+
+async def resume_catalogue_audio_jobs(db) -> List[str]:
+    """Startup: pick up catalogue audio jobs a restart left unfinished."""
+    jobs = await db[_AUDIO_JOBS].find(
+        {"status": {"$in": ["queued", "running"]}}, {"_id": 0, "id": 1}).to_list(None)
+    for job in jobs[:1]:
+        _spawn_audio_job(db, job["id"])
+    for job in jobs[1:]:
+        await db[_AUDIO_JOBS].update_one({"id": job["id"]}, {"$set": {
+            "status": "failed", "error": "Interrotto: un altro job è stato ripreso.",
+            "finishedAt": _now_iso()}})
+    return [job["id"] for job in jobs[:1]]
+
+
 # --------------------------------------------------------------------------- #
 # Phase F — AI-assisted drafting (Claude Sonnet 4.5 via Emergent LLM Key)
 # --------------------------------------------------------------------------- #
@@ -1240,13 +1913,7 @@ async def generate_ai_draft(db, card: dict, dialect: str,
     if not ipa:
         raise HTTPException(status_code=400, detail="La card non ha un simbolo IPA valido.")
 
-    canon = None
-    for candidate in _ipa_equivalents(ipa):
-        canon = await db.canonical_phonemes.find_one(
-            {"dialect": dialect, "ipa": candidate}, {"_id": 0},
-        )
-        if canon:
-            break
+    canon = await _canonical_row(db, ipa, dialect)
     if not canon:
         raise HTTPException(
             status_code=404,
@@ -1345,18 +2012,20 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
     # ------------------------------------------------------------------ #
     @router.get("/admin/phonemes", response_model=List[PhonemeCardSummary])
     async def admin_list(admin: dict = Depends(get_admin_user)):
-        docs = await coll.find({}, {"_id": 0}).sort([("order", 1), ("id", 1)]).to_list(1000)
+        docs = await coll.find({}, _LIST_PROJECTION).sort([("order", 1), ("id", 1)]).to_list(1000)
+        # Phase E — readiness badge, persisted on the card; only stale ones
+        # (edited card, new canonical version) are recomputed here.
+        version = await canonical_inventory.current_version(db)
+        stale = {d["id"] for d in docs if _readiness_stale(d, version)}
+        fresh = await refresh_stale_readiness(db, list(stale), version) if stale else {}
         summaries: List[PhonemeCardSummary] = []
         for d in docs:
             s = _summarise(d)
-            # Phase E — augment with readiness score for the list badge
-            try:
-                report = await build_readiness_report(db, d)
-                s.readinessScore = report["score"]
-                s.readinessReady = report["ready"]
-                s.readinessFailCount = report["summary"]["fail"]
-            except Exception:  # noqa: BLE001 — never break the list on a bad card
-                s.readinessScore = None
+            badge = fresh.get(d["id"]) if d["id"] in stale else d.get(_READINESS_FIELD)
+            if badge:
+                s.readinessScore = badge["score"]
+                s.readinessReady = badge["ready"]
+                s.readinessFailCount = badge["failCount"]
             summaries.append(s)
         return summaries
 
@@ -1384,13 +2053,14 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
     async def admin_readiness(card_id: str, admin: dict = Depends(get_admin_user)):
         """
         Run the deterministic readiness suite against the current DB doc.
-        Returns {ready, score, summary, checks[]} — pure diagnostics,
-        no DB writes. See build_readiness_report() for the full check set.
+        Returns {ready, score, summary, checks[]} — diagnostics only; the
+        card's persisted list badge is refreshed as a side effect. See
+        build_readiness_report() for the full check set.
         """
         doc = await coll.find_one({"id": card_id}, {"_id": 0})
         if not doc:
             raise HTTPException(status_code=404, detail="Fonema non trovato")
-        return await build_readiness_report(db, doc)
+        return await refresh_card_readiness(db, doc)
 
     # ------------------------------------------------------------------ #
     # Phase F — AI-assisted drafting (Claude Sonnet 4.5, preview-only)
@@ -1565,7 +2235,7 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
         # ---- 3) Persist (published stays False for skeleton cards)
         if not update_fields:
             try:
-                report = await build_readiness_report(db, doc)
+                report = await refresh_card_readiness(db, doc)
                 cur_score = report["score"]
             except Exception:  # noqa: BLE001
                 cur_score = None
@@ -1589,7 +2259,7 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
         # ---- 4) Return summary + fresh readiness score
         updated = await coll.find_one({"id": card_id}, {"_id": 0})
         try:
-            report = await build_readiness_report(db, updated)
+            report = await refresh_card_readiness(db, updated)
             readiness_score = report["score"]
         except Exception:  # noqa: BLE001
             readiness_score = None
@@ -1621,12 +2291,19 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
         from .phoneme_batch_v2 import FIELD_TAXONOMY
         return FIELD_TAXONOMY
 
-    @router.post("/admin/phonemes/batch/regenerate-derived")
+    @router.get("/admin/phonemes/lexicon-status")
+    async def admin_lexicon_status(admin: dict = Depends(get_admin_user)):
+        """Lexicon subsystem state (index / scan fallback), load timings and RSS."""
+        from .phoneme_lexicon_rule import lexicon_status
+        return lexicon_status()
+
+    @router.post("/admin/phonemes/batch/regenerate-derived", status_code=202)
     async def admin_batch_regenerate_derived(
+        dry_run: bool = False,
         admin: dict = Depends(get_admin_user),
     ):
         """One-click bulk regeneration of ALL DERIVED fields across every
-        card that is not flagged as locked.
+        card that is not flagged as locked — started as a background job.
 
         Runs, in order, for each card:
           §3.1 muscles (never LLM/user authored — always overwrite)
@@ -1634,85 +2311,30 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
           §3.4 hotspots (skipped when ``hotspots_locked=true``)
           §3.2/§3.3 lexicon (skipped when ``lexicon_locked=true``,
                               preserves audio URLs on surviving words)
+          §3.5 pronunciation (skipped when ``pronunciation_locked=true``)
 
-        Idempotent. Never touches CREATIVE fields (mnemonic, funFact, etc.)
-        or NEEDS_SOURCE fields (video). Returns per-card summary.
+        Idempotent: only cards whose DERIVED fields actually change are
+        written. Never touches CREATIVE fields (mnemonic, funFact, etc.) or
+        NEEDS_SOURCE fields (video). ``dry_run=true`` writes nothing and
+        records the per-card diff instead. Returns the job id; poll
+        ``GET …/regenerate-derived/{job_id}`` for progress and results.
         """
-        results = []
-        skipped = 0
-        errors = []
-        async for card in coll.find({}, {"_id": 0}):
-            cid = card.get("id")
-            if not cid:
-                skipped += 1
-                continue
-            entry: Dict[str, Any] = {"id": cid, "ipa": card.get("ipa"),
-                                     "applied": [], "skipped": []}
-            try:
-                await apply_muscle_rule_to_doc(db, card)
-                entry["applied"].append("muscles")
-            except Exception as exc:  # noqa: BLE001
-                entry["skipped"].append(f"muscles({type(exc).__name__})")
+        job = await start_regenerate_derived_job(db, admin.get("username"), dry_run)
+        return {"jobId": job["id"], "status": job["status"], "dryRun": dry_run}
 
-            try:
-                overlay = await apply_overlay_rule_to_doc(db, card)
-                card["anatomicalLabels"] = overlay["anatomicalLabels"]
-                card["airflowArrows"]    = overlay["airflowArrows"]
-                card["voicing"]          = overlay["voicing"]
-                entry["applied"].append("overlay")
-            except Exception as exc:  # noqa: BLE001
-                entry["skipped"].append(f"overlay({type(exc).__name__})")
-
-            if card.get("hotspots_locked"):
-                entry["skipped"].append("hotspots(locked)")
-            else:
-                try:
-                    await apply_hotspot_rule_to_doc(db, card)
-                    entry["applied"].append("hotspots")
-                except Exception as exc:  # noqa: BLE001
-                    entry["skipped"].append(f"hotspots({type(exc).__name__})")
-
-            if card.get("lexicon_locked"):
-                entry["skipped"].append("lexicon(locked)")
-            else:
-                try:
-                    await apply_lexicon_rule_to_doc(db, card, preserve_audio=True)
-                    entry["applied"].append("lexicon")
-                except Exception as exc:  # noqa: BLE001
-                    entry["skipped"].append(f"lexicon({type(exc).__name__})")
-
-            # §3.5 pronunciation protocol
-            if card.get("pronunciation_locked"):
-                entry["skipped"].append("pronunciation(locked)")
-            else:
-                try:
-                    await apply_pronunciation_rule_to_doc(db, card, preserve_body=True)
-                    entry["applied"].append("pronunciation")
-                except Exception as exc:  # noqa: BLE001
-                    entry["skipped"].append(f"pronunciation({type(exc).__name__})")
-
-            # Persist the diff (all fields at once — atomic).
-            await coll.update_one({"id": cid}, {"$set": {
-                "facialMuscles":     card.get("facialMuscles") or [],
-                "anatomicalLabels":  card.get("anatomicalLabels") or [],
-                "airflowArrows":     card.get("airflowArrows") or [],
-                "voicing":           card.get("voicing") or "",
-                "hotspots":          card.get("hotspots") or [],
-                "commonWords":       card.get("commonWords") or [],
-                "spellings":         card.get("spellings") or [],
-                "pronunciationGuide": card.get("pronunciationGuide") or {},
-                "updatedAt":         _now_iso(),
-                "updatedBy":         admin.get("username"),
-            }})
-            results.append(entry)
-
-        return {
-            "ok":       True,
-            "processed": len(results),
-            "skipped":  skipped,
-            "errors":   errors,
-            "results":  results,
-        }
+    @router.get("/admin/phonemes/batch/regenerate-derived/{job_id}")
+    async def admin_regenerate_derived_status(
+        job_id: str,
+        include_results: bool = True,
+        admin: dict = Depends(get_admin_user),
+    ):
+        projection: Dict[str, Any] = {"_id": 0}
+        if not include_results:
+            projection["results"] = 0
+        job = await db[_REGEN_JOBS].find_one({"id": job_id}, projection)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job non trovato")
+        return job
 
     # =====================================================================
     # §3.6 · Mnemonic Inline-IPA Rewriter — deterministic, CMUdict-grounded
@@ -1860,6 +2482,9 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
                 changed += 1
             results.append(entry)
 
+        touched = [r["id"] for r in results if r.get("changed")]
+        if touched:
+            await refresh_stale_readiness(db, touched)
         return {
             "ok":        True,
             "processed": len(results),
@@ -1952,6 +2577,10 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
             raise HTTPException(status_code=400, detail=f"Chiave audio non riconosciuta: {key}")
 
         await coll.update_one({"id": card_id}, {"$set": set_ops})
+        if key.startswith(("isolated-", "word-")):
+            # Scoring-reference clip → precompute its formants off-request.
+            from .teacher_references import schedule_reference_index
+            schedule_reference_index(db, [url])
         return {"ok": True, "card_id": card_id, "key": key, "url": url}
 
 
@@ -1963,7 +2592,7 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
     # and can display per-card progress. Skips clips whose URL is already
     # populated → idempotent, safe to re-run without paying twice.
     # =====================================================================
-    class BatchAudioRequest(BaseModel):
+    class CatalogueAudioRequest(BaseModel):
         voice_ame:     Optional[str] = None   # voice_id for AmE items
         voice_rp:      Optional[str] = None   # voice_id for RP items
         voice_default: Optional[str] = None   # voice_id for dialect-agnostic (mnemonic, words)
@@ -1975,6 +2604,9 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
         output_format: str = "mp3_44100_128"
         words_limit:   int = 30       # top-N common words to synthesise per dialect
         include_words_rp: bool = True # if False, words only get AmE audio
+        use_cache:     bool = True    # False → fresh takes, bypassing the TTS dedup cache
+
+    class BatchAudioRequest(CatalogueAudioRequest):
         overwrite:     bool = False   # if True, regenerate even if URL exists
         only_keys:     Optional[List[str]] = None  # if provided, only items with key in this list
         # Per-clip overrides applied when regenerating from Audio Studio:
@@ -1985,83 +2617,6 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
         text_override: Optional[Dict[str, str]] = None
         ipa_override:  Optional[Dict[str, str]] = None
 
-    def _compute_card_audio_items(card: dict, words_limit: int,
-                                    include_words_rp: bool) -> List[dict]:
-        """Return the list of audio items for a single card. Includes an
-        ``ipa`` field per item — set on ``group='isolated'`` clips so the
-        TTS pipeline wraps them in SSML for scientifically accurate IPA
-        pronunciation (see ``synthesize_and_store``).
-        """
-        items: List[dict] = []
-        display_ipa = card.get("displayIpa") or f"/{card.get('ipa','')}/"
-        # For isolated clips we emit ONLY the pure phoneme; the SSML
-        # wrapping in ``synthesize_and_store`` turns this into the exact
-        # IPA sound instead of "the letter U" or an approximate spelling.
-        ipa_symbol = (card.get("ipa") or "").strip()
-        isolated_text = ipa_symbol or (display_ipa.strip("/") if display_ipa else "")
-
-        audio = card.get("audio") or {}
-        for dialect in ("AmE", "RP"):
-            cur = ((audio.get(dialect) or {}).get("isolated") or "")
-            items.append({
-                "key": f"isolated-{dialect}", "group": "isolated",
-                "dialect": dialect, "text": isolated_text,
-                "current_url": cur,
-                "path": ["audio", dialect, "isolated"],
-                "filename_slug": f"{card.get('id','card')}_isolated_{dialect}",
-                "ipa": ipa_symbol,
-            })
-
-        for i, ex in enumerate(card.get("exampleSentences") or []):
-            txt = (ex or {}).get("text") or ""
-            if not txt.strip():
-                continue
-            for dialect in ("AmE", "RP"):
-                cur = (((audio.get(dialect) or {}).get("examples") or [])[i]
-                       if i < len((audio.get(dialect) or {}).get("examples") or []) else "")
-                items.append({
-                    "key": f"example-{dialect}-{i}", "group": "examples",
-                    "dialect": dialect, "text": txt, "current_url": cur,
-                    "path": ["audio", dialect, "examples", i],
-                    "filename_slug": f"{card.get('id','card')}_example_{dialect}_{i+1}",
-                    "ipa": "",
-                })
-
-        mn = card.get("mnemonic") or {}
-        if (mn.get("phrase") or "").strip():
-            items.append({
-                "key": "mnemonic", "group": "mnemonic", "dialect": "default",
-                "text": mn.get("phrase"),
-                "current_url": mn.get("audio") or mn.get("audioAmE") or "",
-                "path": ["mnemonic", "audio"],
-                "filename_slug": f"{card.get('id','card')}_mnemonic",
-                "ipa": "",
-            })
-
-        # Common words — top N by list order (already zipf-sorted from lexicon)
-        for i, w in enumerate((card.get("commonWords") or [])[:max(0, words_limit)]):
-            word = (w or {}).get("w", "").strip()
-            if not word:
-                continue
-            items.append({
-                "key": f"word-{i}-AmE", "group": "words", "dialect": "AmE",
-                "text": word,
-                "current_url": (w.get("audioAmE") or w.get("audio") or ""),
-                "path": ["commonWords", i, "audioAmE"],
-                "filename_slug": f"{card.get('id','card')}_word_{re.sub(r'[^a-z0-9]+','_', word.lower())}_AmE",
-                "ipa": "",
-            })
-            if include_words_rp:
-                items.append({
-                    "key": f"word-{i}-RP", "group": "words", "dialect": "RP",
-                    "text": word,
-                    "current_url": (w.get("audioRP") or ""),
-                    "path": ["commonWords", i, "audioRP"],
-                    "filename_slug": f"{card.get('id','card')}_word_{re.sub(r'[^a-z0-9]+','_', word.lower())}_RP",
-                    "ipa": "",
-                })
-        return items
-
     @router.post("/admin/phonemes/{card_id}/batch-audio")
     async def admin_batch_audio(
         card_id: str,
@@ -2072,26 +2627,29 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
 
         Iterates all audio items (isolated + examples + mnemonic + top-N words)
         and calls ElevenLabs for each clip whose URL is empty (or all clips
-        when ``overwrite=true``). Persists URLs into the card doc under the
-        proper nested path. Returns per-item status so the frontend can
-        display progress + a final error list.
+        when ``overwrite=true``). Clips run on the async TTS engine's worker
+        pool (``ELEVENLABS_CONCURRENCY`` / ``ELEVENLABS_RATE_PER_S``, retries
+        on 429/5xx) and each URL is persisted into the card doc under the
+        proper nested path as soon as its clip completes, so a dropped
+        request keeps every clip finished so far. Per-clip progress is
+        recorded on the card's run document — poll
+        ``GET …/{card_id}/batch-audio/progress`` while this request runs.
+        Clips whose exact request (final text, voice, model, format,
+        settings) was synthesised before come from the TTS dedup cache —
+        ``use_cache=false`` forces fresh takes, and so does ``overwrite=true``
+        (regenerating a clip means a new take, which replaces the cached one).
+        Returns per-item status so the frontend can display a final error list.
 
         Errors on individual clips DO NOT abort the run — the pipeline
         continues (matches option E=c: "continue always, show errors at end").
         """
-        from .elevenlabs import synthesize_and_store
-        from storage_helper import put_object as _emergent_put
-        from pathlib import Path as _Path
+        from .elevenlabs import run_tts_batch
+        from utils.storage_ledger import tracked_put as _emergent_put
 
         doc = await coll.find_one({"id": card_id}, {"_id": 0})
         if not doc:
             raise HTTPException(status_code=404, detail="Fonema non trovato")
 
-        voice_map = {
-            "AmE":     (payload.voice_ame or "").strip(),
-            "RP":      (payload.voice_rp or "").strip(),
-            "default": (payload.voice_default or "").strip(),
-        }
         items = _compute_card_audio_items(
             doc, payload.words_limit, payload.include_words_rp
         )
@@ -2103,109 +2661,71 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
         generated: List[str] = []
         skipped:   List[str] = []
         errors:    List[dict] = []
-        # We accumulate changes into an IN-MEMORY working copy of the doc
-        # and re-serialise the affected top-level fields at the end. This
-        # avoids MongoDB's "dotted-key array-index creates a subdocument
-        # instead of an array" trap when the field doesn't pre-exist as
-        # an array on the doc.
-        work = dict(doc)
-        work_audio = dict(work.get("audio") or {})
-        for d in ("AmE", "RP"):
-            entry = dict(work_audio.get(d) or {})
-            # Normalise "examples": accept legacy dict-with-numeric-keys shape
-            ex_raw = entry.get("examples") or []
-            if isinstance(ex_raw, dict):
-                ex_raw = [ex_raw.get(str(k), "") for k in sorted(ex_raw.keys(), key=lambda s: int(s) if str(s).isdigit() else 0)]
-            entry["examples"] = list(ex_raw)
-            work_audio[d] = entry
-        work_mnemonic = dict(work.get("mnemonic") or {})
-        work_common   = [dict(w) for w in (work.get("commonWords") or [])]
-        fields_touched = set()
-
-        # ``uploads_dir`` fallback for local write on emergent storage failure
-        uploads_dir = _Path("/app/backend/uploads")
+        reference_urls: List[str] = []   # new scoring-reference clips to index
+        work = _audio_work(doc)
+        settings = payload.model_dump()
 
+        clips: List[dict] = []
         for it in items:
             if it["current_url"] and not payload.overwrite:
                 skipped.append(it["key"])
                 continue
-
-            voice_id = voice_map.get(it["dialect"]) or voice_map.get("default")
-            # Apply per-clip overrides if the caller provided them (Audio Studio).
-            item_text = (payload.text_override or {}).get(it["key"]) if payload.text_override else None
-            item_text = item_text if item_text is not None else it["text"]
-            item_ipa  = (payload.ipa_override or {}).get(it["key"]) if payload.ipa_override else None
-            if item_ipa is None:
-                # Auto-detect: if the text is a bare /…/ IPA token, treat as isolated phoneme.
-                stripped = (item_text or "").strip()
-                if len(stripped) >= 3 and stripped.startswith("/") and stripped.endswith("/"):
-                    item_ipa = stripped.strip("/").strip()
-            # Fall back to the item's baked-in IPA hint (only set for isolated).
-            item_ipa = item_ipa if item_ipa is not None else it.get("ipa") or None
-
-            try:
-                res = synthesize_and_store(
-                    text=item_text,
-                    voice_id=voice_id,
-                    emergent_put=_emergent_put,
-                    uploads_dir=uploads_dir,
-                    stability=payload.stability,
-                    similarity_boost=payload.similarity_boost,
-                    style=payload.style,
-                    use_speaker_boost=payload.use_speaker_boost,
-                    model_id=payload.model_id,
-                    output_format=payload.output_format,
-                    filename_hint=it["filename_slug"],
-                    ipa_phoneme=item_ipa,
-                )
-                rel_url = res["relative_url"]
-                # Write into the in-memory doc at ``path`` — arrays are
-                # preserved as arrays, dicts as dicts.
-                path = it["path"]
-                if path[0] == "audio":
-                    dialect, kind = path[1], path[2]
-                    dentry = work_audio[dialect]
-                    if kind == "isolated":
-                        dentry["isolated"] = rel_url
-                    elif kind == "examples":
-                        idx = path[3]
-                        arr = dentry.get("examples") or []
-                        while len(arr) <= idx:
-                            arr.append("")
-                        arr[idx] = rel_url
-                        dentry["examples"] = arr
-                    work_audio[dialect] = dentry
-                    fields_touched.add("audio")
-                elif path[0] == "mnemonic":
-                    work_mnemonic["audio"] = rel_url
-                    fields_touched.add("mnemonic")
-                elif path[0] == "commonWords":
-                    idx = path[1]
-                    key = path[2]  # audioAmE or audioRP
-                    while len(work_common) <= idx:
-                        work_common.append({})
-                    work_common[idx][key] = rel_url
-                    fields_touched.add("commonWords")
-                generated.append(it["key"])
-            except Exception as exc:  # noqa: BLE001
-                errors.append({
-                    "key":   it["key"],
-                    "text":  it["text"][:60],
-                    "error": f"{type(exc).__name__}: {str(exc)[:200]}",
-                })
-
-        if fields_touched:
-            set_ops: Dict[str, Any] = {
-                "updatedAt": _now_iso(),
-                "updatedBy": admin.get("username"),
-            }
-            if "audio" in fields_touched:
-                set_ops["audio"] = work_audio
-            if "mnemonic" in fields_touched:
-                set_ops["mnemonic"] = work_mnemonic
-            if "commonWords" in fields_touched:
-                set_ops["commonWords"] = work_common
-            await coll.update_one({"id": card_id}, {"$set": set_ops})
+            clips.append({"key": it["key"], "item": it, "kwargs": _audio_clip_kwargs(
+                it, settings, payload.text_override, payload.ipa_override)})
+
+        runs = db[_AUDIO_RUNS]
+        await runs.update_one({"cardId": card_id}, {"$set": {
+            "cardId": card_id, "status": "running", "total": len(items),
+            "queued": len(clips), "skipped": len(skipped), "done": 0, "failed": 0,
+            "events": [], "startedAt": _now_iso(), "startedBy": admin.get("username"),
+            "finishedAt": None,
+        }}, upsert=True)
+        persist_lock = asyncio.Lock()
+
+        async def _on_done(clip: dict, res: Optional[dict], exc: Optional[Exception]) -> None:
+            it = clip["item"]
+            event: Dict[str, Any] = {"key": it["key"], "ms": clip.get("elapsed_ms"),
+                                     "at": _now_iso()}
+            async with persist_lock:
+                if exc is None:
+                    rel_url = res["relative_url"]
+                    field = _set_audio_url(work, it["path"], rel_url)
+                    await coll.update_one({"id": card_id}, {"$set": {
+                        field: work[field],
+                        "updatedAt": _now_iso(),
+                        "updatedBy": admin.get("username"),
+                    }})
+                    generated.append(it["key"])
+                    if it["key"].startswith(("isolated-", "word-")):
+                        reference_urls.append(rel_url)
+                    event.update(status="generated", url=rel_url,
+                                 attempts=res.get("attempts", 1),
+                                 cached=res.get("cached", False))
+                    counter = "done"
+                else:
+                    errors.append({
+                        "key":   it["key"],
+                        "text":  it["text"][:60],
+                        "error": f"{type(exc).__name__}: {str(exc)[:200]}",
+                    })
+                    event.update(status="error", error=errors[-1]["error"])
+                    counter = "failed"
+                await runs.update_one({"cardId": card_id}, {
+                    "$inc": {counter: 1}, "$push": {"events": {"$each": [event]}}})
+
+        await run_tts_batch(clips, emergent_put=_emergent_put,
+                            uploads_dir=_AUDIO_UPLOADS_DIR, on_done=_on_done,
+                            db=db, use_cache=payload.use_cache and not payload.overwrite)
+
+        # Clips finish in any order — report them in card order.
+        order = {it["key"]: i for i, it in enumerate(items)}
+        generated.sort(key=order.__getitem__)
+        errors.sort(key=lambda e: order[e["key"]])
+        await runs.update_one({"cardId": card_id}, {"$set": {
+            "status": "done", "finishedAt": _now_iso()}})
+        if reference_urls:
+            from .teacher_references import schedule_reference_index
+            schedule_reference_index(db, reference_urls)
 
         return {
             "ok":         True,
@@ -2216,6 +2736,43 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
             "errors":     errors,
         }
 
+    @router.get("/admin/phonemes/{card_id}/batch-audio/progress")
+    async def admin_batch_audio_progress(
+        card_id: str,
+        admin: dict = Depends(get_admin_user),
+    ):
+        """Progress of the card's latest ``batch-audio`` run: counters plus
+        one event per finished clip (``generated`` with its URL and attempt
+        count, or ``error``), in completion order."""
+        run = await db[_AUDIO_RUNS].find_one({"cardId": card_id}, {"_id": 0})
+        if not run:
+            raise HTTPException(status_code=404, detail="Nessuna generazione audio per questa card")
+        return run
+
+    @router.post("/admin/phonemes/batch/audio", status_code=202)
+    async def admin_catalogue_audio(
+        payload: CatalogueAudioRequest,
+        admin: dict = Depends(get_admin_user),
+    ):
+        """Fill every missing clip of the whole catalogue in one background
+        job: identical requests across cards are synthesised once, the
+        worker pool shares the TTS engine's global limits, and a job cut
+        short by a restart resumes at startup. Returns the job id; poll
+        ``GET …/batch/audio/{job_id}`` for progress, ETA and characters
+        consumed."""
+        job = await start_catalogue_audio_job(db, admin.get("username"), payload.model_dump())
+        return {"jobId": job["id"], "status": job["status"]}
+
+    @router.get("/admin/phonemes/batch/audio/{job_id}")
+    async def admin_catalogue_audio_status(
+        job_id: str,
+        admin: dict = Depends(get_admin_user),
+    ):
+        job = await db[_AUDIO_JOBS].find_one({"id": job_id}, {"_id": 0})
+        if not job:
+            raise HTTPException(status_code=404, detail="Job non trovato")
+        return job
+
 
 
 
@@ -2364,14 +2921,9 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
         dialect = None
         last_err = None
         for d in candidate_dialects:
-            for candidate in _ipa_equivalents(ipa):
-                canon = await db.canonical_phonemes.find_one(
-                    {"dialect": d, "ipa": candidate}, {"_id": 0},
-                )
-                if canon:
-                    dialect = d
-                    break
+            canon = await _canonical_row(db, ipa, d)
             if canon:
+                dialect = d
                 break
             last_err = f"{d}: /{ipa}/ non trovato"
         if not canon or not dialect:
@@ -2579,7 +3131,7 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
 
         # ---- 7) Rescore readiness
         try:
-            report = await build_readiness_report(db, updated)
+            report = await refresh_card_readiness(db, updated)
             readiness_score = report["score"]
         except Exception:  # noqa: BLE001
             readiness_score = None
@@ -2650,9 +3202,9 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
         doc["updatedAt"] = now
         doc["createdBy"] = admin.get("username")
         doc["updatedBy"] = admin.get("username")
+        await _inject_computed_chart(db, doc, persist=False)
 
         await coll.insert_one(doc)
-        await _inject_computed_chart(db, doc)
         return _to_response(doc)
 
     @router.put("/admin/phonemes/{card_id}", response_model=PhonemeCardResponse)
@@ -2724,9 +3276,19 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
 
         update_fields["updatedAt"] = _now_iso()
         update_fields["updatedBy"] = admin.get("username")
+        # Phase C — materialise the chart in the same write if its inputs moved.
+        merged.update(update_fields)
+        await _inject_computed_chart(db, merged, persist=False)
+        if merged.get(_CHART_KEY_FIELD) != existing.get(_CHART_KEY_FIELD):
+            update_fields["frequencyChart"] = merged["frequencyChart"]
+            update_fields[_CHART_KEY_FIELD] = merged[_CHART_KEY_FIELD]
 
         await coll.update_one({"id": card_id}, {"$set": update_fields})
         updated = await coll.find_one({"id": card_id}, {"_id": 0})
+        try:
+            await refresh_card_readiness(db, updated)
+        except Exception:  # noqa: BLE001 — the list recomputes it lazily
+            logging.exception("readiness: refresh failed for card %s", card_id)
         await _inject_computed_chart(db, updated)
         return _to_response(updated)
 
@@ -2767,6 +3329,7 @@ def build_phoneme_cards_router(db, get_admin_user, get_optional_admin_user=None)
 
         now = _now_iso()
         clone = dict(src)
+        clone.pop(_READINESS_FIELD, None)
         clone["id"] = new_id
         clone["published"] = False
         clone["order"] = int(src.get("order", 100)) + 1
@@ -3092,4 +3655,9 @@ async def ensure_phoneme_seed(db) -> Dict[str, Any]:
     except Exception as e:  # noqa: BLE001
         patched.append(f"es-highlights.error:{type(e).__name__}")
 
+    # The migrations above write without bumping ``updatedAt`` — drop every
+    # persisted readiness badge so it is rebuilt from the patched cards.
+    if patched:
+        await coll.update_many({}, {"$unset": {_READINESS_FIELD: ""}})
+
     return {"inserted": inserted, "skipped": skipped, "patched": patched}
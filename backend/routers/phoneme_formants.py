@@ -33,19 +33,29 @@ from __future__ import annotations
 
 import os
 import math
+import time
+import asyncio
 import logging
-import tempfile
 import statistics
 from datetime import datetime, timezone
-from typing import Callable, Optional
+from typing import Awaitable, Callable, Optional
 
 import httpx
+import numpy as np
 import parselmouth
+from numpy.lib.stride_tricks import sliding_window_view
 from parselmouth.praat import call
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from pydantic import BaseModel
 
 from data.formant_references import build_reference_rows, HIGH_IMPACT_IPA
+from routers.analysis_pool import batch_slots, parse_batch_takes, run_analysis
+from routers.audio_ingest import MAX_TAKE_BYTES, SpooledTake, spool_bytes, spool_upload
+from routers.measurement_cache import (
+    digest_measurement_key,
+    get_measurement_cache,
+    measurement_key,
+)
 
 
 class ConsentUpdate(BaseModel):
@@ -66,9 +76,11 @@ _EQUIV = {
 
 
 async def ensure_formant_references(db) -> dict:
-    """Idempotently seed the ``formant_references`` collection."""
+    """Idempotently seed the ``formant_references`` collection. Any actual
+    change bumps the reference version stamp, so every process's
+    ``FormantReferenceIndex`` reloads."""
     rows = build_reference_rows()
-    inserted = 0
+    inserted = modified = 0
     for r in rows:
         res = await db.formant_references.update_one(
             {"phoneme_ipa": r["phoneme_ipa"], "dialect": r["dialect"],
@@ -77,7 +89,10 @@ async def ensure_formant_references(db) -> dict:
         )
         if res.upserted_id is not None:
             inserted += 1
-    return {"total": len(rows), "inserted": inserted}
+        modified += res.modified_count
+    if inserted or modified:
+        await bump_reference_version(db)
+    return {"total": len(rows), "inserted": inserted, "modified": modified}
 
 
 # ---- Validation constants (FIX A2 + PROBLEMA B) ---- #
@@ -130,6 +145,28 @@ def _pooled_f1_sd(refs: list) -> Optional[float]:
 # LPC ceilings retried in order (Hz, max n formants).
 _CEILINGS = ((5500.0, 5.0), (5000.0, 5.0), (4500.0, 5.0))
 _CEILING_RANGE = [5500, 5000, 4500]
+# ---- Track sampling engine ---- #
+# ``numpy``  — pull each pitch/formant track ONCE as an array (``Pitch``
+#   selected candidates, ``Formant → To Matrix`` per formant) and reproduce
+#   Praat's linear ``Get value at time`` + the 20 ms sliding windows with
+#   vectorised NumPy. Window dicts are identical to the legacy engine.
+# ``legacy`` — one ``Get value at time`` Praat call per formant per 5 ms frame
+#   and pure-Python windows. Kept as the reference for parity testing.
+# Env: PHONEME_FORMANT_ENGINE (default numpy).
+FORMANT_ENGINE = os.environ.get("PHONEME_FORMANT_ENGINE", "numpy").lower()
+_ENGINES = ("numpy", "legacy")
+# ---- FormantPath candidate budget ---- #
+# ``To FormantPath (burg)`` runs one Burg analysis per candidate ceiling
+# (middle × e^(±k·0.05), k = 0..steps), but ``Extract Formant`` only follows
+# the MIDDLE candidate (no path finder is run) and Praat 6.1 offers no command
+# to extract a side candidate — so one FormantPath cannot serve all three
+# ceilings, and every side candidate is discarded work.
+# ``lean``   — steps=1 (Praat's minimum): 3 Burg analyses per ceiling, 9 per take.
+# ``legacy`` — steps=4: 9 per ceiling, 27 per take.
+# The extracted track is bit-identical in both modes (see
+# ``scripts/compare_formant_path_modes.py``). Env: PHONEME_FORMANT_PATH_MODE.
+FORMANT_PATH_MODE = os.environ.get("PHONEME_FORMANT_PATH_MODE", "lean").lower()
+_PATH_STEPS = {"lean": 1, "legacy": 4}
 
 
 def _median(vals: list) -> Optional[int]:
@@ -142,28 +179,70 @@ def _pstdev(vals: list) -> Optional[float]:
     return round(statistics.pstdev(xs), 1) if len(xs) >= 2 else 0.0
 
 
-def _candidate_windows(snd, dur, VOI, step, max_formant, max_num) -> list[dict]:
-    """All stable voiced 20 ms windows for one LPC ceiling, sorted by combined
-    F1+F2 SD (least variance first). Each window carries median F1/F2/F3 and the
-    within-window per-formant SD used by the FIX A2 stability check."""
-    try:
-        fp = call(snd, "To FormantPath (burg)", 0.0025, float(max_num), float(max_formant),
-                  0.025, 50.0, 0.05, 4)
-        formant = call(fp, "Extract Formant")
-    except Exception:  # noqa: BLE001
-        return []
-
-    times, F1, F2, F3 = [], [], [], []
+def _time_grid(dur: float, step: float) -> list[float]:
+    """The 5 ms analysis grid. Built by repeated addition (not ``arange``) so
+    both engines sample at bit-identical times."""
+    times = []
     t = 0.0
     while t <= dur:
+        times.append(t)
+        t += step
+    return times
+
+
+def _sample_linear(values, obj, times) -> np.ndarray:
+    """Vectorised Praat ``Sampled_getValueAtX`` (linear interpolation) over a
+    per-frame track ``values`` (NaN = undefined frame) of the Sampled ``obj``.
+    Same rules as the per-call query: undefined outside [xmin, xmax] or when the
+    nearest frame is undefined; an undefined/absent far neighbour → nearest value."""
+    t = np.asarray(times, dtype=float)
+    nx = int(obj.nx)
+    ireal = (t - obj.x1) / obj.dx + 1.0
+    ileft = np.floor(ireal).astype(np.int64)
+    phase = ireal - ileft
+    left_is_near = phase < 0.5
+    inear = np.where(left_is_near, ileft, ileft + 1)
+    ifar = np.where(left_is_near, ileft + 1, ileft)
+    phase = np.where(left_is_near, phase, 1.0 - phase)
+    padded = np.concatenate(([np.nan], np.asarray(values, dtype=float), [np.nan]))
+    fnear = padded[np.clip(inear, 0, nx + 1)]
+    ffar = padded[np.clip(ifar, 0, nx + 1)]
+    out = np.where(np.isnan(ffar), fnear, fnear + phase * (ffar - fnear))
+    out[(t < obj.xmin) | (t > obj.xmax) | (inear < 1) | (inear > nx)] = np.nan
+    return out
+
+
+def _pitch_track(pitch, times, engine: str) -> list:
+    """F0 (Hz) at every grid time, ``None`` where unvoiced/undefined."""
+    if pitch is None:
+        return [None] * len(times)
+    if engine == "numpy":
+        try:
+            freq = pitch.selected_array["frequency"].astype(float)
+            freq[(freq <= 0.0) | (freq >= pitch.ceiling)] = np.nan
+            vals = _sample_linear(freq, pitch, times)
+            return [None if v != v else v for v in vals.tolist()]
+        except Exception:  # noqa: BLE001
+            logging.exception("formants: numpy pitch sampling failed, using legacy")
+    out = []
+    for t in times:
+        try:
+            v = call(pitch, "Get value at time", t, "Hertz", "Linear")
+            out.append(v if (v and v == v) else None)
+        except Exception:  # noqa: BLE001
+            out.append(None)
+    return out
+
+
+def _windows_legacy(formant, times, VOI, step) -> list[dict]:
+    F1, F2, F3 = [], [], []
+    for t in times:
         for i, arr in ((1, F1), (2, F2), (3, F3)):
             try:
                 v = call(formant, "Get value at time", i, t, "hertz", "Linear")
                 arr.append(v if (v and v == v) else None)
             except Exception:  # noqa: BLE001
                 arr.append(None)
-        times.append(t)
-        t += step
 
     wframes = max(3, int(round(0.020 / step)))  # 20 ms sliding window
     windows: list[dict] = []
@@ -182,18 +261,140 @@ def _candidate_windows(snd, dur, VOI, step, max_formant, max_num) -> list[dict]:
             "F1_sd": _pstdev(f1s), "F2_sd": _pstdev(f2s), "F3_sd": _pstdev(f3s),
             "sd_f1f2": round(statistics.pstdev(f1s) + statistics.pstdev(f2s), 1),
         })
+    return windows
+
+
+def _round1(approx: float, exact: Callable[[], float]) -> float:
+    """``round(x, 1)`` of a NumPy SD. Within 1e-6 of a rounding tie the last-ulp
+    difference vs ``statistics.pstdev`` could flip the result, so the exact
+    value is recomputed there (keeps the engines identical)."""
+    scaled = approx * 10.0
+    if abs(scaled - math.floor(scaled) - 0.5) < 1e-6:
+        return round(exact(), 1)
+    return round(approx, 1)
+
+
+def _windows_numpy(formant, times, VOI, step) -> list[dict]:
+    n = len(times)
+    tracks = []
+    for i in (1, 2, 3):
+        vals = np.array(call(formant, "To Matrix", i).values[0], dtype=float)
+        vals[vals == 0.0] = np.nan  # Praat writes 0 for an absent formant
+        tracks.append(_sample_linear(vals, formant, times))
+
+    wframes = max(3, int(round(0.020 / step)))  # 20 ms sliding window
+    if n < wframes:
+        return []
+    voi = np.zeros(n, dtype=bool)
+    voi[:min(n, len(VOI))] = VOI[:n]
+    win = sliding_window_view(np.vstack(tracks), wframes, axis=1)   # (3, n-w+1, w)
+    defined = ~np.isnan(win)
+    vcount = sliding_window_view(voi, wframes).sum(axis=1)
+    keep = np.flatnonzero(defined[0].all(axis=1) & defined[1].all(axis=1)
+                          & (vcount >= wframes * 0.5))
+    if not keep.size:
+        return []
+    w, d = win[:, keep, :], defined[:, keep, :]
+    cnt = d.sum(axis=2)                                              # (3, k)
+    med = np.take_along_axis(np.sort(w, axis=2), (cnt // 2)[..., None], axis=2)[..., 0]
+    safe = np.maximum(cnt, 1)
+    mean = np.where(d, w, 0.0).sum(axis=2) / safe
+    dev = np.where(d, w - mean[..., None], 0.0)
+    sd = np.sqrt((dev * dev).sum(axis=2) / safe)
+
+    windows: list[dict] = []
+    for col, start in enumerate(keep.tolist()):
+        vals = [w[k, col][d[k, col]].tolist() for k in range(3)]
+        sds = [
+            _round1(float(sd[k, col]), lambda xs=vals[k]: statistics.pstdev(xs))
+            if cnt[k, col] >= 2 else 0.0
+            for k in range(3)
+        ]
+        windows.append({
+            "start_ms": round(times[start] * 1000, 1),
+            "end_ms": round(times[start + wframes - 1] * 1000, 1),
+            "F1": round(float(med[0, col])), "F2": round(float(med[1, col])),
+            "F3": round(float(med[2, col])) if cnt[2, col] else None,
+            "F1_sd": sds[0], "F2_sd": sds[1], "F3_sd": sds[2],
+            "sd_f1f2": _round1(
+                float(sd[0, col]) + float(sd[1, col]),
+                lambda a=vals[0], b=vals[1]: statistics.pstdev(a) + statistics.pstdev(b)),
+        })
+    return windows
+
+
+def _candidate_windows(snd, times, VOI, step, max_formant, max_num,
+                       engine: Optional[str] = None,
+                       path_mode: Optional[str] = None) -> list[dict]:
+    """All stable voiced 20 ms windows for one LPC ceiling, sorted by combined
+    F1+F2 SD (least variance first). Each window carries median F1/F2/F3 and the
+    within-window per-formant SD used by the FIX A2 stability check."""
+    engine = engine or FORMANT_ENGINE
+    path_steps = _PATH_STEPS[path_mode or FORMANT_PATH_MODE]
+    try:
+        fp = call(snd, "To FormantPath (burg)", 0.0025, float(max_num), float(max_formant),
+                  0.025, 50.0, 0.05, path_steps)
+        formant = call(fp, "Extract Formant")
+    except Exception:  # noqa: BLE001
+        return []
+
+    windows = None
+    if engine == "numpy":
+        try:
+            windows = _windows_numpy(formant, times, VOI, step)
+        except Exception:  # noqa: BLE001
+            logging.exception("formants: numpy window engine failed, using legacy")
+    if windows is None:
+        windows = _windows_legacy(formant, times, VOI, step)
     windows.sort(key=lambda w: w["sd_f1f2"])
     return windows
 
 
-def _measure_all_ceilings(path: str) -> Optional[dict]:
+class LazyCeilings:
+    """Per-ceiling measurements computed on first iteration, in ``_CEILINGS``
+    order, and memoised. ``_select_measurement`` returns on the first
+    plausible+stable window, so a clean take only ever pays for the ceilings
+    it walked; the implausible/unstable paths iterate on and compute the rest.
+    Holds the loaded Sound → in-process only (never pickled to a worker)."""
+
+    def __init__(self, compute: Callable[[int], dict], total: int):
+        self._compute = compute
+        self._total = total
+        self.computed: list[dict] = []
+
+    def __iter__(self):
+        i = 0
+        while i < self._total:
+            if i == len(self.computed):
+                self.computed.append(self._compute(i))
+            yield self.computed[i]
+            i += 1
+
+    def all(self) -> list[dict]:
+        """Force every ceiling (Expert Mode / eager callers)."""
+        return list(self)
+
+
+def _measure_all_ceilings(path: str, engine: Optional[str] = None,
+                          path_mode: Optional[str] = None,
+                          lazy: bool = False) -> Optional[dict]:
     """Ceiling-independent pitch analysis + per-ceiling candidate windows.
 
     Returns ``{f0_global, duration, max_num_formants, ceilings:[{ceiling_hz,
     max_num, windows:[...]}]}`` or ``None`` if the sound cannot be loaded or is
     too short. Plausibility (per-phoneme/group) and stability (FIX A2) are
     applied downstream in the router, where the reference is known.
+    ``engine`` overrides ``FORMANT_ENGINE`` ('numpy' | 'legacy') and
+    ``path_mode`` overrides ``FORMANT_PATH_MODE`` ('lean' | 'legacy').
+    With ``lazy=True`` ``ceilings`` is a ``LazyCeilings``: only the ceilings up
+    to the first one with usable windows are analysed here, the rest on demand.
     """
+    engine = engine or FORMANT_ENGINE
+    path_mode = path_mode or FORMANT_PATH_MODE
+    if engine not in _ENGINES:
+        raise ValueError(f"unknown formant engine: {engine!r}")
+    if path_mode not in _PATH_STEPS:
+        raise ValueError(f"unknown FormantPath mode: {path_mode!r}")
     try:
         snd = parselmouth.Sound(path)
     except Exception:  # noqa: BLE001
@@ -212,41 +413,30 @@ def _measure_all_ceilings(path: str) -> Optional[dict]:
         pitch = None
 
     step = 0.005
-
-    def f0_at(t: float):
-        if pitch is None:
-            return None
-        try:
-            v = call(pitch, "Get value at time", t, "Hertz", "Linear")
-            return v if (v and v == v) else None
-        except Exception:  # noqa: BLE001
-            return None
-
-    VOI = []
-    voiced_f0 = []
-    t = 0.0
-    while t <= dur:
-        fv = f0_at(t)
-        VOI.append(bool(fv) if pitch is not None else True)
-        if fv:
-            voiced_f0.append(fv)
-        t += step
+    times = _time_grid(dur, step)
+    f0_track = _pitch_track(pitch, times, engine)
+    VOI = [bool(fv) if pitch is not None else True for fv in f0_track]
+    voiced_f0 = [fv for fv in f0_track if fv]
     f0_global = round(sum(voiced_f0) / len(voiced_f0)) if len(voiced_f0) * step >= 0.100 else None
 
-    ceilings = []
-    for max_formant, max_num in _CEILINGS:
-        windows = _candidate_windows(snd, dur, VOI, step, max_formant, max_num)
-        ceilings.append({"ceiling_hz": round(max_formant), "max_num": int(max_num), "windows": windows})
+    def _ceiling(i: int) -> dict:
+        max_formant, max_num = _CEILINGS[i]
+        windows = _candidate_windows(snd, times, VOI, step, max_formant, max_num,
+                                     engine, path_mode)
+        return {"ceiling_hz": round(max_formant), "max_num": int(max_num), "windows": windows}
+
+    ceilings = LazyCeilings(_ceiling, len(_CEILINGS))
     if not any(c["windows"] for c in ceilings):
         return None
-    return {"f0_global": f0_global, "duration": dur, "max_num_formants": 5, "ceilings": ceilings}
+    return {"f0_global": f0_global, "duration": dur, "max_num_formants": 5,
+            "ceilings": ceilings if lazy else ceilings.all()}
 
 
 def _extract_formants(path: str) -> Optional[dict]:
     """Best-effort median F1/F2/F3 + F0 from the most stable window of the
     default LPC ceiling — used ONLY for the teacher reference clip (a single
     clean studio take, so no per-phoneme plausibility retry is needed)."""
-    meas = _measure_all_ceilings(path)
+    meas = _measure_all_ceilings(path, lazy=True)
     if not meas:
         return None
     for c in meas["ceilings"]:
@@ -359,6 +549,25 @@ def _build_diagnostics(meas: dict, ranges: dict, sel: dict, reliable: bool) -> d
     }
 
 
+def _ceilings_overview(ceilings, ranges: dict) -> list[dict]:
+    """Expert Mode (explicit ``expert`` flag only): one row per LPC ceiling —
+    including those the lazy selection never needed, which iterating here
+    forces — with its representative window and plausibility/stability."""
+    out = []
+    for c in ceilings:
+        windows = c["windows"]
+        plaus = next((w for w in windows if _window_plausible(w, ranges)), None)
+        rep = plaus or (windows[0] if windows else None)
+        out.append({
+            "ceiling_hz": c["ceiling_hz"],
+            "n_windows": len(windows),
+            "F1": rep and rep.get("F1"), "F2": rep and rep.get("F2"), "F3": rep and rep.get("F3"),
+            "plausible": plaus is not None,
+            "stable": _window_stable(plaus, ranges)[0] if plaus else None,
+        })
+    return out
+
+
 def _score_gop(measured: float, mean: float, sd: float, tol_sd: float = 2.5) -> float:
     """DEPRECATED (kept for unit tests). Legacy linear GOP score. Production
     scoring now uses ``_score_gaussian`` (PUNTO D)."""
@@ -459,6 +668,7 @@ _MSG_UNSTABLE = (
     "Non siamo riusciti a misurare questa registrazione in modo affidabile. "
     "Prova a tenere il suono più fermo e costante per 1-2 secondi, in un ambiente silenzioso."
 )
+_MSG_NO_FORMANTS = "Impossibile estrarre le formanti. Registra di nuovo in un ambiente silenzioso."
 
 
 # --------------------------------------------------------------------------- #
@@ -466,36 +676,98 @@ _MSG_UNSTABLE = (
 # /phonemes/analyze-formants endpoint AND the public /level-test/score
 # endpoint). Kept at module scope so it is import-friendly and picklable-safe.
 # --------------------------------------------------------------------------- #
+# ---- Reference table, in memory ---- #
+# ``formant_references`` is tiny (a few dozen rows) and only changes when
+# ``ensure_formant_references`` upserts. Each process keeps it as a dict
+# ``(phoneme_ipa, dialect) → rows`` plus the resolved ``_EQUIV`` fallbacks, so
+# ``find_reference`` is a zero-I/O lookup. Invalidation is a version stamp in
+# ``formant_references_meta`` (bumped on every real change), re-read at most
+# every FORMANT_REF_INDEX_REFRESH_S seconds (default 60); the process that
+# seeds invalidates its own copy immediately. A change stream would need a
+# replica set, which the deployment doesn't guarantee.
+_REF_META = "formant_references_meta"
+_REF_INDEX_REFRESH_S = float(os.environ.get("FORMANT_REF_INDEX_REFRESH_S", "60"))
+
+
+async def bump_reference_version(db) -> None:
+    await db[_REF_META].update_one(
+        {"_id": "version"},
+        {"$inc": {"version": 1},
+         "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}},
+        upsert=True,
+    )
+    _reference_index.invalidate()
+
+
+class FormantReferenceIndex:
+    def __init__(self, refresh_s: float):
+        self.refresh_s = refresh_s
+        self.version: Optional[int] = None
+        self._rows: dict = {}       # (phoneme_ipa, dialect) → rows
+        self._resolved: dict = {}   # (requested ipa, dialect) → rows after _EQUIV
+        self._checked_at = 0.0
+        self._loaded = False
+
+    def invalidate(self) -> None:
+        self._loaded = False
+
+    async def _read_version(self, db) -> int:
+        doc = await db[_REF_META].find_one({"_id": "version"}, {"version": 1})
+        return int((doc or {}).get("version", 0))
+
+    async def load(self, db) -> int:
+        """(Re)load every row. Returns the number of rows indexed."""
+        version = await self._read_version(db)
+        rows = await db.formant_references.find({}, {"_id": 0}).to_list(length=None)
+        table: dict = {}
+        for r in rows:
+            table.setdefault((r.get("phoneme_ipa"), r.get("dialect")), []).append(r)
+        self._rows, self._resolved = table, {}
+        self.version, self._loaded = version, True
+        self._checked_at = time.monotonic()
+        return len(rows)
+
+    async def _fresh(self, db) -> None:
+        if not self._loaded:
+            await self.load(db)
+        elif time.monotonic() - self._checked_at >= self.refresh_s:
+            self._checked_at = time.monotonic()
+            if await self._read_version(db) != self.version:
+                await self.load(db)
+
+    def resolve(self, phoneme_ipa: str, dialect: str) -> list[dict]:
+        key = (phoneme_ipa, dialect)
+        hit = self._resolved.get(key)
+        if hit is None:
+            candidates = _EQUIV.get(phoneme_ipa, [phoneme_ipa])
+            if phoneme_ipa not in candidates:
+                candidates = [phoneme_ipa] + candidates
+            hit = next((self._rows[(c, dialect)][:10] for c in candidates
+                        if self._rows.get((c, dialect))), [])
+            self._resolved[key] = hit
+        return list(hit)
+
+    async def find(self, db, phoneme_ipa: str, dialect: str) -> list[dict]:
+        await self._fresh(db)
+        return self.resolve(phoneme_ipa, dialect)
+
+
+_reference_index = FormantReferenceIndex(_REF_INDEX_REFRESH_S)
+
+
+async def load_reference_index(db) -> int:
+    return await _reference_index.load(db)
+
+
 async def find_reference(db, phoneme_ipa: str, dialect: str) -> list[dict]:
-    candidates = _EQUIV.get(phoneme_ipa, [phoneme_ipa])
-    if phoneme_ipa not in candidates:
-        candidates = [phoneme_ipa] + candidates
-    for cand in candidates:
-        rows = await db.formant_references.find(
-            {"phoneme_ipa": cand, "dialect": dialect}, {"_id": 0}
-        ).to_list(length=10)
-        if rows:
-            return rows
-    return []
-
-
-async def fetch_and_extract(url: str) -> Optional[dict]:
-    """Download a (possibly relative) reference clip and extract its formants."""
-    full = f"http://localhost:8001{url}" if url.startswith("/") else url
-    try:
-        async with httpx.AsyncClient(follow_redirects=True, timeout=20) as client:
-            resp = await client.get(full)
-            resp.raise_for_status()
-            data = resp.content
-    except Exception:  # noqa: BLE001
-        return None
-    if not data:
-        return None
-    is_mp3 = full.lower().split("?")[0].endswith(".mp3")
-    src_ext = ".mp3" if is_mp3 else ".wav"
-    with tempfile.NamedTemporaryFile(delete=False, suffix=src_ext) as tf:
-        tf.write(data)
-        src_path = tf.name
+    """Dataset rows for ``phoneme_ipa``/``dialect``, falling back through the
+    ``_EQUIV`` candidates in order — from the in-memory reference index."""
+    return await _reference_index.find(db, phoneme_ipa, dialect)
+
+
+def _extract_reference_clip(src_path: str, is_mp3: bool) -> Optional[dict]:
+    """Runs INSIDE an analysis-pool worker: decode a spooled teacher clip
+    (MP3 → WAV when possible) and extract its formants."""
     wav_path = None
     try:
         if is_mp3:
@@ -508,12 +780,47 @@ async def fetch_and_extract(url: str) -> Optional[dict]:
                 return _extract_formants(src_path)
         return _extract_formants(src_path)
     finally:
-        for p in (src_path, wav_path):
-            if p:
-                try:
-                    os.unlink(p)
-                except OSError:
-                    pass
+        if wav_path:
+            try:
+                os.unlink(wav_path)
+            except OSError:
+                pass
+
+
+async def download_clip(url: str) -> Optional[bytes]:
+    """GET a (possibly relative) clip URL. Relative URLs (e.g. per-word clips
+    stored as ``/api/uploads/...``) are resolved against the backend's own
+    internal origin so the fetch works identically in Preview and Production,
+    regardless of the public domain configured in FRONTEND_URL."""
+    full = f"http://localhost:8001{url}" if url.startswith("/") else url
+    try:
+        async with httpx.AsyncClient(follow_redirects=True, timeout=20) as client:
+            resp = await client.get(full)
+            resp.raise_for_status()
+            return resp.content or None
+    except Exception:  # noqa: BLE001
+        return None
+
+
+def is_mp3_url(url: str) -> bool:
+    return url.lower().split("?")[0].endswith(".mp3")
+
+
+async def extract_reference_bytes(data: bytes, is_mp3: bool) -> Optional[dict]:
+    """Formants of a teacher clip's bytes, in the shared analysis pool, via
+    the content-addressed measurement cache. Scoring requests read the
+    precomputed ``teacher_reference_formants`` index instead
+    (``routers.teacher_references``); this is its measuring step."""
+    cache = get_measurement_cache()
+    key = measurement_key(data, "reference", f"{_measurement_params()}|mp3={is_mp3}")
+    hit = await cache.get(key)
+    if hit is not None:
+        return hit["ref"]
+    clip = await asyncio.to_thread(spool_bytes, data, ".mp3" if is_mp3 else ".wav")
+    with clip:
+        ref = await run_analysis(_extract_reference_clip, clip.path, is_mp3)
+    await cache.put(key, "reference", {"ref": ref})
+    return ref
 
 
 def compute_formant_score(
@@ -523,12 +830,14 @@ def compute_formant_score(
     dialect: str,
     teacher_ref: Optional[dict] = None,
     group_override: Optional[str] = None,
+    expert: bool = False,
 ) -> dict:
     """Pure scoring core: given an already-computed measurement (`meas`), the
     dataset reference rows (`refs`, may be empty) and an optional teacher clip
     reference, resolve the speaker group, build plausibility ranges, select the
     reliable window and score F1/F2/F3. Raises HTTPException on failure so both
-    callers surface identical, actionable errors."""
+    callers surface identical, actionable errors. ``expert`` adds the
+    per-ceiling overview (``all_ceilings``) to the diagnostics."""
     f0 = meas["f0_global"]
     ref_source = None
     ref_group = None
@@ -612,6 +921,8 @@ def compute_formant_score(
     sel = _select_measurement(meas["ceilings"], ranges)
     if sel["status"] != "ok":
         diag = _build_diagnostics(meas, ranges, sel, False)
+        if expert:
+            diag["all_ceilings"] = _ceilings_overview(meas["ceilings"], ranges)
         reason = sel["status"]
         logging.warning("compute_formant_score: REJECTED (%s) phoneme=%s dialect=%s expert=%s",
                         reason, phoneme_ipa, dialect, diag)
@@ -628,6 +939,8 @@ def compute_formant_score(
     win = sel["window"]
     student = {"F1": win["F1"], "F2": win["F2"], "F3": win["F3"], "F0": f0, "reliable": True}
     diagnostics = _build_diagnostics(meas, ranges, sel, True)
+    if expert:
+        diagnostics["all_ceilings"] = _ceilings_overview(meas["ceilings"], ranges)
 
     per_formant = []
     dispersion_sources = set()
@@ -674,6 +987,82 @@ def compute_formant_score(
     }
 
 
+# Bump when the measurement algorithm changes in a way the parameters below
+# don't capture, so cached measurements are never reused across versions.
+_MEASUREMENT_VERSION = 1
+
+
+def _measurement_params() -> str:
+    """Everything besides the audio bytes that determines a measurement —
+    part of the measurement-cache key."""
+    return (f"v{_MEASUREMENT_VERSION}|ceilings={_CEILINGS}|step=0.005|pitch=60-500"
+            f"|engine={FORMANT_ENGINE}|path={FORMANT_PATH_MODE}")
+
+
+def take_cache_key(take: SpooledTake) -> str:
+    return digest_measurement_key(take.digest, "take", _measurement_params())
+
+
+def _score_envelope(meas: Optional[dict], refs: list[dict], phoneme_ipa: str, dialect: str,
+                    teacher_ref: Optional[dict], expert: bool) -> dict:
+    """``compute_formant_score`` as ``{"result": ...}`` or
+    ``{"error": {"status_code", "detail"}}`` (``HTTPException`` does not pickle)."""
+    if not meas:
+        return {"error": {"status_code": 422, "detail": _MSG_NO_FORMANTS}}
+    try:
+        return {"result": compute_formant_score(meas, refs, phoneme_ipa, dialect,
+                                                teacher_ref=teacher_ref, expert=expert)}
+    except HTTPException as exc:
+        return {"error": {"status_code": exc.status_code, "detail": exc.detail}}
+
+
+def _snapshot(meas: Optional[dict]) -> dict:
+    """Cacheable form of a measurement: the ceilings actually computed (a
+    lazy measurement may stop early) and whether that is all of them."""
+    if not meas:
+        return {"meas": None, "complete": True}
+    ceilings = meas["ceilings"]
+    done = list(ceilings.computed) if isinstance(ceilings, LazyCeilings) else list(ceilings)
+    return {"meas": {**meas, "ceilings": done}, "complete": len(done) == len(_CEILINGS)}
+
+
+def score_take_from_path(
+    path: str,
+    refs: list[dict],
+    phoneme_ipa: str,
+    dialect: str,
+    teacher_ref: Optional[dict] = None,
+    expert: bool = False,
+) -> dict:
+    """Runs INSIDE an analysis-pool worker: measure a spooled take (lazy
+    ceilings) and score it. Only the path crosses the process boundary — the
+    request owns the file. Returns the ``_score_envelope`` plus the
+    measurement ``snapshot`` for the measurement cache."""
+    # Lazy: a clean take stops at the first plausible+stable ceiling.
+    meas = _measure_all_ceilings(path, lazy=True)
+    out = _score_envelope(meas, refs, phoneme_ipa, dialect, teacher_ref, expert)
+    out["snapshot"] = _snapshot(meas)
+    return out
+
+
+def score_snapshot(snap: dict, refs: list[dict], phoneme_ipa: str, dialect: str,
+                   teacher_ref: Optional[dict] = None, expert: bool = False) -> Optional[dict]:
+    """Score a cached measurement snapshot in-process, or return ``None`` when
+    the snapshot cannot answer exactly as a fresh measurement would.
+
+    A complete snapshot always can. A lazy one (only the ceilings up to an
+    earlier request's ``ok`` window) can iff selection against THIS reference
+    also ends ``ok`` inside the computed prefix — ceilings are walked in
+    order, so the remaining ones would never have been reached. Expert Mode
+    lists every ceiling and so needs a complete snapshot."""
+    if snap["complete"]:
+        return _score_envelope(snap["meas"], refs, phoneme_ipa, dialect, teacher_ref, expert)
+    if expert:
+        return None
+    out = _score_envelope(snap["meas"], refs, phoneme_ipa, dialect, teacher_ref, False)
+    return None if "error" in out else out
+
+
 def score_against_reference(
     student: dict,
     f0: Optional[float],
@@ -736,23 +1125,11 @@ def score_against_reference(
 def build_phoneme_formants_router(
     db,
     get_current_user: Callable,
-    emergent_put: Callable[[str, bytes, str], bool],
+    emergent_put: Callable[[str, bytes, str], Awaitable[bool]],
     uploads_dir,
 ) -> APIRouter:
     router = APIRouter(prefix="/phonemes", tags=["phoneme-formants"])
 
-    async def _find_reference(phoneme_ipa: str, dialect: str) -> list[dict]:
-        candidates = _EQUIV.get(phoneme_ipa, [phoneme_ipa])
-        if phoneme_ipa not in candidates:
-            candidates = [phoneme_ipa] + candidates
-        for cand in candidates:
-            rows = await db.formant_references.find(
-                {"phoneme_ipa": cand, "dialect": dialect}, {"_id": 0}
-            ).to_list(length=10)
-            if rows:
-                return rows
-        return []
-
     async def _require_audio_consent(user: dict):
         c = await db.user_consents.find_one({"user_id": user["id"]}, {"_id": 0})
         if not c or not c.get("audio_granted"):
@@ -783,269 +1160,131 @@ def build_phoneme_formants_router(
         return c
 
     # ---------------- Analyze formants ---------------- #
-    @router.post("/analyze-formants")
-    async def analyze_formants(
-        file: UploadFile = File(...),
-        phoneme_ipa: str = Form(...),
-        dialect: str = Form(...),
-        target_kind: str = Form("phoneme"),
-        reference_url: str = Form(""),
-        user: dict = Depends(get_current_user),
-    ):
+    def _check_take(take: SpooledTake, dialect: str) -> None:
         if dialect not in {"AmE", "RP"}:
             raise HTTPException(status_code=400, detail="Dialetto non valido (AmE|RP)")
-        await _require_audio_consent(user)
-
-        raw = await file.read()
-        if not raw:
+        if not take.size:
             raise HTTPException(status_code=400, detail="Audio vuoto")
-        if len(raw) > 15 * 1024 * 1024:
+        if take.too_large:
             raise HTTPException(status_code=413, detail="Audio troppo grande")
 
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tf:
-            tf.write(raw)
-            tmp_path = tf.name
-        try:
-            meas = _measure_all_ceilings(tmp_path)
-        finally:
-            try:
-                os.unlink(tmp_path)
-            except OSError:
-                pass
-        if not meas:
-            raise HTTPException(
-                status_code=422,
-                detail="Impossibile estrarre le formanti. Registra di nuovo in un ambiente silenzioso.",
-            )
-
-        f0 = meas["f0_global"]
-
-        # ---- Resolve reference + build per-formant plausibility ranges ---- #
+    async def _analyze_take(take: SpooledTake, phoneme_ipa: str, dialect: str,
+                            reference_url: str, expert: bool, user: dict) -> dict:
         # Numeric GOP scoring ALWAYS uses the Hillenbrand/Deterding dataset means
         # whenever a reference exists for this phoneme+dialect. The teacher clip
         # is the VISUAL spectrogram reference; it becomes the NUMERIC reference
         # only for phonemes absent from the dataset (diphthongs/consonants).
-        refs = await _find_reference(phoneme_ipa, dialect)
-        ref_source = None
-        ref_group = None
-        citation = ""
-        best = None
+        refs = await find_reference(db, phoneme_ipa, dialect)
         teacher_ref = None
-        ranges: dict = {}
-        group_method = None
-        groups_available: list = []
-        group_refs: dict = {}
-
-        def _range(name, ref, sd_real, source):
-            if sd_real:
-                sd_used, sd_source = round(float(sd_real), 1), source
-            else:
-                sd_used, sd_source = round(ref * SD_EST_PCT[name], 1), "estimated_pct"
-            span = PLAUSIBILITY_SD_MULT * sd_used
-            return {"ref": ref, "sd_used": sd_used, "sd_source": sd_source,
-                    "min": ref - span, "max": ref + span}
-
-        if refs:
-            # Speaker group from whole-take mean F0 with FIXED thresholds
-            # (stable across recordings): <165→men, 165-255→women, >255→children.
-            def group_distance(r):
-                # Fallback only (F0 unavailable): pick group nearest to the
-                # least-variance window of the first usable ceiling.
-                rough = next((c["windows"][0] for c in meas["ceilings"] if c["windows"]), {})
-                d, n = 0.0, 0
-                for k in ("F1", "F2", "F3"):
-                    m, s = r.get(f"{k}_mean"), rough.get(k)
-                    if m and s:
-                        d += abs(s - m) / m
-                        n += 1
-                return d / n if n else 9e9
-
-            if f0:
-                label = "men" if f0 < 165 else ("women" if f0 <= 255 else "children")
-                avail = {r["speaker_group"]: r for r in refs}
-                prefs = {
-                    "men": ["men", "male"],
-                    "women": ["women", "female"],
-                    "children": ["children", "female", "women"],
-                }[label]
-                best = next((avail[g] for g in prefs if g in avail), None) or min(refs, key=group_distance)
-                group_method = "f0_threshold"
-            else:
-                best = min(refs, key=group_distance)
-                group_method = "formant_distance"
-            ref_group = best["speaker_group"]
-            citation = best["source_citation"]
-            ref_source = "dataset"
-            groups_available = [r["speaker_group"] for r in refs]
-            group_refs = {r["speaker_group"]: {"F1": r.get("F1_mean"), "F2": r.get("F2_mean"), "F3": r.get("F3_mean")} for r in refs}
-            row_sd_source = best.get("sd_source", "estimated_pooled")
-            pooled_f1 = _pooled_f1_sd(refs) if F1_POOLED_SD else None
-            for k in ("F1", "F2", "F3"):
-                m, sd = best.get(f"{k}_mean"), best.get(f"{k}_sd")
-                if m:
-                    if k == "F1" and pooled_f1:
-                        ranges[k] = _range(k, m, pooled_f1, "intergender_pooled")
-                    else:
-                        ranges[k] = _range(k, m, sd, row_sd_source)
-            logging.info(
-                "analyze-formants: phoneme=%s dialect=%s F0=%s group=%s (via %s) ranges=%s",
-                phoneme_ipa, dialect, f0, ref_group, group_method,
-                {k: (round(v["min"]), round(v["max"])) for k, v in ranges.items()},
-            )
-        else:
+        if not refs:
             if not reference_url:
                 raise HTTPException(
                     status_code=422,
                     detail="Nessun riferimento disponibile per questo bersaglio.",
                 )
-            teacher_ref = await _fetch_and_extract(reference_url)
+            from routers.teacher_references import resolve_teacher_reference
+            teacher_ref = await resolve_teacher_reference(db, reference_url)
             if not teacher_ref:
                 raise HTTPException(
                     status_code=422,
                     detail="Impossibile analizzare l'audio di riferimento del docente.",
                 )
-            ref_source = "teacher_sample"
-            citation = "Campione di riferimento Prof. Dapper (Fase 1)"
-            for k in ("F1", "F2", "F3"):
-                m = teacher_ref.get(k)
-                if m:
-                    # A single clip has no population SD → pooled estimate only.
-                    ranges[k] = _range(k, m, None, "teacher_estimate")
-
-        if not ranges:
-            raise HTTPException(status_code=422, detail="Confronto formanti non disponibile.")
-
-        # ---- PROBLEMA B + FIX A2: plausibility + stability selection ---- #
-        sel = _select_measurement(meas["ceilings"], ranges)
-        if sel["status"] != "ok":
-            reliable = False
-            diag = _build_diagnostics(meas, ranges, sel, reliable)
-            reason = sel["status"]  # 'implausible' | 'unstable'
-            logging.warning(
-                "analyze-formants: REJECTED (%s) phoneme=%s dialect=%s user=%s expert=%s",
-                reason, phoneme_ipa, dialect, user.get("id"), diag,
-            )
-            logging.warning("analyze-formants[expert]: %s", diag)
-            raise HTTPException(
-                status_code=422,
-                detail={
-                    "message": _MSG_IMPLAUSIBLE if reason == "implausible" else _MSG_UNSTABLE,
-                    "reason": reason,
-                    "offenders": sel.get("offenders", []),
-                    "expert": diag,
-                },
-            )
 
-        win = sel["window"]
-        student = {"F1": win["F1"], "F2": win["F2"], "F3": win["F3"], "F0": f0, "reliable": True}
-        diagnostics = _build_diagnostics(meas, ranges, sel, True)
-        if ref_source == "dataset":
-            logging.info(
-                "analyze-formants: phoneme=%s dialect=%s student=%s F0=%s "
-                "selected_group=%s (via %s) groups_available=%s group_refs=%s",
-                phoneme_ipa, dialect, student, f0, ref_group, group_method,
-                groups_available, group_refs,
-            )
-        logging.info("analyze-formants[expert]: %s", diagnostics)
-
-        # ---- Score (PUNTO D gaussian curve + PUNTO E per-phoneme weights) ---- #
-        # Single source of truth: both the score and the plausibility gate read
-        # the SAME per-formant SD from ``ranges[k]["sd_used"]`` (no divergent path).
-        per_formant = []
-        dispersion_sources = set()
-        for k in ("F1", "F2", "F3"):
-            r = ranges.get(k)
-            meas_v = student.get(k)
-            if r and meas_v:
-                per_formant.append({
-                    "name": k, "measured": meas_v, "reference": r["ref"],
-                    "score": _score_gaussian(meas_v, r["ref"], r["sd_used"]),
-                    "hint": _direction_hint(k, meas_v, r["ref"]),
-                })
-                dispersion_sources.add(r["sd_source"])
-
-        if not per_formant:
-            raise HTTPException(status_code=422, detail="Confronto formanti non disponibile.")
-
-        present = {p["name"] for p in per_formant}
-        weights = _formant_weights(phoneme_ipa, present)
-        composite = _weighted_composite(per_formant, phoneme_ipa)
-        # Expose the scoring knobs in Expert Mode (PUNTO D/E): the k of the
-        # gaussian curve and the per-formant weights actually applied.
-        diagnostics["scoring_curve"] = {"model": "gaussian", "k": GAUSSIAN_K}
-        diagnostics["formant_weights"] = {p["name"]: weights.get(p["name"]) for p in per_formant}
-        diagnostics["rhotic"] = phoneme_ipa in RHOTIC_IPA
-        # Dispersion provenance for an honest, dynamic footer (PUNTO C):
-        #   'published'  → all scored formants used a real dataset SD
-        #   'estimated'  → at least one used the pooled % estimate
-        #   'teacher'    → reference is the teacher clip (single sample)
-        if ref_source == "teacher_sample":
-            dispersion_source = "teacher"
-        elif dispersion_sources and all(s in ("published",) for s in dispersion_sources if s):
-            dispersion_source = "published"
-        else:
-            dispersion_source = "estimated"
+        # Measurement + plausibility/stability selection + scoring run in the
+        # shared analysis pool (429 when saturated, 503 on timeout) — unless
+        # this exact take was measured before (content-addressed cache).
+        cache = get_measurement_cache()
+        key = take_cache_key(take)
+        snap = await cache.get(key)
+        out = score_snapshot(snap, refs, phoneme_ipa, dialect, teacher_ref, expert) if snap else None
+        if out is None:
+            out = await run_analysis(score_take_from_path, take.path, refs, phoneme_ipa,
+                                     dialect, teacher_ref, expert)
+            await cache.put(key, "take", out.pop("snapshot"))
+        if "error" in out:
+            err = out["error"]
+            if isinstance(err["detail"], dict):
+                logging.warning(
+                    "analyze-formants: REJECTED (%s) phoneme=%s dialect=%s user=%s expert=%s",
+                    err["detail"].get("reason"), phoneme_ipa, dialect, user.get("id"),
+                    err["detail"].get("expert"),
+                )
+            raise HTTPException(status_code=err["status_code"], detail=err["detail"])
 
+        res = out["result"]
         logging.info(
-            "analyze-formants: source=%s group=%s per_formant=%s composite=%s "
-            "weights=%s dispersion=%s",
-            ref_source, ref_group,
-            [(p["name"], p["measured"], p["reference"], p["score"]) for p in per_formant],
-            composite, weights, dispersion_source,
+            "analyze-formants: phoneme=%s dialect=%s student=%s source=%s group=%s "
+            "per_formant=%s composite=%s dispersion=%s",
+            phoneme_ipa, dialect, res["student_formants"], res["reference_source"],
+            res["reference_group"],
+            [(p["name"], p["measured"], p["reference"], p["score"]) for p in res["per_formant"]],
+            res["composite_score"], res["dispersion_source"],
         )
-        return {
-            "phoneme_ipa": phoneme_ipa,
-            "dialect": dialect,
-            "student_formants": student,
-            "reference_source": ref_source,
-            "reference_group": ref_group,
-            "citation": citation,
-            "dispersion_source": dispersion_source,
-            "per_formant": per_formant,
-            "composite_score": composite,
-            "cefr": _cefr_band(composite),
-            "high_impact": phoneme_ipa in HIGH_IMPACT_IPA,
-            "diagnostics": diagnostics,
-            "analyzed_at": datetime.now(timezone.utc).isoformat(),
-        }
+        logging.info("analyze-formants[expert]: %s", res["diagnostics"])
+        return res
 
-    async def _fetch_and_extract(url: str) -> Optional[dict]:
-        # Relative URLs (e.g. per-word clips stored as ``/api/uploads/...``)
-        # are resolved against the backend's own internal origin so the fetch
-        # works identically in Preview and Production, regardless of the
-        # public domain configured in FRONTEND_URL.
-        full = f"http://localhost:8001{url}" if url.startswith("/") else url
-        try:
-            async with httpx.AsyncClient(follow_redirects=True, timeout=20) as client:
-                resp = await client.get(full)
-                resp.raise_for_status()
-                data = resp.content
-        except Exception:  # noqa: BLE001
-            return None
-        if not data:
-            return None
-        is_mp3 = full.lower().split("?")[0].endswith(".mp3")
-        src_ext = ".mp3" if is_mp3 else ".wav"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=src_ext) as tf:
-            tf.write(data)
-            src_path = tf.name
-        wav_path = None
+    @router.post("/analyze-formants")
+    async def analyze_formants(
+        file: UploadFile = File(...),
+        phoneme_ipa: str = Form(...),
+        dialect: str = Form(...),
+        target_kind: str = Form("phoneme"),
+        reference_url: str = Form(""),
+        expert: bool = Form(False),
+        user: dict = Depends(get_current_user),
+    ):
+        if dialect not in {"AmE", "RP"}:
+            raise HTTPException(status_code=400, detail="Dialetto non valido (AmE|RP)")
+        await _require_audio_consent(user)
+        with await spool_upload(file, MAX_TAKE_BYTES) as take:
+            _check_take(take, dialect)
+            return await _analyze_take(take, phoneme_ipa, dialect, reference_url, expert, user)
+
+    @router.post("/analyze-formants/batch")
+    async def analyze_formants_batch(
+        files: list[UploadFile] = File(...),
+        takes: str = Form(...),
+        user: dict = Depends(get_current_user),
+    ):
+        """Several takes in one request (multi-take / multi-phoneme practice).
+        ``takes`` is a JSON array, one object per file in the same order, with
+        the ``/analyze-formants`` form fields (``phoneme_ipa`` required;
+        ``dialect``, ``target_kind``, ``reference_url``, ``expert``).
+
+        Takes are independent, so they are analysed concurrently — at most one
+        job per pool worker at a time (``batch_slots``). Each entry of ``results`` is ``{index, ok, result}``
+        or ``{index, ok: false, status_code, detail}`` — a rejected take (422,
+        429, …) never fails the batch."""
+        await _require_audio_consent(user)
+        specs = parse_batch_takes(takes, len(files), {
+            "dialect": "", "target_kind": "phoneme", "reference_url": "", "expert": False})
+
+        async def _one(i: int, take: SpooledTake) -> dict:
+            spec = specs[i]
+            try:
+                _check_take(take, spec["dialect"])
+                res = await _analyze_take(take, spec["phoneme_ipa"], spec["dialect"],
+                                          spec["reference_url"], bool(spec["expert"]), user)
+                return {"index": i, "ok": True, "result": res}
+            except HTTPException as exc:
+                return {"index": i, "ok": False,
+                        "status_code": exc.status_code, "detail": exc.detail}
+            except Exception:  # noqa: BLE001
+                logging.exception("analyze-formants/batch: take %s failed", i)
+                return {"index": i, "ok": False, "status_code": 500, "detail": "Errore di analisi"}
+
+        spooled = []
         try:
-            if is_mp3:
-                try:
-                    snd = parselmouth.Sound(src_path)
-                    wav_path = src_path + ".wav"
-                    snd.save(wav_path, parselmouth.SoundFileFormat.WAV)
-                    return _extract_formants(wav_path)
-                except Exception:  # noqa: BLE001
-                    return _extract_formants(src_path)
-            return _extract_formants(src_path)
+            for f in files:
+                spooled.append(await spool_upload(f, MAX_TAKE_BYTES))
+            with batch_slots():
+                results = await asyncio.gather(*(_one(i, t) for i, t in enumerate(spooled)))
         finally:
-            for p in (src_path, wav_path):
-                if p:
-                    try:
-                        os.unlink(p)
-                    except OSError:
-                        pass
+            for t in spooled:
+                t.close()
+        failed = sum(1 for r in results if not r["ok"])
+        logging.info("analyze-formants/batch: user=%s takes=%s failed=%s",
+                     user.get("id"), len(results), failed)
+        return {"results": results, "count": len(results), "failed": failed}
 
     return router
@@ -11,6 +11,17 @@ Data sources:
     ARPAbet transcriptions (GenAm reference).
   • wordfreq (Zipf frequency, English corpus) → global usage rank.
 
+Both are compiled once into an on-disk inverted index (``LexiconIndex``,
+see ``build_lexicon_index`` / ``scripts/build_lexicon_index.py``) that is
+memory-mapped on first use: lexicon generation is a top-K slice of the
+phone's posting list instead of a full-dictionary scan. The scan remains
+as the fallback when the index cannot be built, and answers while it is
+not ready: the build takes seconds, so it never runs on the request path
+(``lexicon_index``) — only in the startup warm-up thread
+(``schedule_lexicon_warmup``, LEXICON_WARMUP=0 disables) or in a background
+thread started by the first lookup that finds it missing. Load time and
+process RSS are recorded (``lexicon_status``).
+
 Guarantees:
   • Fully deterministic — same IPA input yields identical output.
   • No LLM claims — every word is grounded in cmudict.
@@ -23,7 +34,20 @@ Reference spec: `/app/backend/canonical_data/HotspotRule_v1.md` §3.2/§3.3
 
 from __future__ import annotations
 from typing import Any, Callable, Dict, List, Optional, Tuple
+import asyncio
+import importlib.metadata
+import json
+import logging
+import os
 import re
+import shutil
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
 
 
 # =========================================================================
@@ -268,6 +292,355 @@ def _extract_matching_words(target_arpa: str, max_words: int = 30,
     return out
 
 
+# =========================================================================
+# Precompiled inverted index (CMUdict × wordfreq)
+# =========================================================================
+# Word ids are assigned in (-zipf, word) order — the order the scan sorts
+# its matches in — so every posting list (the sorted ids of the words whose
+# first pronunciation contains a phone, stress digit included) is already
+# ranked, and the top-K words for a set of phones are the K smallest ids of
+# the union of the lists' heads. Files (under LEXICON_INDEX_DIR, default
+# ``backend/data/lexicon_index``):
+#   manifest.json            versions, phone table, posting ranges
+#   words.bin / ipa.bin      UTF-8 blobs (IPA precomputed, no slashes)
+#   *_offsets.npy            uint32 blob offsets per word id
+#   zipf.npy                 uint16 centi-Zipf per id (wordfreq quantises
+#                            to 1/100, so this is exact)
+#   phones.npy / phone_offsets.npy   first pronunciation, as phone codes
+#   alpha.npy                ids in alphabetical order (word → id lookup)
+#   postings.npy             concatenated posting lists (blocklist excluded)
+# The manifest records the cmudict / wordfreq versions it was built from; a
+# mismatch triggers a rebuild on next use.
+_INDEX_FORMAT = 1
+_INDEX_DIR = os.environ.get(
+    "LEXICON_INDEX_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "lexicon_index"),
+)
+
+
+def _source_versions() -> Dict[str, str]:
+    out = {}
+    for pkg in ("cmudict", "wordfreq"):
+        try:
+            out[pkg] = importlib.metadata.version(pkg)
+        except importlib.metadata.PackageNotFoundError:
+            out[pkg] = "unknown"
+    return out
+
+
+def _write_blob(dest: str, name: str, strings: List[str]) -> None:
+    encoded = [s.encode("utf-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.uint32)
+    offsets[1:] = np.cumsum([len(b) for b in encoded])
+    with open(os.path.join(dest, f"{name}.bin"), "wb") as fh:
+        fh.write(b"".join(encoded))
+    np.save(os.path.join(dest, f"{name}_offsets.npy"), offsets)
+
+
+def build_lexicon_index(dest: str = _INDEX_DIR) -> Dict[str, Any]:
+    """Compile CMUdict + wordfreq into the on-disk index at ``dest``
+    (replaced atomically). Returns the manifest."""
+    cmu = _get_cmudict()
+    wf = _get_wordfreq()
+    rows = []
+    for word, prons in cmu.items():
+        if not word or not prons or not _WORD_RE.match(word):
+            continue
+        rows.append((int(round(wf.zipf_frequency(word, "en") * 100)), word, prons[0]))
+    rows.sort(key=lambda r: (-r[0], r[1]))
+
+    phone_table = sorted({p for _, _, pron in rows for p in pron})
+    code = {p: i for i, p in enumerate(phone_table)}
+    postings: Dict[str, List[int]] = {p: [] for p in phone_table}
+    phones: List[int] = []
+    phone_offsets = [0]
+    for wid, (_, word, pron) in enumerate(rows):
+        phones.extend(code[p] for p in pron)
+        phone_offsets.append(len(phones))
+        if word in _BLOCKLIST:
+            continue
+        for p in dict.fromkeys(pron):
+            postings[p].append(wid)
+
+    parent = os.path.dirname(os.path.abspath(dest))
+    os.makedirs(parent, exist_ok=True)
+    tmp = tempfile.mkdtemp(prefix=".lexicon-index-", dir=parent)
+    try:
+        os.chmod(tmp, 0o755)
+        words = [r[1] for r in rows]
+        _write_blob(tmp, "words", words)
+        _write_blob(tmp, "ipa", [_arpabet_pron_to_ipa(r[2]).strip("/") for r in rows])
+        np.save(os.path.join(tmp, "zipf.npy"), np.array([r[0] for r in rows], dtype=np.uint16))
+        np.save(os.path.join(tmp, "phones.npy"), np.array(phones, dtype=np.uint8))
+        np.save(os.path.join(tmp, "phone_offsets.npy"), np.array(phone_offsets, dtype=np.uint32))
+        np.save(os.path.join(tmp, "alpha.npy"),
+                np.array(sorted(range(len(words)), key=words.__getitem__), dtype=np.int32))
+        ranges, flat = {}, []
+        for p in phone_table:
+            ranges[p] = [len(flat), len(flat) + len(postings[p])]
+            flat.extend(postings[p])
+        np.save(os.path.join(tmp, "postings.npy"), np.array(flat, dtype=np.int32))
+        manifest = {"format": _INDEX_FORMAT, "sources": _source_versions(),
+                    "words": len(rows), "phones": phone_table, "postings": ranges}
+        with open(os.path.join(tmp, "manifest.json"), "w") as fh:
+            json.dump(manifest, fh)
+        old = None
+        if os.path.exists(dest):
+            old = tempfile.mkdtemp(prefix=".lexicon-index-old-", dir=parent)
+            os.replace(dest, os.path.join(old, "index"))
+        os.replace(tmp, dest)
+        if old:
+            shutil.rmtree(old, ignore_errors=True)
+        return manifest
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+
+
+class LexiconIndex:
+    """Read-only view over a built index directory (arrays memory-mapped)."""
+
+    def __init__(self, path: str):
+        with open(os.path.join(path, "manifest.json")) as fh:
+            self.manifest = json.load(fh)
+        self.path = path
+
+        def arr(name):
+            return np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r")
+
+        def blob(name):
+            size = os.path.getsize(os.path.join(path, f"{name}.bin"))
+            if not size:
+                return np.zeros(0, dtype=np.uint8)
+            return np.memmap(os.path.join(path, f"{name}.bin"), dtype=np.uint8, mode="r")
+
+        self._words, self._word_off = blob("words"), arr("words_offsets")
+        self._ipa, self._ipa_off = blob("ipa"), arr("ipa_offsets")
+        self.zipf = arr("zipf")
+        self._phones, self._phone_off = arr("phones"), arr("phone_offsets")
+        self._alpha = arr("alpha")
+        self._postings = arr("postings")
+        self.phone_table: List[str] = self.manifest["phones"]
+        self._ranges: Dict[str, List[int]] = self.manifest["postings"]
+
+    def __len__(self) -> int:
+        return int(self.manifest["words"])
+
+    @staticmethod
+    def _text(blob, offsets, wid: int) -> str:
+        return bytes(blob[int(offsets[wid]):int(offsets[wid + 1])]).decode("utf-8")
+
+    def word(self, wid: int) -> str:
+        return self._text(self._words, self._word_off, wid)
+
+    def ipa(self, wid: int) -> str:
+        return self._text(self._ipa, self._ipa_off, wid)
+
+    def phones(self, wid: int) -> List[str]:
+        codes = self._phones[int(self._phone_off[wid]):int(self._phone_off[wid + 1])]
+        return [self.phone_table[c] for c in codes]
+
+    def lookup(self, word: str) -> Optional[int]:
+        """Word id by binary search over the alphabetical permutation."""
+        lo, hi = 0, len(self._alpha)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.word(int(self._alpha[mid])) < word:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self._alpha):
+            wid = int(self._alpha[lo])
+            if self.word(wid) == word:
+                return wid
+        return None
+
+    def posting(self, phone: str) -> np.ndarray:
+        start, end = self._ranges.get(phone, (0, 0))
+        return self._postings[start:end]
+
+    def top_words(self, phones: List[str], k: int, min_centizipf: int) -> List[int]:
+        """The ``k`` best-ranked ids containing any of ``phones`` with a
+        centi-Zipf of at least ``min_centizipf``."""
+        heads = [self.posting(p)[:k] for p in phones]
+        if not heads:
+            return []
+        ids = np.unique(np.concatenate(heads))[:k]
+        return [int(i) for i in ids if self.zipf[i] >= min_centizipf]
+
+
+_index: Optional[LexiconIndex] = None
+_index_failed = False
+_index_lock = threading.Lock()
+_status: Dict[str, Any] = {"state": "cold"}
+
+
+def _open_existing() -> bool:
+    """Open the on-disk index if it is fresh. False when it is missing or
+    stale (needs a build); a corrupt index marks the scan fallback."""
+    global _index, _index_failed
+    t0 = time.perf_counter()
+    try:
+        if not os.path.exists(os.path.join(_INDEX_DIR, "manifest.json")):
+            return False
+        idx = LexiconIndex(_INDEX_DIR)
+        if (idx.manifest.get("format") != _INDEX_FORMAT
+                or idx.manifest.get("sources") != _source_versions()):
+            return False
+    except Exception:  # noqa: BLE001
+        logger.exception("lexicon index unreadable — falling back to the CMUdict scan")
+        _index_failed = True
+        _status.update(state="scan")
+        return True
+    _index = idx
+    _status.update(state="index", path=idx.path, words=len(idx), built=False,
+                   open_ms=round((time.perf_counter() - t0) * 1000, 1))
+    return True
+
+
+def _build_and_open() -> None:
+    global _index, _index_failed
+    t0 = time.perf_counter()
+    logger.warning("lexicon index missing or stale at %s — building", _INDEX_DIR)
+    _status.update(state="building")
+    try:
+        build_lexicon_index(_INDEX_DIR)
+        idx = LexiconIndex(_INDEX_DIR)
+    except Exception:  # noqa: BLE001
+        logger.exception("lexicon index unavailable — falling back to the CMUdict scan")
+        _index_failed = True
+        _status.update(state="scan")
+        return
+    _index = idx
+    _status.update(state="index", path=idx.path, words=len(idx), built=True,
+                   open_ms=round((time.perf_counter() - t0) * 1000, 1))
+
+
+def load_lexicon_index() -> Optional[LexiconIndex]:
+    """Open the index, building (or rebuilding) it first when missing or
+    stale — seconds of work, so only for the warm-up / background build
+    threads and scripts. None when it cannot be built."""
+    with _index_lock:
+        if _index is None and not _index_failed and not _open_existing():
+            _build_and_open()
+    return _index
+
+
+_build_thread: Optional[threading.Thread] = None
+
+
+def _build_in_background() -> None:
+    global _build_thread
+    if _build_thread is None or not _build_thread.is_alive():
+        _status.update(state="building")
+        _build_thread = threading.Thread(target=load_lexicon_index,
+                                         name="lexicon-index-build", daemon=True)
+        _build_thread.start()
+
+
+def lexicon_index() -> Optional[LexiconIndex]:
+    """The process-wide index for the request path (``word_to_ipa`` & co. run
+    on the event loop): never builds and never waits. A fresh index on disk
+    is opened on first use; while it is being opened or built elsewhere, or
+    is missing/stale (a build is then started in a background thread), the
+    result is None and callers scan."""
+    if _index is not None or _index_failed:
+        return _index
+    if not _index_lock.acquire(blocking=False):
+        return None
+    try:
+        if _index is None and not _index_failed and not _open_existing():
+            _build_in_background()
+    finally:
+        _index_lock.release()
+    return _index
+
+
+def _rss_bytes() -> int:
+    """Current resident set size (Linux ``/proc``; peak RSS elsewhere)."""
+    try:
+        with open("/proc/self/statm") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def warm_lexicon() -> Dict[str, Any]:
+    """Open (or build) the index and answer one query so the first admin
+    request doesn't pay for it. Records RSS before/after in the status."""
+    before = _rss_bytes()
+    t0 = time.perf_counter()
+    load_lexicon_index()
+    generate_lexicon_for_canonical("ʊ")
+    _status.update(
+        warm_ms=round((time.perf_counter() - t0) * 1000, 1),
+        rss_before_mb=round(before / 2**20, 1),
+        rss_after_mb=round(_rss_bytes() / 2**20, 1),
+    )
+    return lexicon_status()
+
+
+def lexicon_status() -> Dict[str, Any]:
+    """State of the lexicon subsystem: ``cold`` (nothing loaded yet),
+    ``building``, ``index`` or ``scan`` (fallback), plus load timings and
+    RSS."""
+    out = dict(_status)
+    if _cmudict_cache is not None:
+        out["cmudict_loaded"] = True
+    out["rss_mb"] = round(_rss_bytes() / 2**20, 1)
+    return out
+
+
+_pending: set = set()
+
+
+def schedule_lexicon_warmup() -> bool:
+    """Run ``warm_lexicon`` in a worker thread from the startup hook, unless
+    LEXICON_WARMUP=0. Returns whether a warm-up was scheduled."""
+    if os.environ.get("LEXICON_WARMUP", "1") == "0":
+        return False
+
+    async def _run():
+        try:
+            st = await asyncio.to_thread(warm_lexicon)
+            logger.info("lexicon warm: state=%s open_ms=%s warm_ms=%s built=%s rss %s → %s MB",
+                        st.get("state"), st.get("open_ms"), st.get("warm_ms"), st.get("built"),
+                        st.get("rss_before_mb"), st.get("rss_after_mb"))
+        except Exception:  # noqa: BLE001
+            logger.exception("lexicon warm-up failed (loads on first use)")
+
+    task = asyncio.get_running_loop().create_task(_run())
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+    return True
+
+
+def _stress_ok(phone: str, stress_pred: Optional[Callable[[str], bool]]) -> bool:
+    if stress_pred is None:
+        return True
+    return stress_pred(phone[-1] if phone and phone[-1].isdigit() else "")
+
+
+def _indexed_matching_words(idx: LexiconIndex, target_arpa: str, max_words: int = 30,
+                            min_zipf: float = 2.5,
+                            target_ipa: str = "") -> List[Dict[str, str]]:
+    """``_extract_matching_words`` answered from the index."""
+    stress_pred = _STRESS_FILTER.get(target_ipa)
+    phones = [p for p in idx.phone_table
+              if _strip_stress(p) == target_arpa and _stress_ok(p, stress_pred)]
+    out: List[Dict[str, str]] = []
+    for wid in idx.top_words(phones, max_words, int(round(min_zipf * 100))):
+        out.append({
+            "w":         idx.word(wid),
+            "ipa":       "/" + idx.ipa(wid) + "/",
+            "audioAmE":  "",
+            "audioRP":   "",
+            "zipf":      int(idx.zipf[wid]) / 100,
+        })
+    return out
+
+
 # =========================================================================
 # Spelling distribution (§3.3)
 # =========================================================================
@@ -401,6 +774,10 @@ def word_to_ipa(word: str) -> Optional[str]:
         # Skip contractions, digits, hyphens — CMUdict entries are
         # single alphabetic tokens.
         return None
+    idx = lexicon_index()
+    if idx is not None:
+        wid = idx.lookup(key)
+        return idx.ipa(wid) if wid is not None else None
     cmu = _get_cmudict()
     prons = cmu.get(key)
     if not prons:
@@ -424,11 +801,17 @@ def word_contains_phoneme(word: str, target_ipa: str) -> bool:
     key = word.strip().lower()
     if not _WORD_RE.match(key):
         return False
-    cmu = _get_cmudict()
-    prons = cmu.get(key)
-    if not prons:
-        return False
-    pron = prons[0]
+    idx = lexicon_index()
+    if idx is not None:
+        wid = idx.lookup(key)
+        if wid is None:
+            return False
+        pron = idx.phones(wid)
+    else:
+        prons = _get_cmudict().get(key)
+        if not prons:
+            return False
+        pron = prons[0]
     stress_pred = _STRESS_FILTER.get(target_ipa)
     for p in pron:
         base = _strip_stress(p)
@@ -465,6 +848,10 @@ def generate_lexicon_for_canonical(target_ipa: str,
     if not arpa:
         return {"commonWords": [], "spellings": []}
 
-    words = _extract_matching_words(arpa, max_words=max_words, target_ipa=target_ipa)
+    idx = lexicon_index()
+    if idx is not None:
+        words = _indexed_matching_words(idx, arpa, max_words=max_words, target_ipa=target_ipa)
+    else:
+        words = _extract_matching_words(arpa, max_words=max_words, target_ipa=target_ipa)
     spellings = _compute_spelling_distribution(target_ipa, words)
     return {"commonWords": words, "spellings": spellings}
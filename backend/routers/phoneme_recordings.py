@@ -16,10 +16,13 @@ import os
 import re
 import uuid
 from datetime import datetime, timezone
-from typing import Callable, Optional
+from typing import Awaitable, Callable, Optional
 
 from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 
+from routers.audio_ingest import spool_upload
+from utils.storage_ledger import record_put
+
 _ALLOWED_EXT = {"webm", "ogg", "m4a", "mp4", "wav", "mp3"}
 _CONTENT_TYPES = {
     "webm": "audio/webm",
@@ -35,7 +38,7 @@ _MAX_BYTES = 15 * 1024 * 1024  # 15 MB — a short spoken clip is well under thi
 def build_phoneme_recordings_router(
     db,
     get_current_user: Callable,
-    emergent_put: Callable[[str, bytes, str], bool],
+    emergent_put: Callable[[str, bytes, str], Awaitable[bool]],
     uploads_dir,
 ) -> APIRouter:
     router = APIRouter(prefix="/phonemes", tags=["phoneme-recordings"])
@@ -78,12 +81,6 @@ def build_phoneme_recordings_router(
         if not consent or not consent.get("audio_granted"):
             raise HTTPException(status_code=403, detail="Consenso audio mancante.")
 
-        raw = await file.read()
-        if not raw:
-            raise HTTPException(status_code=400, detail="Registrazione vuota")
-        if len(raw) > _MAX_BYTES:
-            raise HTTPException(status_code=413, detail="Registrazione troppo grande (max 15 MB)")
-
         orig = file.filename or "rec.webm"
         ext = orig.rsplit(".", 1)[-1].lower() if "." in orig else "webm"
         if ext not in _ALLOWED_EXT:
@@ -96,11 +93,20 @@ def build_phoneme_recordings_router(
         ts = int(datetime.now(timezone.utc).timestamp())
         filename = f"recordings/{safe_student}/{card_id}_{ts}_{uuid.uuid4().hex[:8]}.{ext}"
 
-        ok = emergent_put(filename, raw, content_type)
-        if not ok:
-            local_path = uploads_dir / filename
-            local_path.parent.mkdir(parents=True, exist_ok=True)
-            local_path.write_bytes(raw)
+        # Spooled in chunks: an oversized upload is refused without ever being
+        # held in memory, and the local fallback moves the file into place.
+        with await spool_upload(file, _MAX_BYTES, suffix=f".{ext}") as take:
+            if not take.size:
+                raise HTTPException(status_code=400, detail="Registrazione vuota")
+            if take.too_large:
+                raise HTTPException(status_code=413, detail="Registrazione troppo grande (max 15 MB)")
+            size_bytes = take.size
+            ok = await emergent_put(filename, take.read_bytes(), content_type)
+            if not ok:
+                local_path = uploads_dir / filename
+                local_path.parent.mkdir(parents=True, exist_ok=True)
+                take.move_to(local_path)
+                await record_put(filename, size_bytes)
 
         doc = {
             "id": str(uuid.uuid4()),
@@ -114,7 +120,7 @@ def build_phoneme_recordings_router(
             "audio_url": f"/api/uploads/{filename}",
             "filename": filename,
             "content_type": content_type,
-            "size_bytes": len(raw),
+            "size_bytes": size_bytes,
             "created_at": datetime.now(timezone.utc).isoformat(),
         }
         await db.phoneme_recordings.insert_one(doc)
@@ -16,8 +16,9 @@ Endpoints:
   - ``POST   /members/popups/{id}/dismiss``   — dismiss (don't show again)
 
 The upload endpoint uses the same storage helpers as ``routers/uploads.py``
-(get_total_storage_used, auto_generate_thumbnail, …) — imported directly
-from ``utils.storage`` so this router stays self-contained.
+— size limits from ``utils.storage``, the quota from the storage ledger
+(``utils.storage_ledger``) — and renders its thumbnail through
+``routers.thumbnail_jobs``.
 """
 
 from __future__ import annotations
@@ -27,7 +28,7 @@ import shutil
 import uuid
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Awaitable, Callable, List, Optional
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from pydantic import BaseModel, ConfigDict
@@ -36,10 +37,10 @@ from utils.storage import (
     UPLOAD_MAX_FILE_SIZE,
     UPLOAD_MAX_TOTAL_STORAGE,
     UPLOADS_DIR,
-    auto_generate_thumbnail,
     format_size,
-    get_total_storage_used,
 )
+from utils.storage_ledger import record_put, used_bytes
+from routers.thumbnail_jobs import render_thumbnail
 
 
 # --------------------------------------------------------------------------- #
@@ -79,7 +80,7 @@ def build_popups_router(
     db,
     get_admin_user: Callable,
     get_current_user: Callable,
-    emergent_put: Callable[[str, bytes, str], bool],
+    emergent_put: Callable[[str, bytes, str], Awaitable[bool]],
     guess_mime: Callable[[str], str],
 ) -> APIRouter:
     router = APIRouter()
@@ -186,7 +187,7 @@ def build_popups_router(
                 detail=f"Tipo file non supportato. Estensioni permesse: {', '.join(allowed)}",
             )
 
-        current_storage = get_total_storage_used()
+        current_storage = await used_bytes()
         if current_storage >= UPLOAD_MAX_TOTAL_STORAGE:
             raise HTTPException(status_code=400, detail="Spazio di archiviazione esaurito.")
 
@@ -212,17 +213,18 @@ def build_popups_router(
             )
 
         file_url = f"/api/uploads/{safe_filename}"
+        await record_put(safe_filename, file_size)
         audio_exts = [".mp3", ".wav", ".ogg", ".m4a", ".aac"]
         file_type = "audio" if file_ext in audio_exts else "video"
 
         # Persist to Emergent Object Storage (survives container restarts)
         try:
             with open(file_path, "rb") as fh:
-                emergent_put(safe_filename, fh.read(), guess_mime(safe_filename))
+                await emergent_put(safe_filename, fh.read(), guess_mime(safe_filename))
         except Exception as e:
             logging.warning(f"Emergent storage put failed for {safe_filename}: {e}")
 
-        thumbnail_url = auto_generate_thumbnail(file_path, content_type=file_type) or ""
+        thumbnail_url = await render_thumbnail(file_path, content_type=file_type) or ""
 
         return {
             "success":             True,
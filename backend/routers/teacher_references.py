@@ -0,0 +1,313 @@
+"""
+Precomputed teacher-reference formants (``teacher_reference_formants``).
+
+For phonemes without a dataset row (diphthongs, dialectal consonants) the
+numeric reference is the teacher's clip. Extracting it per request meant an
+HTTP loopback download, an MP3→WAV transcode and a multi-ceiling Praat run
+inside the student's request. Instead, every clip URL written onto a phoneme
+card is indexed once, off the request path:
+
+* ``admin_patch_audio_url`` / ``admin_batch_audio`` (phoneme cards) and the
+  Level Test word-example writers call ``schedule_reference_index`` — a
+  fire-and-forget task that measures the new clips in the analysis pool;
+* ``scripts/backfill_teacher_references.py`` indexes every existing card.
+
+One document per normalised URL: ``{url, content_hash, params, ref, status,
+indexed_at}``. ``content_hash`` (BLAKE2b of the clip bytes) makes re-indexing
+idempotent — unchanged bytes are never re-measured — and ``params`` (the
+measurement parameters) makes a stale row a miss once the analysis changes.
+
+Hot path (``resolve_teacher_reference``): one indexed ``find_one`` on
+``{url, params, content_hash}``. For a clip in the local uploads dir the
+current hash comes from a stat-keyed memo, so a clip replaced under the same
+URL is a miss, not a stale hit. A miss never measures inline: if the URL is
+a reference clip of some card, the row is marked ``pending``, indexing is
+scheduled and the request gets a 503 with ``Retry-After``; any other URL is
+answered like an unmeasurable clip (422 from the caller), never fetched.
+A clip that can't be read (dead host, 404, missing local file) gets a
+terminal ``unreachable`` row — also a 422 — re-checked in the background at
+most every ``_UNREACHABLE_RECHECK_S``. Indexing jobs rejected by a saturated
+pool are retried with back-off; one that still fails leaves the row
+``pending`` and the next miss schedules it again.
+"""
+from __future__ import annotations
+
+import os
+import asyncio
+import logging
+import contextlib
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable, Optional
+from urllib.parse import urlparse
+
+from fastapi import HTTPException
+
+from routers.audio_ingest import content_digest
+from routers.phoneme_formants import (
+    _measurement_params,
+    download_clip,
+    extract_reference_bytes,
+    is_mp3_url,
+)
+
+logger = logging.getLogger(__name__)
+
+_COLLECTION = "teacher_reference_formants"
+_UPLOADS_DIR = Path(__file__).parent.parent / "uploads"
+_UPLOADS_PREFIX = "/api/uploads/"
+_MEASURED = ("indexed", "unmeasurable")
+# Attempts per clip when the analysis pool rejects the job (429), and the
+# base back-off between them (doubles per attempt).
+_INDEX_ATTEMPTS = 5
+_INDEX_BACKOFF_S = 2.0
+# Minimum age of an ``unreachable`` row before a scoring request re-checks it.
+_UNREACHABLE_RECHECK_S = 600
+# Card fields holding reference clips — the ones ``card_reference_urls`` reads.
+_CARD_URL_FIELDS = (
+    "audio.AmE.isolated", "audio.RP.isolated",
+    "audio.AmE.wordExample.url", "audio.RP.wordExample.url",
+    "commonWords.audioAmE", "commonWords.audioRP",
+)
+_MSG_PENDING = "Riferimento del docente in preparazione. Riprova tra qualche secondo."
+# Background indexing tasks — held so they aren't garbage-collected mid-run.
+_pending: set = set()
+# Normalised URLs with an indexing task scheduled or running — an index miss
+# on one of them does not schedule another.
+_scheduled: set = set()
+# path → (mtime_ns, size, content_hash) of local clips.
+_digests: dict = {}
+
+
+def normalise_audio_url(url: str) -> str:
+    """Index key for a clip URL: absolute ``…/api/uploads/x`` URLs (public
+    domain via FRONTEND_URL) and their relative form map to the same key."""
+    url = (url or "").strip()
+    path = urlparse(url).path
+    if path.startswith(_UPLOADS_PREFIX):
+        return path
+    return url
+
+
+def card_reference_urls(card: dict) -> list[str]:
+    """Clip URLs on a card that can become a scoring reference: the isolated
+    phoneme, the common-word clips (per dialect) and the Level Test word
+    example. Examples and the mnemonic are demonstrations, never references."""
+    urls = []
+    for d in ("AmE", "RP"):
+        entry = (card.get("audio") or {}).get(d) or {}
+        urls.append(entry.get("isolated"))
+        urls.append((entry.get("wordExample") or {}).get("url"))
+    for w in card.get("commonWords") or []:
+        if isinstance(w, dict):
+            urls.extend((w.get("audioAmE"), w.get("audioRP")))
+    seen, out = set(), []
+    for u in urls:
+        if u and isinstance(u, str) and normalise_audio_url(u) not in seen:
+            seen.add(normalise_audio_url(u))
+            out.append(u)
+    return out
+
+
+def _local_clip(url: str) -> Optional[Path]:
+    """The file ``/api/uploads`` would serve for ``url``, if it is local."""
+    key = normalise_audio_url(url)
+    if key.startswith(_UPLOADS_PREFIX):
+        rel = key[len(_UPLOADS_PREFIX):]
+        local = _UPLOADS_DIR / rel
+        if ".." not in rel and local.is_file():
+            return local
+    return None
+
+
+async def _read_clip(url: str) -> Optional[bytes]:
+    """Clip bytes — straight from the local uploads dir when present (the same
+    file ``/api/uploads`` would serve), else over HTTP."""
+    local = _local_clip(url)
+    if local is not None:
+        return await asyncio.to_thread(local.read_bytes)
+    return await download_clip(url)
+
+
+def _local_digest(path: Path) -> Optional[str]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    memo = _digests.get(str(path))
+    if memo and memo[:2] == (st.st_mtime_ns, st.st_size):
+        return memo[2]
+    try:
+        digest = content_digest(path.read_bytes())
+    except OSError:
+        return None
+    _digests[str(path)] = (st.st_mtime_ns, st.st_size, digest)
+    return digest
+
+
+async def current_content_hash(url: str) -> Optional[str]:
+    """Hash of the clip ``url`` serves now — re-read only when the local
+    file's mtime/size changed. ``None`` for clips that are not local (object
+    storage / external): those are trusted to the hash recorded when the
+    writer re-indexed them."""
+    local = _local_clip(url)
+    if local is None:
+        return None
+    return await asyncio.to_thread(_local_digest, local)
+
+
+async def index_reference_clip(db, url: str, data: Optional[bytes] = None,
+                               force: bool = False) -> dict:
+    """Measure one clip and upsert its index row. Returns ``{url, status,
+    ref}`` with status ``indexed`` | ``unchanged`` | ``unmeasurable`` |
+    ``unreachable``."""
+    key = normalise_audio_url(url)
+    if data is None:
+        data = await _read_clip(url)
+    if not data:
+        await db[_COLLECTION].update_one(
+            {"url": key},
+            {"$set": {"url": key, "status": "unreachable", "ref": None,
+                      "checked_at": datetime.now(timezone.utc).isoformat()}},
+            upsert=True,
+        )
+        return {"url": key, "status": "unreachable", "ref": None}
+    content_hash = content_digest(data)
+    params = _measurement_params()
+    if not force:
+        doc = await db[_COLLECTION].find_one(
+            {"url": key, "content_hash": content_hash, "params": params,
+             "status": {"$in": list(_MEASURED)}}, {"_id": 0, "ref": 1})
+        if doc:
+            return {"url": key, "status": "unchanged", "ref": doc.get("ref")}
+    ref = await extract_reference_bytes(data, is_mp3_url(key))
+    status = "indexed" if ref else "unmeasurable"
+    await db[_COLLECTION].update_one(
+        {"url": key},
+        {"$set": {"url": key, "content_hash": content_hash, "params": params,
+                  "ref": ref, "status": status,
+                  "indexed_at": datetime.now(timezone.utc).isoformat()}},
+        upsert=True,
+    )
+    return {"url": key, "status": status, "ref": ref}
+
+
+async def _index_row(db, url: str) -> Optional[dict]:
+    """The index row answering for the clip's current bytes: measured with the
+    current parameters, or ``unreachable`` — unless the clip is now a local
+    file, which a later indexing run can read."""
+    measured = {"params": _measurement_params(), "status": {"$in": list(_MEASURED)}}
+    content_hash = await current_content_hash(url)
+    if content_hash is not None:
+        query = {"url": normalise_audio_url(url), "content_hash": content_hash, **measured}
+    else:
+        query = {"url": normalise_audio_url(url), "$or": [measured, {"status": "unreachable"}]}
+    return await db[_COLLECTION].find_one(query, {"_id": 0, "ref": 1, "status": 1, "checked_at": 1})
+
+
+async def lookup_teacher_reference(db, url: str) -> tuple[bool, Optional[dict]]:
+    """``(found, ref)`` from the index for the clip's current bytes; ``ref``
+    is None for a clip that was indexed but could not be measured or read."""
+    doc = await _index_row(db, url)
+    return (doc is not None, (doc or {}).get("ref"))
+
+
+async def is_card_reference(db, url: str) -> bool:
+    """Whether ``url`` is a reference clip of some phoneme card (in any of the
+    forms a card stores an upload URL: relative, absolute on FRONTEND_URL, or
+    as sent). Only those are ever fetched and indexed for a scoring request."""
+    key = normalise_audio_url(url)
+    forms = {url, key}
+    base = os.environ.get("FRONTEND_URL", "").rstrip("/")
+    if base and key.startswith(_UPLOADS_PREFIX):
+        forms.add(base + key)
+    doc = await db.phoneme_cards.find_one(
+        {"$or": [{field: {"$in": sorted(forms)}} for field in _CARD_URL_FIELDS]},
+        {"_id": 0, "id": 1})
+    return doc is not None
+
+
+def _recheck_due(doc: dict) -> bool:
+    try:
+        checked = datetime.fromisoformat(doc.get("checked_at") or "")
+    except ValueError:
+        return True
+    return (datetime.now(timezone.utc) - checked).total_seconds() >= _UNREACHABLE_RECHECK_S
+
+
+async def mark_pending(db, url: str) -> None:
+    """Flag ``url`` as waiting for (re-)indexing. The measured fields of an
+    older row are kept until the new measurement replaces them."""
+    key = normalise_audio_url(url)
+    await db[_COLLECTION].update_one(
+        {"url": key},
+        {"$set": {"url": key, "status": "pending",
+                  "requested_at": datetime.now(timezone.utc).isoformat()}},
+        upsert=True,
+    )
+
+
+async def resolve_teacher_reference(db, url: str) -> Optional[dict]:
+    """Teacher formants for a scoring request, from the index only. ``None``
+    (the caller's 422) for a clip that is unmeasurable, unreachable or not a
+    card reference; a card clip the index hasn't measured (new, replaced, or
+    re-parametrised) is queued for indexing and answered with 503 +
+    ``Retry-After``."""
+    doc = await _index_row(db, url)
+    if doc is not None:
+        if (doc.get("status") == "unreachable" and _recheck_due(doc)
+                and normalise_audio_url(url) not in _scheduled):
+            schedule_reference_index(db, [url])
+        return doc.get("ref")
+    if not await is_card_reference(db, url):
+        logger.warning("teacher-reference: %s is not a card reference clip", url)
+        return None
+    logger.warning("teacher-reference: index miss for %s — queued for indexing", url)
+    await mark_pending(db, url)
+    if normalise_audio_url(url) not in _scheduled:
+        schedule_reference_index(db, [url])
+    raise HTTPException(status_code=503, detail=_MSG_PENDING, headers={"Retry-After": "5"})
+
+
+async def _index_with_retry(db, url: str) -> dict:
+    """``index_reference_clip``, retried with back-off while the analysis pool
+    is saturated (the last rejection is raised)."""
+    for attempt in range(_INDEX_ATTEMPTS):
+        try:
+            return await index_reference_clip(db, url)
+        except HTTPException as exc:
+            if exc.status_code != 429 or attempt == _INDEX_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(_INDEX_BACKOFF_S * 2 ** attempt)
+
+
+def schedule_reference_index(db, urls: Iterable[str]) -> None:
+    """Index ``urls`` in the background (admin write paths, index misses):
+    the caller returns immediately, the measurement runs in the analysis pool."""
+    urls = list(dict.fromkeys(normalise_audio_url(u) for u in urls if u))
+    if not urls:
+        return
+    _scheduled.update(urls)
+
+    async def _run():
+        for u in urls:
+            try:
+                res = await _index_with_retry(db, u)
+                logger.info("teacher-reference: %s %s", res["status"], res["url"])
+            except Exception:  # noqa: BLE001
+                # Left (or marked) pending: the next index miss re-schedules it.
+                logger.exception("teacher-reference: indexing failed for %s", u)
+                with contextlib.suppress(Exception):
+                    await mark_pending(db, u)
+            finally:
+                _scheduled.discard(u)
+
+    task = asyncio.get_running_loop().create_task(_run())
+    _pending.add(task)
+    task.add_done_callback(_pending.discard)
+
+
+async def ensure_teacher_reference_indexes(db) -> None:
+    await db[_COLLECTION].create_index("url", unique=True)
+    await db[_COLLECTION].create_index([("url", 1), ("content_hash", 1)])
+    await db[_COLLECTION].create_index("status")
@@ -0,0 +1,310 @@
+"""
+Thumbnail jobs — off-loop thumbnail rendering and the bulk regenerate job.
+
+Thumbnails used to be rendered inline in the request handlers: a blocking
+``subprocess.run(ffmpeg …)`` for videos and ``pdf2image`` for PDFs, on the
+event loop thread, and ``regenerate-all-thumbnails`` walked up to 1000
+items serially inside one request.
+
+* Video frames come from an asyncio ffmpeg subprocess (killed after
+  THUMBNAIL_FFMPEG_TIMEOUT_S); PDF pages are rasterised in a small spawn
+  ``ProcessPoolExecutor`` (THUMBNAIL_POOL_WORKERS). Nothing blocks the loop.
+* Responsive renditions: each thumbnail is written at 160/320/480 px as
+  WebP + JPEG (``utils.storage.write_renditions``); ``thumbnail_url`` is
+  the widest JPEG and ``thumbnail_renditions`` on the content doc is the
+  manifest ``ContentResponse`` exposes for ``srcset``.
+* Idempotent by source content: renditions are named after the SHA-256 of
+  their source file. An existing set is reused without rendering, and
+  concurrent requests for the same source share one render.
+* ``POST /admin/content/regenerate-all-thumbnails`` starts a background job
+  (202 + job id) over every item without a thumbnail — or with a local
+  thumbnail from before renditions, re-rendered from that image: up to
+  THUMBNAIL_JOB_CONCURRENCY items in flight, one ``bulk_write`` per chunk.
+  Status, progress and per-item outcomes live in ``thumbnail_jobs``; poll
+  ``GET …/regenerate-all-thumbnails/{job_id}``. One job at a time (409).
+
+Env: THUMBNAIL_POOL_WORKERS (2), THUMBNAIL_JOB_CONCURRENCY (4),
+THUMBNAIL_JOB_FLUSH_EVERY (25), THUMBNAIL_FFMPEG_TIMEOUT_S (15, read by
+``utils.storage``).
+"""
+from __future__ import annotations
+
+import os
+import uuid
+import asyncio
+import logging
+import multiprocessing as mp
+from pathlib import Path
+from datetime import datetime, timezone
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from pymongo import UpdateOne
+
+from utils.storage import (
+    THUMBNAILS_DIR,
+    existing_renditions,
+    extract_video_frame,
+    fallback_url,
+    get_drive_thumbnail,
+    get_youtube_thumbnail,
+    render_image_renditions,
+    render_pdf_renditions,
+    rendition_manifest,
+    source_digest,
+    thumbnail_key,
+    thumbnail_kind,
+    uploaded_file_for,
+)
+from utils.storage_ledger import record_local
+
+logger = logging.getLogger(__name__)
+
+_WORKERS = max(1, int(os.environ.get("THUMBNAIL_POOL_WORKERS", "2")))
+_JOB_CONCURRENCY = max(1, int(os.environ.get("THUMBNAIL_JOB_CONCURRENCY", "4")))
+_JOB_FLUSH_EVERY = max(1, int(os.environ.get("THUMBNAIL_JOB_FLUSH_EVERY", "25")))
+_JOBS = "thumbnail_jobs"
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class ThumbnailRenderer:
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # source key → the render in progress for it (its future URL)
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._counters = {"rendered": 0, "reused": 0, "coalesced": 0, "failed": 0}
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=mp.get_context("spawn"))
+        return self._executor
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _in_pool(self, fn: Callable, *args):
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        except BrokenProcessPool:
+            self._executor = None  # a worker died: respawn on the next job
+            raise
+
+    async def _render(self, kind: str, file_path: Path, key: str) -> bool:
+        if kind == "pdf":
+            return await self._in_pool(render_pdf_renditions, str(file_path), key)
+        if kind == "image":
+            return await self._in_pool(render_image_renditions, str(file_path), key)
+        frame = THUMBNAILS_DIR / f".frame_{key}.{os.getpid()}.jpg"
+        try:
+            if not await extract_video_frame(file_path, frame):
+                return False
+            return await self._in_pool(render_image_renditions, str(frame), key)
+        finally:
+            frame.unlink(missing_ok=True)
+
+    async def render(self, file_path: Path, content_type: str = "",
+                     kind: Optional[str] = None) -> Optional[str]:
+        """``thumbnail_url`` (the widest JPEG rendition) for an uploaded
+        video / PDF — or any image with ``kind="image"`` — or ``None`` when
+        the file is not thumbnailable or rendering failed."""
+        kind = kind or thumbnail_kind(file_path, content_type)
+        if kind is None or not file_path.exists():
+            return None
+        key = thumbnail_key(await asyncio.to_thread(source_digest, file_path))
+        url = fallback_url(await asyncio.to_thread(existing_renditions, key))
+        if url:
+            self._counters["reused"] += 1
+            return url
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self._counters["coalesced"] += 1
+            return await asyncio.shield(pending)
+
+        fut = asyncio.get_running_loop().create_future()
+        self._inflight[key] = fut
+        try:
+            if await self._render(kind, file_path, key):
+                renditions = await asyncio.to_thread(existing_renditions, key)
+                url = fallback_url(renditions)
+                await record_local(*(THUMBNAILS_DIR / r["url"].rsplit("/", 1)[-1] for r in renditions))
+        except Exception as e:  # noqa: BLE001
+            logger.warning(f"Thumbnail render failed for {file_path.name}: {e}")
+        finally:
+            self._counters["rendered" if url else "failed"] += 1
+            fut.set_result(url)
+            self._inflight.pop(key, None)
+        return url
+
+    def metrics(self) -> dict:
+        return {"workers": self.workers, "in_flight": len(self._inflight), **self._counters}
+
+
+_renderer: Optional[ThumbnailRenderer] = None
+
+
+def get_thumbnail_renderer() -> ThumbnailRenderer:
+    global _renderer
+    if _renderer is None:
+        _renderer = ThumbnailRenderer(_WORKERS)
+    return _renderer
+
+
+def shutdown_thumbnail_pool() -> None:
+    if _renderer is not None:
+        _renderer.shutdown()
+
+
+async def render_thumbnail(file_path: Path, content_type: str = "",
+                           kind: Optional[str] = None) -> Optional[str]:
+    """Render (or reuse) the thumbnail renditions of an uploaded file."""
+    return await get_thumbnail_renderer().render(file_path, content_type, kind)
+
+
+async def thumbnail_fields(thumbnail_url: Optional[str]) -> Dict[str, Any]:
+    """``thumbnail_url`` plus its rendition manifest, as stored on a
+    ``member_content`` doc."""
+    return {"thumbnail_url": thumbnail_url or "",
+            "thumbnail_renditions": await asyncio.to_thread(rendition_manifest, thumbnail_url)}
+
+
+async def content_thumbnail(url: str, content_type: str = "") -> Optional[str]:
+    """Thumbnail for a content item: YouTube / Google-Drive URLs first, then
+    the uploaded video / PDF behind an ``/api/uploads/…`` URL."""
+    url = url or ""
+    thumbnail_url = get_youtube_thumbnail(url) or get_drive_thumbnail(url)
+    if thumbnail_url:
+        return thumbnail_url
+    file_path = await asyncio.to_thread(uploaded_file_for, url)
+    if file_path is None:
+        return None
+    return await render_thumbnail(file_path, content_type)
+
+
+# --------------------------------------------------------------------------- #
+# Bulk regenerate — background job
+# --------------------------------------------------------------------------- #
+_job_tasks: Dict[str, asyncio.Task] = {}
+# Items with no thumbnail, and items whose local thumbnail predates
+# renditions (re-rendered from that thumbnail, so custom ones survive).
+_JOB_QUERY = {"$or": [
+    {"thumbnail_url": {"$exists": False}},
+    {"thumbnail_url": {"$in": [None, ""]}},
+    {"thumbnail_url": {"$regex": "^/api/uploads/thumbnails/"},
+     "thumbnail_renditions": {"$exists": False}},
+]}
+
+
+async def run_thumbnail_job(db, job_id: str) -> None:
+    jobs = db[_JOBS]
+    await jobs.update_one({"id": job_id}, {"$set": {"status": "running", "started_at": _now_iso()}})
+    try:
+        todo = await db.member_content.find(_JOB_QUERY, {
+            "_id": 0, "id": 1, "url": 1, "content_type": 1, "thumbnail_url": 1}).to_list(None)
+        await jobs.update_one({"id": job_id}, {"$set": {"total": len(todo)}})
+        sem = asyncio.Semaphore(_JOB_CONCURRENCY)
+
+        async def one(c: dict) -> Optional[str]:
+            async with sem:
+                if c.get("thumbnail_url"):
+                    legacy = await asyncio.to_thread(uploaded_file_for, c["thumbnail_url"])
+                    return await render_thumbnail(legacy, kind="image") if legacy else None
+                return await content_thumbnail(c.get("url", ""), c.get("content_type", ""))
+
+        processed = updated = 0
+        for start in range(0, len(todo), _JOB_FLUSH_EVERY):
+            chunk = todo[start:start + _JOB_FLUSH_EVERY]
+            outcomes = await asyncio.gather(*(one(c) for c in chunk), return_exceptions=True)
+            ops, results, errors = [], [], []
+            for c, out in zip(chunk, outcomes):
+                if isinstance(out, BaseException):
+                    logger.error("thumbnail job: content %s failed: %r", c["id"], out)
+                    errors.append(f"{c['id']}: {type(out).__name__}")
+                    continue
+                results.append({"id": c["id"], "thumbnail_url": out or ""})
+                if out:
+                    ops.append(UpdateOne({"id": c["id"]}, {"$set": await thumbnail_fields(out)}))
+            if ops:
+                await db.member_content.bulk_write(ops, ordered=False)
+            processed += len(chunk)
+            updated += len(ops)
+            await jobs.update_one({"id": job_id}, {
+                "$set": {"processed": processed, "updated": updated},
+                "$push": {"results": {"$each": results}, "errors": {"$each": errors}},
+            })
+        await jobs.update_one({"id": job_id}, {"$set": {"status": "done", "finished_at": _now_iso()}})
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("thumbnail job %s failed", job_id)
+        await jobs.update_one({"id": job_id}, {"$set": {
+            "status": "failed", "error": f"{type(exc).__name__}: {exc}", "finished_at": _now_iso()}})
+
+
+async def start_thumbnail_job(db, username: Optional[str]) -> Dict[str, Any]:
+    """Record a new job and run it in the background. One job at a time."""
+    running = next((jid for jid, t in _job_tasks.items() if not t.done()), None)
+    if running:
+        raise HTTPException(status_code=409,
+                            detail=f"Rigenerazione anteprime già in corso (job {running}).")
+    job = {
+        "id": str(uuid.uuid4()), "kind": "regenerate-thumbnails", "status": "queued",
+        "total": None, "processed": 0, "updated": 0, "results": [], "errors": [],
+        "created_at": _now_iso(), "created_by": username,
+        "started_at": None, "finished_at": None,
+    }
+    await db[_JOBS].insert_one(dict(job))
+    task = asyncio.get_running_loop().create_task(run_thumbnail_job(db, job["id"]))
+    _job_tasks[job["id"]] = task
+    task.add_done_callback(lambda t, jid=job["id"]: _job_tasks.pop(jid, None))
+    return job
+
+
+def build_thumbnail_jobs_router(db, get_admin_user: Callable) -> APIRouter:
+    router = APIRouter(tags=["thumbnails"])
+
+    @router.post("/admin/content/{content_id}/regenerate-thumbnail")
+    async def regenerate_content_thumbnail(content_id: str, admin: dict = Depends(get_admin_user)):
+        """Regenerate thumbnail for a single content item"""
+        content = await db.member_content.find_one({"id": content_id}, {"_id": 0})
+        if not content:
+            raise HTTPException(status_code=404, detail="Contenuto non trovato")
+
+        thumbnail_url = await content_thumbnail(content.get("url", ""), content.get("content_type", ""))
+        if thumbnail_url:
+            fields = await thumbnail_fields(thumbnail_url)
+            await db.member_content.update_one({"id": content_id}, {"$set": fields})
+            return {"success": True, **fields}
+
+        return {"success": False, "thumbnail_url": "", "message": "Impossibile generare anteprima per questo contenuto"}
+
+    @router.post("/admin/content/regenerate-all-thumbnails", status_code=202)
+    async def regenerate_all_thumbnails(admin: dict = Depends(get_admin_user)):
+        """Regenerate thumbnails for all content items without one — started
+        as a background job. Poll ``GET …/regenerate-all-thumbnails/{job_id}``."""
+        job = await start_thumbnail_job(db, admin.get("username"))
+        return {"job_id": job["id"], "status": job["status"]}
+
+    @router.get("/admin/content/regenerate-all-thumbnails/{job_id}")
+    async def regenerate_all_thumbnails_status(
+        job_id: str,
+        include_results: bool = True,
+        admin: dict = Depends(get_admin_user),
+    ):
+        projection: Dict[str, Any] = {"_id": 0}
+        if not include_results:
+            projection["results"] = 0
+        job = await db[_JOBS].find_one({"id": job_id}, projection)
+        if not job:
+            raise HTTPException(status_code=404, detail="Job non trovato")
+        return {**job, "renderer": get_thumbnail_renderer().metrics()}
+
+    return router
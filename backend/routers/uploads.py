@@ -6,15 +6,19 @@ Endpoints:
 * ``POST   /admin/upload``                       — main file upload (video,
   audio, PDF, image). Enforces per-file + total-storage caps, saves to
   ``UPLOADS_DIR`` and mirrors to Emergent Object Storage. Auto-generates a
-  thumbnail for videos and PDFs (YouTube URL support lives in the
+  thumbnail for videos and PDFs off the event loop
+  (``routers.thumbnail_jobs``; YouTube URL support lives in the
   URL-thumbnail endpoint below).
 * ``DELETE /admin/upload/{filename}``            — remove a single file
   with path-traversal protection.
 * ``POST   /admin/thumbnail/upload``             — upload a custom
-  thumbnail image, auto-resized to 480px.
+  thumbnail image, re-encoded as 160/320/480px WebP + JPEG renditions.
 * ``POST   /admin/thumbnail/generate-from-url``  — return the YouTube /
   Google-Drive derived thumbnail URL without touching disk.
-* ``GET    /admin/storage/stats``                — dashboard usage stats.
+* ``GET    /admin/storage/stats``                — dashboard usage stats,
+  read from the storage ledger (``utils.storage_ledger``), per prefix.
+* ``POST   /admin/storage/reconcile``            — rebuild the ledger from
+  disk (background, 409 while one runs).
 * ``GET    /uploads/{file_path:path}``           — public file serve with
   Emergent-storage fallback (writes back on hit for next-request speed).
 
@@ -28,11 +32,10 @@ import logging
 import shutil
 import uuid
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Awaitable, Callable, Optional
 
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
 from fastapi.responses import FileResponse, Response
-from PIL import Image
 from pydantic import BaseModel
 
 from utils.storage import (
@@ -41,11 +44,18 @@ from utils.storage import (
     UPLOAD_MAX_FILE_SIZE,
     UPLOAD_MAX_TOTAL_STORAGE,
     UPLOADS_DIR,
-    auto_generate_thumbnail,
     format_size,
-    get_total_storage_used,
+    get_drive_thumbnail,
     get_youtube_thumbnail,
 )
+from utils.storage_ledger import (
+    ledger_usage,
+    record_delete,
+    record_put,
+    start_reconcile,
+    used_bytes,
+)
+from routers.thumbnail_jobs import render_thumbnail, thumbnail_fields
 
 logger = logging.getLogger(__name__)
 
@@ -63,8 +73,8 @@ class ThumbnailFromURLRequest(BaseModel):
 # --------------------------------------------------------------------------- #
 def build_uploads_router(
     get_admin_user: Callable,
-    emergent_put: Callable[[str, bytes, str], bool],
-    emergent_get: Callable[[str], Optional[tuple]],
+    emergent_put: Callable[[str, bytes, str], Awaitable[bool]],
+    emergent_get: Callable[[str], Awaitable[Optional[tuple]]],
     guess_mime: Callable[[str], str],
 ) -> APIRouter:
     """Assemble the uploads APIRouter.
@@ -74,8 +84,10 @@ def build_uploads_router(
     get_admin_user:
         Shared FastAPI dependency (role == "admin").
     emergent_put / emergent_get / guess_mime:
-        The three ``storage_helper`` callables (kept out of this module to
-        avoid a hard dependency on ``server.py`` internals).
+        The ``storage_helper`` callables — ``put_object_async`` /
+        ``get_object_async`` (awaited, pooled client) and
+        ``guess_content_type`` — kept out of this module to avoid a hard
+        dependency on ``server.py`` internals.
     """
 
     router = APIRouter()
@@ -84,8 +96,9 @@ def build_uploads_router(
     @router.get("/admin/storage/stats")
     async def get_storage_stats(_admin: dict = Depends(get_admin_user)):
         """Get storage statistics (admin only)."""
-        total_used = get_total_storage_used()
-        file_count = len(list(UPLOADS_DIR.iterdir())) if UPLOADS_DIR.exists() else 0
+        usage = await ledger_usage()
+        total_used = usage["bytes"]
+        file_count = usage["files"]
         return {
             "total_used_bytes":       total_used,
             "total_used_formatted":   format_size(total_used),
@@ -97,8 +110,18 @@ def build_uploads_router(
             "file_count":             file_count,
             "max_file_size_bytes":    UPLOAD_MAX_FILE_SIZE,
             "max_file_size_formatted": format_size(UPLOAD_MAX_FILE_SIZE),
+            "by_prefix":              usage["prefixes"],
+            "reconciled_at":          usage["reconciled_at"],
+            "reconciling":            usage["reconciling"],
         }
 
+    @router.post("/admin/storage/reconcile", status_code=202)
+    async def reconcile_storage(_admin: dict = Depends(get_admin_user)):
+        """Rebuild the storage ledger from disk in the background (admin only)."""
+        if not start_reconcile():
+            raise HTTPException(status_code=409, detail="Ricalcolo dello spazio già in corso")
+        return {"status": "started"}
+
     # ---- upload file ----------------------------------------------------- #
     @router.post("/admin/upload")
     async def upload_file(
@@ -107,7 +130,7 @@ def build_uploads_router(
     ):
         """Upload a file for member content (admin only)."""
         # Check total storage before upload
-        current_storage = get_total_storage_used()
+        current_storage = await used_bytes()
         if current_storage >= UPLOAD_MAX_TOTAL_STORAGE:
             raise HTTPException(
                 status_code=400,
@@ -164,15 +187,16 @@ def build_uploads_router(
             )
 
         file_url = f"/api/uploads/{safe_filename}"
+        await record_put(safe_filename, file_size)
 
         # Mirror to Emergent Object Storage (survives container restarts)
         try:
             with open(file_path, "rb") as fh:
-                emergent_put(safe_filename, fh.read(), guess_mime(safe_filename))
+                await emergent_put(safe_filename, fh.read(), guess_mime(safe_filename))
         except Exception as e:
             logger.warning(f"Emergent storage put failed for {safe_filename}: {e}")
 
-        thumbnail_url = auto_generate_thumbnail(file_path, content_type=file_type)
+        thumbnail_url = await render_thumbnail(file_path, content_type=file_type)
 
         return {
             "success":            True,
@@ -183,6 +207,7 @@ def build_uploads_router(
             "file_size_formatted": format_size(file_size),
             "url":                file_url,
             "thumbnail_url":      thumbnail_url or "",
+            "thumbnail_renditions": (await thumbnail_fields(thumbnail_url))["thumbnail_renditions"],
             "storage_used":       format_size(new_total),
             "storage_remaining":  format_size(UPLOAD_MAX_TOTAL_STORAGE - new_total),
         }
@@ -199,6 +224,7 @@ def build_uploads_router(
             raise HTTPException(status_code=400, detail="Percorso file non valido")
         try:
             file_path.unlink()
+            await record_delete(filename)
             return {"success": True, "message": "File eliminato con successo"}
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Errore nell'eliminazione: {str(e)}")
@@ -215,24 +241,20 @@ def build_uploads_router(
         if file_ext not in allowed_img:
             raise HTTPException(status_code=400, detail=f"Solo immagini: {', '.join(allowed_img)}")
 
-        unique_id = str(uuid.uuid4())[:8]
-        safe_name = f"thumb_custom_{unique_id}{file_ext}"
-        thumb_path = THUMBNAILS_DIR / safe_name
-
+        # Staged under a temp name; the renditions are named after its hash.
+        staged = THUMBNAILS_DIR / f".upload_{uuid.uuid4().hex[:8]}{file_ext}"
         try:
-            with open(thumb_path, "wb") as buffer:
+            with open(staged, "wb") as buffer:
                 shutil.copyfileobj(file.file, buffer)
-            # Resize to standard thumbnail size
-            img = Image.open(thumb_path)
-            img.thumbnail((480, 480), Image.LANCZOS)
-            img.save(str(thumb_path), quality=85)
+            thumbnail_url = await render_thumbnail(staged, kind="image")
         except Exception as e:
             raise HTTPException(status_code=500, detail=f"Errore: {str(e)}")
+        finally:
+            staged.unlink(missing_ok=True)
+        if not thumbnail_url:
+            raise HTTPException(status_code=400, detail="Immagine non leggibile")
 
-        return {
-            "success": True,
-            "thumbnail_url": f"/api/uploads/thumbnails/{safe_name}",
-        }
+        return {"success": True, **await thumbnail_fields(thumbnail_url)}
 
     # ---- thumbnail from URL --------------------------------------------- #
     @router.post("/admin/thumbnail/generate-from-url")
@@ -241,19 +263,9 @@ def build_uploads_router(
         _admin: dict = Depends(get_admin_user),
     ):
         """Auto-generate a thumbnail from a URL (YouTube, Google Drive, …)."""
-        import re
-        url = request.url
-        yt_thumb = get_youtube_thumbnail(url)
-        if yt_thumb:
-            return {"success": True, "thumbnail_url": yt_thumb}
-        # Google Drive thumbnail
-        drive_match = re.search(r"drive\.google\.com\/file\/d\/([a-zA-Z0-9_-]+)", url)
-        if drive_match:
-            file_id = drive_match.group(1)
-            return {
-                "success": True,
-                "thumbnail_url": f"https://drive.google.com/thumbnail?id={file_id}&sz=w480",
-            }
+        thumbnail_url = get_youtube_thumbnail(request.url) or get_drive_thumbnail(request.url)
+        if thumbnail_url:
+            return {"success": True, "thumbnail_url": thumbnail_url}
         return {
             "success": False,
             "thumbnail_url": "",
@@ -281,7 +293,7 @@ def build_uploads_router(
             return FileResponse(str(local_path), media_type=guess_mime(local_path.name))
 
         # Local miss → fetch from Emergent storage
-        obj = emergent_get(file_path)
+        obj = await emergent_get(file_path)
         if obj is None:
             raise HTTPException(status_code=404, detail="File not found")
         data, content_type = obj
@@ -0,0 +1,77 @@
+"""
+teacher_reference_formants backfill — index every scoring-reference clip.
+
+Walks every phoneme card, collects the clips that can serve as a numeric
+reference (``card_reference_urls``: isolated phoneme, common-word clips,
+Level Test word example) and measures each one into
+``teacher_reference_formants``. New writes are indexed by the admin audio
+endpoints; this covers clips that predate the index.
+
+Idempotent: a clip whose bytes (content hash) and measurement parameters
+are unchanged is skipped without re-measuring. ``--force`` re-measures
+everything, ``--dry-run`` only lists the URLs.
+
+    python3 scripts/backfill_teacher_references.py [--force] [--dry-run]
+"""
+import argparse
+import asyncio
+import os
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+async def backfill_teacher_references(db, force: bool = False,
+                                      dry_run: bool = False) -> Dict[str, int]:
+    from routers.teacher_references import (
+        card_reference_urls, index_reference_clip, normalise_audio_url,
+    )
+
+    urls: Dict[str, str] = {}
+    async for card in db.phoneme_cards.find(
+        {}, {"_id": 0, "id": 1, "audio": 1, "commonWords": 1},
+    ):
+        for u in card_reference_urls(card):
+            urls.setdefault(normalise_audio_url(u), u)
+
+    counts: Counter = Counter()
+    for key, url in sorted(urls.items()):
+        if dry_run:
+            print(f"  · {key}")
+            counts["listed"] += 1
+            continue
+        res = await index_reference_clip(db, url, force=force)
+        counts[res["status"]] += 1
+        if res["status"] != "unchanged":
+            print(f"  {res['status']:<12} {key}")
+    return dict(counts)
+
+
+async def _main_cli() -> None:
+    from dotenv import load_dotenv  # noqa: WPS433
+    from motor.motor_asyncio import AsyncIOMotorClient  # noqa: WPS433
+    from routers.analysis_pool import shutdown_analysis_pool
+    from routers.teacher_references import ensure_teacher_reference_indexes
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--force", action="store_true", help="re-measure unchanged clips")
+    parser.add_argument("--dry-run", action="store_true", help="list URLs, measure nothing")
+    args = parser.parse_args()
+
+    load_dotenv(Path(__file__).parent.parent / ".env")
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    db = client[os.environ["DB_NAME"]]
+    try:
+        await ensure_teacher_reference_indexes(db)
+        result = await backfill_teacher_references(db, force=args.force, dry_run=args.dry_run)
+    finally:
+        shutdown_analysis_pool()
+        client.close()
+    print("Backfill complete. " + " · ".join(f"{k}={v}" for k, v in sorted(result.items())))
+
+
+if __name__ == "__main__":
+    asyncio.run(_main_cli())
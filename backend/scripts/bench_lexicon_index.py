@@ -0,0 +1,75 @@
+"""
+Lexicon generation benchmark — full CMUdict scan vs the precompiled index.
+
+For every phoneme of the canonical inventory (both dialects) it times
+``_extract_matching_words`` (the scan: every CMUdict entry, a wordfreq lookup
+per candidate) against ``_indexed_matching_words`` (a top-K slice of the
+index's posting lists), checks that both return the same words, and prints
+one row per phoneme plus totals. The index is built first when missing.
+
+``python3 scripts/bench_lexicon_index.py [--max-words 30] [--repeat 3]``
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers import phoneme_lexicon_rule as lex  # noqa: E402
+from routers.canonical_phonemes import _build_seed_docs  # noqa: E402
+
+
+def _arpa(ipa: str):
+    arpa = lex._IPA_TO_ARPABET.get(ipa)
+    if not arpa and len(ipa) > 1:
+        arpa = lex._IPA_TO_ARPABET.get(ipa[0])
+    return arpa
+
+
+def _best(fn, repeat: int):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--max-words", type=int, default=30)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args(argv)
+
+    t0 = time.perf_counter()
+    idx = lex.load_lexicon_index()
+    print(f"index open: {(time.perf_counter() - t0) * 1000:.1f} ms ({len(idx)} words)")
+    lex._get_cmudict()  # the scan's one-off dictionary parse is not what we time
+
+    ipas = sorted({d["ipa"] for d in _build_seed_docs()})
+    total_scan = total_index = 0.0
+    mismatches = 0
+    print(f"{'ipa':>5} {'arpa':>5} {'scan_ms':>9} {'index_ms':>9} {'speedup':>8} {'words':>5} same")
+    for ipa in ipas:
+        arpa = _arpa(ipa)
+        if not arpa:
+            print(f"{ipa:>5} {'-':>5} (no ARPAbet mapping)")
+            continue
+        t_scan, scan = _best(lambda: lex._extract_matching_words(
+            arpa, max_words=args.max_words, target_ipa=ipa), args.repeat)
+        t_index, indexed = _best(lambda: lex._indexed_matching_words(
+            idx, arpa, max_words=args.max_words, target_ipa=ipa), args.repeat)
+        same = scan == indexed
+        mismatches += not same
+        total_scan += t_scan
+        total_index += t_index
+        print(f"{ipa:>5} {arpa:>5} {t_scan * 1000:9.1f} {t_index * 1000:9.3f} "
+              f"{t_scan / t_index:7.0f}x {len(indexed):5d} {'yes' if same else 'NO'}")
+    print(f"total: scan {total_scan:.2f}s  index {total_index * 1000:.1f} ms  "
+          f"speedup {total_scan / total_index:.0f}x  mismatches {mismatches}")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
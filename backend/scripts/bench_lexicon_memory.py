@@ -0,0 +1,69 @@
+"""
+Lexicon cold-start report — first-call latency and RSS, scan vs index.
+
+Each mode runs in a fresh interpreter (``--child``) so nothing is shared:
+
+* ``scan``  — the fallback path: parse CMUdict into a dict, import wordfreq,
+  scan the whole dictionary for the first lexicon;
+* ``index`` — memory-map the precompiled index (built first when missing)
+  and slice the posting lists.
+
+For each it prints RSS after importing the module (baseline), after the
+first ``generate_lexicon_for_canonical`` call and the delta, plus the
+first- and second-call latency.
+
+``python3 scripts/bench_lexicon_memory.py [--ipa ʊ]``
+"""
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _child(mode: str, ipa: str) -> dict:
+    from routers import phoneme_lexicon_rule as lex
+    if mode == "scan":
+        lex._index_failed = True
+    else:
+        lex.load_lexicon_index()   # make sure it exists; its build is not what we time
+        lex._index = None
+    base = lex._rss_bytes()
+    t0 = time.perf_counter()
+    lex.generate_lexicon_for_canonical(ipa)
+    first = time.perf_counter() - t0
+    after = lex._rss_bytes()
+    t0 = time.perf_counter()
+    lex.generate_lexicon_for_canonical(ipa)
+    second = time.perf_counter() - t0
+    return {
+        "mode": mode,
+        "rss_base_mb": round(base / 2**20, 1),
+        "rss_after_mb": round(after / 2**20, 1),
+        "rss_delta_mb": round((after - base) / 2**20, 1),
+        "first_call_ms": round(first * 1000, 1),
+        "second_call_ms": round(second * 1000, 2),
+    }
+
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--ipa", default="ʊ")
+    ap.add_argument("--child", choices=("scan", "index"))
+    args = ap.parse_args(argv)
+    if args.child:
+        print(json.dumps(_child(args.child, args.ipa)))
+        return 0
+    for mode in ("scan", "index"):
+        out = subprocess.run([sys.executable, __file__, "--child", mode, "--ipa", args.ipa],
+                             check=True, capture_output=True, text=True).stdout
+        row = json.loads(out.strip().splitlines()[-1])
+        print("  ".join(f"{k}={v}" for k, v in row.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,239 @@
+"""
+Member folder listing benchmark — per-folder ``count_documents`` vs one ``$group``.
+
+For each ``--sizes`` (folder count) it seeds folders with ``--items`` pieces of
+content each (mixed public / assigned visibility) and times, for a client
+user, the previous listing (folders query + one ``count_documents`` per
+folder) against the current one (folders query +
+``utils.member_content.folder_content_counts``). Per size and mode it prints
+the database round trips per listing and latency p50 / p95 over ``--runs``.
+
+Backends:
+
+* default — an in-memory collection double that sleeps ``--rtt-ms`` per round
+  trip (network latency dominates the N+1 pattern; the double isolates it);
+* ``--mongo-url`` — a real MongoDB: a scratch database is seeded with the
+  production indexes, round trips are counted with a pymongo command
+  listener, and the database is dropped afterwards.
+
+``python3 scripts/bench_member_folders.py [--sizes 10 100 1000] [--items 5]
+[--runs 20] [--rtt-ms 0.5] [--mongo-url mongodb://localhost:27017]``
+"""
+import sys
+import time
+import random
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from utils.member_content import client_visibility_filter, folder_content_counts  # noqa: E402
+
+USER = "u-bench"
+
+
+def _seed_docs(n_folders: int, items: int, rng: random.Random):
+    others = [f"u{i}" for i in range(20)]
+    folders, content = [], []
+    for i in range(n_folders):
+        folders.append({"id": f"f{i}", "name": f"Folder {i}", "order": i,
+                        "is_public": rng.random() < 0.7,
+                        "assigned_users": [USER] if rng.random() < 0.3 else []})
+        for j in range(items):
+            assigned = rng.sample(others, 2) + ([USER] if rng.random() < 0.2 else [])
+            content.append({"id": f"c{i}-{j}", "folder_id": f"f{i}", "order": j,
+                            "is_public": rng.random() < 0.5, "assigned_users": assigned})
+    return folders, content
+
+
+# --------------------------------------------------------------------------- #
+# The two listings under test
+# --------------------------------------------------------------------------- #
+async def legacy_listing(db):
+    folders = await db.folders.find(client_visibility_filter(USER), {"_id": 0}).sort("order", 1).to_list(1000)
+    counts = {}
+    for f in folders:
+        q = {"folder_id": f["id"]}
+        q.update(client_visibility_filter(USER))
+        counts[f["id"]] = await db.member_content.count_documents(q)
+    return counts
+
+
+async def aggregated_listing(db):
+    folders = await db.folders.find(client_visibility_filter(USER), {"_id": 0}).sort("order", 1).to_list(1000)
+    counts = await folder_content_counts(db, (f["id"] for f in folders), USER)
+    return {f["id"]: counts.get(f["id"], 0) for f in folders}
+
+
+# --------------------------------------------------------------------------- #
+# In-memory backend
+# --------------------------------------------------------------------------- #
+def _match(doc, q):
+    for k, v in q.items():
+        if k == "$or":
+            if not any(_match(doc, sub) for sub in v):
+                return False
+        elif isinstance(v, dict) and "$in" in v:
+            if doc.get(k) not in v["$in"]:
+                return False
+        elif isinstance(doc.get(k), list):
+            if v not in doc[k]:
+                return False
+        elif doc.get(k) != v:
+            return False
+    return True
+
+
+class _MemCursor:
+    def __init__(self, db, docs):
+        self.db, self.docs = db, docs
+
+    def sort(self, key, direction=1):
+        self.docs.sort(key=lambda d: d.get(key, 0), reverse=direction < 0)
+        return self
+
+    async def to_list(self, length=None):
+        await self.db.trip()
+        return self.docs
+
+
+class _MemCollection:
+    def __init__(self, db, docs):
+        self.db, self.docs = db, docs
+        self.by_folder = {}
+        for d in docs:
+            self.by_folder.setdefault(d.get("folder_id"), []).append(d)
+
+    def _candidates(self, q):
+        fid = q.get("folder_id")
+        if isinstance(fid, str):
+            return self.by_folder.get(fid, [])
+        if isinstance(fid, dict):
+            return [d for f in fid["$in"] for d in self.by_folder.get(f, [])]
+        return self.docs
+
+    def find(self, q, projection=None):
+        return _MemCursor(self.db, [d for d in self._candidates(q) if _match(d, q)])
+
+    async def count_documents(self, q):
+        await self.db.trip()
+        return sum(_match(d, q) for d in self._candidates(q))
+
+    def aggregate(self, pipeline):
+        match = pipeline[0]["$match"]
+        counts = {}
+        for d in self._candidates(match):
+            if _match(d, match):
+                counts[d["folder_id"]] = counts.get(d["folder_id"], 0) + 1
+        return _MemCursor(self.db, [{"_id": k, "n": n} for k, n in counts.items()])
+
+
+class _MemDB:
+    def __init__(self, folders, content, rtt_s):
+        self.rtt_s, self.round_trips = rtt_s, 0
+        self.folders = _MemCollection(self, folders)
+        self.member_content = _MemCollection(self, content)
+
+    async def trip(self):
+        self.round_trips += 1
+        if self.rtt_s:
+            await asyncio.sleep(self.rtt_s)
+
+
+# --------------------------------------------------------------------------- #
+# Runner
+# --------------------------------------------------------------------------- #
+async def _time(db, counter, fn, runs):
+    expected = await fn(db)
+    before = counter()
+    await fn(db)
+    trips = counter() - before
+    samples = []
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        assert await fn(db) == expected
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    return expected, trips, statistics.median(samples), samples[int(0.95 * (len(samples) - 1))]
+
+
+async def _bench_size(args, n, backend):
+    folders, content = _seed_docs(n, args.items, random.Random(n))
+    db, counter, cleanup = await backend(folders, content)
+    try:
+        rows = []
+        for name, fn in (("per-folder", legacy_listing), ("aggregated", aggregated_listing)):
+            counts, trips, p50, p95 = await _time(db, counter, fn, args.runs)
+            rows.append((name, counts, trips, p50, p95))
+        assert rows[0][1] == rows[1][1], "listings disagree"
+        for name, _, trips, p50, p95 in rows:
+            print(f"{n:>8} {name:>12} {trips:>12} {p50:>10.2f} {p95:>10.2f}")
+    finally:
+        await cleanup()
+
+
+def _memory_backend(args):
+    async def make(folders, content):
+        db = _MemDB(folders, content, args.rtt_ms / 1000)
+
+        async def cleanup():
+            pass
+        return db, lambda: db.round_trips, cleanup
+    return make
+
+
+def _mongo_backend(args):
+    from pymongo import monitoring
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    class Counter(monitoring.CommandListener):
+        commands = 0
+
+        def started(self, event):
+            if event.command_name in {"find", "getMore", "aggregate", "count"}:
+                Counter.commands += 1
+
+        def succeeded(self, event):
+            pass
+
+        def failed(self, event):
+            pass
+
+    async def make(folders, content):
+        client = AsyncIOMotorClient(args.mongo_url, event_listeners=[Counter()])
+        db = client[f"bench_member_folders_{int(time.time())}"]
+        await db.member_content.create_index([("folder_id", 1), ("order", 1)])
+        await db.folders.insert_many(folders)
+        if content:
+            await db.member_content.insert_many(content)
+
+        async def cleanup():
+            await client.drop_database(db.name)
+            client.close()
+        return db, lambda: Counter.commands, cleanup
+    return make
+
+
+async def main_async(args):
+    backend = (_mongo_backend if args.mongo_url else _memory_backend)(args)
+    where = args.mongo_url or f"in-memory, {args.rtt_ms} ms per round trip"
+    print(f"backend: {where}; {args.items} items/folder; {args.runs} runs")
+    print(f"{'folders':>8} {'listing':>12} {'round trips':>12} {'p50 ms':>10} {'p95 ms':>10}")
+    for n in args.sizes:
+        await _bench_size(args, n, backend)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    ap.add_argument("--items", type=int, default=5, help="content items per folder")
+    ap.add_argument("--runs", type=int, default=20)
+    ap.add_argument("--rtt-ms", type=float, default=0.5, help="in-memory backend only")
+    ap.add_argument("--mongo-url", default=None)
+    asyncio.run(main_async(ap.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
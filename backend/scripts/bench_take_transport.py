@@ -0,0 +1,136 @@
+"""
+Analysis-pool transport micro-benchmark — pickled bytes vs spool-file path.
+
+Submits ``--takes`` concurrent jobs to a warm ``AnalysisPool`` in two modes:
+
+* ``bytes`` — the previous transport: the take's bytes are pickled into the
+  worker, which writes them to its own temp file before measuring;
+* ``path``  — the current one: the take is spooled once in the parent
+  (``audio_ingest.spool_bytes``, on tmpfs when available) and only the path
+  string crosses the process boundary.
+
+``--job read`` isolates the transport (the worker only touches the file);
+``--job measure`` runs the real ``_measure_all_ceilings``. Per mode it prints
+wall time, throughput, job latency (p50/p95), the pickled payload per job and
+the parent's peak Python allocation (tracemalloc) — where the in-flight
+copies show up. The take is the committed ``vowel_i.wav`` fixture tiled to
+``--seconds``.
+
+``python3 scripts/bench_take_transport.py [--takes 24] [--seconds 10]
+[--workers 2] [--job read|measure]``
+"""
+import io
+import os
+import sys
+import time
+import wave
+import pickle
+import asyncio
+import argparse
+import tempfile
+import statistics
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers.analysis_pool import AnalysisPool  # noqa: E402
+from routers.audio_ingest import SPOOL_DIR, spool_bytes  # noqa: E402
+from routers.phoneme_formants import _measure_all_ceilings  # noqa: E402
+
+FIXTURE = Path(__file__).parent.parent / "tests" / "fixtures" / "vowel_i.wav"
+
+
+def _work(path: str, job: str):
+    if job == "read":
+        with open(path, "rb") as fh:
+            return len(fh.read())
+    return _measure_all_ceilings(path) is not None
+
+
+def _bytes_job(raw: bytes, job: str):
+    """The old worker entry point: re-materialise the take on disk."""
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".wav") as tf:
+        tf.write(raw)
+        path = tf.name
+    try:
+        return _work(path, job)
+    finally:
+        os.unlink(path)
+
+
+def _path_job(path: str, job: str):
+    return _work(path, job)
+
+
+def build_take(seconds: float) -> bytes:
+    with wave.open(str(FIXTURE), "rb") as w:
+        params, frames = w.getparams(), w.readframes(w.getnframes())
+    reps = max(1, int(seconds * params.framerate / params.nframes + 0.999))
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setparams(params)
+        w.writeframes(frames * reps)
+    return buf.getvalue()
+
+
+async def _run_mode(pool: AnalysisPool, mode: str, raw: bytes, takes: int, job: str) -> dict:
+    latencies = []
+
+    async def one(i: int):
+        t0 = time.perf_counter()
+        if mode == "bytes":
+            data = bytes(bytearray(raw))  # each request owns its own copy
+            await pool.run(_bytes_job, data, job)
+        else:
+            clip = await asyncio.to_thread(spool_bytes, raw)
+            with clip:
+                await pool.run(_path_job, clip.path, job)
+        latencies.append(time.perf_counter() - t0)
+
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(takes)))
+    wall = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    arg = raw if mode == "bytes" else "/dev/shm/vf-spool-xxxxxxxx.wav"
+    latencies.sort()
+    return {
+        "mode": mode, "wall_s": round(wall, 3), "takes_per_s": round(takes / wall, 2),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1),
+        "p95_ms": round(latencies[int(0.95 * (len(latencies) - 1))] * 1000, 1),
+        "pickled_bytes_per_job": len(pickle.dumps((arg, job))),
+        "parent_peak_alloc_mb": round(peak / 2**20, 2),
+    }
+
+
+async def _main(args) -> list[dict]:
+    raw = build_take(args.seconds)
+    pool = AnalysisPool(workers=args.workers, max_queue=args.takes, job_timeout_s=600)
+    await pool.start()
+    try:
+        await _run_mode(pool, "path", raw, args.workers, args.job)  # page in both paths
+        await _run_mode(pool, "bytes", raw, args.workers, args.job)
+        return [await _run_mode(pool, m, raw, args.takes, args.job) for m in ("bytes", "path")]
+    finally:
+        pool.shutdown()
+
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--takes", type=int, default=24)
+    ap.add_argument("--seconds", type=float, default=10.0)
+    ap.add_argument("--workers", type=int, default=2)
+    ap.add_argument("--job", choices=("read", "measure"), default="read")
+    args = ap.parse_args(argv)
+    size = len(build_take(args.seconds))
+    print(f"take={size / 2**20:.2f} MB takes={args.takes} workers={args.workers} "
+          f"job={args.job} spool_dir={SPOOL_DIR or tempfile.gettempdir()}")
+    for row in asyncio.run(_main(args)):
+        print("  ".join(f"{k}={v}" for k, v in row.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
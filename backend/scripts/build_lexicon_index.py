@@ -0,0 +1,35 @@
+"""
+Compile the CMUdict × wordfreq lexicon index (``phoneme_lexicon_rule.LexiconIndex``).
+
+The backend builds it on first use when it is missing or was built from other
+cmudict / wordfreq versions; run this at deploy time so no request pays for
+the build. Writes to LEXICON_INDEX_DIR (default ``backend/data/lexicon_index``)
+unless ``--out`` is given.
+
+``python3 scripts/build_lexicon_index.py [--out DIR]``
+"""
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers.phoneme_lexicon_rule import _INDEX_DIR, build_lexicon_index  # noqa: E402
+
+
+def main(argv: list[str]) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    ap.add_argument("--out", default=_INDEX_DIR)
+    args = ap.parse_args(argv)
+    t0 = time.perf_counter()
+    manifest = build_lexicon_index(args.out)
+    size = sum(p.stat().st_size for p in Path(args.out).iterdir())
+    print(f"lexicon index: {manifest['words']} words, {len(manifest['phones'])} phones, "
+          f"{size / 2**20:.2f} MB in {time.perf_counter() - t0:.1f}s → {args.out} "
+          f"(cmudict {manifest['sources']['cmudict']}, wordfreq {manifest['sources']['wordfreq']})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,108 @@
+"""
+FormantPath mode regression harness — ``lean`` vs ``legacy`` (offline).
+
+Runs ``_measure_all_ceilings`` in both ``PHONEME_FORMANT_PATH_MODE`` modes on
+every Level Test recording under ``uploads/leveltest`` (or the paths given on
+the command line) and compares, per clip:
+
+* the raw measurement (all ceilings, all candidate windows);
+* the ceiling + nucleus window chosen by ``_select_measurement``;
+* the full ``compute_formant_score`` result for the clip's target phoneme
+  (references from ``build_reference_rows()`` — no Mongo needed).
+
+Exit status is non-zero on any divergence, so it can gate a deploy:
+``python3 scripts/compare_formant_path_modes.py [clip ...]``.
+"""
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import HTTPException  # noqa: E402
+
+from data.formant_references import build_reference_rows  # noqa: E402
+from data.level_test_word_examples import LEVEL_TEST_WORD_EXAMPLES  # noqa: E402
+from routers import phoneme_formants as pf  # noqa: E402
+
+LEVELTEST_DIR = Path(__file__).parent.parent / "uploads" / "leveltest"
+_PHONEME_BY_LABEL = {s["label"]: s["phoneme"] for s in LEVEL_TEST_WORD_EXAMPLES}
+
+
+def _refs_for(rows: list, phoneme_ipa: str, dialect: str) -> list:
+    """Offline twin of ``find_reference`` over the static reference rows."""
+    candidates = pf._EQUIV.get(phoneme_ipa, [phoneme_ipa])
+    if phoneme_ipa not in candidates:
+        candidates = [phoneme_ipa] + candidates
+    for cand in candidates:
+        hit = [r for r in rows if r["phoneme_ipa"] == cand and r["dialect"] == dialect]
+        if hit:
+            return hit
+    return []
+
+
+def _score(meas: dict, refs: list, phoneme_ipa: str, dialect: str) -> dict:
+    try:
+        res = pf.compute_formant_score(meas, refs, phoneme_ipa, dialect)
+    except HTTPException as exc:
+        return {"status_code": exc.status_code, "detail": exc.detail}
+    res.pop("analyzed_at", None)
+    return res
+
+
+def compare_clip(path: Path, rows: list) -> dict:
+    """Measure + score one clip in both modes. Returns timings and the list of
+    divergent stages (empty list = identical)."""
+    label, dialect = path.stem.split("_")[:2]
+    phoneme_ipa = _PHONEME_BY_LABEL.get(label, "")
+    refs = _refs_for(rows, phoneme_ipa, dialect)
+
+    out, timings = {}, {}
+    for mode in ("legacy", "lean"):
+        t0 = time.perf_counter()
+        meas = pf._measure_all_ceilings(str(path), path_mode=mode)
+        timings[mode] = time.perf_counter() - t0
+        score = _score(meas, refs, phoneme_ipa, dialect) if meas and refs else None
+        diag = (score or {}).get("diagnostics") or ((score or {}).get("detail") or {}).get("expert") or {}
+        out[mode] = {
+            "meas": meas,
+            "selected": {"ceiling_hz": diag.get("ceiling_selected_hz"),
+                         "window_ms": diag.get("nucleus_window_ms"),
+                         "reliable": diag.get("reliable")},
+            "score": score,
+        }
+    diverged = [k for k in ("meas", "selected", "score")
+                if repr(out["legacy"][k]) != repr(out["lean"][k])]
+    score = out["lean"]["score"] or {}
+    return {
+        "clip": path.name, "phoneme": phoneme_ipa, "dialect": dialect,
+        "composite": score.get("composite_score", score.get("status_code")),
+        "legacy_s": timings["legacy"], "lean_s": timings["lean"],
+        "diverged": diverged,
+    }
+
+
+def main(argv: list) -> int:
+    clips = [Path(a) for a in argv] or sorted(LEVELTEST_DIR.glob("*.mp3"))
+    if not clips:
+        print(f"No recordings found under {LEVELTEST_DIR}")
+        return 1
+    rows = build_reference_rows()
+    failures = 0
+    total_legacy = total_lean = 0.0
+    for clip in clips:
+        r = compare_clip(clip, rows)
+        total_legacy += r["legacy_s"]
+        total_lean += r["lean_s"]
+        flag = "✅" if not r["diverged"] else f"❌ {','.join(r['diverged'])}"
+        failures += bool(r["diverged"])
+        print(f"  {flag} {r['clip']:<34} /{r['phoneme']}/ {r['dialect']:<3} "
+              f"score={r['composite']!s:<6} legacy={r['legacy_s']:.2f}s lean={r['lean_s']:.2f}s")
+    speedup = total_legacy / total_lean if total_lean else 0.0
+    print(f"\n{len(clips)} clips, {failures} divergent — "
+          f"legacy {total_legacy:.2f}s, lean {total_lean:.2f}s (×{speedup:.2f})")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
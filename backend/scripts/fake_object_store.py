@@ -0,0 +1,174 @@
+"""
+Local stand-in for Emergent Object Storage, for offline runs of ``storage_helper``.
+
+Answers ``POST …/init`` (``emergent_key`` → ``storage_key``) and
+``PUT`` / ``GET …/objects/<path>`` like the real API, keeping objects in
+memory. Every request, the peak number in flight and the client
+connections that carried them are recorded, so tests can assert
+keep-alive reuse and the client's concurrency cap. ``expire_keys()`` makes
+every issued key answer 403 (forces a refresh); ``failures`` scripts
+answers per object path: ``{"vocalfitness/uploads/a.mp3": [503]}`` fails
+the first request for that object before it succeeds.
+
+Point the backend at it with ``EMERGENT_STORAGE_URL``:
+
+``python3 scripts/fake_object_store.py --port 8766``
+``EMERGENT_STORAGE_URL=http://127.0.0.1:8766/api/v1/storage EMERGENT_LLM_KEY=dev …``
+"""
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+_PREFIX = "/api/v1/storage"
+
+
+class FakeObjectStore:
+    """Threaded HTTP/1.1 object store on ``127.0.0.1`` (``port=0`` → any free port)."""
+
+    def __init__(self, port: int = 0, latency_s: float = 0.0,
+                 failures: Optional[Dict[str, List[int]]] = None,
+                 emergent_key: str = "test-key"):
+        self.latency_s = latency_s
+        self.failures = {k: list(v) for k, v in (failures or {}).items()}
+        self.emergent_key = emergent_key
+        self.objects: Dict[str, Tuple[bytes, str]] = {}
+        self.requests: List[dict] = []
+        self.connections = set()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._keys: set = set()
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}{_PREFIX}"
+
+    @property
+    def inits(self) -> int:
+        return sum(1 for r in self.requests if r["method"] == "POST")
+
+    def expire_keys(self) -> None:
+        with self._lock:
+            self._keys.clear()
+
+    def start(self) -> "FakeObjectStore":
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeObjectStore":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"   # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: bytes = b"",
+                       ctype: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def _begin(self, path: str) -> int:
+                with server._lock:
+                    server.connections.add(self.client_address)
+                    server.in_flight += 1
+                    server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+                    plan = server.failures.get(path) or []
+                    status = plan.pop(0) if plan else 200
+                    server.requests.append({"method": self.command, "path": path,
+                                            "status": status, "at": time.monotonic()})
+                if server.latency_s:
+                    time.sleep(server.latency_s)
+                return status
+
+            def _end(self) -> None:
+                with server._lock:
+                    server.in_flight -= 1
+
+            def do_POST(self):
+                body = self._body()
+                if self.path != f"{_PREFIX}/init":
+                    return self._reply(404, b'{"detail":"not found"}')
+                status = self._begin("init")
+                try:
+                    if status != 200:
+                        return self._reply(status, b'{"detail":"scripted failure"}')
+                    if json.loads(body or b"{}").get("emergent_key") != server.emergent_key:
+                        return self._reply(401, b'{"detail":"invalid emergent key"}')
+                    with server._lock:
+                        key = f"sk-{len(server.requests)}"
+                        server._keys.add(key)
+                    self._reply(200, json.dumps({"storage_key": key}).encode())
+                finally:
+                    self._end()
+
+            def _object(self, write: bool):
+                body = self._body() if write else b""
+                if not self.path.startswith(f"{_PREFIX}/objects/"):
+                    return self._reply(404, b'{"detail":"not found"}')
+                path = self.path[len(f"{_PREFIX}/objects/"):]
+                status = self._begin(path)
+                try:
+                    if status != 200:
+                        return self._reply(status, b'{"detail":"scripted failure"}')
+                    if self.headers.get("X-Storage-Key") not in server._keys:
+                        return self._reply(403, b'{"detail":"storage key expired"}')
+                    if write:
+                        ctype = self.headers.get("Content-Type") or "application/octet-stream"
+                        server.objects[path] = (body, ctype)
+                        return self._reply(200, b'{"ok":true}')
+                    if path not in server.objects:
+                        return self._reply(404, b'{"detail":"not found"}')
+                    data, ctype = server.objects[path]
+                    self._reply(200, data, ctype)
+                finally:
+                    self._end()
+
+            def do_PUT(self):
+                self._object(write=True)
+
+            def do_GET(self):
+                self._object(write=False)
+
+        return Handler
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--port", type=int, default=8766)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    ap.add_argument("--emergent-key", default="dev")
+    args = ap.parse_args()
+    srv = FakeObjectStore(args.port, args.latency, emergent_key=args.emergent_key)
+    print(f"fake object store on {srv.url} (EMERGENT_LLM_KEY={args.emergent_key})")
+    try:
+        srv._httpd.serve_forever()
+    except KeyboardInterrupt:
+        srv.stop()
+
+
+if __name__ == "__main__":
+    main()
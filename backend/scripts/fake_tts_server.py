@@ -0,0 +1,126 @@
+"""
+Fake ElevenLabs text-to-speech server for offline runs of the async engine.
+
+Answers ``POST /v1/text-to-speech/{voice_id}`` like the real API (audio
+bytes, ``xi-api-key`` required) and records every request, the peak number
+of requests in flight and their arrival times, so tests can assert the
+engine's concurrency cap and token bucket. ``failures`` scripts answers per
+text: ``{"word": [429, 503]}`` makes the first two requests for ``word``
+fail with those statuses before it succeeds.
+
+Point the backend at it with ``ELEVENLABS_API_BASE``:
+
+``python3 scripts/fake_tts_server.py --port 8765 --latency 0.2``
+``ELEVENLABS_API_BASE=http://127.0.0.1:8765 ELEVENLABS_API_KEY=dev …``
+"""
+import json
+import time
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+
+class FakeTTSServer:
+    """Threaded fake TTS API on ``127.0.0.1`` (``port=0`` → any free port)."""
+
+    def __init__(self, port: int = 0, latency_s: float = 0.0,
+                 failures: Optional[Dict[str, List[int]]] = None,
+                 api_key: str = "test-key"):
+        self.latency_s = latency_s
+        self.failures = {k: list(v) for k, v in (failures or {}).items()}
+        self.api_key = api_key
+        self.requests: List[dict] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeTTSServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeTTSServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status: int, body: bytes, ctype: str, headers=None):
+                self.send_response(status)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                path, _, query = self.path.partition("?")
+                if not path.startswith("/v1/text-to-speech/"):
+                    return self._reply(404, b'{"detail":"not found"}', "application/json")
+                if self.headers.get("xi-api-key") != server.api_key:
+                    return self._reply(401, b'{"detail":"invalid api key"}', "application/json")
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)))
+                text = body.get("text", "")
+                with server._lock:
+                    server.in_flight += 1
+                    server.peak_in_flight = max(server.peak_in_flight, server.in_flight)
+                    plan = server.failures.get(text) or []
+                    status = plan.pop(0) if plan else 200
+                    server.requests.append({
+                        "voice_id": path.rsplit("/", 1)[-1], "query": query,
+                        "text": text, "model_id": body.get("model_id"),
+                        "voice_settings": body.get("voice_settings"),
+                        "status": status, "at": time.monotonic(),
+                    })
+                try:
+                    if server.latency_s:
+                        time.sleep(server.latency_s)
+                    if status != 200:
+                        headers = {"Retry-After": "0"} if status == 429 else None
+                        return self._reply(status, b'{"detail":"scripted failure"}',
+                                           "application/json", headers)
+                    self._reply(200, b"ID3fake:" + text.encode(), "audio/mpeg")
+                finally:
+                    with server._lock:
+                        server.in_flight -= 1
+
+        return Handler
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds per request")
+    ap.add_argument("--api-key", default="dev")
+    args = ap.parse_args()
+    srv = FakeTTSServer(args.port, args.latency, api_key=args.api_key)
+    print(f"fake TTS on {srv.url} (xi-api-key={args.api_key})")
+    try:
+        srv._httpd.serve_forever()
+    except KeyboardInterrupt:
+        srv.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,4 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, BackgroundTasks, Request
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, BackgroundTasks, Request, Query, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
@@ -32,7 +32,9 @@ THUMBNAILS_DIR.mkdir(exist_ok=True)
 load_dotenv(ROOT_DIR / '.env')
 
 # Emergent Object Storage (persistent across deploys)
-from storage_helper import init_storage as _init_emergent_storage, put_object as emergent_put, get_object as emergent_get, guess_content_type as guess_mime
+from storage_helper import init_storage_async as _init_emergent_storage, get_object_async as emergent_get, guess_content_type as guess_mime, storage as emergent_storage
+# Object-storage puts go through the storage ledger (per-prefix usage counters)
+from utils.storage_ledger import ensure_storage_ledger, tracked_put as emergent_put
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
@@ -61,6 +63,8 @@ async def create_indexes():
         await db.member_content.create_index("content_type")
         await db.member_content.create_index("order")
         await db.member_content.create_index([("category", 1), ("order", 1)])
+        await db.member_content.create_index([("folder_id", 1), ("order", 1)])
+        await db.member_content.create_index([("visible_to", 1), ("order", 1), ("id", 1)])
         
         # Newsletter subscribers indexes
         await db.newsletter_subscribers.create_index("email", unique=True)
@@ -136,6 +140,24 @@ async def create_indexes():
         await db.level_test_sessions.create_index("session_id", unique=True)
         await db.level_test_sessions.create_index("created_at")
 
+        # Phoneme cards — the public card read is a single find_one by id
+        await db.phoneme_cards.create_index("id", unique=True)
+        await db.phoneme_cards.create_index([("published", 1), ("order", 1)])
+        await db.phoneme_regen_jobs.create_index("id", unique=True)
+        await db.phoneme_regen_jobs.create_index("createdAt")
+        await db.phoneme_audio_runs.create_index("cardId", unique=True)
+        await db.phoneme_audio_jobs.create_index("id", unique=True)
+        await db.phoneme_audio_jobs.create_index("status")
+        await db.tts_cache.create_index("key", unique=True)
+
+        # Formant measurement cache (content-addressed, TTL-expired)
+        from routers.measurement_cache import ensure_measurement_cache_indexes
+        await ensure_measurement_cache_indexes(db)
+
+        # Precomputed teacher-reference formants (one row per clip URL)
+        from routers.teacher_references import ensure_teacher_reference_indexes
+        await ensure_teacher_reference_indexes(db)
+
         logging.info("MongoDB indexes created successfully")
     except Exception as e:
         logging.error(f"Error creating indexes: {e}")
@@ -149,9 +171,20 @@ async def startup_event():
     except Exception as e:
         logging.warning(f"Admin seeding at startup failed (non-fatal): {e}")
     try:
-        _init_emergent_storage()
+        await _init_emergent_storage()
     except Exception as e:
         logging.warning(f"Emergent storage init at startup failed (will retry on first use): {e}")
+    try:
+        if await ensure_storage_ledger(db):
+            logging.info("Storage ledger: first build started in the background")
+    except Exception as e:
+        logging.warning(f"Storage ledger init failed (usage reads 0 until reconciled): {e}")
+    try:
+        reindexed = await ensure_visibility_index(db)
+        if reindexed:
+            logging.info(f"Member content visibility index: back-filled {reindexed} items")
+    except Exception as e:
+        logging.warning(f"Member content visibility back-fill failed (non-fatal): {e}")
     try:
         from routers.phoneme_cards import ensure_phoneme_seed
         result = await ensure_phoneme_seed(db)
@@ -167,15 +200,85 @@ async def startup_event():
     try:
         from routers.canonical_phonemes import ensure_canonical_seed
         result = await ensure_canonical_seed(db)
-        logging.info(f"Canonical phoneme inventory seed: upserted={result['upserted']} total={result['total']}")
+        logging.info(f"Canonical phoneme inventory seed: upserted={result['upserted']} changed={result['changed']} total={result['total']} version={result['version']}")
     except Exception as e:
         logging.warning(f"Canonical phoneme seed failed (non-fatal): {e}")
+    try:
+        from routers.phoneme_cards import refresh_stale_readiness
+        refreshed = await refresh_stale_readiness(db)
+        logging.info(f"Phoneme readiness badges refreshed: {len(refreshed)}")
+    except Exception as e:
+        logging.warning(f"Phoneme readiness refresh failed (admin list recomputes lazily): {e}")
+    try:
+        from routers.phoneme_cards import refresh_stale_charts
+        refreshed = await refresh_stale_charts(db)
+        logging.info(f"Phoneme frequency charts materialised: {refreshed}")
+    except Exception as e:
+        logging.warning(f"Phoneme frequency chart refresh failed (reads recompute lazily): {e}")
+    try:
+        from routers.phoneme_cards import resume_catalogue_audio_jobs
+        resumed = await resume_catalogue_audio_jobs(db)
+        if resumed:
+            logging.info(f"Catalogue audio job resumed: {resumed[0]}")
+    except Exception as e:
+        logging.warning(f"Catalogue audio job resume failed (restart it from the dashboard): {e}")
+    try:
+        from routers.phoneme_cards import fail_interrupted_regen_jobs
+        interrupted = await fail_interrupted_regen_jobs(db)
+        if interrupted:
+            logging.info(f"Regenerate-derived jobs interrupted by restart: {interrupted}")
+    except Exception as e:
+        logging.warning(f"Interrupted regenerate-derived jobs not closed: {e}")
     try:
         from routers.phoneme_formants import ensure_formant_references
         result = await ensure_formant_references(db)
         logging.info(f"Formant references seed: inserted={result['inserted']} total={result['total']}")
     except Exception as e:
         logging.warning(f"Formant references seed failed (non-fatal): {e}")
+    try:
+        from routers.phoneme_formants import load_reference_index
+        rows = await load_reference_index(db)
+        logging.info(f"Formant reference index loaded: rows={rows}")
+    except Exception as e:
+        logging.warning(f"Formant reference index load failed (loads on first lookup): {e}")
+    try:
+        from routers.phoneme_lexicon_rule import schedule_lexicon_warmup
+        if schedule_lexicon_warmup():
+            logging.info("Lexicon index warm-up scheduled")
+    except Exception as e:
+        logging.warning(f"Lexicon warm-up not scheduled (loads on first use): {e}")
+    try:
+        from routers.audio_ingest import sweep_stale_spools
+        removed = sweep_stale_spools()
+        if removed:
+            logging.info(f"Removed {removed} stale audio spool file(s)")
+    except Exception as e:
+        logging.warning(f"Audio spool sweep failed: {e}")
+    try:
+        from routers.analysis_pool import start_analysis_pool
+        result = await start_analysis_pool()
+        logging.info(f"Analysis pool warm: workers={result['workers']} warm_s={result['warm_s']}")
+    except Exception as e:
+        logging.warning(f"Analysis pool warm-up failed (workers will spawn on first job): {e}")
+
+
+# Thumbnail URL + rendition manifest as stored on member_content
+# (routers/thumbnail_jobs.py).
+from routers.thumbnail_jobs import thumbnail_fields
+
+# Member-area visibility predicate, one-aggregation folder counts and the
+# per-user visibility index on member_content (utils/member_content.py).
+from utils.member_content import (
+    PUBLIC,
+    client_visibility_filter,
+    encode_cursor,
+    ensure_visibility_index,
+    folder_content_counts,
+    page_query,
+    readable_by,
+    reindex_content,
+    visibility_fields,
+)
 
 
 # ==================== AUTHENTICATION CONFIG ====================
@@ -418,6 +521,11 @@ class ContentCreate(BaseModel):
     hide_origin: bool = False  # Hide source URL from clients
     embed_code: str = ""  # Custom embed code (optional)
 
+class ThumbnailRendition(BaseModel):
+    url: str
+    width: int
+    type: str  # MIME type: "image/webp" or the "image/jpeg" fallback
+
 class ContentResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str
@@ -426,6 +534,7 @@ class ContentResponse(BaseModel):
     content_type: str
     url: str
     thumbnail_url: str = ""
+    thumbnail_renditions: List[ThumbnailRendition] = []  # srcset candidates (empty for external thumbnails)
     folder_id: Optional[str] = None
     folder_name: Optional[str] = None
     is_public: bool = True
@@ -916,11 +1025,11 @@ async def create_folder(folder: FolderCreate, admin: dict = Depends(get_admin_us
 async def list_all_folders(admin: dict = Depends(get_admin_user)):
     """List all folders (admin only)"""
     folders = await db.folders.find({}, {"_id": 0}).sort("order", 1).to_list(1000)
+    counts = await folder_content_counts(db, (f["id"] for f in folders))
     
     result = []
     for f in folders:
-        # Count content in this folder
-        content_count = await db.member_content.count_documents({"folder_id": f["id"]})
+        content_count = counts.get(f["id"], 0)
         result.append(FolderResponse(
             id=f["id"],
             name=f["name"],
@@ -945,6 +1054,8 @@ async def update_folder(folder_id: str, update: FolderUpdate, admin: dict = Depe
     update_data = {k: v for k, v in update.model_dump().items() if v is not None}
     
     await db.folders.update_one({"id": folder_id}, {"$set": update_data})
+    if "assigned_users" in update_data or "name" in update_data:
+        await reindex_content(db, {"folder_id": folder_id})
     
     updated = await db.folders.find_one({"id": folder_id}, {"_id": 0})
     content_count = await db.member_content.count_documents({"folder_id": folder_id})
@@ -968,8 +1079,11 @@ async def delete_folder(folder_id: str, admin: dict = Depends(get_admin_user)):
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Cartella non trovata")
     
-    # Remove folder_id from contents
+    # Remove folder_id from contents (and the folder's grants from the index)
+    orphaned = await db.member_content.find({"folder_id": folder_id}, {"_id": 0, "id": 1}).to_list(None)
     await db.member_content.update_many({"folder_id": folder_id}, {"$set": {"folder_id": None}})
+    if orphaned:
+        await reindex_content(db, {"id": {"$in": [c["id"] for c in orphaned]}})
     
     return {"message": "Cartella eliminata con successo"}
 
@@ -984,6 +1098,7 @@ async def assign_users_to_folder(folder_id: str, request: AssignUsersRequest, ad
         {"id": folder_id},
         {"$set": {"assigned_users": request.user_ids}}
     )
+    await reindex_content(db, {"folder_id": folder_id})
     
     return {"message": f"Utenti assegnati alla cartella", "assigned_users": request.user_ids}
 
@@ -994,12 +1109,11 @@ async def create_content(content: ContentCreate, admin: dict = Depends(get_admin
     content_id = str(uuid.uuid4())
     now = datetime.now(timezone.utc)
     
-    # Get folder name if folder_id is provided
-    folder_name = None
+    # Get folder name (and its grants, for the visibility index) if folder_id is provided
+    folder = None
     if content.folder_id:
-        folder = await db.folders.find_one({"id": content.folder_id}, {"_id": 0, "name": 1})
-        if folder:
-            folder_name = folder["name"]
+        folder = await db.folders.find_one({"id": content.folder_id}, {"_id": 0, "name": 1, "assigned_users": 1})
+    folder_name = folder["name"] if folder else None
     
     content_doc = {
         "id": content_id,
@@ -1007,7 +1121,6 @@ async def create_content(content: ContentCreate, admin: dict = Depends(get_admin
         "description": content.description,
         "content_type": content.content_type,
         "url": content.url,
-        "thumbnail_url": content.thumbnail_url,
         "folder_id": content.folder_id,
         "is_public": content.is_public,
         "assigned_users": content.assigned_users,
@@ -1018,6 +1131,8 @@ async def create_content(content: ContentCreate, admin: dict = Depends(get_admin
         "updated_at": now.isoformat(),
         "created_by": admin["username"]
     }
+    content_doc.update(visibility_fields(content_doc, folder))
+    content_doc.update(await thumbnail_fields(content.thumbnail_url))
     
     await db.member_content.insert_one(content_doc)
     
@@ -1028,6 +1143,7 @@ async def create_content(content: ContentCreate, admin: dict = Depends(get_admin
         content_type=content.content_type,
         url=content.url,
         thumbnail_url=content.thumbnail_url,
+        thumbnail_renditions=content_doc["thumbnail_renditions"],
         folder_id=content.folder_id,
         folder_name=folder_name,
         is_public=content.is_public,
@@ -1056,6 +1172,7 @@ async def list_all_content(admin: dict = Depends(get_admin_user)):
             content_type=c["content_type"],
             url=c["url"],
             thumbnail_url=c.get("thumbnail_url", ""),
+            thumbnail_renditions=c.get("thumbnail_renditions", []),
             folder_id=c.get("folder_id"),
             folder_name=folder_map.get(c.get("folder_id")) if c.get("folder_id") else None,
             is_public=c.get("is_public", True),
@@ -1078,8 +1195,12 @@ async def update_content(content_id: str, update: ContentUpdate, admin: dict = D
     
     update_data = {k: v for k, v in update.model_dump().items() if v is not None}
     update_data["updated_at"] = datetime.now(timezone.utc).isoformat()
+    if "thumbnail_url" in update_data:
+        update_data.update(await thumbnail_fields(update_data["thumbnail_url"]))
     
     await db.member_content.update_one({"id": content_id}, {"$set": update_data})
+    if update_data.keys() & {"is_public", "assigned_users", "folder_id"}:
+        await reindex_content(db, {"id": content_id})
     
     updated = await db.member_content.find_one({"id": content_id}, {"_id": 0})
     
@@ -1097,6 +1218,7 @@ async def update_content(content_id: str, update: ContentUpdate, admin: dict = D
         content_type=updated["content_type"],
         url=updated["url"],
         thumbnail_url=updated.get("thumbnail_url", ""),
+        thumbnail_renditions=updated.get("thumbnail_renditions", []),
         folder_id=updated.get("folder_id"),
         folder_name=folder_name,
         is_public=updated.get("is_public", True),
@@ -1119,6 +1241,7 @@ async def assign_users_to_content(content_id: str, request: AssignUsersRequest,
         {"id": content_id},
         {"$set": {"assigned_users": request.user_ids}}
     )
+    await reindex_content(db, {"id": content_id})
     
     return {"message": f"Utenti assegnati al contenuto", "assigned_users": request.user_ids}
 
@@ -1131,88 +1254,19 @@ async def delete_content(content_id: str, admin: dict = Depends(get_admin_user))
     return {"message": "Contenuto eliminato con successo"}
 
 
-@api_router.post("/admin/content/{content_id}/regenerate-thumbnail")
-async def regenerate_content_thumbnail(content_id: str, admin: dict = Depends(get_admin_user)):
-    """Regenerate thumbnail for a single content item"""
-    content = await db.member_content.find_one({"id": content_id}, {"_id": 0})
-    if not content:
-        raise HTTPException(status_code=404, detail="Contenuto non trovato")
-
-    url = content.get("url", "")
-    content_type = content.get("content_type", "")
-    thumbnail_url = None
-
-    # Try URL-based thumbnail (YouTube, Google Drive)
-    yt_thumb = get_youtube_thumbnail(url)
-    if yt_thumb:
-        thumbnail_url = yt_thumb
-    else:
-        drive_match = re.search(r'drive\.google\.com\/file\/d\/([a-zA-Z0-9_-]+)', url)
-        if drive_match:
-            thumbnail_url = f"https://drive.google.com/thumbnail?id={drive_match.group(1)}&sz=w480"
-
-    # Try file-based thumbnail (uploaded video/PDF)
-    if not thumbnail_url and url:
-        filename = url.split("/api/uploads/")[-1] if "/api/uploads/" in url else ""
-        if filename:
-            file_path = UPLOADS_DIR / filename
-            if file_path.exists():
-                thumbnail_url = auto_generate_thumbnail(file_path, content_type=content_type)
-
-    if thumbnail_url:
-        await db.member_content.update_one({"id": content_id}, {"$set": {"thumbnail_url": thumbnail_url}})
-        return {"success": True, "thumbnail_url": thumbnail_url}
-
-    return {"success": False, "thumbnail_url": "", "message": "Impossibile generare anteprima per questo contenuto"}
-
-
-@api_router.post("/admin/content/regenerate-all-thumbnails")
-async def regenerate_all_thumbnails(admin: dict = Depends(get_admin_user)):
-    """Regenerate thumbnails for all content items without one"""
-    contents = await db.member_content.find({}, {"_id": 0}).to_list(1000)
-    updated = 0
-    for c in contents:
-        if c.get("thumbnail_url"):
-            continue
-        url = c.get("url", "")
-        content_type = c.get("content_type", "")
-        thumbnail_url = None
-
-        yt_thumb = get_youtube_thumbnail(url)
-        if yt_thumb:
-            thumbnail_url = yt_thumb
-        else:
-            drive_match = re.search(r'drive\.google\.com\/file\/d\/([a-zA-Z0-9_-]+)', url)
-            if drive_match:
-                thumbnail_url = f"https://drive.google.com/thumbnail?id={drive_match.group(1)}&sz=w480"
-
-        if not thumbnail_url and url:
-            filename = url.split("/api/uploads/")[-1] if "/api/uploads/" in url else ""
-            if filename:
-                file_path = UPLOADS_DIR / filename
-                if file_path.exists():
-                    thumbnail_url = auto_generate_thumbnail(file_path, content_type=content_type)
-
-        if thumbnail_url:
-            await db.member_content.update_one({"id": c["id"]}, {"$set": {"thumbnail_url": thumbnail_url}})
-            updated += 1
-
-    return {"success": True, "updated": updated, "total": len(contents)}
+# Thumbnail regeneration (single item + bulk background job) extracted to
+# routers/thumbnail_jobs.py — wired below via ``build_thumbnail_jobs_router``.
 
 
 # ==================== FILE UPLOAD ENDPOINT (Admin) ====================
 # Constants + helpers extracted to utils/storage.py.
 # Upload / delete / serve endpoints extracted to routers/uploads.py.
 # Re-import the constants + helpers so the remaining endpoints in this
-# file (content thumbnail regeneration, popup media upload, DB stats)
-# can keep referring to them unchanged.
+# file (popup media upload, DB stats) can keep referring to them unchanged.
 from utils.storage import (
     UPLOAD_MAX_FILE_SIZE,
     UPLOAD_MAX_TOTAL_STORAGE,
-    auto_generate_thumbnail,
     format_size,
-    get_total_storage_used,
-    get_youtube_thumbnail,
 )
 
 
@@ -1289,95 +1343,79 @@ async def get_member_folders(current_user: dict = Depends(get_current_user)):
         folders = await db.folders.find({}, {"_id": 0}).sort("order", 1).to_list(1000)
     else:
         # Client sees public folders OR folders assigned to them
-        folders = await db.folders.find({
-            "$or": [
-                {"is_public": True},
-                {"assigned_users": user_id}
-            ]
-        }, {"_id": 0}).sort("order", 1).to_list(1000)
+        folders = await db.folders.find(client_visibility_filter(user_id), {"_id": 0}).sort("order", 1).to_list(1000)
+    
+    # Content visible to the user, counted for every folder in one aggregation
+    counts = await folder_content_counts(db, (f["id"] for f in folders),
+                                         None if is_admin else user_id)
     
     result = []
     for f in folders:
-        # Count content visible to user in this folder
-        if is_admin:
-            content_count = await db.member_content.count_documents({"folder_id": f["id"]})
-        else:
-            content_count = await db.member_content.count_documents({
-                "folder_id": f["id"],
-                "$or": [
-                    {"is_public": True},
-                    {"assigned_users": user_id}
-                ]
-            })
-        
         result.append({
             "id": f["id"],
             "name": f["name"],
             "description": f.get("description", ""),
             "thumbnail_url": f.get("thumbnail_url", ""),
-            "content_count": content_count,
+            "content_count": counts.get(f["id"], 0),
             "order": f.get("order", 0)
         })
     
     return result
 
+def _content_response(c: dict, is_admin: bool) -> ContentResponse:
+    return ContentResponse(
+        id=c["id"],
+        title=c["title"],
+        description=c.get("description", ""),
+        content_type=c["content_type"],
+        url=c["url"] if not c.get("hide_origin") else "",  # Hide URL if hide_origin is true
+        thumbnail_url=c.get("thumbnail_url", ""),
+        thumbnail_renditions=c.get("thumbnail_renditions", []),
+        folder_id=c.get("folder_id"),
+        folder_name=c.get("folder_name") if c.get("folder_id") else None,
+        is_public=c.get("is_public", True),
+        assigned_users=c.get("assigned_users", []) if is_admin else [],  # Only admin sees assignments
+        order=c.get("order", 0),
+        hide_origin=c.get("hide_origin", False),
+        embed_code=c.get("embed_code", ""),
+        created_at=datetime.fromisoformat(c["created_at"]) if isinstance(c["created_at"], str) else c["created_at"],
+        updated_at=datetime.fromisoformat(c["updated_at"]) if isinstance(c.get("updated_at"), str) else c.get("updated_at")
+    )
+
 @api_router.get("/members/content", response_model=List[ContentResponse])
-async def get_member_content(current_user: dict = Depends(get_current_user), folder_id: str = None):
-    """Get available content for authenticated members (filtered by visibility)"""
+async def get_member_content(
+    response: Response,
+    current_user: dict = Depends(get_current_user),
+    folder_id: str = None,
+    limit: int = Query(1000, ge=1, le=1000),
+    cursor: Optional[str] = None,
+):
+    """Get available content for authenticated members (filtered by visibility).
+
+    One query on the ``visible_to`` index; folder names come from the
+    denormalised ``folder_name``. Keyset-paginated on ``(order, id)``: when
+    more items follow, the ``X-Next-Cursor`` response header carries the
+    ``cursor`` for the next page.
+    """
     user_id = current_user["id"]
     is_admin = current_user.get("role") == "admin"
     
-    # Build query based on user role and folder
-    if is_admin:
-        # Admin sees all content
-        query = {}
-        if folder_id:
-            query["folder_id"] = folder_id
-    else:
-        # Client sees: public content OR content assigned to them OR content in assigned folders
-        # First get folders assigned to user
-        assigned_folders = await db.folders.find(
-            {"assigned_users": user_id},
-            {"_id": 0, "id": 1}
-        ).to_list(1000)
-        assigned_folder_ids = [f["id"] for f in assigned_folders]
-        
-        query = {
-            "$or": [
-                {"is_public": True},
-                {"assigned_users": user_id},
-                {"folder_id": {"$in": assigned_folder_ids}} if assigned_folder_ids else {"folder_id": "__none__"}
-            ]
-        }
-        if folder_id:
-            query = {"$and": [query, {"folder_id": folder_id}]}
-    
-    contents = await db.member_content.find(query, {"_id": 0}).sort("order", 1).to_list(1000)
+    # Admin sees all content; client sees what the visibility index grants them
+    query = {} if is_admin else readable_by(user_id)
+    if folder_id:
+        query["folder_id"] = folder_id
+    try:
+        query = page_query(query, cursor)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Cursore non valido")
     
-    # Get folder names
-    folders = await db.folders.find({}, {"_id": 0, "id": 1, "name": 1}).to_list(1000)
-    folder_map = {f["id"]: f["name"] for f in folders}
+    contents = await db.member_content.find(query, {"_id": 0, "visible_to": 0}) \
+        .sort([("order", 1), ("id", 1)]).limit(limit + 1).to_list(limit + 1)
+    if len(contents) > limit:
+        contents = contents[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(contents[-1])
     
-    return [
-        ContentResponse(
-            id=c["id"],
-            title=c["title"],
-            description=c.get("description", ""),
-            content_type=c["content_type"],
-            url=c["url"] if not c.get("hide_origin") else "",  # Hide URL if hide_origin is true
-            thumbnail_url=c.get("thumbnail_url", ""),
-            folder_id=c.get("folder_id"),
-            folder_name=folder_map.get(c.get("folder_id")) if c.get("folder_id") else None,
-            is_public=c.get("is_public", True),
-            assigned_users=c.get("assigned_users", []) if is_admin else [],  # Only admin sees assignments
-            order=c.get("order", 0),
-            hide_origin=c.get("hide_origin", False),
-            embed_code=c.get("embed_code", ""),
-            created_at=datetime.fromisoformat(c["created_at"]) if isinstance(c["created_at"], str) else c["created_at"],
-            updated_at=datetime.fromisoformat(c["updated_at"]) if isinstance(c.get("updated_at"), str) else c.get("updated_at")
-        )
-        for c in contents
-    ]
+    return [_content_response(c, is_admin) for c in contents]
 
 @api_router.get("/members/content/{content_id}", response_model=ContentResponse)
 async def get_single_content(content_id: str, current_user: dict = Depends(get_current_user)):
@@ -1389,45 +1427,11 @@ async def get_single_content(content_id: str, current_user: dict = Depends(get_c
     if not content:
         raise HTTPException(status_code=404, detail="Contenuto non trovato")
     
-    # Check access permission (unless admin)
-    if not is_admin:
-        is_public = content.get("is_public", True)
-        is_assigned = user_id in content.get("assigned_users", [])
-        
-        # Check if in assigned folder
-        in_assigned_folder = False
-        if content.get("folder_id"):
-            folder = await db.folders.find_one({"id": content["folder_id"]}, {"_id": 0})
-            if folder and user_id in folder.get("assigned_users", []):
-                in_assigned_folder = True
-        
-        if not (is_public or is_assigned or in_assigned_folder):
-            raise HTTPException(status_code=403, detail="Non hai accesso a questo contenuto")
-    
-    # Get folder name
-    folder_name = None
-    if content.get("folder_id"):
-        folder = await db.folders.find_one({"id": content["folder_id"]}, {"_id": 0, "name": 1})
-        if folder:
-            folder_name = folder["name"]
+    # Check access permission (unless admin) against the visibility index
+    if not is_admin and not {PUBLIC, user_id} & set(content.get("visible_to") or []):
+        raise HTTPException(status_code=403, detail="Non hai accesso a questo contenuto")
     
-    return ContentResponse(
-        id=content["id"],
-        title=content["title"],
-        description=content.get("description", ""),
-        content_type=content["content_type"],
-        url=content["url"] if not content.get("hide_origin") else "",  # Hide URL if hide_origin
-        thumbnail_url=content.get("thumbnail_url", ""),
-        folder_id=content.get("folder_id"),
-        folder_name=folder_name,
-        is_public=content.get("is_public", True),
-        assigned_users=content.get("assigned_users", []) if is_admin else [],
-        order=content.get("order", 0),
-        hide_origin=content.get("hide_origin", False),
-        embed_code=content.get("embed_code", ""),
-        created_at=datetime.fromisoformat(content["created_at"]) if isinstance(content["created_at"], str) else content["created_at"],
-        updated_at=datetime.fromisoformat(content["updated_at"]) if isinstance(content.get("updated_at"), str) else content.get("updated_at")
-    )
+    return _content_response(content, is_admin)
 
 # ==================== ELEVENLABS TTS / VOICE CLONING ====================
 # Endpoints extracted to routers/elevenlabs.py — wired below via
@@ -1607,6 +1611,7 @@ async def import_youtube_playlist(
             "youtube_video_id": video["video_id"],  # Track original YouTube ID
             "created_at": datetime.now(timezone.utc).isoformat()
         }
+        content_doc.update(visibility_fields(content_doc, folder_doc))
         content_docs.append(content_doc)
     
     if content_docs:
@@ -1643,8 +1648,9 @@ async def get_youtube_playlists(admin: dict = Depends(get_admin_user)):
     playlists = await db.youtube_playlists.find({}, {"_id": 0}).sort("created_at", -1).to_list(1000)
     
     # Get current video counts
+    counts = await folder_content_counts(db, (p.get("folder_id") for p in playlists))
     for p in playlists:
-        p["current_video_count"] = await db.member_content.count_documents({"folder_id": p["folder_id"]})
+        p["current_video_count"] = counts.get(p.get("folder_id"), 0)
         # Convert datetime strings if needed
         if isinstance(p.get("last_sync"), str):
             p["last_sync"] = datetime.fromisoformat(p["last_sync"])
@@ -1702,6 +1708,7 @@ async def sync_youtube_playlist(playlist_doc_id: str, admin: dict = Depends(get_
             content_docs.append(content_doc)
         
         await db.member_content.insert_many(content_docs)
+        await reindex_content(db, {"id": {"$in": [c["id"] for c in content_docs]}})
     
     # Update playlist doc
     await db.youtube_playlists.update_one(
@@ -1800,6 +1807,7 @@ async def update_playlist_users(playlist_doc_id: str, data: AssignUsersRequest,
         {"folder_id": folder_id},
         {"$set": {"assigned_users": data.user_ids}}
     )
+    await reindex_content(db, {"folder_id": folder_id})
     
     return {
         "success": True,
@@ -1907,13 +1915,19 @@ from routers.canonical_phonemes import build_canonical_phonemes_router
 from routers.phoneme_recordings import build_phoneme_recordings_router
 from routers.phoneme_formants import build_phoneme_formants_router, ensure_formant_references
 from routers.level_test import build_level_test_router
+from routers.analysis_pool import build_analysis_pool_router, shutdown_analysis_pool
+from routers.measurement_cache import build_measurement_cache_router
+from routers.thumbnail_jobs import build_thumbnail_jobs_router, shutdown_thumbnail_pool
 api_router.include_router(build_phoneme_formants_router(db, get_current_user, emergent_put, UPLOADS_DIR))
 api_router.include_router(build_level_test_router(db, get_admin_user, emergent_put, UPLOADS_DIR))
+api_router.include_router(build_analysis_pool_router(get_admin_user))
+api_router.include_router(build_measurement_cache_router(db, get_admin_user))
 api_router.include_router(build_phoneme_cards_router(db, get_admin_user, build_user_deps.optional_admin))
 api_router.include_router(build_phoneme_recordings_router(db, get_current_user, emergent_put, UPLOADS_DIR))
-api_router.include_router(build_elevenlabs_router(get_admin_user, emergent_put, UPLOADS_DIR))
+api_router.include_router(build_elevenlabs_router(db, get_admin_user, emergent_put, UPLOADS_DIR))
 api_router.include_router(build_admin_leads_router(db, get_admin_user))
 api_router.include_router(build_proposals_router(db, get_admin_user))
+api_router.include_router(build_thumbnail_jobs_router(db, get_admin_user))
 api_router.include_router(build_uploads_router(get_admin_user, emergent_put, emergent_get, guess_mime))
 api_router.include_router(build_testimonials_clients_router(db))
 api_router.include_router(build_messages_router(db, get_admin_user, get_current_user, get_conversation_id, send_notification_email))
@@ -1934,6 +1948,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Configure logging
@@ -1945,4 +1960,7 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    shutdown_analysis_pool()
+    shutdown_thumbnail_pool()
+    await emergent_storage.aclose()
     client.close()
\ No newline at end of file
@@ -7,12 +7,21 @@ Used as a backup-source for /api/uploads/{filename} static files:
   - On download: try local disk first, fallback to fetching from Emergent storage
 
 This avoids any DB migration: existing URLs (/api/uploads/<safe_filename>) keep working.
+
+Async endpoints await ``put_object_async`` / ``get_object_async`` (one pooled,
+rate-limited ``StorageClient``); ``put_object`` / ``get_object`` are the
+blocking facade kept for CLI scripts such as ``backfill_uploads.py``.
 """
 import os
+import random
+import asyncio
 import logging
-import requests
+import threading
+import importlib.util
 from typing import Optional, Tuple
 
+import httpx
+
 logger = logging.getLogger(__name__)
 
 STORAGE_URL = "https://integrations.emergentagent.com/objstore/api/v1/storage"
@@ -20,37 +29,19 @@ APP_NAME = "vocalfitness"
 
 _storage_key: Optional[str] = None
 
+# HTTP/2 multiplexes concurrent transfers over one connection; httpx only
+# speaks it when the optional ``h2`` package is installed.
+_HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
 
 def _emergent_key() -> Optional[str]:
     return os.environ.get("EMERGENT_LLM_KEY")
 
 
-def init_storage() -> Optional[str]:
-    """Initialize the storage session. Returns a reusable storage_key.
-
-    Safe to call multiple times — caches the key after first success.
-    Returns None if EMERGENT_LLM_KEY is missing or init fails.
-    """
-    global _storage_key
-    if _storage_key:
-        return _storage_key
-    key = _emergent_key()
-    if not key:
-        logger.warning("EMERGENT_LLM_KEY not set — Emergent Object Storage disabled.")
-        return None
-    try:
-        resp = requests.post(
-            f"{STORAGE_URL}/init",
-            json={"emergent_key": key},
-            timeout=30,
-        )
-        resp.raise_for_status()
-        _storage_key = resp.json().get("storage_key")
-        logger.info("Emergent Object Storage initialized.")
-        return _storage_key
-    except Exception as e:
-        logger.error(f"Emergent storage init failed: {e}")
-        return None
+def _storage_url() -> str:
+    """Storage API base. ``EMERGENT_STORAGE_URL`` points the backend at a
+    stand-in store (``scripts/fake_object_store.py``) for offline runs."""
+    return (os.environ.get("EMERGENT_STORAGE_URL") or STORAGE_URL).rstrip("/")
 
 
 def _reset_key():
@@ -63,29 +54,153 @@ def _path_for(filename: str) -> str:
     return f"{APP_NAME}/uploads/{filename.lstrip('/')}"
 
 
-def put_object(filename: str, data: bytes, content_type: str = "application/octet-stream") -> bool:
-    """Upload bytes to Emergent storage at vocalfitness/uploads/<filename>.
-    Returns True on success, False on failure (so callers can decide to continue).
+class StorageClient:
+    """Async Emergent Object Storage client on one pooled ``httpx.AsyncClient``.
+
+    Connections are kept alive and reused across requests (HTTP/2 when
+    ``h2`` is installed), at most ``concurrency`` transfers run at once,
+    transport errors / 429 / 5xx are retried with jittered exponential
+    backoff, and a 403 (expired ``storage_key``) refreshes the key once per
+    request. The storage key is shared process-wide (``_storage_key``), so
+    one refresh serves every caller. The HTTP client, semaphore and lock
+    belong to the event loop that created them and are rebuilt if the
+    client is used from another loop.
     """
-    key = init_storage()
-    if not key:
-        return False
-    path = _path_for(filename)
-    for attempt in range(2):
-        try:
-            resp = requests.put(
-                f"{STORAGE_URL}/objects/{path}",
-                headers={"X-Storage-Key": key, "Content-Type": content_type},
-                data=data,
-                timeout=180,
+
+    def __init__(self, *, concurrency: int = 16, max_connections: int = 20,
+                 max_keepalive: int = 10, max_retries: int = 3, backoff_s: float = 0.5,
+                 timeout_s: float = 120.0, put_timeout_s: float = 180.0,
+                 http2: bool = True):
+        self.concurrency = max(1, concurrency)
+        self.max_connections = max(1, max_connections)
+        self.max_keepalive = max(0, max_keepalive)
+        self.max_retries = max(0, max_retries)
+        self.backoff_s = backoff_s
+        self.timeout_s = timeout_s
+        self.put_timeout_s = put_timeout_s
+        self.http2 = http2 and _HTTP2_AVAILABLE
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._http: Optional[httpx.AsyncClient] = None
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._key_lock: Optional[asyncio.Lock] = None
+        self.stats = {"requests": 0, "retries": 0, "keyRefreshes": 0}
+
+    @classmethod
+    def from_env(cls) -> "StorageClient":
+        env = os.environ.get
+        return cls(
+            concurrency=int(env("STORAGE_CONCURRENCY", "16")),
+            max_connections=int(env("STORAGE_MAX_CONNECTIONS", "20")),
+            max_keepalive=int(env("STORAGE_MAX_KEEPALIVE", "10")),
+            max_retries=int(env("STORAGE_MAX_RETRIES", "3")),
+            backoff_s=float(env("STORAGE_BACKOFF_S", "0.5")),
+            timeout_s=float(env("STORAGE_TIMEOUT_S", "120")),
+            put_timeout_s=float(env("STORAGE_PUT_TIMEOUT_S", "180")),
+            http2=env("STORAGE_HTTP2", "1") != "0",
+        )
+
+    def _client(self) -> httpx.AsyncClient:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._http is None or self._http.is_closed:
+            self._loop = loop
+            self._http = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(max_connections=self.max_connections,
+                                    max_keepalive_connections=self.max_keepalive),
+                timeout=httpx.Timeout(self.timeout_s, connect=10.0),
             )
-            if resp.status_code == 403 and attempt == 0:
-                # storage_key expired — refresh and retry once
+            self._sem = asyncio.Semaphore(self.concurrency)
+            self._key_lock = asyncio.Lock()
+        return self._http
+
+    async def aclose(self) -> None:
+        """Close the pooled connections (app shutdown)."""
+        if self._http is not None and not self._http.is_closed:
+            await self._http.aclose()
+        self._http, self._loop = None, None
+
+    def _delay(self, attempt: int) -> float:
+        return min(30.0, self.backoff_s * 2 ** (attempt - 1)) * (0.5 + random.random())
+
+    async def init(self, stale: Optional[str] = None) -> Optional[str]:
+        """Return the shared storage key, requesting one if needed.
+
+        ``stale`` is a key the server just refused: it is dropped unless
+        another request already replaced it, so concurrent 403s trigger a
+        single ``/init``. Returns None if EMERGENT_LLM_KEY is missing or
+        init fails.
+        """
+        global _storage_key
+        http = self._client()
+        async with self._key_lock:
+            if stale is not None and _storage_key == stale:
                 _reset_key()
-                key = init_storage()
-                if not key:
-                    return False
-                continue
+                self.stats["keyRefreshes"] += 1
+            if _storage_key:
+                return _storage_key
+            key = _emergent_key()
+            if not key:
+                logger.warning("EMERGENT_LLM_KEY not set — Emergent Object Storage disabled.")
+                return None
+            try:
+                resp = await http.post(f"{_storage_url()}/init",
+                                       json={"emergent_key": key}, timeout=30)
+                resp.raise_for_status()
+                _storage_key = resp.json().get("storage_key")
+                logger.info("Emergent Object Storage initialized.")
+                return _storage_key
+            except Exception as e:
+                logger.error(f"Emergent storage init failed: {e}")
+                return None
+
+    async def _request(self, method: str, filename: str, *, timeout: float,
+                       content: Optional[bytes] = None,
+                       headers: Optional[dict] = None) -> Optional[httpx.Response]:
+        """Send one object request; None when storage is unavailable.
+        Raises the last ``httpx`` error once retries are exhausted."""
+        http = self._client()
+        key = await self.init()
+        if not key:
+            return None
+        url = f"{_storage_url()}/objects/{_path_for(filename)}"
+        refreshed, attempt = False, 0
+        while True:
+            try:
+                async with self._sem:
+                    self.stats["requests"] += 1
+                    resp = await http.request(
+                        method, url, content=content, timeout=timeout,
+                        headers={"X-Storage-Key": key, **(headers or {})})
+            except httpx.TransportError:
+                if attempt >= self.max_retries:
+                    raise
+            else:
+                if resp.status_code == 403 and not refreshed:
+                    # storage_key expired — refresh and retry once
+                    refreshed = True
+                    key = await self.init(stale=key)
+                    if not key:
+                        return None
+                    continue
+                if not (resp.status_code == 429 or resp.status_code >= 500) \
+                        or attempt >= self.max_retries:
+                    return resp
+            attempt += 1
+            self.stats["retries"] += 1
+            await asyncio.sleep(self._delay(attempt))
+
+    async def put(self, filename: str, data: bytes,
+                  content_type: str = "application/octet-stream") -> bool:
+        """Upload bytes to vocalfitness/uploads/<filename>.
+        Returns True on success, False on failure (so callers can decide to continue).
+        """
+        path = _path_for(filename)
+        try:
+            resp = await self._request("PUT", filename, content=data,
+                                       headers={"Content-Type": content_type},
+                                       timeout=self.put_timeout_s)
+            if resp is None:
+                return False
             if resp.status_code == 409:
                 # Object already exists at that path — treat as success (idempotent)
                 logger.info(f"Object {path} already exists (409) — keeping existing.")
@@ -95,38 +210,80 @@ def put_object(filename: str, data: bytes, content_type: str = "application/octe
         except Exception as e:
             logger.error(f"put_object failed for {path}: {e}")
             return False
-    return False
-
 
-def get_object(filename: str) -> Optional[Tuple[bytes, str]]:
-    """Fetch (bytes, content_type) from Emergent storage by filename.
-    Returns None if not found or storage unavailable.
-    """
-    key = init_storage()
-    if not key:
-        return None
-    path = _path_for(filename)
-    for attempt in range(2):
+    async def get(self, filename: str) -> Optional[Tuple[bytes, str]]:
+        """Fetch (bytes, content_type) by filename.
+        Returns None if not found or storage unavailable.
+        """
+        path = _path_for(filename)
         try:
-            resp = requests.get(
-                f"{STORAGE_URL}/objects/{path}",
-                headers={"X-Storage-Key": key},
-                timeout=120,
-            )
-            if resp.status_code == 403 and attempt == 0:
-                _reset_key()
-                key = init_storage()
-                if not key:
-                    return None
-                continue
-            if resp.status_code == 404:
+            resp = await self._request("GET", filename, timeout=self.timeout_s)
+            if resp is None or resp.status_code == 404:
                 return None
             resp.raise_for_status()
             return resp.content, resp.headers.get("Content-Type", "application/octet-stream")
         except Exception as e:
             logger.error(f"get_object failed for {path}: {e}")
             return None
-    return None
+
+
+storage = StorageClient.from_env()
+
+
+async def init_storage_async() -> Optional[str]:
+    return await storage.init()
+
+
+async def put_object_async(filename: str, data: bytes,
+                           content_type: str = "application/octet-stream") -> bool:
+    """Upload bytes to Emergent storage at vocalfitness/uploads/<filename>."""
+    return await storage.put(filename, data, content_type)
+
+
+async def get_object_async(filename: str) -> Optional[Tuple[bytes, str]]:
+    """Fetch (bytes, content_type) from Emergent storage by filename."""
+    return await storage.get(filename)
+
+
+# --------------------------------------------------------------------------- #
+# Sync facade (CLI scripts, worker threads)
+# --------------------------------------------------------------------------- #
+# Blocking callers share one private event loop on a daemon thread, so their
+# requests reuse that loop's connection pool instead of opening a TCP+TLS
+# session per call. Never call these from a coroutine: await the ``*_async``
+# functions instead.
+_sync_storage = StorageClient.from_env()
+_sync_loop: Optional[asyncio.AbstractEventLoop] = None
+_sync_lock = threading.Lock()
+
+
+def _run_sync(coro):
+    global _sync_loop
+    with _sync_lock:
+        if _sync_loop is None or _sync_loop.is_closed():
+            _sync_loop = asyncio.new_event_loop()
+            threading.Thread(target=_sync_loop.run_forever, daemon=True,
+                             name="storage-sync").start()
+    return asyncio.run_coroutine_threadsafe(coro, _sync_loop).result()
+
+
+def init_storage() -> Optional[str]:
+    """Initialize the storage session. Returns a reusable storage_key.
+
+    Safe to call multiple times — caches the key after first success.
+    Returns None if EMERGENT_LLM_KEY is missing or init fails.
+    """
+    return _run_sync(_sync_storage.init())
+
+
+def put_object(filename: str, data: bytes, content_type: str = "application/octet-stream") -> bool:
+    """Blocking ``put_object_async``. Returns True on success, False on failure."""
+    return _run_sync(_sync_storage.put(filename, data, content_type))
+
+
+def get_object(filename: str) -> Optional[Tuple[bytes, str]]:
+    """Blocking ``get_object_async``. Returns None if not found or storage unavailable."""
+    return _run_sync(_sync_storage.get(filename))
 
 
 _EXT_MIME = {
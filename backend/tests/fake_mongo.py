@@ -0,0 +1,409 @@
+"""
+In-memory Motor double shared by the offline test suites.
+
+``FakeDB`` hands out a ``FakeCollection`` per attribute / item, like
+``AsyncIOMotorDatabase``; collections hold plain dicts in ``docs`` and
+implement the subset of the query / update language the app uses (equality
+with array membership, dotted paths, ``$in`` / ``$nin`` / ``$ne`` /
+``$lt``-family / ``$exists`` / ``$regex`` / ``$or`` / ``$and``; ``$set`` /
+``$setOnInsert`` / ``$unset`` / ``$inc`` / ``$push`` updates; inclusion and
+exclusion projections). Every result is a deep copy, as a round trip would
+be.
+
+Counters for the I/O assertions: ``reads`` / ``writes`` per collection (one
+per call), ``bulk_writes`` (one entry per ``bulk_write`` with its op count),
+``updates`` (every update document applied) and ``FakeDB.round_trips``
+(every read on any collection of the DB).
+"""
+import copy
+import re
+
+from pymongo import ReturnDocument
+
+_MISSING = object()
+
+
+class FakeResult:
+    def __init__(self, upserted_id=None, matched_count=0, modified_count=0, deleted_count=0):
+        self.upserted_id, self.matched_count = upserted_id, matched_count
+        self.modified_count, self.deleted_count = modified_count, deleted_count
+
+
+def _values(doc, path):
+    """Every value ``path`` reaches in ``doc`` (arrays fan out); empty if missing."""
+    head, _, rest = path.partition(".")
+    if not isinstance(doc, dict) or head not in doc:
+        return []
+    value = doc[head]
+    if not rest:
+        return [value]
+    if isinstance(value, list):
+        return [v for item in value for v in _values(item, rest)]
+    return _values(value, rest)
+
+
+def _flat(values):
+    """Candidates an operator compares against: arrays match element-wise."""
+    out = []
+    for v in values:
+        out.append(v)
+        if isinstance(v, list):
+            out.extend(v)
+    return out or [None]
+
+
+def _ordered(a, b, op):
+    try:
+        return {"$lt": a < b, "$lte": a <= b, "$gt": a > b, "$gte": a >= b}[op]
+    except TypeError:
+        return False
+
+
+def _cond(values, cond):
+    candidates = _flat(values)
+    for op, arg in cond.items():
+        if op == "$in":
+            ok = any(v in arg for v in candidates)
+        elif op == "$nin":
+            ok = not any(v in arg for v in candidates)
+        elif op == "$ne":
+            ok = arg not in candidates
+        elif op == "$eq":
+            ok = arg in candidates
+        elif op in ("$lt", "$lte", "$gt", "$gte"):
+            ok = any(v is not None and _ordered(v, arg, op) for v in candidates)
+        elif op == "$exists":
+            ok = bool(values) == bool(arg)
+        elif op == "$regex":
+            ok = any(isinstance(v, str) and re.search(arg, v) for v in candidates)
+        else:
+            raise NotImplementedError(op)
+        if not ok:
+            return False
+    return True
+
+
+def match(doc, query):
+    for k, v in (query or {}).items():
+        if k == "$or":
+            if not any(match(doc, sub) for sub in v):
+                return False
+        elif k == "$and":
+            if not all(match(doc, sub) for sub in v):
+                return False
+        elif isinstance(v, dict) and v and all(op.startswith("$") for op in v):
+            if not _cond(_values(doc, k), v):
+                return False
+        elif v not in _flat(_values(doc, k)):
+            return False
+    return True
+
+
+def _get(doc, path):
+    for part in path.split("."):
+        if not isinstance(doc, dict) or part not in doc:
+            return _MISSING
+        doc = doc[part]
+    return doc
+
+
+def _set(doc, path, value):
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.setdefault(part, {})
+    doc[leaf] = value
+
+
+def _unset(doc, path):
+    *parents, leaf = path.split(".")
+    for part in parents:
+        doc = doc.get(part)
+        if not isinstance(doc, dict):
+            return
+    doc.pop(leaf, None)
+
+
+def project(doc, projection):
+    if doc is None:
+        return None
+    doc = copy.deepcopy(doc)
+    fields = {k: v for k, v in (projection or {}).items() if k != "_id"}
+    if fields and all(fields.values()):
+        out = {"_id": doc["_id"]} if "_id" in doc else {}
+        for path in fields:
+            value = _get(doc, path)
+            if value is not _MISSING:
+                _set(out, path, value)
+        doc = out
+    else:
+        for path in fields:
+            _unset(doc, path)
+    if projection and not projection.get("_id", 1):
+        doc.pop("_id", None)
+    return doc
+
+
+def _sort_key(value):
+    return (value is not None, value if value is not None else 0)
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, keys, direction=1):
+        keys = keys if isinstance(keys, list) else [(keys, direction)]
+        for key, d in reversed(keys):
+            self.docs.sort(key=lambda doc: _sort_key(_get(doc, key) if _get(doc, key) is not _MISSING
+                                                     else None), reverse=d < 0)
+        return self
+
+    def skip(self, n):
+        self.docs = self.docs[n:]
+        return self
+
+    def limit(self, n):
+        if n:
+            self.docs = self.docs[:n]
+        return self
+
+    async def to_list(self, length=None):
+        return self.docs[:length] if length else list(self.docs)
+
+    def __aiter__(self):
+        return self._iter()
+
+    async def _iter(self):
+        for doc in self.docs:
+            yield doc
+
+
+class FakeCollection:
+    def __init__(self, docs=(), db=None):
+        self.docs = [copy.deepcopy(d) for d in docs]
+        self.db = db
+        self.reads = self.writes = 0
+        self.bulk_writes = []
+        self.updates = []
+
+    # ---- reads ---------------------------------------------------------- #
+    def _read(self):
+        self.reads += 1
+        if self.db is not None:
+            self.db.round_trips += 1
+
+    def _first(self, q):
+        return next((d for d in self.docs if match(d, q)), None)
+
+    def find(self, q=None, projection=None, **kw):
+        self._read()
+        return FakeCursor([project(d, projection) for d in self.docs if match(d, q)])
+
+    async def find_one(self, q=None, projection=None, **kw):
+        self._read()
+        return project(self._first(q), projection)
+
+    async def count_documents(self, q):
+        self._read()
+        return sum(match(d, q) for d in self.docs)
+
+    async def estimated_document_count(self):
+        return len(self.docs)
+
+    async def distinct(self, key, q=None):
+        self._read()
+        out = []
+        for d in self.docs:
+            if match(d, q):
+                out += [v for v in _flat(_values(d, key)) if v is not None and v not in out]
+        return out
+
+    def aggregate(self, pipeline):
+        self._read()
+        docs = copy.deepcopy(self.docs)
+        for stage in pipeline:
+            (op, arg), = stage.items()
+            if op == "$match":
+                docs = [d for d in docs if match(d, arg)]
+            elif op == "$group":
+                docs = self._group(docs, arg)
+            elif op == "$sort":
+                docs = FakeCursor(docs).sort(list(arg.items())).docs
+            else:
+                raise NotImplementedError(op)
+        return FakeCursor(docs)
+
+    @staticmethod
+    def _group(docs, spec):
+        def field(d, expr):
+            return _get(d, expr[1:]) if isinstance(expr, str) and expr.startswith("$") else expr
+
+        rows = {}
+        for d in docs:
+            key = field(d, spec["_id"])
+            key = None if key is _MISSING else key
+            row = rows.setdefault(repr(key), {"_id": key, **{k: 0 for k in spec if k != "_id"}})
+            for name, acc in spec.items():
+                if name == "_id":
+                    continue
+                (op, expr), = acc.items()
+                assert op == "$sum", op
+                value = field(d, expr)
+                row[name] += value if isinstance(value, (int, float)) else 0
+        return list(rows.values())
+
+    # ---- writes --------------------------------------------------------- #
+    def _apply(self, doc, update):
+        """Apply one update document in place; True if ``doc`` changed."""
+        self.updates.append(copy.deepcopy(update))
+        before = copy.deepcopy(doc)
+        for k, v in update.get("$set", {}).items():
+            _set(doc, k, copy.deepcopy(v))
+        for k in update.get("$unset", {}):
+            _unset(doc, k)
+        for k, v in update.get("$inc", {}).items():
+            current = _get(doc, k)
+            _set(doc, k, (0 if current is _MISSING else current) + v)
+        for k, v in update.get("$push", {}).items():
+            current = _get(doc, k)
+            items = list(current) if current is not _MISSING else []
+            if isinstance(v, dict) and "$each" in v:
+                items += copy.deepcopy(v["$each"])
+                if "$slice" in v:
+                    items = items[v["$slice"]:] if v["$slice"] < 0 else items[:v["$slice"]]
+            else:
+                items.append(copy.deepcopy(v))
+            _set(doc, k, items)
+        return doc != before
+
+    def _seed(self, q, update):
+        doc = {k: copy.deepcopy(v) for k, v in q.items()
+               if not k.startswith("$") and not (isinstance(v, dict) and any(o.startswith("$") for o in v))}
+        for k, v in update.get("$setOnInsert", {}).items():
+            _set(doc, k, copy.deepcopy(v))
+        self.docs.append(doc)
+        return doc
+
+    def _update(self, q, update, upsert=False, many=False):
+        hits = [d for d in self.docs if match(d, q)]
+        if not many:
+            hits = hits[:1]
+        if not hits and upsert:
+            doc = self._seed(q, update)
+            self._apply(doc, update)
+            return FakeResult(upserted_id=doc.get("_id", "new"))
+        changed = sum(self._apply(d, update) for d in hits)
+        return FakeResult(matched_count=len(hits), modified_count=changed)
+
+    def _replace(self, q, new, upsert=False):
+        old = self._first(q)
+        new = copy.deepcopy(new)
+        if old is not None:
+            if "_id" in old:
+                new.setdefault("_id", old["_id"])
+            self.docs[self.docs.index(old)] = new
+            return FakeResult(matched_count=1, modified_count=int(old != new))
+        if upsert:
+            if "_id" in q and not isinstance(q["_id"], dict):
+                new.setdefault("_id", q["_id"])
+            self.docs.append(new)
+            return FakeResult(upserted_id=new.get("_id", "new"))
+        return FakeResult()
+
+    def _delete(self, q, many=False):
+        gone = [d for d in self.docs if match(d, q)]
+        if not many:
+            gone = gone[:1]
+        self.docs = [d for d in self.docs if all(d is not g for g in gone)]
+        return FakeResult(deleted_count=len(gone))
+
+    async def insert_one(self, doc):
+        self.writes += 1
+        self.docs.append(copy.deepcopy(doc))
+        return FakeResult()
+
+    async def insert_many(self, docs, ordered=True):
+        self.writes += 1
+        self.docs += copy.deepcopy(list(docs))
+        return FakeResult()
+
+    async def update_one(self, q, update, upsert=False):
+        self.writes += 1
+        return self._update(q, update, upsert)
+
+    async def update_many(self, q, update, upsert=False):
+        self.writes += 1
+        return self._update(q, update, upsert, many=True)
+
+    async def replace_one(self, q, doc, upsert=False):
+        self.writes += 1
+        return self._replace(q, doc, upsert)
+
+    async def delete_one(self, q):
+        self.writes += 1
+        return self._delete(q)
+
+    async def delete_many(self, q):
+        self.writes += 1
+        return self._delete(q, many=True)
+
+    async def find_one_and_update(self, q, update, projection=None, upsert=False,
+                                  return_document=ReturnDocument.BEFORE, **kw):
+        self.writes += 1
+        doc = self._first(q)
+        before = copy.deepcopy(doc)
+        if doc is None and upsert:
+            doc = self._seed(q, update)
+        if doc is not None:
+            self._apply(doc, update)
+        return project(doc if return_document == ReturnDocument.AFTER else before, projection)
+
+    async def find_one_and_delete(self, q, projection=None, **kw):
+        self.writes += 1
+        doc = self._first(q)
+        if doc is not None:
+            self._delete(q)
+        return project(doc, projection)
+
+    async def bulk_write(self, ops, ordered=True):
+        self.bulk_writes.append(len(ops))
+        for op in ops:
+            kind = type(op).__name__
+            if kind == "UpdateOne":
+                self._update(op._filter, op._doc, op._upsert)
+            elif kind == "UpdateMany":
+                self._update(op._filter, op._doc, op._upsert, many=True)
+            elif kind == "ReplaceOne":
+                self._replace(op._filter, op._doc, op._upsert)
+            elif kind == "InsertOne":
+                self.docs.append(copy.deepcopy(op._doc))
+            elif kind == "DeleteOne":
+                self._delete(op._filter)
+            elif kind == "DeleteMany":
+                self._delete(op._filter, many=True)
+            else:
+                raise NotImplementedError(kind)
+        return FakeResult()
+
+    async def create_index(self, *a, **k):
+        return None
+
+    async def create_indexes(self, *a, **k):
+        return []
+
+
+class FakeDB(dict):
+    round_trips = 0
+
+    def __missing__(self, name):
+        self[name] = FakeCollection()
+        return self[name]
+
+    def __setitem__(self, name, collection):
+        collection.db = self
+        super().__setitem__(name, collection)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+        return self[name]
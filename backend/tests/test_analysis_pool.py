@@ -0,0 +1,143 @@
+"""
+Shared analysis pool (``routers.analysis_pool``): bounded admission,
+per-job timeout, HTTP mapping and metrics.
+
+Jobs are stdlib callables (``time.sleep``, ``os.getpid``) so they pickle into
+the spawn workers without importing this module. Runs offline.
+"""
+import os
+import sys
+import time
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers import analysis_pool as ap  # noqa: E402
+
+
+def test_saturated_pool_rejects_and_reports_queue():
+    pool = ap.AnalysisPool(workers=1, max_queue=1, job_timeout_s=10)
+
+    async def scenario():
+        await pool.start()
+        jobs = [asyncio.create_task(pool.run(time.sleep, 0.5)) for _ in range(2)]
+        await asyncio.sleep(0)
+        busy = pool.metrics()
+        with pytest.raises(ap.PoolSaturated):
+            await pool.run(time.sleep, 0)
+        await asyncio.gather(*jobs)
+        await asyncio.sleep(0.05)  # let the done-callbacks land on the loop
+        return busy, pool.metrics()
+
+    try:
+        busy, idle = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert (busy["busy_workers"], busy["queue_length"]) == (1, 1)
+    assert idle["in_flight"] == 0
+    assert (idle["submitted"], idle["completed"], idle["rejected"]) == (2, 2, 1)
+    assert idle["warm"] is True
+    assert idle["latency_s"]["count"] == 2
+    assert idle["latency_s"]["buckets"][-1] == {"le": "+Inf", "count": 2}
+
+
+def test_timed_out_job_keeps_its_worker_busy():
+    pool = ap.AnalysisPool(workers=1, max_queue=0, job_timeout_s=0.2)
+
+    async def scenario():
+        await pool.start()
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(time.sleep, 1.0)
+        during = pool.metrics()
+        await asyncio.sleep(1.2)
+        return during, pool.metrics()
+
+    try:
+        during, after = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert during["timeouts"] == 1
+    assert during["busy_workers"] == 1
+    assert after["in_flight"] == 0
+
+
+def test_run_analysis_maps_saturation_to_429(monkeypatch):
+    pool = ap.AnalysisPool(workers=1, max_queue=0, job_timeout_s=10)
+    pool._in_flight = pool.capacity
+    monkeypatch.setattr(ap, "_pool", pool)
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(ap.run_analysis(time.sleep, 0))
+    assert exc.value.status_code == 429
+    assert exc.value.headers.get("Retry-After")
+    assert pool.metrics()["rejected"] == 1
+
+
+def test_timed_out_queued_jobs_are_cancelled():
+    pool = ap.AnalysisPool(workers=1, max_queue=3, job_timeout_s=0.3)
+
+    async def scenario():
+        await pool.start()
+        running = asyncio.create_task(pool.run(time.sleep, 1.0))
+        await asyncio.sleep(0.05)
+        # Behind the sleeper: the executor pre-feeds a few jobs to its call
+        # queue (no longer cancellable); the rest are still pending.
+        queued = await asyncio.gather(*(pool.run(time.sleep, 0) for _ in range(3)),
+                                      return_exceptions=True)
+        with pytest.raises(asyncio.TimeoutError):
+            await running
+        await asyncio.sleep(1.0)
+        return queued, pool.metrics()
+
+    try:
+        queued, after = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert all(isinstance(q, asyncio.TimeoutError) for q in queued)
+    assert after["timeouts"] == 4 and after["cancelled"] >= 1
+    assert after["cancelled"] + after["completed"] == 4
+    assert after["in_flight"] == 0
+
+
+def test_worker_crash_resets_the_pool_once():
+    pool = ap.AnalysisPool(workers=2, max_queue=4, job_timeout_s=10)
+
+    async def scenario():
+        await pool.start()
+        doomed = [asyncio.create_task(pool.run(os._exit, 1))]
+        doomed += [asyncio.create_task(pool.run(time.sleep, 1.0)) for _ in range(3)]
+        done, _ = await asyncio.wait(doomed, return_when=asyncio.FIRST_COMPLETED)
+        # Submitted on the replacement executor while the other crashed jobs
+        # are still reporting: their late resets must leave it alone.
+        healthy = asyncio.create_task(pool.run(os.getpid))
+        crashed = await asyncio.gather(*doomed, return_exceptions=True)
+        return crashed, await healthy, pool.metrics()
+
+    try:
+        crashed, pid, after = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert all(isinstance(c, ap.BrokenProcessPool) for c in crashed)
+    assert isinstance(pid, int)
+    assert after["restarts"] == 1
+
+
+def test_batch_slots_bound_a_batch_to_the_workers(monkeypatch):
+    pool = ap.AnalysisPool(workers=2, max_queue=0, job_timeout_s=10)
+    monkeypatch.setattr(ap, "_pool", pool)
+
+    async def scenario():
+        await pool.start()
+        with ap.batch_slots():
+            return await asyncio.gather(*(ap.run_analysis(time.sleep, 0.2) for _ in range(6)))
+
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        pool.shutdown()
+    assert results == [None] * 6
+    assert pool.metrics()["rejected"] == 0 and pool.metrics()["completed"] == 6
@@ -0,0 +1,138 @@
+"""
+Streaming take ingestion (``routers.audio_ingest``).
+
+The spooled file must be byte-identical to the upload, its incremental digest
+must key the measurement cache exactly like hashing the bytes, and the
+memory-mapped ``wav_stats`` must report what the old ``wave`` + pure-Python
+reduction reported. Runs offline.
+"""
+import io
+import sys
+import errno
+import wave
+import array
+import asyncio
+import os
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+from fastapi import UploadFile
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers import audio_ingest as ai  # noqa: E402
+from routers.measurement_cache import digest_measurement_key, measurement_key  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "vowel_i.wav"
+shutil_usage = namedtuple("usage", "total used free", defaults=(0, 0, 0))
+
+
+def _legacy_wav_stats(raw: bytes) -> dict:
+    """The pre-spooling ``level_test._wav_stats``."""
+    with wave.open(io.BytesIO(raw), "rb") as w:
+        n, sr, ch = w.getnframes(), w.getframerate(), w.getnchannels()
+        frames = w.readframes(n)
+    dur = round(n / sr, 3) if sr else 0.0
+    a = array.array("h")
+    a.frombytes(frames)
+    return {"bytes": len(raw), "duration_s": dur, "sample_rate": sr, "channels": ch,
+            "frames": n, "rms": round((sum(x * x for x in a) / len(a)) ** 0.5 / 32768.0, 5),
+            "peak": round(max(abs(x) for x in a) / 32768.0, 5)}
+
+
+def _wav_bytes(samples: np.ndarray, sr: int = 16000, channels: int = 1) -> bytes:
+    buf = io.BytesIO()
+    with wave.open(buf, "wb") as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(sr)
+        w.writeframes(samples.astype("<i2").tobytes())
+    return buf.getvalue()
+
+
+def _spool(data: bytes, max_bytes=ai.MAX_TAKE_BYTES):
+    upload = UploadFile(file=io.BytesIO(data), filename="take.wav")
+    return asyncio.run(ai.spool_upload(upload, max_bytes))
+
+
+def test_spooled_file_and_digest_match_the_upload(monkeypatch):
+    monkeypatch.setattr(ai, "SPOOL_CHUNK_BYTES", 4096)  # many chunks
+    data = FIXTURE.read_bytes()
+    with _spool(data) as take:
+        assert take.read_bytes() == data
+        assert (take.size, take.is_wav, take.too_large) == (len(data), True, False)
+        assert digest_measurement_key(take.digest, "take", "p") == measurement_key(data, "take", "p")
+        path = take.path
+    assert not os.path.exists(path)
+
+
+def test_oversized_upload_stops_copying():
+    with _spool(b"x" * 10_000, max_bytes=4096) as take:
+        assert take.too_large and os.path.getsize(take.path) == 0
+
+
+def test_stats_match_the_legacy_reduction(tmp_path):
+    rng = np.random.default_rng(7)
+    cases = [FIXTURE.read_bytes(),
+             _wav_bytes(rng.integers(-32768, 32767, 48_000, endpoint=True), 44100, channels=2),
+             _wav_bytes(np.full(3000, -32768), 8000)]   # |min| overflows int16
+    for data in cases:
+        with _spool(data) as take:
+            assert take.stats() == _legacy_wav_stats(data)
+
+
+def test_stats_on_non_wav_report_a_parse_error():
+    with _spool(b"\x1aE\xdf\xa3webm-ish") as take:
+        assert not take.is_wav
+        stats = take.stats()
+    assert stats["bytes"] == 12 and "wav_parse_error" in stats
+
+
+def test_spool_bytes_and_stale_sweep(tmp_path, monkeypatch):
+    monkeypatch.setattr(ai, "SPOOL_DIR", str(tmp_path))
+    monkeypatch.setattr(ai.tempfile, "tempdir", str(tmp_path))
+    with ai.spool_bytes(b"ID3 clip", ".mp3") as clip:
+        assert clip.path.endswith(".mp3") and Path(clip.path).parent == tmp_path
+        assert clip.read_bytes() == b"ID3 clip"
+        assert ai.spool_usage()["files"] == 1
+        assert ai.sweep_stale_spools(max_age_s=3600) == 0   # live request
+        orphan = tmp_path / (ai._SPOOL_PREFIX + "orphan.wav")
+        orphan.write_bytes(b"x")
+        os.utime(orphan, (0, 0))
+        (tmp_path / "unrelated.wav").write_bytes(b"x")
+        assert ai.sweep_stale_spools(max_age_s=3600) == 1
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["unrelated.wav"]
+
+
+def test_spool_falls_back_to_the_temp_dir_when_the_spool_dir_is_full(tmp_path, monkeypatch):
+    shm, tmp = tmp_path / "shm", tmp_path / "tmp"
+    shm.mkdir()
+    tmp.mkdir()
+    monkeypatch.setattr(ai, "SPOOL_DIR", str(shm))
+    monkeypatch.setattr(ai.tempfile, "tempdir", str(tmp))
+    with ai.spool_bytes(b"clip") as roomy:
+        assert Path(roomy.path).parent == shm
+
+    monkeypatch.setattr(ai.shutil, "disk_usage", lambda p: shutil_usage(free=1))
+    with ai.spool_bytes(b"clip") as full:
+        assert Path(full.path).parent == tmp
+        assert ai.spool_usage()["files"] == 1
+
+
+def test_spool_retries_in_the_temp_dir_on_enospc(tmp_path, monkeypatch):
+    monkeypatch.setattr(ai, "SPOOL_DIR", str(tmp_path / "shm"))
+    monkeypatch.setattr(ai.tempfile, "tempdir", str(tmp_path))
+    (tmp_path / "shm").mkdir()
+    real = ai._spool_to
+
+    def no_space(spool_dir, src, max_bytes, suffix):
+        if spool_dir is not None:
+            src.read(2)
+            raise OSError(errno.ENOSPC, "No space left on device")
+        return real(spool_dir, src, max_bytes, suffix)
+
+    monkeypatch.setattr(ai, "_spool_to", no_space)
+    with ai.spool_bytes(b"ID3 clip", ".mp3") as clip:
+        assert Path(clip.path).parent == tmp_path
+        assert clip.read_bytes() == b"ID3 clip"
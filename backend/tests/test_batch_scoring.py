@@ -0,0 +1,113 @@
+"""
+Batch formant scoring (``/phonemes/analyze-formants/batch``; the Level Test
+``/level-test/score-batch`` shares ``parse_batch_takes``).
+
+A batch must return, in order, exactly what posting each take to the
+single-take endpoint returns — with a bad take reported in its own slot
+instead of failing the request. Runs offline: the router is mounted on a
+bare app over an in-memory DB double; the measurements run for real in the
+analysis pool.
+"""
+import sys
+import json
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI, HTTPException
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data.formant_references import build_reference_rows  # noqa: E402
+from routers import analysis_pool as ap  # noqa: E402
+from routers.analysis_pool import BATCH_MAX_TAKES, parse_batch_takes  # noqa: E402
+from fake_mongo import FakeCollection, FakeDB  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "vowel_i.wav"
+
+
+def test_parse_batch_takes_validates_shape():
+    ok = parse_batch_takes(json.dumps([{"phoneme_ipa": "i", "junk": 1}]), 1, {"dialect": "RP"})
+    assert ok == [{"phoneme_ipa": "i", "dialect": "RP"}]
+    for takes, n in (("nope", 1), ("[]", 0), ('[{"phoneme_ipa": "i"}]', 2), ('[{"dialect": "RP"}]', 1)):
+        with pytest.raises(HTTPException) as exc:
+            parse_batch_takes(takes, n, {})
+        assert exc.value.status_code == 400
+    too_many = json.dumps([{"phoneme_ipa": "i"}] * (BATCH_MAX_TAKES + 1))
+    with pytest.raises(HTTPException) as exc:
+        parse_batch_takes(too_many, BATCH_MAX_TAKES + 1, {})
+    assert exc.value.status_code == 413
+
+
+def test_batch_limit_never_exceeds_pool_capacity(monkeypatch):
+    monkeypatch.setattr(ap, "_pool", ap.AnalysisPool(workers=2, max_queue=1, job_timeout_s=10))
+    monkeypatch.setattr(ap, "BATCH_MAX_TAKES", 12)
+    assert ap.batch_max_takes() == 3
+    with pytest.raises(HTTPException) as exc:
+        parse_batch_takes(json.dumps([{"phoneme_ipa": "i"}] * 4), 4, {})
+    assert exc.value.status_code == 413 and "max 3" in exc.value.detail
+
+
+@pytest.fixture
+def client():
+    pytest.importorskip("parselmouth")
+    from routers import phoneme_formants as pf
+    from routers.analysis_pool import shutdown_analysis_pool
+
+    db = FakeDB()
+    db["formant_references"] = FakeCollection(build_reference_rows())
+    db["user_consents"] = FakeCollection([{"user_id": "u1", "audio_granted": True}])
+    pf._reference_index.invalidate()
+    app = FastAPI()
+    app.include_router(pf.build_phoneme_formants_router(
+        db, lambda: {"id": "u1"}, lambda *a: False, None))
+    with TestClient(app) as c:
+        yield c
+    shutdown_analysis_pool()
+
+
+def _strip(res):
+    res = dict(res)
+    res.pop("analyzed_at", None)
+    return res
+
+
+def test_batch_matches_single_takes_in_order(client):
+    wav = FIXTURE.read_bytes()
+    takes = [{"phoneme_ipa": "i", "dialect": "AmE"},
+             {"phoneme_ipa": "i", "dialect": "XX"},
+             {"phoneme_ipa": "i", "dialect": "RP", "expert": True}]
+    r = client.post("/phonemes/analyze-formants/batch",
+                    files=[("files", ("a.wav", wav, "audio/wav"))] * 3,
+                    data={"takes": json.dumps(takes)})
+    assert r.status_code == 200, r.text
+    body = r.json()
+    assert (body["count"], body["failed"]) == (3, 1)
+    assert [x["index"] for x in body["results"]] == [0, 1, 2]
+    assert body["results"][1]["status_code"] == 400
+
+    for i in (0, 2):
+        single = client.post("/phonemes/analyze-formants",
+                             files={"file": ("a.wav", wav, "audio/wav")},
+                             data={k: str(v).lower() if isinstance(v, bool) else v
+                                   for k, v in takes[i].items()})
+        assert single.status_code == 200, single.text
+        assert _strip(body["results"][i]["result"]) == _strip(single.json())
+    assert "all_ceilings" in body["results"][2]["result"]["diagnostics"]
+
+
+def test_full_batch_fits_an_idle_pool(client, monkeypatch):
+    from routers import measurement_cache as mc
+
+    # Every take must really reach the pool (no cache hits between takes).
+    monkeypatch.setattr(mc, "_cache", mc.MeasurementCache(0, False))
+    pool = ap.get_analysis_pool()
+    n = ap.batch_max_takes()
+    assert n == min(BATCH_MAX_TAKES, pool.capacity)
+    rejected = pool.metrics()["rejected"]
+    r = client.post("/phonemes/analyze-formants/batch",
+                    files=[("files", ("a.wav", FIXTURE.read_bytes(), "audio/wav"))] * n,
+                    data={"takes": json.dumps([{"phoneme_ipa": "i", "dialect": "RP"}] * n)})
+    assert r.status_code == 200, r.text
+    assert (r.json()["count"], r.json()["failed"]) == (n, 0)
+    assert pool.metrics()["rejected"] == rejected
@@ -0,0 +1,94 @@
+"""
+In-process canonical inventory (``canonical_phonemes.CanonicalInventory``).
+
+Every lookup must resolve exactly like the old per-candidate Mongo queries
+(``_ipa_equivalents`` order, first hit wins; dialect-less lookups take the
+first row in natural order) while issuing no query once loaded; a version
+bump — local or from another process — must reach the index. Runs offline
+over the in-memory DB double filled by the real seed.
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers import canonical_phonemes as cp  # noqa: E402
+from routers import phoneme_cards as pc  # noqa: E402
+from fake_mongo import FakeDB  # noqa: E402
+
+
+def _seeded():
+    db = FakeDB()
+    asyncio.run(cp.ensure_canonical_seed(db))
+    return db
+
+
+async def _legacy_row(db, ipa, dialect=None):
+    for cand in pc._ipa_equivalents(ipa):
+        q = {"dialect": dialect, "ipa": cand} if dialect else {"ipa": cand}
+        row = await db.canonical_phonemes.find_one(q, {"_id": 0})
+        if row:
+            return row
+    return None
+
+
+def _symbols(db):
+    syms = {d["ipa"] for d in db.canonical_phonemes.docs}
+    return sorted(syms | set(pc._IPA_EQUIVALENTS) | {"i:", "r", "g", "x", ""})
+
+
+def test_lookups_match_the_legacy_queries_with_no_query_after_load():
+    db = _seeded()
+    legacy = {}
+    for ipa in _symbols(db):
+        for dialect in (None, "GenAm", "RP"):
+            legacy[(ipa, dialect)] = asyncio.run(_legacy_row(db, ipa, dialect))
+
+    db.canonical_phonemes.reads = 0
+    for (ipa, dialect), row in legacy.items():
+        assert asyncio.run(pc._canonical_row(db, ipa, dialect)) == row, (ipa, dialect)
+    assert db.canonical_phonemes.reads == 0
+
+
+def test_ranked_matches_the_legacy_frequency_query():
+    db = _seeded()
+    for dialect in ("GenAm", "RP"):
+        for kind in ("vowel", "diphthong", "consonant"):
+            docs = asyncio.run(db.canonical_phonemes.find(
+                {"dialect": dialect, "kind": kind, "frequency_rank": {"$ne": None}}).to_list(100))
+            docs.sort(key=lambda d: d.get("frequency_rank") or 999)
+            ranked = asyncio.run(cp.canonical_inventory.ranked(db, dialect, kind))
+            assert [(d["ipa"], d["frequency_rank"]) for d in ranked] == \
+                [(d["ipa"], d["frequency_rank"]) for d in docs]
+
+
+def test_returned_rows_are_private_copies():
+    db = _seeded()
+    row = asyncio.run(pc._canonical_row(db, "iː", "RP"))
+    row["kind"] = "mutated"
+    row.setdefault("dialect_notes", []).append("x")
+    again = asyncio.run(pc._canonical_row(db, "iː", "RP"))
+    assert again["kind"] != "mutated" and "x" not in (again.get("dialect_notes") or [])
+
+
+def test_local_bump_reloads_and_remote_bump_is_seen_after_the_refresh_window(monkeypatch):
+    db = _seeded()
+    inv = cp.canonical_inventory
+    v1 = asyncio.run(inv.current_version(db))
+    assert v1 == asyncio.run(cp.canonical_version(db)) == 1
+
+    row = next(d for d in db.canonical_phonemes.docs if d["ipa"] == "ʊ" and d["dialect"] == "RP")
+    row["kind"] = "edited"
+    asyncio.run(cp.bump_canonical_version(db))
+    assert asyncio.run(pc._canonical_row(db, "ʊ", "RP"))["kind"] == "edited"
+    assert inv.version == 2
+
+    # Another process bumps: invisible inside the window, seen after it.
+    row["kind"] = "vowel"
+    db[cp._CANONICAL_META].docs[0]["version"] = 3
+    monkeypatch.setattr(inv, "refresh_s", 3600)
+    assert asyncio.run(pc._canonical_row(db, "ʊ", "RP"))["kind"] == "edited"
+    monkeypatch.setattr(inv, "refresh_s", 0)
+    assert asyncio.run(pc._canonical_row(db, "ʊ", "RP"))["kind"] == "vowel"
+    assert asyncio.run(inv.current_version(db)) == 3
@@ -0,0 +1,186 @@
+"""
+Catalogue-wide audio job (``phoneme_cards.run_catalogue_audio_job``).
+
+The plan must hold exactly the missing clips of every card, with identical
+synthesis requests merged across cards and dialects; the job must fill every
+slot with one paid call per distinct request, report characters consumed and
+an ETA, and a job cut short by a restart must resume from the cards and its
+job document without re-synthesising finished clips. Admin edits made while
+the job runs must survive its writes. Runs offline against
+the fake TTS server over an in-memory DB double.
+"""
+import sys
+import copy
+import time
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import storage_helper  # noqa: E402
+from routers import canonical_phonemes as cp  # noqa: E402
+from routers import elevenlabs as el  # noqa: E402
+from routers import phoneme_cards as pc  # noqa: E402
+from routers import teacher_references as tr  # noqa: E402
+from fake_tts_server import FakeTTSServer  # noqa: E402
+from fake_mongo import FakeCollection, FakeDB  # noqa: E402
+
+
+async def _stored(*args):
+    return True
+
+
+_SETTINGS = {
+    "voice_ame": None, "voice_rp": None, "voice_default": "v-def",
+    "stability": 0.42, "similarity_boost": 0.88, "style": 0.05, "use_speaker_boost": True,
+    "model_id": "eleven_multilingual_v2", "output_format": "mp3_44100_128",
+    "words_limit": 30, "include_words_rp": True, "use_cache": True,
+}
+
+_CARDS = [
+    {"id": "u-foot", "ipa": "ʊ", "category": "vowel", "order": 1, "dialects": ["AmE", "RP"],
+     "updatedAt": "t1", "audio": {"RP": {"isolated": "/api/uploads/old.mp3"}},
+     "mnemonic": {"phrase": "A good cook."},
+     "commonWords": [{"w": "look"}, {"w": "book", "audioAmE": "/api/uploads/book.mp3"}]},
+    {"id": "uh-strut", "ipa": "ʌ", "category": "vowel", "order": 2, "dialects": ["AmE", "RP"],
+     "updatedAt": "t1", "exampleSentences": [{"text": "Look up."}],
+     "commonWords": [{"w": "look"}, {"w": "cut"}]},
+]
+
+
+@pytest.fixture
+def env(monkeypatch):
+    for k, v in dict(concurrency=2, rate_per_s=0.0, backoff_s=0.01, _loop=None).items():
+        monkeypatch.setattr(el.tts_engine, k, v)
+    monkeypatch.setattr(storage_helper, "put_object_async", _stored)
+    monkeypatch.setattr(tr, "schedule_reference_index", lambda db, urls: None)
+    srv = FakeTTSServer(latency_s=0.03).start()
+    monkeypatch.setenv("ELEVENLABS_API_BASE", srv.url)
+    monkeypatch.setenv("ELEVENLABS_API_KEY", srv.api_key)
+    db = FakeDB()
+    db["phoneme_cards"] = FakeCollection(_CARDS)
+    asyncio.run(cp.ensure_canonical_seed(db))
+    yield db, srv
+    srv.stop()
+
+
+def _slots(card):
+    return {it["key"]: it["current_url"]
+            for it in pc._compute_card_audio_items(card, 30, True)}
+
+
+def test_plan_merges_identical_requests_across_cards_and_dialects():
+    plan = pc.plan_catalogue_audio(copy.deepcopy(_CARDS), _SETTINGS)
+    by_text = {g["kwargs"]["text"]: [f"{t['cardId']}:{t['key']}" for t in g["targets"]]
+               for g in plan}
+    assert by_text["look"] == ["u-foot:word-0-AmE", "u-foot:word-0-RP",
+                               "uh-strut:word-0-AmE", "uh-strut:word-0-RP"]
+    assert by_text["book"] == ["u-foot:word-1-RP"]             # AmE slot already filled
+    assert by_text["ʊ"] == ["u-foot:isolated-AmE"]             # RP slot already filled
+    assert by_text["Look up."] == ["uh-strut:example-AmE-0", "uh-strut:example-RP-0"]
+    assert len(plan) == 7 and sum(len(g["targets"]) for g in plan) == 13
+
+
+def test_job_fills_every_slot_with_one_call_per_request(env):
+    db, srv = env
+
+    async def go():
+        job = await pc.start_catalogue_audio_job(db, "admin", dict(_SETTINGS))
+        await pc._audio_tasks[job["id"]]
+        return await db[pc._AUDIO_JOBS].find_one({"id": job["id"]})
+
+    job = asyncio.run(go())
+    assert job["status"] == "done" and job["runs"] == 1
+    assert (job["clipsPlanned"], job["slotsPlanned"], job["clipsDone"], job["slotsFilled"]) == (7, 13, 7, 13)
+    assert (job["clipsRemaining"], job["eta_s"], job["errors"]) == (0, 0, [])
+    assert len(srv.requests) == 7
+    assert job["charsConsumed"] == sum(len(r["text"]) for r in srv.requests)
+
+    cards = {d["id"]: d for d in db.phoneme_cards.docs}
+    for card in cards.values():
+        assert all(_slots(card).values()), card["id"]
+        assert card["updatedBy"] == "admin" and "readiness" in card
+    assert cards["u-foot"]["audio"]["RP"]["isolated"] == "/api/uploads/old.mp3"
+    look = {cards[c]["commonWords"][0][k] for c in cards for k in ("audioAmE", "audioRP")}
+    assert len(look) == 1                                      # one file, four slots
+
+
+def test_admin_edits_made_during_the_job_survive(env, monkeypatch):
+    db, _ = env
+    real_batch = el.run_tts_batch
+
+    async def edit_then_run(clips, **kw):
+        # The job has loaded and planned the cards; the admin edits them now.
+        foot = next(d for d in db.phoneme_cards.docs if d["id"] == "u-foot")
+        foot["audio"]["AmE"] = {"isolated": "/api/uploads/patched.mp3"}
+        foot["commonWords"].append({"w": "hood", "audioAmE": "/api/uploads/hood.mp3"})
+        strut = next(d for d in db.phoneme_cards.docs if d["id"] == "uh-strut")
+        strut["commonWords"][1] = {"w": "hut"}
+        return await real_batch(clips, **kw)
+
+    monkeypatch.setattr(el, "run_tts_batch", edit_then_run)
+
+    async def go():
+        job = await pc.start_catalogue_audio_job(db, "admin", dict(_SETTINGS))
+        await pc._audio_tasks[job["id"]]
+        return await db[pc._AUDIO_JOBS].find_one({"id": job["id"]})
+
+    job = asyncio.run(go())
+    assert job["status"] == "done"
+    cards = {d["id"]: d for d in db.phoneme_cards.docs}
+    foot, strut = cards["u-foot"], cards["uh-strut"]
+    assert foot["audio"]["AmE"]["isolated"] == "/api/uploads/patched.mp3"
+    assert foot["commonWords"][2] == {"w": "hood", "audioAmE": "/api/uploads/hood.mp3"}
+    assert foot["commonWords"][0]["audioAmE"]                  # untouched slots still filled
+    assert strut["commonWords"][1] == {"w": "hut"}             # "cut" clip not put on "hut"
+    assert (job["slotsFilled"], job["slotsSkipped"]) == (10, 3)
+
+
+def test_interrupted_job_resumes_without_resynthesising_finished_clips(env):
+    db, srv = env
+
+    async def crash_then_resume():
+        job = await pc.start_catalogue_audio_job(db, "admin", dict(_SETTINGS))
+        jobs = db[pc._AUDIO_JOBS]
+        while (await jobs.find_one({"id": job["id"]}))["clipsDone"] < 3:
+            await asyncio.sleep(0.01)
+        pc._audio_tasks[job["id"]].cancel()                    # process dies mid-run
+        await asyncio.gather(pc._audio_tasks[job["id"]], return_exceptions=True)
+        crashed = await jobs.find_one({"id": job["id"]})
+        seen = len(srv.requests)
+
+        resumed = await pc.resume_catalogue_audio_jobs(db)      # next startup
+        assert resumed == [job["id"]]
+        await pc._audio_tasks[job["id"]]
+        return crashed, seen, await jobs.find_one({"id": job["id"]})
+
+    crashed, seen, job = asyncio.run(crash_then_resume())
+    assert crashed["status"] == "running" and 3 <= crashed["clipsDone"] < 7
+    assert job["status"] == "done" and job["runs"] == 2 and job["resumedAt"]
+    assert job["clipsPlanned"] == 7 and job["clipsDone"] == 7 and job["slotsFilled"] == 13
+    # Only the clips not yet written into the cards are planned again.
+    assert 0 < len(srv.requests) - seen <= 7 - crashed["clipsDone"]
+    assert all(all(_slots(d).values()) for d in db.phoneme_cards.docs)
+
+
+def test_endpoints_start_one_job_at_a_time_and_report_progress(env):
+    db, _ = env
+    app = FastAPI()
+    app.include_router(pc.build_phoneme_cards_router(db, lambda: {"username": "admin"}))
+    with TestClient(app) as client:
+        r = client.post("/admin/phonemes/batch/audio", json={"voice_default": "v-def"})
+        assert r.status_code == 202, r.text
+        assert client.post("/admin/phonemes/batch/audio", json={}).status_code == 409
+        job_id = r.json()["jobId"]
+        for _ in range(200):
+            status = client.get(f"/admin/phonemes/batch/audio/{job_id}").json()
+            if status["status"] == "done":
+                break
+            time.sleep(0.05)
+        assert status["status"] == "done" and status["slotsFilled"] == 13
+        assert client.get("/admin/phonemes/batch/audio/nope").status_code == 404
@@ -0,0 +1,82 @@
+"""
+Parity tests for the fast formant paths: the NumPy track engine
+(PHONEME_FORMANT_ENGINE) and the lean FormantPath mode
+(PHONEME_FORMANT_PATH_MODE).
+
+The ``numpy`` engine pulls whole pitch/formant tracks as arrays and builds
+the 20 ms windows with strided NumPy; the ``legacy`` engine issues one
+Praat ``Get value at time`` per formant per 5 ms frame. Scoring depends on
+the exact window dicts (medians, SDs, sort order), so the two engines MUST
+return identical measurements — not "close", identical.
+
+Runs offline on the committed fixtures (no backend / Mongo needed).
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+parselmouth = pytest.importorskip("parselmouth")
+from parselmouth.praat import call  # noqa: E402
+
+from routers import phoneme_formants as pf  # noqa: E402
+
+BACKEND = Path(__file__).parent.parent
+_CLIPS = [
+    BACKEND / "tests" / "fixtures" / "vowel_i.wav",
+    *sorted((BACKEND / "uploads" / "leveltest").glob("*_RP_*.mp3"))[:2],
+]
+
+
+@pytest.mark.parametrize("clip", _CLIPS, ids=lambda p: p.name)
+def test_numpy_engine_matches_legacy_byte_for_byte(clip):
+    if not clip.exists():
+        pytest.skip(f"missing clip {clip}")
+    legacy = pf._measure_all_ceilings(str(clip), engine="legacy")
+    fast = pf._measure_all_ceilings(str(clip), engine="numpy")
+    assert legacy, f"{clip.name} unmeasurable"
+    assert repr(fast) == repr(legacy)
+
+
+def test_sample_linear_matches_praat_get_value_at_time():
+    snd = parselmouth.Sound(str(_CLIPS[0]))
+    snd.subtract_mean()
+    times = pf._time_grid(snd.get_total_duration(), 0.005)
+    fp = call(snd, "To FormantPath (burg)", 0.0025, 5.0, 5000.0, 0.025, 50.0, 0.05, 4)
+    formant = call(fp, "Extract Formant")
+    for i in (1, 2, 3):
+        vals = np.array(call(formant, "To Matrix", i).values[0], dtype=float)
+        vals[vals == 0.0] = np.nan
+        got = pf._sample_linear(vals, formant, times)
+        for t, g in zip(times, got.tolist()):
+            v = call(formant, "Get value at time", i, t, "hertz", "Linear")
+            want = v if (v and v == v) else None
+            assert (None if g != g else g) == want, f"F{i} @ {t}"
+
+
+def test_pitch_track_numpy_matches_legacy():
+    snd = parselmouth.Sound(str(_CLIPS[0]))
+    pitch = call(snd, "To Pitch", 0.0, 60.0, 500.0)
+    times = pf._time_grid(snd.get_total_duration(), 0.005)
+    assert pf._pitch_track(pitch, times, "numpy") == pf._pitch_track(pitch, times, "legacy")
+
+
+@pytest.mark.parametrize("clip", _CLIPS, ids=lambda p: p.name)
+def test_lean_formant_path_matches_legacy(clip):
+    """Side candidates never reach ``Extract Formant``: dropping from 4 to 1
+    step per direction must not change a single window."""
+    if not clip.exists():
+        pytest.skip(f"missing clip {clip}")
+    legacy = pf._measure_all_ceilings(str(clip), path_mode="legacy")
+    lean = pf._measure_all_ceilings(str(clip), path_mode="lean")
+    assert repr(lean) == repr(legacy)
+
+
+def test_unknown_engine_is_rejected():
+    with pytest.raises(ValueError):
+        pf._measure_all_ceilings(str(_CLIPS[0]), engine="fortran")
+    with pytest.raises(ValueError):
+        pf._measure_all_ceilings(str(_CLIPS[0]), path_mode="single")
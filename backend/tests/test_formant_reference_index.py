@@ -0,0 +1,92 @@
+"""
+In-memory formant reference index (``phoneme_formants.FormantReferenceIndex``).
+
+``find_reference`` must resolve exactly like the old per-candidate Mongo
+queries (``_EQUIV`` order, first non-empty candidate wins) while issuing no
+query at all once loaded; a version-stamp bump must reach the index. Runs
+offline against the in-memory DB double seeded from
+``build_reference_rows()``.
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from data.formant_references import build_reference_rows  # noqa: E402
+from routers import phoneme_formants as pf  # noqa: E402
+from fake_mongo import FakeCollection, FakeDB  # noqa: E402
+
+
+def _db():
+    db = FakeDB()
+    db["formant_references"] = FakeCollection(build_reference_rows())
+    return db
+
+
+async def _legacy_find_reference(db, phoneme_ipa, dialect):
+    """The pre-index implementation: one query per ``_EQUIV`` candidate."""
+    candidates = pf._EQUIV.get(phoneme_ipa, [phoneme_ipa])
+    if phoneme_ipa not in candidates:
+        candidates = [phoneme_ipa] + candidates
+    for cand in candidates:
+        rows = await db.formant_references.find(
+            {"phoneme_ipa": cand, "dialect": dialect}, {"_id": 0}).to_list(length=10)
+        if rows:
+            return rows
+    return []
+
+
+def test_index_resolves_like_per_candidate_queries_with_zero_io():
+    db = _db()
+    ipas = sorted({r["phoneme_ipa"] for r in build_reference_rows()} | set(pf._EQUIV) | {"aɪ", "θ"})
+    index = pf.FormantReferenceIndex(refresh_s=3600)
+
+    async def scenario():
+        await index.load(db)
+        loaded_queries = db.formant_references.reads + db[pf._REF_META].reads
+        for ipa in ipas:
+            for dialect in ("AmE", "RP"):
+                assert await index.find(db, ipa, dialect) == \
+                    await _legacy_find_reference(db, ipa, dialect), (ipa, dialect)
+        return loaded_queries
+
+    before = asyncio.run(scenario())
+    legacy_queries = db.formant_references.reads - before
+    # Every query issued after load came from the legacy twin, none from the index.
+    assert db[pf._REF_META].reads == 1
+    assert legacy_queries >= len(ipas) * 2
+
+
+def test_version_bump_reloads_after_refresh_window():
+    db = _db()
+    index = pf.FormantReferenceIndex(refresh_s=0)  # re-check the stamp on every lookup
+
+    async def scenario():
+        await index.load(db)
+        assert await index.find(db, "aɪ", "RP") == []
+        db.formant_references.docs.append(
+            {"phoneme_ipa": "aɪ", "dialect": "RP", "speaker_group": "male", "F1_mean": 700})
+        stale = await index.find(db, "aɪ", "RP")      # same version → cached result
+        await db[pf._REF_META].update_one({"_id": "version"}, {"$inc": {"version": 1}}, upsert=True)
+        fresh = await index.find(db, "aɪ", "RP")
+        return stale, fresh
+
+    stale, fresh = asyncio.run(scenario())
+    assert stale == []
+    assert [r["F1_mean"] for r in fresh] == [700]
+
+
+def test_seeding_bumps_the_version_only_on_change():
+    db = FakeDB()
+
+    async def scenario():
+        first = await pf.ensure_formant_references(db)
+        v1 = (await db[pf._REF_META].find_one({"_id": "version"}))["version"]
+        second = await pf.ensure_formant_references(db)
+        v2 = (await db[pf._REF_META].find_one({"_id": "version"}))["version"]
+        return first, second, v1, v2
+
+    first, second, v1, v2 = asyncio.run(scenario())
+    assert first["inserted"] == first["total"] and second["inserted"] == second["modified"] == 0
+    assert v1 == v2 == 1
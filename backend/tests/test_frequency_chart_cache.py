@@ -0,0 +1,95 @@
+"""
+Materialised frequency chart on the phoneme card (Phase C).
+
+The public card read must return exactly what ``compute_frequency_chart``
+computes while, once materialised, costing a single ``find_one`` and no
+write; a canonical version bump or an edit of the card's chart inputs must
+produce the new chart. Runs offline over an in-memory DB double seeded with
+the real canonical rows.
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers import canonical_phonemes as cp  # noqa: E402
+from routers import phoneme_cards as pc  # noqa: E402
+from fake_mongo import FakeCollection, FakeDB  # noqa: E402
+
+
+_CARDS = [
+    {"id": "u-foot", "ipa": "ʊ", "displayIpa": "/ʊ/", "category": "vowel", "order": 1,
+     "dialects": ["AmE", "RP"], "published": True, "updatedAt": "t1",
+     "frequencyChart": [{"ipa": "ʊ", "height": 100, "active": True}]},   # legacy seed bars
+    {"id": "t-tap", "ipa": "t", "displayIpa": "/t/", "category": "consonant", "order": 2,
+     "dialects": ["AmE"], "published": True, "updatedAt": "t1"},
+]
+
+
+def _setup():
+    db = FakeDB()
+    db["phoneme_cards"] = FakeCollection(_CARDS)
+    asyncio.run(cp.ensure_canonical_seed(db))
+    app = FastAPI()
+    app.include_router(pc.build_phoneme_cards_router(db, lambda: {"username": "admin"}))
+    return db, TestClient(app)
+
+
+def _expected(db, card_id):
+    card = next(d for d in db.phoneme_cards.docs if d["id"] == card_id)
+    return asyncio.run(pc.compute_frequency_chart(
+        db, card["ipa"], card["category"], card.get("dialects") or []))
+
+
+def _chart(client, card_id):
+    r = client.get(f"/phonemes/{card_id}")
+    assert r.status_code == 200, r.text
+    return r.json()["frequencyChart"]
+
+
+def test_startup_sweep_replaces_legacy_bars_and_reads_are_one_find_one():
+    db, client = _setup()
+    assert asyncio.run(pc.refresh_stale_charts(db)) == 2
+    assert asyncio.run(pc.refresh_stale_charts(db)) == 0
+    for card_id in ("u-foot", "t-tap"):
+        db.phoneme_cards.reads = db.phoneme_cards.writes = 0
+        db.canonical_phonemes.reads = 0
+        assert _chart(client, card_id) == _expected(db, card_id)
+        assert (db.phoneme_cards.reads, db.phoneme_cards.writes) == (1, 0)
+        assert db.canonical_phonemes.reads == 0
+
+
+def test_stale_chart_is_recomputed_on_read_and_persisted_once():
+    db, client = _setup()
+    first = _chart(client, "u-foot")
+    assert first == _expected(db, "u-foot") and len(first) > 1
+    stored = next(d for d in db.phoneme_cards.docs if d["id"] == "u-foot")
+    assert stored["frequencyChart"] == first
+    db.phoneme_cards.writes = 0
+    assert _chart(client, "u-foot") == first and db.phoneme_cards.writes == 0
+
+
+def test_canonical_bump_and_card_edit_produce_the_new_chart():
+    db, client = _setup()
+    asyncio.run(pc.refresh_stale_charts(db))
+    before = _chart(client, "u-foot")
+
+    # Unrank the most frequent GenAm vowel and bump the version.
+    ranked = [d for d in db.canonical_phonemes.docs
+              if d["dialect"] == "GenAm" and d["kind"] == "vowel" and d.get("frequency_rank")]
+    min(ranked, key=lambda d: d["frequency_rank"])["frequency_rank"] = None
+    asyncio.run(cp.bump_canonical_version(db))
+    after = _chart(client, "u-foot")
+    assert after == _expected(db, "u-foot") and after != before
+
+    r = client.put("/admin/phonemes/u-foot", json={"dialects": ["RP"]})
+    assert r.status_code == 200, r.text
+    stored = next(d for d in db.phoneme_cards.docs if d["id"] == "u-foot")
+    assert stored["frequencyChartKey"]["dialect"] == "RP"
+    assert r.json()["frequencyChart"] == stored["frequencyChart"] == _expected(db, "u-foot")
+    db.phoneme_cards.writes = 0
+    assert _chart(client, "u-foot") == stored["frequencyChart"] and db.phoneme_cards.writes == 0
@@ -0,0 +1,77 @@
+"""
+Lazy LPC-ceiling evaluation (``_measure_all_ceilings(lazy=True)``).
+
+Guards two invariants:
+  * a plausible+stable take stops after the ceiling that produced the
+    ``ok`` window — later ceilings are never analysed;
+  * the lazy pipeline is a pure latency change: the score, the selected
+    window and the Expert-Mode diagnostics equal the eager pipeline's.
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers import phoneme_formants as pf  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "vowel_i.wav"
+
+
+def _window(f1, f2, f3, sd=5.0):
+    return {"start_ms": 0.0, "end_ms": 15.0, "F1": f1, "F2": f2, "F3": f3,
+            "F1_sd": sd, "F2_sd": sd, "F3_sd": sd, "sd_f1f2": 2 * sd}
+
+
+def _lazy(windows_per_ceiling):
+    calls = []
+
+    def compute(i):
+        calls.append(i)
+        hz = round(pf._CEILINGS[i][0])
+        return {"ceiling_hz": hz, "max_num": 5, "windows": windows_per_ceiling[i]}
+
+    return pf.LazyCeilings(compute, len(pf._CEILINGS)), calls
+
+
+_RANGES = {"F1": {"min": 300, "max": 400}, "F2": {"min": 2000, "max": 2600}}
+
+
+def test_ok_on_first_ceiling_computes_only_that_ceiling():
+    ceilings, calls = _lazy([[_window(350, 2300, 3000)], [], []])
+    sel = pf._select_measurement(ceilings, _RANGES)
+    assert sel["status"] == "ok"
+    assert calls == [0]
+
+
+def test_implausible_take_walks_every_ceiling():
+    ceilings, calls = _lazy([[_window(900, 900, 2500)]] * 3)
+    sel = pf._select_measurement(ceilings, _RANGES)
+    assert sel["status"] == "implausible"
+    assert calls == [0, 1, 2]
+    assert len(sel["attempts"]) == 3
+
+
+def test_memoised_ceilings_are_not_recomputed():
+    ceilings, calls = _lazy([[_window(900, 900, 2500)], [_window(350, 2300, 3000)], []])
+    pf._select_measurement(ceilings, _RANGES)
+    overview = pf._ceilings_overview(ceilings, _RANGES)
+    assert calls == [0, 1, 2]
+    assert [c["plausible"] for c in overview] == [False, True, False]
+
+
+def test_lazy_score_equals_eager_score():
+    pytest.importorskip("parselmouth")
+    from data.formant_references import build_reference_rows
+    refs = [r for r in build_reference_rows() if r["phoneme_ipa"] == "i" and r["dialect"] == "AmE"]
+
+    eager = pf._measure_all_ceilings(str(FIXTURE))
+    lazy = pf._measure_all_ceilings(str(FIXTURE), lazy=True)
+    a = pf.compute_formant_score(eager, refs, "i", "AmE")
+    b = pf.compute_formant_score(lazy, refs, "i", "AmE")
+    a.pop("analyzed_at")
+    b.pop("analyzed_at")
+    assert b == a
+    assert len(lazy["ceilings"].computed) < len(pf._CEILINGS)
+    assert lazy["ceilings"].all() == eager["ceilings"]
@@ -0,0 +1,134 @@
+"""
+Precompiled CMUdict × wordfreq index (``phoneme_lexicon_rule.LexiconIndex``).
+
+Lexicon generation, ``word_to_ipa`` and ``word_contains_phoneme`` must answer
+exactly like the full-dictionary scan they replace; a stale index (other
+cmudict / wordfreq versions) must be rebuilt, and an index that cannot be
+built must fall back to the scan. The request-path accessor never builds
+nor waits for a build: lookups scan until the index is ready. Runs offline
+(builds into a temp dir).
+"""
+import sys
+import random
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers import phoneme_lexicon_rule as lex  # noqa: E402
+
+# Stress-sensitive vowels, a diphthong, the first-vowel fallback and consonants.
+_IPAS = ["ə", "ʌ", "ɚ", "ɝ", "iː", "ɪ", "ʊ", "aɪ", "ʊə", "t", "ŋ", "ʒ"]
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    path = tmp_path_factory.mktemp("lexicon") / "index"
+    lex.build_lexicon_index(str(path))
+    return lex.LexiconIndex(str(path))
+
+
+@pytest.fixture
+def use_index(index, monkeypatch):
+    monkeypatch.setattr(lex, "_index", index)
+    monkeypatch.setattr(lex, "_index_failed", False)
+    return index
+
+
+def _scan_only(monkeypatch):
+    monkeypatch.setattr(lex, "_index", None)
+    monkeypatch.setattr(lex, "_index_failed", True)
+
+
+@pytest.mark.parametrize("ipa", _IPAS)
+def test_generated_lexicon_matches_the_scan(ipa, use_index, monkeypatch):
+    indexed = lex.generate_lexicon_for_canonical(ipa)
+    _scan_only(monkeypatch)
+    assert indexed == lex.generate_lexicon_for_canonical(ipa)
+    assert len(indexed["commonWords"]) == 30
+
+
+def test_word_lookups_match_the_scan(use_index, monkeypatch):
+    words = random.Random(3).sample(sorted(lex._get_cmudict()), 400)
+    words += ["the", "a", "Hello", "  about ", "who'll", "xyzzy", ""]
+    targets = sorted(set(lex._IPA_TO_ARPABET) | {"aɪ", "ʊə"})
+    indexed = [(lex.word_to_ipa(w), [lex.word_contains_phoneme(w, t) for t in targets])
+               for w in words]
+    _scan_only(monkeypatch)
+    assert indexed == [(lex.word_to_ipa(w), [lex.word_contains_phoneme(w, t) for t in targets])
+                       for w in words]
+
+
+def test_stale_index_is_rebuilt_and_build_failure_falls_back(index, monkeypatch):
+    monkeypatch.setattr(lex, "_INDEX_DIR", index.path)
+    monkeypatch.setattr(lex, "_index", None)
+    monkeypatch.setattr(lex, "_index_failed", False)
+    assert lex.load_lexicon_index().manifest == index.manifest   # fresh → opened as is
+
+    monkeypatch.setattr(lex, "_index", None)
+    monkeypatch.setattr(lex, "_source_versions", lambda: {"cmudict": "0", "wordfreq": "0"})
+    builds = []
+
+    def failing_build(dest):
+        builds.append(dest)
+        raise OSError("read-only file system")
+
+    monkeypatch.setattr(lex, "build_lexicon_index", failing_build)
+    assert lex.load_lexicon_index() is None and builds == [index.path]
+    assert lex.word_to_ipa("about") == "əbaʊt"   # served by the scan
+
+
+def test_request_path_scans_while_the_index_is_built(index, tmp_path, monkeypatch):
+    monkeypatch.setattr(lex, "_INDEX_DIR", str(tmp_path / "index"))
+    monkeypatch.setattr(lex, "_index", None)
+    monkeypatch.setattr(lex, "_index_failed", False)
+    monkeypatch.setattr(lex, "_build_thread", None)
+    monkeypatch.setattr(lex, "_status", {"state": "cold"})
+    release = threading.Event()
+    real_build = lex.build_lexicon_index
+
+    def slow_build(dest):
+        release.wait(10)
+        return real_build(dest)
+
+    monkeypatch.setattr(lex, "build_lexicon_index", slow_build)
+    assert lex.lexicon_index() is None                  # missing → build started, not awaited
+    assert lex.lexicon_status()["state"] == "building"
+    assert lex.word_to_ipa("about") == "əbaʊt"          # served by the scan meanwhile
+    assert lex._build_thread.is_alive()
+    release.set()
+    lex._build_thread.join(30)
+    assert lex.lexicon_index().manifest["sources"] == index.manifest["sources"]
+    assert lex.lexicon_status()["built"] is True
+
+
+def test_request_path_never_waits_for_the_lock(index, monkeypatch):
+    monkeypatch.setattr(lex, "_INDEX_DIR", index.path)
+    monkeypatch.setattr(lex, "_index", None)
+    monkeypatch.setattr(lex, "_index_failed", False)
+    with lex._index_lock:                                # warm-up holding it
+        assert lex.lexicon_index() is None
+    assert lex.lexicon_index().manifest == index.manifest
+
+
+def test_warmup_records_load_and_rss(index, monkeypatch):
+    monkeypatch.setattr(lex, "_INDEX_DIR", index.path)
+    monkeypatch.setattr(lex, "_index", None)
+    monkeypatch.setattr(lex, "_index_failed", False)
+    monkeypatch.setattr(lex, "_status", {"state": "cold"})
+    assert lex.lexicon_status()["state"] == "cold"
+    st = lex.warm_lexicon()
+    assert (st["state"], st["built"], st["words"]) == ("index", False, len(index))
+    assert st["rss_after_mb"] >= st["rss_before_mb"] > 0 and st["warm_ms"] >= 0
+
+
+def test_warmup_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("LEXICON_WARMUP", "0")
+    assert asyncio.run(_schedule()) is False
+
+
+async def _schedule():
+    return lex.schedule_lexicon_warmup()
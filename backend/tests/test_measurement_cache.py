@@ -0,0 +1,122 @@
+"""
+Content-addressed measurement cache (``routers.measurement_cache``) and the
+snapshot reuse rules of ``phoneme_formants.score_snapshot``.
+
+A cached snapshot must answer exactly as a fresh measurement would — or not
+at all. Runs offline (the DB tier is exercised against the in-memory DB
+collection double).
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers import measurement_cache as mc  # noqa: E402
+from routers import phoneme_formants as pf  # noqa: E402
+from fake_mongo import FakeDB  # noqa: E402
+
+FIXTURE = Path(__file__).parent / "fixtures" / "vowel_i.wav"
+
+
+def test_key_depends_on_bytes_kind_and_params():
+    k = mc.measurement_key(b"abc", "take", "p1")
+    assert k == mc.measurement_key(b"abc", "take", "p1")
+    assert k != mc.measurement_key(b"abd", "take", "p1")
+    assert k != mc.measurement_key(b"abc", "reference", "p1")
+    assert k != mc.measurement_key(b"abc", "take", "p2")
+
+
+def test_lru_evicts_oldest_and_counts():
+    cache = mc.MeasurementCache(lru_size=2)
+
+    async def scenario():
+        await cache.put("a", "take", {"v": 1})
+        await cache.put("b", "take", {"v": 2})
+        assert await cache.get("a") == {"v": 1}   # a becomes most recent
+        await cache.put("c", "take", {"v": 3})    # evicts b
+        return await cache.get("b"), await cache.stats()
+
+    missing, stats = asyncio.run(scenario())
+    assert missing is None
+    assert (stats["hits_memory"], stats["misses"], stats["memory_entries"]) == (1, 1, 2)
+
+
+def test_db_tier_hit_is_promoted_and_purge_clears_both_tiers():
+    db = FakeDB()
+    warm = mc.MeasurementCache(lru_size=8)
+    warm.attach_db(db)
+    cold = mc.MeasurementCache(lru_size=8)  # e.g. another app process
+    cold.attach_db(db)
+
+    async def scenario():
+        await warm.put("k", "take", {"v": 1})
+        first, second = await cold.get("k"), await cold.get("k")
+        purged = await cold.purge("take")
+        return first, second, purged, await cold.get("k"), await cold.stats()
+
+    first, second, purged, after, stats = asyncio.run(scenario())
+    assert first == second == {"v": 1}
+    assert (stats["hits_db"], stats["hits_memory"]) == (1, 1)
+    assert purged == {"memory_purged": 1, "db_purged": 1}
+    assert after is None
+
+
+def test_disabled_cache_is_a_noop():
+    cache = mc.MeasurementCache(lru_size=8, enabled=False)
+
+    async def scenario():
+        await cache.put("k", "take", {"v": 1})
+        return await cache.get("k")
+
+    assert asyncio.run(scenario()) is None
+
+
+# ---- snapshot reuse (phoneme_formants) ---------------------------------- #
+def _window(f1, f2, f3, sd=5.0):
+    return {"start_ms": 0.0, "end_ms": 15.0, "F1": f1, "F2": f2, "F3": f3,
+            "F1_sd": sd, "F2_sd": sd, "F3_sd": sd, "sd_f1f2": 2 * sd}
+
+
+def _refs(ipa="i", dialect="AmE"):
+    from data.formant_references import build_reference_rows
+    return [r for r in build_reference_rows() if r["phoneme_ipa"] == ipa and r["dialect"] == dialect]
+
+
+def _partial_snapshot(first_ceiling_windows):
+    meas = {"f0_global": 120, "duration": 1.0, "max_num_formants": 5,
+            "ceilings": [{"ceiling_hz": 5500, "max_num": 5, "windows": first_ceiling_windows}]}
+    return {"meas": meas, "complete": False}
+
+
+def test_partial_snapshot_answers_only_when_selection_ends_inside_it():
+    refs = _refs()
+    row = next(r for r in refs if r["speaker_group"] in ("men", "male"))
+    good = _window(row["F1_mean"], row["F2_mean"], row["F3_mean"])
+    ok = pf.score_snapshot(_partial_snapshot([good]), refs, "i", "AmE")
+    assert ok is not None and "result" in ok
+    assert ok["result"]["diagnostics"]["ceiling_selected_hz"] == 5500
+
+    # Same prefix, but Expert Mode wants every ceiling → re-measure.
+    assert pf.score_snapshot(_partial_snapshot([good]), refs, "i", "AmE", expert=True) is None
+    # Implausible inside the prefix → the unseen ceilings might still fit.
+    bad = _window(900, 900, 2500)
+    assert pf.score_snapshot(_partial_snapshot([bad]), refs, "i", "AmE") is None
+
+
+def test_unmeasurable_snapshot_replays_the_422():
+    out = pf.score_snapshot(pf._snapshot(None), _refs(), "i", "AmE")
+    assert out["error"]["status_code"] == 422
+
+
+def test_worker_snapshot_round_trip_matches_fresh_score():
+    pytest.importorskip("parselmouth")
+    refs = _refs()
+    fresh = pf.score_take_from_path(str(FIXTURE), refs, "i", "AmE")
+    snap = fresh.pop("snapshot")
+    cached = pf.score_snapshot(snap, refs, "i", "AmE")
+    fresh["result"].pop("analyzed_at")
+    cached["result"].pop("analyzed_at")
+    assert cached == fresh
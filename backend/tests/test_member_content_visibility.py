@@ -0,0 +1,167 @@
+"""
+Member content reads (``server.get_member_content`` / ``get_single_content``).
+
+Visibility is materialised on every ``member_content`` doc
+(``utils.member_content`` — ``visible_to`` + ``folder_name``): a member read
+must be one query and return exactly what the old per-request
+``$or`` over public / assigned / assigned-folder returned, the index must
+follow the assign / update / folder endpoints, and keyset pages on
+``(order, id)`` must tile the full listing. Runs offline over an in-memory
+DB double.
+"""
+import os
+import sys
+import random
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException, Response
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test")
+
+import server  # noqa: E402
+from utils.member_content import (  # noqa: E402
+    ensure_visibility_index, encode_cursor, page_query, reindex_content,
+)
+from fake_mongo import FakeCollection, FakeDB  # noqa: E402
+
+
+USERS = ["u1", "u2", "u3"]
+
+
+def _seed(rng, n_folders=8):
+    db = FakeDB()
+    folders, content = [], []
+    for i in range(n_folders):
+        folders.append({"id": f"f{i}", "name": f"Folder {i}",
+                        "assigned_users": rng.sample(USERS, rng.randint(0, 2)),
+                        "created_at": "2026-01-01T00:00:00+00:00"})
+        for j in range(rng.randint(1, 6)):
+            content.append({"id": f"c{i}-{j}", "title": f"T{i}{j}", "content_type": "video",
+                            "url": "https://example.com", "folder_id": f"f{i}",
+                            "is_public": rng.random() < 0.3, "order": rng.randint(0, 4),
+                            "assigned_users": rng.sample(USERS, rng.randint(0, 1)),
+                            "created_at": "2026-01-01T00:00:00+00:00"})
+    content.append({"id": "loose", "title": "L", "content_type": "pdf", "url": "x",
+                    "folder_id": None, "is_public": True, "order": 2,
+                    "created_at": "2026-01-01T00:00:00+00:00"})
+    db["folders"] = FakeCollection(folders)
+    db["member_content"] = FakeCollection(content)
+    asyncio.run(ensure_visibility_index(db))
+    db.round_trips = 0
+    db.member_content.bulk_writes.clear()
+    return db
+
+
+def _legacy_visible(db, user_id):
+    """The per-request predicate ``get_member_content`` used to build."""
+    assigned = [f["id"] for f in db.folders.docs if user_id in f.get("assigned_users", [])]
+    names = {f["id"]: f["name"] for f in db.folders.docs}
+    return {c["id"]: names.get(c.get("folder_id")) for c in db.member_content.docs
+            if c.get("is_public") is True or user_id in c.get("assigned_users", [])
+            or c.get("folder_id") in assigned}
+
+
+def _list(user, **kw):
+    resp = Response()
+    items = asyncio.run(server.get_member_content(response=resp, current_user=user,
+                                                  folder_id=kw.get("folder_id"),
+                                                  limit=kw.get("limit", 1000),
+                                                  cursor=kw.get("cursor")))
+    return items, resp.headers.get("X-Next-Cursor")
+
+
+@pytest.mark.parametrize("user_id", USERS + ["nobody"])
+def test_listing_matches_legacy_predicate_in_one_query(user_id, monkeypatch):
+    db = _seed(random.Random(user_id))
+    monkeypatch.setattr(server, "db", db)
+
+    items, nxt = _list({"id": user_id, "role": "client"})
+    assert db.round_trips == 1 and nxt is None
+    assert {c.id: c.folder_name for c in items} == _legacy_visible(db, user_id)
+    assert all(c.assigned_users == [] for c in items)
+
+
+def test_single_content_is_gated_by_the_index(monkeypatch):
+    db = _seed(random.Random(3))
+    monkeypatch.setattr(server, "db", db)
+    for user_id in USERS:
+        visible = _legacy_visible(db, user_id)
+        for c in db.member_content.docs:
+            user = {"id": user_id, "role": "client"}
+            if c["id"] in visible:
+                got = asyncio.run(server.get_single_content(c["id"], current_user=user))
+                assert got.folder_name == visible[c["id"]]
+            else:
+                with pytest.raises(HTTPException) as e:
+                    asyncio.run(server.get_single_content(c["id"], current_user=user))
+                assert e.value.status_code == 403
+
+
+def test_index_follows_assign_update_and_folder_endpoints(monkeypatch):
+    db = _seed(random.Random(5))
+    monkeypatch.setattr(server, "db", db)
+    admin = {"username": "admin", "role": "admin"}
+
+    def check():
+        for user_id in USERS:
+            items, _ = _list({"id": user_id, "role": "client"})
+            assert {c.id: c.folder_name for c in items} == _legacy_visible(db, user_id)
+
+    asyncio.run(server.assign_users_to_folder("f0", server.AssignUsersRequest(user_ids=["u1", "u2"]), admin=admin))
+    check()
+    asyncio.run(server.assign_users_to_content("c1-0", server.AssignUsersRequest(user_ids=["u3"]), admin=admin))
+    check()
+    asyncio.run(server.update_content("c2-0", server.ContentUpdate(is_public=True, folder_id="f3"), admin=admin))
+    check()
+    asyncio.run(server.update_folder("f3", server.FolderUpdate(name="Renamed"), admin=admin))
+    check()
+
+
+def test_keyset_pages_tile_the_listing(monkeypatch):
+    db = _seed(random.Random(11), n_folders=20)
+    monkeypatch.setattr(server, "db", db)
+    admin = {"id": "a", "role": "admin"}
+
+    full, _ = _list(admin)
+    paged, cursor = [], None
+    while True:
+        page, cursor = _list(admin, limit=4, cursor=cursor)
+        paged += page
+        if cursor is None:
+            break
+    assert [c.id for c in paged] == [c.id for c in full]
+    assert [(c.order, c.id) for c in full] == sorted((c.order, c.id) for c in full)
+
+
+def test_bad_cursor_is_a_400(monkeypatch):
+    monkeypatch.setattr(server, "db", _seed(random.Random(0)))
+    with pytest.raises(HTTPException) as e:
+        _list({"id": "u1", "role": "client"}, cursor="not-a-cursor")
+    assert e.value.status_code == 400
+
+
+def test_reindex_only_rewrites_stale_docs():
+    db = _seed(random.Random(2))
+    assert asyncio.run(reindex_content(db, {})) == 0
+    db.folders.docs[0]["assigned_users"] = ["u1", "u2", "u3"]
+    n = asyncio.run(reindex_content(db, {"folder_id": "f0"}))
+    assert 0 < n == sum(db.member_content.bulk_writes)
+    assert page_query({}, encode_cursor({"order": 1, "id": "x"}))["$or"][1] == {"order": 1, "id": {"$gt": "x"}}
+
+
+def test_content_without_is_public_is_public(monkeypatch):
+    db = _seed(random.Random(4))
+    db.member_content.docs.append({"id": "old", "title": "Old", "content_type": "pdf", "url": "x",
+                                   "folder_id": None, "order": 0, "visible_to": [],
+                                   "created_at": "2026-01-01T00:00:00+00:00"})
+    assert asyncio.run(ensure_visibility_index(db)) == 1
+    monkeypatch.setattr(server, "db", db)
+    user = {"id": "nobody", "role": "client"}
+
+    got = asyncio.run(server.get_single_content("old", current_user=user))
+    items, _ = _list(user)
+    assert got.is_public is True and "old" in {c.id for c in items}
@@ -0,0 +1,97 @@
+"""
+Member / admin folder listings (``server.get_member_folders`` & co.).
+
+Per-folder content counts now come from one ``$group`` aggregation
+(``utils.member_content.folder_content_counts``) instead of one
+``count_documents`` per folder: the counts must match the per-folder
+queries they replace — visibility predicate included — and a listing must
+cost two round trips whatever the number of folders. Runs offline over an
+in-memory DB double.
+"""
+import os
+import sys
+import random
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "test")
+
+import server  # noqa: E402
+from utils.member_content import client_visibility_filter, folder_content_counts  # noqa: E402
+from fake_mongo import FakeCollection, FakeDB, match  # noqa: E402
+
+
+def _seed(n_folders, rng):
+    db = FakeDB()
+    users = ["u1", "u2", "u3"]
+    folders, content = [], []
+    for i in range(n_folders):
+        folders.append({"id": f"f{i}", "name": f"Folder {i}", "order": n_folders - i,
+                        "is_public": rng.random() < 0.5,
+                        "assigned_users": rng.sample(users, rng.randint(0, 2)),
+                        "created_at": "2026-01-01T00:00:00+00:00"})
+        for j in range(rng.randint(0, 6)):
+            content.append({"id": f"c{i}-{j}", "folder_id": f"f{i}",
+                            "is_public": rng.random() < 0.4,
+                            "assigned_users": rng.sample(users, rng.randint(0, 2))})
+    content.append({"id": "loose", "folder_id": None, "is_public": True})
+    db["folders"] = FakeCollection(folders)
+    db["member_content"] = FakeCollection(content)
+    return db
+
+
+async def _legacy_counts(db, folders, user_id):
+    out = {}
+    for f in folders:
+        q = {"folder_id": f["id"]}
+        if user_id is not None:
+            q.update(client_visibility_filter(user_id))
+        out[f["id"]] = await db.member_content.count_documents(q)
+    return out
+
+
+@pytest.mark.parametrize("user", [{"id": "u1", "role": "client"},
+                                  {"id": "u3", "role": "client"},
+                                  {"id": "admin-1", "role": "admin"}])
+@pytest.mark.parametrize("n_folders", [1, 40])
+def test_member_folders_match_per_folder_counts_in_two_round_trips(user, n_folders, monkeypatch):
+    db = _seed(n_folders, random.Random(n_folders))
+    monkeypatch.setattr(server, "db", db)
+
+    listed = asyncio.run(server.get_member_folders(current_user=user))
+    assert db.round_trips == 2
+
+    uid = None if user["role"] == "admin" else user["id"]
+    visible = [f for f in db.folders.docs if uid is None or match(f, client_visibility_filter(uid))]
+    expected = asyncio.run(_legacy_counts(db, visible, uid))
+    assert [f["id"] for f in listed] == [f["id"] for f in sorted(visible, key=lambda f: f["order"])]
+    assert {f["id"]: f["content_count"] for f in listed} == expected
+
+
+def test_admin_listings_use_one_aggregation(monkeypatch):
+    db = _seed(25, random.Random(7))
+    db["youtube_playlists"] = FakeCollection([
+        {"id": "p1", "folder_id": "f3", "created_at": "2026-01-02T00:00:00+00:00"},
+        {"id": "p2", "folder_id": "gone", "created_at": "2026-01-01T00:00:00+00:00"}])
+    monkeypatch.setattr(server, "db", db)
+    expected = asyncio.run(_legacy_counts(db, db.folders.docs, None))
+
+    db.round_trips = 0
+    folders = asyncio.run(server.list_all_folders(admin={"role": "admin"}))
+    assert db.round_trips == 2
+    assert {f.id: f.content_count for f in folders} == expected
+
+    db.round_trips = 0
+    playlists = asyncio.run(server.get_youtube_playlists(admin={"role": "admin"}))
+    assert db.round_trips == 2
+    assert [p["current_video_count"] for p in playlists] == [expected["f3"], 0]
+
+
+def test_counts_skip_the_query_when_there_are_no_folders():
+    db = _seed(0, random.Random(0))
+    assert asyncio.run(folder_content_counts(db, [None, ""])) == {}
+    assert db.round_trips == 0
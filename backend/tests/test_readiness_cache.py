@@ -0,0 +1,97 @@
+"""
+Persisted readiness badge for ``GET /admin/phonemes`` (Phase E list).
+
+The list must show exactly what ``build_readiness_report`` computes, while
+recomputing only cards whose inputs changed: an edited card (``updatedAt``)
+or a new canonical inventory version. Runs offline over an in-memory DB
+double seeded with the real canonical rows.
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers import canonical_phonemes as cp  # noqa: E402
+from routers import phoneme_cards as pc  # noqa: E402
+from fake_mongo import FakeCollection, FakeDB  # noqa: E402
+
+
+_CARDS = [
+    {"id": "u-foot", "ipa": "ʊ", "displayIpa": "/ʊ/", "category": "vowel", "order": 1,
+     "dialects": ["AmE", "RP"], "updatedAt": "t1",
+     "hotspots": [{"id": "h1"}, {"id": "h2"}, {"id": "h3"}],
+     "features": [{"label": "Contrast", "value": "/ʊ/ vs /uː/: full vs fool"}]},
+    {"id": "i-fleece", "ipa": "iː", "displayIpa": "/iː/", "category": "vowel", "order": 2,
+     "dialects": ["AmE", "RP"], "updatedAt": "t1"},
+    {"id": "t-tap", "ipa": "t", "displayIpa": "/t/", "category": "consonant", "order": 3,
+     "dialects": ["AmE"], "updatedAt": "t1"},
+]
+
+
+def _setup():
+    db = FakeDB()
+    db["phoneme_cards"] = FakeCollection(_CARDS)
+    asyncio.run(cp.ensure_canonical_seed(db))
+    app = FastAPI()
+    app.include_router(pc.build_phoneme_cards_router(db, lambda: {"username": "admin"}))
+    return db, TestClient(app)
+
+
+def _badges(client):
+    r = client.get("/admin/phonemes")
+    assert r.status_code == 200, r.text
+    return {c["id"]: (c["readinessScore"], c["readinessReady"], c["readinessFailCount"])
+            for c in r.json()}
+
+
+def test_list_matches_fresh_reports_and_second_list_reads_no_canonical():
+    db, client = _setup()
+    first = _badges(client)
+    for card in _CARDS:
+        report = asyncio.run(pc.build_readiness_report(db, dict(card)))
+        assert first[card["id"]] == (report["score"], report["ready"], report["summary"]["fail"])
+
+    db.canonical_phonemes.reads = 0
+    assert _badges(client) == first
+    assert db.canonical_phonemes.reads == 0
+
+
+def test_only_the_edited_card_is_recomputed(monkeypatch):
+    db, client = _setup()
+    _badges(client)
+    card = next(d for d in db.phoneme_cards.docs if d["id"] == "t-tap")
+    card.update(updatedAt="t2", dialects=["AmE", "RP"])
+    hashes = {d["id"]: d["readiness"]["hash"] for d in db.phoneme_cards.docs}
+
+    built = []
+    real = pc.build_readiness_report
+
+    async def counting(db_, card_):
+        built.append(card_["id"])
+        return await real(db_, card_)
+
+    monkeypatch.setattr(pc, "build_readiness_report", counting)
+    after = _badges(client)
+    assert built == ["t-tap"]
+    report = asyncio.run(real(db, dict(card)))
+    assert after["t-tap"] == (report["score"], report["ready"], report["summary"]["fail"])
+    assert {d["id"] for d in db.phoneme_cards.docs
+            if d["readiness"]["hash"] == hashes[d["id"]]} >= {"u-foot", "i-fleece"}
+
+
+def test_canonical_seed_bumps_version_only_on_change_and_invalidates_badges():
+    db, client = _setup()
+    _badges(client)
+    v1 = asyncio.run(cp.canonical_version(db))
+    result = asyncio.run(cp.ensure_canonical_seed(db))   # unchanged rows
+    assert result["changed"] == 0 and asyncio.run(cp.canonical_version(db)) == v1 == 1
+
+    asyncio.run(cp.bump_canonical_version(db))
+    db.canonical_phonemes.reads = 0
+    _badges(client)
+    assert db.canonical_phonemes.reads > 0
+    assert {d["readiness"]["canonicalVersion"] for d in db.phoneme_cards.docs} == {2}
@@ -0,0 +1,132 @@
+"""
+Background ``regenerate-derived`` job (``phoneme_cards.run_regenerate_derived_job``).
+
+The job must write exactly what running each DERIVED rule on its own
+(canonical row looked up per rule, as before) produces, flush only changed
+cards through one ``bulk_write`` per chunk, report progress on the job
+document, and in dry-run mode write nothing but the per-card diff. A job a
+restart interrupted is closed as failed at startup. Runs
+offline over an in-memory DB double seeded with the real canonical rows.
+"""
+import sys
+import time
+import copy
+import asyncio
+from pathlib import Path
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers import canonical_phonemes as cp  # noqa: E402
+from routers import phoneme_cards as pc  # noqa: E402
+from fake_mongo import FakeCollection, FakeDB  # noqa: E402
+
+
+_CARDS = [
+    {"id": "u-foot", "ipa": "ʊ", "category": "vowel", "dialects": ["AmE", "RP"],
+     "updatedAt": "t1", "hotspots_locked": True, "lexicon_locked": True,
+     "hotspots": [{"id": "h1"}], "pronunciation_locked": True},
+    {"id": "i-fleece", "ipa": "iː", "category": "vowel", "dialects": ["AmE", "RP"], "updatedAt": "t1",
+     "pronunciationGuide": {"body": "Authored paragraph."}},
+    {"id": "t-tap", "ipa": "t", "category": "consonant", "dialects": ["AmE"], "updatedAt": "t1"},
+    {"id": "r-red", "ipa": "r", "category": "consonant", "dialects": ["RP"], "updatedAt": "t1"},
+    {"id": "zz-none", "ipa": "q", "category": "consonant", "dialects": ["RP"], "updatedAt": "t1"},
+    {"ipa": "x"},   # no id → skipped
+]
+
+
+def _setup():
+    db = FakeDB()
+    db["phoneme_cards"] = FakeCollection(_CARDS)
+    asyncio.run(cp.ensure_canonical_seed(db))
+    return db
+
+
+def _run(db, dry_run=False):
+    async def go():
+        job = await pc.start_regenerate_derived_job(db, "admin", dry_run)
+        await pc._regen_tasks[job["id"]]
+        return await db[pc._REGEN_JOBS].find_one({"id": job["id"]})
+    return asyncio.run(go())
+
+
+async def _legacy(db, card):
+    """Each rule resolving its own canonical row (the pre-job behaviour)."""
+    await pc.apply_muscle_rule_to_doc(db, card)
+    await pc.apply_overlay_rule_to_doc(db, card)
+    if not card.get("hotspots_locked"):
+        await pc.apply_hotspot_rule_to_doc(db, card)
+    if not card.get("lexicon_locked"):
+        await pc.apply_lexicon_rule_to_doc(db, card, preserve_audio=True)
+    if not card.get("pronunciation_locked"):
+        await pc.apply_pronunciation_rule_to_doc(db, card, preserve_body=True)
+    return pc._derived_fields(card)
+
+
+def test_job_writes_what_the_per_rule_lookups_produce(monkeypatch):
+    monkeypatch.setattr(pc, "_REGEN_FLUSH_EVERY", 2)
+    db = _setup()
+    expected = {c["id"]: asyncio.run(_legacy(db, copy.deepcopy(c))) for c in _CARDS if "id" in c}
+
+    job = _run(db)
+    assert (job["status"], job["total"], job["processed"], job["skipped"]) == ("done", 5, 5, 1)
+    assert [r["id"] for r in job["results"]] == list(expected)
+    assert db.phoneme_cards.bulk_writes == [2, 2, 1] and job["written"] == 5
+    for doc in db.phoneme_cards.docs:
+        if "id" in doc:
+            assert pc._derived_fields(doc) == expected[doc["id"]], doc["id"]
+            assert doc["updatedBy"] == "admin" and doc["readiness"]["cardUpdatedAt"] == doc["updatedAt"]
+    foot = next(r for r in job["results"] if r["id"] == "u-foot")
+    assert {"hotspots(locked)", "lexicon(locked)", "pronunciation(locked)"} <= set(foot["skipped"])
+    i_fleece = next(d for d in db.phoneme_cards.docs if d.get("id") == "i-fleece")
+    assert i_fleece["pronunciationGuide"]["body"] == "Authored paragraph."
+
+    # Idempotent: a second run finds nothing to write.
+    again = _run(db)
+    assert again["written"] == 0 and all(r["changed"] == [] for r in again["results"])
+    assert db.phoneme_cards.bulk_writes == [2, 2, 1]
+
+
+def test_dry_run_records_diffs_and_writes_nothing():
+    db = _setup()
+    before = copy.deepcopy(db.phoneme_cards.docs)
+    job = _run(db, dry_run=True)
+    assert job["status"] == "done" and job["written"] == 0
+    assert db.phoneme_cards.docs == before and db.phoneme_cards.bulk_writes == []
+    tap = next(r for r in job["results"] if r["id"] == "t-tap")
+    assert "facialMuscles" in tap["changed"] and set(tap["diff"]) == set(tap["changed"])
+    assert tap["diff"]["facialMuscles"]["before"] == []
+
+
+def test_endpoint_starts_the_job_and_reports_progress():
+    db = _setup()
+    app = FastAPI()
+    app.include_router(pc.build_phoneme_cards_router(db, lambda: {"username": "admin"}))
+    with TestClient(app) as client:
+        r = client.post("/admin/phonemes/batch/regenerate-derived?dry_run=true")
+        assert r.status_code == 202, r.text
+        job_id = r.json()["jobId"]
+        for _ in range(200):
+            status = client.get(f"/admin/phonemes/batch/regenerate-derived/{job_id}"
+                                "?include_results=false").json()
+            if status["status"] == "done":
+                break
+            time.sleep(0.05)
+        assert status["status"] == "done" and status["processed"] == 5
+        assert "results" not in status
+        assert client.get("/admin/phonemes/batch/regenerate-derived/nope").status_code == 404
+
+
+def test_startup_fails_jobs_a_restart_interrupted():
+    db = _setup()
+    db[pc._REGEN_JOBS] = FakeCollection([
+        {"id": "dead", "status": "running"}, {"id": "never-ran", "status": "queued"},
+        {"id": "old", "status": "done"}])
+    assert asyncio.run(pc.fail_interrupted_regen_jobs(db)) == ["dead", "never-ran"]
+    status = {j["id"]: j["status"] for j in db[pc._REGEN_JOBS].docs}
+    assert status == {"dead": "failed", "never-ran": "failed", "old": "done"}
+    assert all(j.get("error") for j in db[pc._REGEN_JOBS].docs if j["status"] == "failed")
+    # Nothing left running: a new job starts (no 409) and completes.
+    assert _run(db, dry_run=True)["status"] == "done"
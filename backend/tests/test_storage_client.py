@@ -0,0 +1,123 @@
+"""
+Pooled async storage client (``storage_helper.StorageClient``).
+
+Against the local stand-in store (``scripts/fake_object_store.py``): many
+concurrent transfers must ride a few kept-alive connections under the
+concurrency cap, an expired storage key must be refreshed once for every
+request that hit the 403, 5xx / transport errors must be retried with
+backoff, and the blocking facade used by CLI scripts must share one pool
+across calls. Runs offline.
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import storage_helper as sh  # noqa: E402
+from routers import uploads  # noqa: E402
+from fake_object_store import FakeObjectStore  # noqa: E402
+
+
+def _client(**kw):
+    kw = {"concurrency": 3, "max_connections": 3, "max_keepalive": 3,
+          "backoff_s": 0.01, "http2": False, **kw}
+    return sh.StorageClient(**kw)
+
+
+@pytest.fixture
+def store(monkeypatch):
+    monkeypatch.setattr(sh, "_storage_key", None)
+    srv = FakeObjectStore(latency_s=0.02).start()
+    monkeypatch.setenv("EMERGENT_STORAGE_URL", srv.url)
+    monkeypatch.setenv("EMERGENT_LLM_KEY", srv.emergent_key)
+    yield srv
+    srv.stop()
+
+
+def _run(client, coro_fn):
+    async def go():
+        try:
+            return await coro_fn(client)
+        finally:
+            await client.aclose()
+    return asyncio.run(go())
+
+
+def test_concurrent_transfers_reuse_pooled_connections(store):
+    async def go(c):
+        puts = await asyncio.gather(*(c.put(f"a/{i}.mp3", b"x%d" % i, "audio/mpeg")
+                                      for i in range(24)))
+        return puts, await c.get("a/7.mp3"), await c.get("a/missing.mp3")
+
+    puts, hit, miss = _run(_client(), go)
+    assert all(puts) and hit == (b"x7", "audio/mpeg") and miss is None
+    assert store.objects["vocalfitness/uploads/a/0.mp3"] == (b"x0", "audio/mpeg")
+    assert store.peak_in_flight <= 3
+    assert len(store.connections) <= 3 and store.inits == 1    # 27 requests, ≤ 3 sockets
+
+
+def test_expired_key_is_refreshed_once_for_concurrent_requests(store):
+    async def go(c):
+        assert await c.put("warm.txt", b"w")
+        store.expire_keys()
+        return await asyncio.gather(*(c.put(f"k/{i}", b"k") for i in range(6)))
+
+    c = _client()
+    assert all(_run(c, go))
+    assert store.inits == 2 and c.stats["keyRefreshes"] == 1
+    assert sum(r["status"] == 200 and r["path"].startswith("vocalfitness/uploads/k/")
+               for r in store.requests) == 12                   # 6 refused + 6 retried
+
+
+def test_server_errors_are_retried_then_given_up(store):
+    store.failures = {"vocalfitness/uploads/flaky.mp3": [503, 502],
+                      "vocalfitness/uploads/down.mp3": [500, 500, 500]}
+
+    async def go(c):
+        return await c.put("flaky.mp3", b"f"), await c.put("down.mp3", b"d")
+
+    c = _client(max_retries=2)
+    assert _run(c, go) == (True, False)
+    assert c.stats["retries"] == 4
+    assert "vocalfitness/uploads/down.mp3" not in store.objects
+
+
+def test_unreachable_store_and_missing_key_fail_soft(store, monkeypatch):
+    monkeypatch.setenv("EMERGENT_LLM_KEY", "")
+    assert _run(_client(), lambda c: c.put("a.mp3", b"a")) is False
+    assert store.requests == []
+
+    monkeypatch.setenv("EMERGENT_LLM_KEY", store.emergent_key)
+    assert _run(_client(), lambda c: c.init())
+    store.stop()
+    c = _client(max_retries=1)
+    assert _run(c, lambda c: c.get("a.mp3")) is None and c.stats["retries"] == 1
+
+
+def test_sync_facade_shares_one_pool_across_calls(store, monkeypatch):
+    monkeypatch.setattr(sh, "_sync_storage", _client())
+    assert sh.init_storage()
+    assert all(sh.put_object(f"cli/{i}.txt", b"c", "text/plain") for i in range(5))
+    assert sh.get_object("cli/3.txt") == (b"c", "text/plain")
+    assert len(store.connections) == 1
+
+
+def test_uploads_serve_falls_back_to_the_store_and_caches_locally(store, tmp_path, monkeypatch):
+    monkeypatch.setattr(sh, "storage", _client())
+    monkeypatch.setattr(uploads, "UPLOADS_DIR", tmp_path)
+    assert _run(_client(), lambda c: c.put("img/p.png", b"\x89PNG", "image/png"))
+    app = FastAPI()
+    app.include_router(uploads.build_uploads_router(
+        lambda: {"role": "admin"}, sh.put_object_async, sh.get_object_async,
+        sh.guess_content_type))
+    with TestClient(app) as client:
+        r = client.get("/uploads/img/p.png")
+        assert (r.status_code, r.content, r.headers["content-type"]) == (200, b"\x89PNG", "image/png")
+        assert client.get("/uploads/img/nope.png").status_code == 404
+    assert (tmp_path / "img" / "p.png").read_bytes() == b"\x89PNG"
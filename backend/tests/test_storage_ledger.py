@@ -0,0 +1,162 @@
+"""
+Storage ledger (``utils.storage_ledger``).
+
+Usage must be recorded incrementally — overwrites and repeated records of
+one key move the counters by the delta only — per prefix, subdirectories
+included; quota reads are one ``find_one``; and ``reconcile`` must rebuild
+exactly what a full scan of ``UPLOADS_DIR`` (plus the keys only in object
+storage) adds up to, without undoing puts and deletes recorded while it
+runs. Runs offline over an in-memory DB double.
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import storage_helper  # noqa: E402
+from utils import storage_ledger as sl  # noqa: E402
+from fake_mongo import FakeDB  # noqa: E402
+
+
+@pytest.fixture
+def ledger(tmp_path, monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(sl, "UPLOADS_DIR", tmp_path)
+    monkeypatch.setattr(sl, "_db", db)
+    return db, tmp_path
+
+
+def _write(root, key, size):
+    path = root / key
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    return path
+
+
+def test_puts_and_deletes_move_counters_by_delta(ledger):
+    db, _ = ledger
+
+    async def go():
+        await sl.record_put("a.mp4", 100)
+        await sl.record_put("elevenlabs/x.mp3", 40)
+        await sl.record_put("elevenlabs/x.mp3", 40, remote=True)   # local + object copy
+        await sl.record_put("a.mp4", 150)                          # overwrite
+        await sl.record_put("thumbnails/t_160.webp", 5)
+        await sl.record_delete("thumbnails/t_160.webp")
+        await sl.record_delete("never-recorded.pdf")
+        return await sl.ledger_usage()
+
+    usage = asyncio.run(go())
+    assert (usage["bytes"], usage["files"]) == (190, 2)
+    assert usage["prefixes"] == {"root": {"bytes": 150, "files": 1},
+                                 "elevenlabs": {"bytes": 40, "files": 1},
+                                 "thumbnails": {"bytes": 0, "files": 0}}
+    db.round_trips = 0
+    assert asyncio.run(sl.used_bytes()) == 190 and db.round_trips == 1
+
+
+def test_tracked_put_records_only_successful_puts(ledger, monkeypatch):
+    outcomes = iter([True, False])
+
+    async def put(filename, data, content_type="application/octet-stream"):
+        return next(outcomes)
+
+    monkeypatch.setattr(storage_helper, "put_object_async", put)
+    assert asyncio.run(sl.tracked_put("recordings/a.webm", b"abc", "audio/webm"))
+    assert not asyncio.run(sl.tracked_put("recordings/b.webm", b"abcd", "audio/webm"))
+    db, _ = ledger
+    assert [(o["key"], o["size"], o.get("remote")) for o in db.storage_objects.docs] == [
+        ("recordings/a.webm", 3, True)]
+
+
+def test_reconcile_matches_a_full_scan(ledger):
+    db, root = ledger
+    _write(root, "a.mp4", 100)
+    _write(root, "popup_1_b.mp3", 30)
+    _write(root, "elevenlabs/x.mp3", 40)
+    _write(root, "thumbnails/thumb_k_160.webp", 7)
+    _write(root, "thumbnails/.upload_tmp.png", 999)   # staged write: skipped
+
+    async def go():
+        await sl.record_put("gone-local-only.mp4", 500)         # stale: dropped
+        await sl.record_put("a.mp4", 1)                          # drifted: fixed
+        await sl.record_put("recordings/r.webm", 60, remote=True)  # remote only: kept
+        return await sl.reconcile(batch=2)
+
+    totals = asyncio.run(go())
+    assert totals == {"bytes": 237, "files": 5, "prefixes": 4}
+    usage = asyncio.run(sl.ledger_usage())
+    assert usage["prefixes"] == {"root": {"bytes": 130, "files": 2},
+                                 "elevenlabs": {"bytes": 40, "files": 1},
+                                 "recordings": {"bytes": 60, "files": 1},
+                                 "thumbnails": {"bytes": 7, "files": 1}}
+    assert usage["reconciled_at"]
+    assert {o["key"] for o in db.storage_objects.docs} == {
+        "a.mp4", "popup_1_b.mp3", "elevenlabs/x.mp3", "thumbnails/thumb_k_160.webp", "recordings/r.webm"}
+
+
+def test_writes_recorded_during_reconcile_are_kept(ledger, monkeypatch):
+    db, root = ledger
+    for key, size in (("a.mp4", 100), ("b.mp4", 20), ("c.mp4", 5), ("e.mp4", 9)):
+        _write(root, key, size)
+    asyncio.run(sl.record_put("b.mp4", 20))
+    asyncio.run(sl.record_put("c.mp4", 5))
+    find, aggregate, ledger_write = (db.storage_objects.find, db.storage_objects.aggregate,
+                                     db.storage_ledger.bulk_write)
+    late = []
+
+    class _AfterRead:
+        """Writes that land between the rebuild's read and its upserts."""
+        def __init__(self, cursor):
+            self.cursor = cursor
+
+        async def to_list(self, length=None):
+            docs = await self.cursor.to_list(length)
+            (root / "b.mp4").unlink()
+            await sl.record_delete("b.mp4")
+            _write(root, "c.mp4", 50)
+            await sl.record_put("c.mp4", 50)
+            (root / "e.mp4").unlink()             # never recorded: nothing to delete
+            return docs
+
+    def racing_aggregate(pipeline):
+        # A put issued while the counters are summed and rewritten.
+        late.append(asyncio.get_running_loop().create_task(sl.record_put("d.mp4", 7, remote=True)))
+        return aggregate(pipeline)
+
+    async def yielding_ledger_write(ops, ordered=True):
+        if len(late) == 1:                       # the rebuild's write: let the put run first
+            late.append(None)
+            await asyncio.sleep(0)
+        return await ledger_write(ops, ordered)
+
+    monkeypatch.setattr(db.storage_objects, "find", lambda q, p=None: _AfterRead(find(q, p)))
+    monkeypatch.setattr(db.storage_objects, "aggregate", racing_aggregate)
+    monkeypatch.setattr(db.storage_ledger, "bulk_write", yielding_ledger_write)
+
+    async def go():
+        await sl.reconcile()
+        await late[0]
+        return await sl.ledger_usage()
+
+    usage = asyncio.run(go())
+    assert {o["key"]: o["size"] for o in db.storage_objects.docs} == {"a.mp4": 100, "c.mp4": 50, "d.mp4": 7}
+    assert (usage["bytes"], usage["files"]) == (157, 3)
+    assert usage["prefixes"] == {"root": {"bytes": 157, "files": 3}}
+
+
+def test_startup_builds_the_ledger_once(ledger, monkeypatch):
+    db, root = ledger
+    _write(root, "a.mp4", 10)
+
+    async def go():
+        assert await sl.ensure_storage_ledger(db)
+        await sl._reconcile_task
+        assert not await sl.ensure_storage_ledger(db)
+
+    monkeypatch.setattr(sl, "_reconcile_task", None)
+    asyncio.run(go())
+    assert asyncio.run(sl.used_bytes()) == 10
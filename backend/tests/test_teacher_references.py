@@ -0,0 +1,204 @@
+"""
+Precomputed teacher-reference index (``routers.teacher_references``).
+
+Guards the hot-path contract: an indexed clip is answered from the index
+without touching the audio, unchanged bytes are never re-measured, and a
+change of measurement parameters turns old rows into misses. Runs offline —
+the collection is the in-memory DB double and the measuring step is counted,
+not executed. A miss or a replaced clip never measures on the request path,
+and only card reference clips are ever queued; an unreadable clip gets a
+terminal row (422, not an endless 503); indexing jobs the saturated pool
+rejects are retried.
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi import HTTPException
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers import teacher_references as tr  # noqa: E402
+from fake_mongo import FakeCollection, FakeDB  # noqa: E402
+
+
+@pytest.fixture
+def measured(monkeypatch):
+    calls = []
+
+    async def fake_extract(data, is_mp3):
+        calls.append((data, is_mp3))
+        return {"F1": 700, "F2": 1200, "F3": 2500, "F0": 110} if data != b"noise" else None
+
+    monkeypatch.setattr(tr, "extract_reference_bytes", fake_extract)
+    return calls
+
+
+def test_absolute_and_relative_upload_urls_share_a_key():
+    rel = "/api/uploads/elevenlabs/aɪ_word_AmE.mp3"
+    assert tr.normalise_audio_url("https://vocalfitness.example" + rel) == rel
+    assert tr.normalise_audio_url(rel + "?v=2") == rel
+    assert tr.normalise_audio_url("https://cdn.example/x.mp3") == "https://cdn.example/x.mp3"
+
+
+def test_card_reference_urls_skips_demonstrations():
+    card = {
+        "audio": {"AmE": {"isolated": "/api/uploads/a.mp3", "examples": ["/api/uploads/ex.mp3"],
+                          "wordExample": {"url": "/api/uploads/w.mp3"}},
+                  "RP": {"isolated": "https://x.example/api/uploads/a.mp3"}},
+        "mnemonic": {"audio": "/api/uploads/m.mp3"},
+        "commonWords": [{"w": "time", "audioAmE": "/api/uploads/t.mp3", "audioRP": ""}],
+    }
+    assert tr.card_reference_urls(card) == [
+        "/api/uploads/a.mp3", "/api/uploads/w.mp3", "/api/uploads/t.mp3"]
+
+
+def test_unchanged_clip_is_not_remeasured(measured):
+    db = FakeDB()
+
+    async def scenario():
+        first = await tr.index_reference_clip(db, "/api/uploads/a.mp3", data=b"clip")
+        again = await tr.index_reference_clip(db, "/api/uploads/a.mp3", data=b"clip")
+        edited = await tr.index_reference_clip(db, "/api/uploads/a.mp3", data=b"clip v2")
+        return first, again, edited
+
+    first, again, edited = asyncio.run(scenario())
+    assert (first["status"], again["status"], edited["status"]) == ("indexed", "unchanged", "indexed")
+    assert measured == [(b"clip", True), (b"clip v2", True)]
+    assert len(db[tr._COLLECTION].docs) == 1
+
+
+def test_resolve_reads_the_index_without_audio(measured, monkeypatch):
+    db = FakeDB()
+
+    async def no_download(url):
+        raise AssertionError("hot path must not fetch audio")
+
+    async def scenario():
+        await tr.index_reference_clip(db, "/api/uploads/a.mp3", data=b"clip")
+        await tr.index_reference_clip(db, "/api/uploads/n.wav", data=b"noise")
+        monkeypatch.setattr(tr, "_read_clip", no_download)
+        return (await tr.resolve_teacher_reference(db, "https://host/api/uploads/a.mp3"),
+                await tr.resolve_teacher_reference(db, "/api/uploads/n.wav"))
+
+    ref, unmeasurable = asyncio.run(scenario())
+    assert ref["F1"] == 700
+    assert unmeasurable is None
+    assert len(measured) == 2
+
+
+def test_parameter_change_turns_rows_into_misses(measured, monkeypatch):
+    db = FakeDB()
+
+    async def scenario():
+        await tr.index_reference_clip(db, "/api/uploads/a.mp3", data=b"clip")
+        monkeypatch.setattr(tr, "_measurement_params", lambda: "v999")
+        return await tr.lookup_teacher_reference(db, "/api/uploads/a.mp3")
+
+    assert asyncio.run(scenario()) == (False, None)
+
+
+def test_clip_replaced_under_the_same_url_is_a_miss(measured, monkeypatch, tmp_path):
+    monkeypatch.setattr(tr, "_UPLOADS_DIR", tmp_path)
+    clip = tmp_path / "a.mp3"
+    db = FakeDB()
+
+    async def scenario():
+        clip.write_bytes(b"clip")
+        await tr.index_reference_clip(db, "/api/uploads/a.mp3")
+        before = await tr.lookup_teacher_reference(db, "/api/uploads/a.mp3")
+        clip.write_bytes(b"re-recorded clip")
+        return before, await tr.lookup_teacher_reference(db, "/api/uploads/a.mp3")
+
+    before, after = asyncio.run(scenario())
+    assert before[0] and before[1]["F1"] == 700
+    assert after == (False, None)
+
+
+def _card_db(url):
+    db = FakeDB()
+    db["phoneme_cards"] = FakeCollection([{"id": "c1", "audio": {"AmE": {"isolated": url}}}])
+    return db
+
+
+def test_miss_is_queued_not_measured_inline(measured, monkeypatch):
+    db = _card_db("/api/uploads/new.mp3")
+    scheduled = []
+    monkeypatch.setattr(tr, "schedule_reference_index", lambda db, urls: scheduled.extend(urls))
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(tr.resolve_teacher_reference(db, "https://host/api/uploads/new.mp3"))
+    assert exc.value.status_code == 503 and exc.value.headers["Retry-After"]
+    assert measured == []
+    assert scheduled == ["https://host/api/uploads/new.mp3"]
+    assert db[tr._COLLECTION].docs[0]["status"] == "pending"
+    assert asyncio.run(tr.lookup_teacher_reference(db, "/api/uploads/new.mp3")) == (False, None)
+
+
+def test_index_job_rejected_by_a_saturated_pool_is_retried(monkeypatch):
+    db = FakeDB()
+    rejections = iter([True, True, False])
+
+    async def saturated_then_ok(data, is_mp3):
+        if next(rejections):
+            raise HTTPException(status_code=429, detail="busy")
+        return {"F1": 500, "F2": 1500, "F3": 2500, "F0": 120}
+
+    async def clip(url):
+        return b"clip"
+
+    monkeypatch.setattr(tr, "extract_reference_bytes", saturated_then_ok)
+    monkeypatch.setattr(tr, "_read_clip", clip)
+    monkeypatch.setattr(tr, "_INDEX_BACKOFF_S", 0)
+
+    async def scenario():
+        tr.schedule_reference_index(db, ["/api/uploads/a.mp3"])
+        await asyncio.gather(*tr._pending)
+        return await tr.lookup_teacher_reference(db, "/api/uploads/a.mp3")
+
+    found, ref = asyncio.run(scenario())
+    assert found and ref["F1"] == 500
+    assert not tr._scheduled
+
+
+def test_unreachable_clip_is_a_422_not_an_endless_503(measured, monkeypatch):
+    db = _card_db("https://dead.example/a.mp3")
+    fetches = []
+
+    async def dead(url):
+        fetches.append(url)
+        return None
+
+    monkeypatch.setattr(tr, "_read_clip", dead)
+
+    async def scenario():
+        with pytest.raises(HTTPException) as first:
+            await tr.resolve_teacher_reference(db, "https://dead.example/a.mp3")
+        await asyncio.gather(*tr._pending)
+        second = await tr.resolve_teacher_reference(db, "https://dead.example/a.mp3")
+        return first.value.status_code, second
+
+    assert asyncio.run(scenario()) == (503, None)
+    row = db[tr._COLLECTION].docs[0]
+    assert row["status"] == "unreachable" and row["checked_at"]
+    assert fetches == ["https://dead.example/a.mp3"] and measured == []
+
+    # Past the back-off the row is re-checked in the background, still a 422.
+    row["checked_at"] = "2000-01-01T00:00:00+00:00"
+
+    async def recheck():
+        ref = await tr.resolve_teacher_reference(db, "https://dead.example/a.mp3")
+        await asyncio.gather(*tr._pending)
+        return ref
+
+    assert asyncio.run(recheck()) is None
+    assert len(fetches) == 2 and row["checked_at"] > "2000"
+
+
+def test_urls_outside_the_cards_are_never_fetched(measured, monkeypatch):
+    db = _card_db("/api/uploads/a.mp3")
+    monkeypatch.setattr(tr, "schedule_reference_index", lambda db, urls: pytest.fail("scheduled"))
+
+    assert asyncio.run(tr.resolve_teacher_reference(db, "https://attacker.example/x.mp3")) is None
+    assert db[tr._COLLECTION].docs == []
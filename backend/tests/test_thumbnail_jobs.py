@@ -0,0 +1,145 @@
+"""
+Thumbnail jobs (``routers.thumbnail_jobs``).
+
+Rendering must stay off the event loop, be idempotent by source content
+(an unchanged source is never re-rendered, concurrent requests for one
+source share a render), and the bulk job must thumbnail every item without
+one, write them through one ``bulk_write`` per chunk and report progress on
+its job document. Renders are stubbed: no ffmpeg / poppler needed.
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from routers import thumbnail_jobs as tj  # noqa: E402
+from utils import storage  # noqa: E402
+from fake_mongo import FakeCollection, FakeDB  # noqa: E402
+
+
+@pytest.fixture
+def stubbed(tmp_path, monkeypatch):
+    """Thumbnails into ``tmp_path``; ffmpeg / poppler stubbed with PIL
+    images, pool jobs run inline. Renders are counted per source."""
+    thumbs = tmp_path / "thumbnails"
+    thumbs.mkdir()
+    monkeypatch.setattr(tj, "THUMBNAILS_DIR", thumbs)
+    monkeypatch.setattr(storage, "THUMBNAILS_DIR", thumbs)
+    calls = []
+
+    async def fake_frame(src, dst):
+        calls.append(src.name)
+        await asyncio.sleep(0.01)
+        Image.new("RGB", (480, 270), (200, 10, 10)).save(dst, "JPEG")
+        return True
+
+    def fake_pdf(src, key):
+        calls.append(Path(src).name)
+        return bool(storage.write_renditions(Image.new("RGB", (270, 360)), key))
+
+    async def inline(self, fn, *args):
+        return fn(*args)
+
+    monkeypatch.setattr(tj, "extract_video_frame", fake_frame)
+    monkeypatch.setattr(tj, "render_pdf_renditions", fake_pdf)
+    monkeypatch.setattr(tj.ThumbnailRenderer, "_in_pool", inline)
+    monkeypatch.setattr(tj, "_renderer", tj.ThumbnailRenderer(1))
+    monkeypatch.setattr(tj, "uploaded_file_for",
+                        lambda url: tmp_path / url.rsplit("/", 1)[-1]
+                        if "/api/uploads/" in url and (tmp_path / url.rsplit("/", 1)[-1]).exists() else None)
+    return tmp_path, calls
+
+
+def test_render_is_idempotent_by_source_content(stubbed):
+    tmp_path, calls = stubbed
+    (tmp_path / "a.mp4").write_bytes(b"same video")
+    (tmp_path / "b.mp4").write_bytes(b"same video")
+    (tmp_path / "c.pdf").write_bytes(b"a pdf")
+
+    async def go():
+        return await asyncio.gather(tj.render_thumbnail(tmp_path / "a.mp4"),
+                                    tj.render_thumbnail(tmp_path / "b.mp4"),
+                                    tj.render_thumbnail(tmp_path / "c.pdf"))
+
+    a, b, c = asyncio.run(go())
+    assert a == b != c and a.startswith("/api/uploads/thumbnails/thumb_") and a.endswith("_480.jpg")
+    assert sorted(calls) == ["a.mp4", "c.pdf"]
+    assert asyncio.run(tj.render_thumbnail(tmp_path / "a.mp4")) == a
+    assert len(calls) == 2
+    m = tj.get_thumbnail_renderer().metrics()
+    assert (m["rendered"], m["coalesced"], m["reused"]) == (2, 1, 1)
+
+
+def test_renditions_are_a_srcset_manifest(stubbed):
+    tmp_path, _ = stubbed
+    (tmp_path / "a.mp4").write_bytes(b"video")
+    (tmp_path / "c.pdf").write_bytes(b"pdf")
+    video = asyncio.run(tj.thumbnail_fields(asyncio.run(tj.render_thumbnail(tmp_path / "a.mp4"))))
+    assert [(r["width"], r["type"]) for r in video["thumbnail_renditions"]] == [
+        (w, t) for w in (160, 320, 480) for t in ("image/webp", "image/jpeg")]
+    assert video["thumbnail_url"] == video["thumbnail_renditions"][-1]["url"]
+    for r in video["thumbnail_renditions"]:
+        with Image.open(tmp_path / "thumbnails" / r["url"].rsplit("/", 1)[-1]) as img:
+            assert img.width == r["width"] and img.format == ("WEBP" if "webp" in r["type"] else "JPEG")
+
+    # Never upscaled: a 270px-wide page stops at 160.
+    pdf = asyncio.run(tj.thumbnail_fields(asyncio.run(tj.render_thumbnail(tmp_path / "c.pdf"))))
+    assert {r["width"] for r in pdf["thumbnail_renditions"]} == {160}
+    assert pdf["thumbnail_url"].endswith("_160.jpg")
+
+    external = asyncio.run(tj.thumbnail_fields("https://img.youtube.com/vi/x/hqdefault.jpg"))
+    assert external["thumbnail_renditions"] == []
+
+
+def test_unthumbnailable_sources_render_nothing(stubbed):
+    tmp_path, calls = stubbed
+    (tmp_path / "song.mp3").write_bytes(b"audio")
+    assert asyncio.run(tj.render_thumbnail(tmp_path / "song.mp3")) is None
+    assert asyncio.run(tj.render_thumbnail(tmp_path / "missing.mp4")) is None
+    assert calls == []
+
+
+def test_bulk_job_fills_missing_thumbnails(stubbed, monkeypatch):
+    tmp_path, calls = stubbed
+    monkeypatch.setattr(tj, "_JOB_FLUSH_EVERY", 2)
+    (tmp_path / "v.mp4").write_bytes(b"video")
+    db = FakeDB()
+    db["member_content"] = FakeCollection([
+        {"id": "yt", "url": "https://youtu.be/abc123", "content_type": "video"},
+        {"id": "drive", "url": "https://drive.google.com/file/d/XYZ/view", "thumbnail_url": ""},
+        {"id": "file", "url": "/api/uploads/v.mp4", "content_type": "video", "thumbnail_url": None},
+        {"id": "gone", "url": "/api/uploads/nope.mp4", "content_type": "video"},
+        {"id": "has", "url": "/api/uploads/v.mp4", "thumbnail_url": "/keep.jpg"},
+        {"id": "legacy", "url": "/api/uploads/v.mp4",
+         "thumbnail_url": "/api/uploads/thumbnails/custom.png"},
+    ])
+    Image.new("RGBA", (640, 360), (0, 0, 255, 128)).save(tmp_path / "custom.png")
+
+    async def go():
+        job = await tj.start_thumbnail_job(db, "admin")
+        with pytest.raises(Exception) as e:
+            await tj.start_thumbnail_job(db, "admin")
+        assert e.value.status_code == 409
+        await asyncio.gather(*tj._job_tasks.values())
+        return job
+
+    job = asyncio.run(go())
+    done = db[tj._JOBS].docs[0]
+    assert done["id"] == job["id"] and done["status"] == "done"
+    assert (done["total"], done["processed"], done["updated"]) == (5, 5, 4)
+    thumbs = {d["id"]: d.get("thumbnail_url") for d in db.member_content.docs}
+    assert thumbs["yt"] == "https://img.youtube.com/vi/abc123/hqdefault.jpg"
+    assert thumbs["drive"] == "https://drive.google.com/thumbnail?id=XYZ&sz=w480"
+    assert thumbs["file"].startswith("/api/uploads/thumbnails/thumb_")
+    assert thumbs["has"] == "/keep.jpg" and not thumbs["gone"]
+    # The legacy custom thumbnail is kept, re-rendered into renditions.
+    assert thumbs["legacy"].endswith("_480.jpg") and thumbs["legacy"] != thumbs["file"]
+    manifests = {d["id"]: d.get("thumbnail_renditions") for d in db.member_content.docs}
+    assert len(manifests["file"]) == len(manifests["legacy"]) == 6
+    assert manifests["yt"] == manifests["drive"] == []
+    assert db.member_content.bulk_writes == [2, 1, 1]
+    assert calls == ["v.mp4"]
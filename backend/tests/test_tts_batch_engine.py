@@ -0,0 +1,171 @@
+"""
+Async ElevenLabs batch engine (``elevenlabs.run_tts_batch`` / ``tts_engine``).
+
+Against the local fake TTS server (``scripts/fake_tts_server.py``): the
+worker pool must never exceed the concurrency cap, the token bucket must
+space requests, 429 / 5xx must be retried while other 4xx fail at once, and
+``batch-audio`` must persist every clip into the card as it completes and
+log one progress event per clip. Runs offline over an in-memory DB double.
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import storage_helper  # noqa: E402
+from routers import elevenlabs as el  # noqa: E402
+from routers import phoneme_cards as pc  # noqa: E402
+from routers import teacher_references as tr  # noqa: E402
+from fake_tts_server import FakeTTSServer  # noqa: E402
+from fake_mongo import FakeCollection, FakeDB  # noqa: E402
+
+
+async def _stored(*args):
+    return True
+
+
+@pytest.fixture
+def engine(monkeypatch):
+    """Fast, tight limits; rebuilt for each test's event loop."""
+    def configure(concurrency=2, rate_per_s=0.0, burst=1, max_retries=3):
+        for k, v in dict(concurrency=concurrency, rate_per_s=rate_per_s, burst=burst,
+                         max_retries=max_retries, backoff_s=0.01, _loop=None).items():
+            monkeypatch.setattr(el.tts_engine, k, v)
+    configure()
+    return configure
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    servers = []
+
+    def start(**kw):
+        srv = FakeTTSServer(**kw).start()
+        servers.append(srv)
+        monkeypatch.setenv("ELEVENLABS_API_BASE", srv.url)
+        monkeypatch.setenv("ELEVENLABS_API_KEY", srv.api_key)
+        return srv
+    yield start
+    for srv in servers:
+        srv.stop()
+
+
+def _batch(clips, tmp_path):
+    done = {}
+
+    async def on_done(clip, res, exc):
+        done[clip["key"]] = (res, exc, clip["elapsed_ms"])
+
+    asyncio.run(el.run_tts_batch(clips, emergent_put=_stored,
+                                 uploads_dir=tmp_path, on_done=on_done, workers=8))
+    return done
+
+
+def _clips(*texts):
+    return [{"key": t, "kwargs": {"text": t, "voice_id": "voice-1", "filename_hint": t}}
+            for t in texts]
+
+
+def test_pool_respects_concurrency_and_retries_only_429_and_5xx(engine, fake, tmp_path):
+    engine(concurrency=2)
+    srv = fake(latency_s=0.05, failures={"w3": [429, 503], "bad": [400]})
+    done = _batch(_clips("w1", "w2", "w3", "w4", "w5", "bad"), tmp_path)
+
+    assert srv.peak_in_flight == 2
+    assert done["w3"][0]["attempts"] == 3 and done["w1"][0]["attempts"] == 1
+    assert isinstance(done["bad"][1], el.ElevenLabsHTTPError) and done["bad"][1].status_code == 400
+    assert [r["text"] for r in srv.requests].count("bad") == 1
+    assert all(done[k][0]["relative_url"].startswith("/api/uploads/elevenlabs/w")
+               for k in ("w1", "w2", "w3", "w4", "w5"))
+    assert all(ms > 0 for _, _, ms in done.values())
+    sent = next(r for r in srv.requests if r["text"] == "w1")
+    assert sent["query"] == "output_format=mp3_44100_128"
+    assert sent["voice_settings"]["use_speaker_boost"] is True
+
+
+def test_token_bucket_spaces_requests_and_retries_give_up(engine, fake, tmp_path):
+    engine(concurrency=8, rate_per_s=20, burst=1, max_retries=1)
+    srv = fake(failures={"down": [500, 500, 500]})
+    done = _batch(_clips(*[f"r{i}" for i in range(6)], "down"), tmp_path)
+
+    arrivals = sorted(r["at"] for r in srv.requests)
+    assert len(arrivals) == 8                          # 6 clips + "down" tried twice
+    assert arrivals[-1] - arrivals[0] >= 7 / 20 * 0.8
+    assert done["down"][1].status_code == 500
+
+
+def test_missing_api_key_fails_every_clip_without_requests(engine, fake, tmp_path, monkeypatch):
+    srv = fake()
+    monkeypatch.setenv("ELEVENLABS_API_KEY", "")
+    done = _batch(_clips("a", "b"), tmp_path)
+    assert all("ELEVENLABS_API_KEY" in str(exc) for _, exc, _ in done.values())
+    assert srv.requests == []
+
+
+def test_batch_audio_persists_each_clip_and_logs_progress(engine, fake, tmp_path, monkeypatch):
+    engine(concurrency=3)
+    srv = fake(latency_s=0.02, failures={"look": [429], "zzz": [422]})
+    monkeypatch.setattr(storage_helper, "put_object_async", _stored)
+    indexed = []
+    monkeypatch.setattr(tr, "schedule_reference_index", lambda db, urls: indexed.extend(urls))
+
+    card = {"id": "u-foot", "ipa": "ʊ", "displayIpa": "/ʊ/",
+            "audio": {"RP": {"isolated": "/api/uploads/old.mp3"}},
+            "mnemonic": {"phrase": "A good cook."},
+            "commonWords": [{"w": "look"}, {"w": "zzz"}, {"w": "book"}]}
+    db = FakeDB()
+    db["phoneme_cards"] = FakeCollection([card])
+    app = FastAPI()
+    app.include_router(pc.build_phoneme_cards_router(db, lambda: {"username": "admin"}))
+    with TestClient(app) as client:
+        r = client.post("/admin/phonemes/u-foot/batch-audio",
+                        json={"voice_default": "v-def", "include_words_rp": False})
+        assert r.status_code == 200, r.text
+        body = r.json()
+        progress = client.get("/admin/phonemes/u-foot/batch-audio/progress").json()
+        assert client.get("/admin/phonemes/nope/batch-audio/progress").status_code == 404
+
+    assert body["skipped"] == ["isolated-RP"]
+    assert body["generated"] == ["isolated-AmE", "mnemonic", "word-0-AmE", "word-2-AmE"]
+    assert [e["key"] for e in body["errors"]] == ["word-1-AmE"]
+    assert len(srv.requests) == 6                      # "look" retried once
+
+    stored = db.phoneme_cards.docs[0]
+    assert stored["audio"]["AmE"]["isolated"].startswith("/api/uploads/elevenlabs/u-foot_isolated_AmE")
+    assert stored["audio"]["RP"]["isolated"] == "/api/uploads/old.mp3"
+    assert stored["mnemonic"]["audio"].startswith("/api/uploads/elevenlabs/u-foot_mnemonic")
+    assert [bool(w.get("audioAmE")) for w in stored["commonWords"]] == [True, False, True]
+    assert len(db.phoneme_cards.updates) == 4          # one write per finished clip
+    assert set(indexed) == {stored["audio"]["AmE"]["isolated"],
+                            stored["commonWords"][0]["audioAmE"],
+                            stored["commonWords"][2]["audioAmE"]}
+
+    assert (progress["status"], progress["queued"], progress["done"], progress["failed"]) == \
+        ("done", 5, 4, 1)
+    events = {e["key"]: e for e in progress["events"]}
+    assert events["word-0-AmE"]["attempts"] == 2 and events["word-1-AmE"]["status"] == "error"
+
+
+def test_overwrite_is_a_fresh_take_not_a_cache_hit(engine, fake, tmp_path, monkeypatch):
+    srv = fake()
+    monkeypatch.setattr(storage_helper, "put_object_async", _stored)
+    monkeypatch.setattr(tr, "schedule_reference_index", lambda db, urls: None)
+    db = FakeDB()
+    db["phoneme_cards"] = FakeCollection([{"id": "u-foot", "ipa": "ʊ", "displayIpa": "/ʊ/"}])
+    app = FastAPI()
+    app.include_router(pc.build_phoneme_cards_router(db, lambda: {"username": "admin"}))
+    regen = {"voice_default": "v-def", "overwrite": True, "only_keys": ["isolated-AmE"]}
+    urls = []
+    with TestClient(app) as client:
+        for _ in range(2):
+            assert client.post("/admin/phonemes/u-foot/batch-audio", json=regen).status_code == 200
+            urls.append(db.phoneme_cards.docs[0]["audio"]["AmE"]["isolated"])
+
+    assert urls[0] != urls[1] and len(srv.requests) == 2
+    assert [d["filename"] for d in db.tts_cache.docs] == [urls[1].split("/api/uploads/")[1]]
@@ -0,0 +1,148 @@
+"""
+TTS dedup cache (``elevenlabs.synthesize_and_store_async`` with ``db``).
+
+A request identical to one already synthesised (final SSML text, voice,
+model, output format, voice settings) must reuse the stored object without
+calling ElevenLabs; identical requests in flight are coalesced; failures
+are never cached; ``use_cache=false`` records a fresh take; an entry whose
+object is gone is evicted and synthesised again; the stats endpoint reports
+the hit rate. Runs offline against the fake TTS server.
+"""
+import sys
+import asyncio
+from pathlib import Path
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "scripts"))
+
+import storage_helper  # noqa: E402
+from routers import elevenlabs as el  # noqa: E402
+from utils import storage_ledger as sl  # noqa: E402
+from fake_tts_server import FakeTTSServer  # noqa: E402
+from fake_mongo import FakeDB  # noqa: E402
+
+
+async def _stored(*args):
+    return True
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    for k, v in dict(concurrency=4, rate_per_s=0.0, backoff_s=0.01, _loop=None).items():
+        monkeypatch.setattr(el.tts_engine, k, v)
+    srv = FakeTTSServer(latency_s=0.05, failures={"boom": [400]}).start()
+    monkeypatch.setenv("ELEVENLABS_API_BASE", srv.url)
+    monkeypatch.setenv("ELEVENLABS_API_KEY", srv.api_key)
+    yield srv
+    srv.stop()
+
+
+async def _unavailable(*args):
+    return False
+
+
+def _synth(db, tmp_path, text="look", **kw):
+    return el.synthesize_and_store_async(
+        text, kw.pop("voice_id", "voice-1"), emergent_put=kw.pop("put", _stored),
+        uploads_dir=tmp_path, db=db, filename_hint=text, **kw)
+
+
+def test_identical_request_is_served_from_the_cache(fake, tmp_path):
+    db = FakeDB()
+
+    async def go():
+        first = await _synth(db, tmp_path)
+        again = await _synth(db, tmp_path)
+        other = [await _synth(db, tmp_path, voice_id="voice-2"),
+                 await _synth(db, tmp_path, stability=0.2),
+                 await _synth(db, tmp_path, ipa_phoneme="lʊk"),
+                 await _synth(db, tmp_path, output_format="pcm_44100")]
+        return first, again, other
+
+    first, again, other = asyncio.run(go())
+    assert (first["cached"], again["cached"]) == (False, True) and again["attempts"] == 0
+    for k in ("url", "relative_url", "filename", "content_type", "size_bytes", "ssml_used"):
+        assert again[k] == first[k], k
+    assert not any(r["cached"] for r in other)
+    assert len(fake.requests) == 5
+    entry = next(d for d in db.tts_cache.docs if d["filename"] == first["filename"])
+    assert entry["hits"] == 1 and entry["chars"] == 4
+
+
+def test_in_flight_duplicates_are_coalesced_and_failures_not_cached(fake, tmp_path):
+    db = FakeDB()
+
+    async def go():
+        same = await asyncio.gather(*(_synth(db, tmp_path, "book") for _ in range(3)))
+        failed = await asyncio.gather(*(_synth(db, tmp_path, "boom") for _ in range(2)),
+                                      return_exceptions=True)
+        return same, failed
+
+    same, failed = asyncio.run(go())
+    assert sorted(r["cached"] for r in same) == [False, True, True]
+    assert len({r["filename"] for r in same}) == 1
+    assert [r["text"] for r in fake.requests].count("book") == 1
+    # The follower retries on its own after the leader's 400; the second try succeeds.
+    assert [r["text"] for r in fake.requests].count("boom") == 2
+    assert isinstance(failed[0], el.ElevenLabsHTTPError) and failed[1]["cached"] is False
+    assert [d["filename"].split("/")[1][:4] for d in db.tts_cache.docs] == ["book", "boom"]
+
+
+def test_use_cache_false_records_a_fresh_take(fake, tmp_path):
+    db = FakeDB()
+
+    async def go():
+        await _synth(db, tmp_path)
+        fresh = await _synth(db, tmp_path, use_cache=False)
+        return fresh, await _synth(db, tmp_path)
+
+    fresh, after = asyncio.run(go())
+    assert fresh["cached"] is False and len(fake.requests) == 2
+    assert after["cached"] is True and after["filename"] == fresh["filename"]
+    assert len(db.tts_cache.docs) == 1
+
+
+def test_entry_whose_object_is_gone_is_evicted(fake, tmp_path, monkeypatch):
+    db = FakeDB()
+    monkeypatch.setattr(sl, "_db", db)
+    monkeypatch.setattr(storage_helper, "put_object_async", _stored)
+
+    async def go():
+        # Local fallback copy lost (redeploy wiped uploads/).
+        local = await _synth(db, tmp_path, put=_unavailable)
+        (tmp_path / local["filename"]).unlink()
+        relocal = await _synth(db, tmp_path, put=_unavailable)
+        # Object-storage key deleted.
+        remote = await _synth(db, tmp_path, "book", put=sl.tracked_put)
+        hit = await _synth(db, tmp_path, "book", put=sl.tracked_put)
+        await sl.record_delete(remote["filename"])
+        return local, relocal, remote, hit, await _synth(db, tmp_path, "book", put=sl.tracked_put)
+
+    local, relocal, remote, hit, resynth = asyncio.run(go())
+    assert relocal["cached"] is False and relocal["filename"] != local["filename"]
+    assert hit["cached"] is True and hit["filename"] == remote["filename"]
+    assert resynth["cached"] is False and resynth["filename"] != remote["filename"]
+    assert len(fake.requests) == 4
+    assert sorted(d["filename"] for d in db.tts_cache.docs) == sorted(
+        [relocal["filename"], resynth["filename"]])
+
+
+def test_stats_endpoint_reports_hit_rate(fake, tmp_path):
+    db = FakeDB()
+
+    async def go():
+        for text in ("look", "look", "look", "book"):
+            await _synth(db, tmp_path, text)
+
+    asyncio.run(go())
+    app = FastAPI()
+    app.include_router(el.build_elevenlabs_router(db, lambda: {"username": "admin"},
+                                                  _stored, tmp_path))
+    with TestClient(app) as client:
+        stats = client.get("/admin/elevenlabs/cache-stats").json()
+    assert stats == {"entries": 2, "hits": 2, "misses": 2, "hitRate": 0.5,
+                     "charsSaved": 8, "charsBilled": 8}
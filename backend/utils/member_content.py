@@ -0,0 +1,158 @@
+"""
+Member-area content helpers.
+
+Shared by the member / admin folder and content endpoints in ``server.py``:
+
+  * ``client_visibility_filter(user_id)``
+                                 — the client visibility predicate
+                                   (public OR assigned to the user)
+  * ``folder_content_counts()``  — per-folder item counts in ONE
+                                   aggregation instead of one
+                                   ``count_documents`` per folder
+  * visibility index             — every ``member_content`` doc carries
+                                   ``visible_to`` (``"*"`` when public —
+                                   no ``is_public`` field counts as
+                                   public — plus the users assigned to it
+                                   or to its folder) and ``folder_name``,
+                                   so a member read is one query on the
+                                   multikey ``visible_to`` index. Kept
+                                   current by the write endpoints
+                                   (``visibility_fields`` on insert,
+                                   ``reindex_content`` after assign /
+                                   update / folder changes) and
+                                   back-filled at startup.
+  * ``encode_cursor`` / ``page_query`` — keyset pagination on
+                                   ``(order, id)``
+
+No imports from ``server.py``: callers pass their ``db`` in.
+"""
+
+from __future__ import annotations
+
+import base64
+import json
+from typing import Dict, Iterable, List, Optional
+
+from pymongo import UpdateOne
+
+PUBLIC = "*"
+
+
+def client_visibility_filter(user_id: str) -> dict:
+    """Mongo filter for documents a client may see: public ones, or ones
+    whose ``assigned_users`` array contains ``user_id``."""
+    return {"$or": [{"is_public": True}, {"assigned_users": user_id}]}
+
+
+async def folder_content_counts(
+    db,
+    folder_ids: Iterable[str],
+    user_id: Optional[str] = None,
+) -> Dict[str, int]:
+    """Count ``member_content`` per folder with a single ``$group``.
+
+    ``user_id=None`` counts everything (admin view); otherwise only the
+    items ``client_visibility_filter(user_id)`` matches. Folders without
+    items are absent from the result — read it with ``.get(folder_id, 0)``.
+    Served by the ``member_content.folder_id`` index, so the cost is one
+    round trip whatever the number of folders.
+    """
+    ids = [fid for fid in dict.fromkeys(folder_ids) if fid]
+    if not ids:
+        return {}
+    match: dict = {"folder_id": {"$in": ids}}
+    if user_id is not None:
+        match.update(client_visibility_filter(user_id))
+    pipeline = [
+        {"$match": match},
+        {"$group": {"_id": "$folder_id", "n": {"$sum": 1}}},
+    ]
+    rows = await db.member_content.aggregate(pipeline).to_list(None)
+    return {r["_id"]: r["n"] for r in rows}
+
+
+# --------------------------------------------------------------------------- #
+# Visibility index
+# --------------------------------------------------------------------------- #
+def visibility_fields(content: dict, folder: Optional[dict]) -> dict:
+    """The indexed fields of one content doc, given its folder (or None).
+
+    ``visible_to`` lists who may read the item: ``PUBLIC`` if it is public
+    (a doc without ``is_public`` is, as the content responses report it),
+    its own ``assigned_users`` and those of its folder — the same three
+    grants the member listing used to evaluate per request.
+    """
+    keys = set(content.get("assigned_users") or [])
+    if content.get("is_public", True):
+        keys.add(PUBLIC)
+    if folder:
+        keys.update(folder.get("assigned_users") or [])
+    return {"visible_to": sorted(keys),
+            "folder_name": folder.get("name") if folder else None}
+
+
+def readable_by(user_id: str) -> dict:
+    """Filter on the visibility index: items ``user_id`` may read."""
+    return {"visible_to": {"$in": [PUBLIC, user_id]}}
+
+
+async def reindex_content(db, query: dict) -> int:
+    """Recompute ``visible_to`` / ``folder_name`` for the content matching
+    ``query``. Three round trips whatever the number of items (content,
+    their folders, one ``bulk_write`` of the docs that changed). Returns
+    the number of docs rewritten."""
+    docs = await db.member_content.find(query, {
+        "_id": 0, "id": 1, "folder_id": 1, "is_public": 1, "assigned_users": 1,
+        "visible_to": 1, "folder_name": 1,
+    }).to_list(None)
+    folder_ids = list({d["folder_id"] for d in docs if d.get("folder_id")})
+    folders = {}
+    if folder_ids:
+        rows = await db.folders.find({"id": {"$in": folder_ids}},
+                                     {"_id": 0, "id": 1, "name": 1, "assigned_users": 1}).to_list(None)
+        folders = {f["id"]: f for f in rows}
+    ops = []
+    for d in docs:
+        fields = visibility_fields(d, folders.get(d.get("folder_id")))
+        if any(d.get(k, ...) != v for k, v in fields.items()):
+            ops.append(UpdateOne({"id": d["id"]}, {"$set": fields}))
+    if ops:
+        await db.member_content.bulk_write(ops, ordered=False)
+    return len(ops)
+
+
+async def ensure_visibility_index(db) -> int:
+    """Startup back-fill: index content written before the index existed,
+    and re-check docs without ``is_public`` (indexed as private before they
+    defaulted to public)."""
+    return await reindex_content(db, {"$or": [{"visible_to": {"$exists": False}},
+                                              {"is_public": {"$exists": False}}]})
+
+
+# --------------------------------------------------------------------------- #
+# Keyset pagination on (order, id)
+# --------------------------------------------------------------------------- #
+def encode_cursor(doc: dict) -> str:
+    raw = json.dumps([doc.get("order", 0), doc["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> List:
+    """``[order, id]`` of the last item of the previous page.
+    Raises ``ValueError`` on anything that is not one of our cursors."""
+    try:
+        order, last_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except Exception as e:
+        raise ValueError(cursor) from e
+    if not isinstance(last_id, str) or not isinstance(order, (int, float)):
+        raise ValueError(cursor)
+    return [order, last_id]
+
+
+def page_query(query: dict, cursor: Optional[str]) -> dict:
+    """``query`` restricted to the items after ``cursor`` in (order, id) order."""
+    if not cursor:
+        return query
+    order, last_id = decode_cursor(cursor)
+    after = {"$or": [{"order": {"$gt": order}}, {"order": order, "id": {"$gt": last_id}}]}
+    return {"$and": [query, after]} if query else after
@@ -3,8 +3,9 @@ Storage & thumbnail utilities.
 
 Shared helpers used by:
   * ``routers/uploads.py``          — file upload endpoints
-  * ``server.py`` (content, popup)  — content thumbnail regeneration,
-                                       popup media upload, DB stats
+  * ``routers/thumbnail_jobs.py``   — thumbnail rendering + bulk job
+                                       (the render primitives below)
+  * ``server.py`` (content, popup)  — popup media upload, DB stats
 
 All paths derive from ``ROOT_DIR`` (``backend/``) so this module remains
 self-contained: no imports from ``server.py`` (which would cause a cycle).
@@ -12,13 +13,16 @@ self-contained: no imports from ``server.py`` (which would cause a cycle).
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import logging
+import os
 import re
-import subprocess
 from pathlib import Path
-from typing import Optional
+from typing import List, Optional
 
 from pdf2image import convert_from_path
+from PIL import Image
 
 # --------------------------------------------------------------------------- #
 # Paths & config
@@ -40,23 +44,14 @@ ALLOWED_EXTENSIONS = {
 UPLOAD_MAX_FILE_SIZE     = 100 * 1024 * 1024        # 100MB per file
 UPLOAD_MAX_TOTAL_STORAGE = 2 * 1024 * 1024 * 1024   # 2GB total
 
-# Thumbnail target (width x height) — small enough for grid views.
+# Largest thumbnail (width x height) — small enough for grid views; the
+# smaller responsive renditions are ``THUMB_WIDTHS`` below.
 THUMB_MAX_SIZE = (480, 360)
 
 
 # --------------------------------------------------------------------------- #
-# Storage size helpers
+# Storage size helpers (usage itself is tracked by ``utils/storage_ledger.py``)
 # --------------------------------------------------------------------------- #
-def get_total_storage_used() -> int:
-    """Total bytes across every top-level file in ``UPLOADS_DIR``."""
-    total = 0
-    if UPLOADS_DIR.exists():
-        for f in UPLOADS_DIR.iterdir():
-            if f.is_file():
-                total += f.stat().st_size
-    return total
-
-
 def format_size(size_bytes: float) -> str:
     """Format bytes → human-readable string (e.g. ``1.4 GB``)."""
     for unit in ("B", "KB", "MB", "GB"):
@@ -69,38 +64,149 @@ def format_size(size_bytes: float) -> str:
 # --------------------------------------------------------------------------- #
 # Thumbnail generation
 # --------------------------------------------------------------------------- #
-def generate_video_thumbnail(video_path: Path) -> Optional[str]:
-    """Extract a frame from a video at 1s using ffmpeg. Returns the
-    ``/api/uploads/thumbnails/…`` URL or ``None`` on failure."""
+# The render primitives only: scheduling (process pool, per-source
+# de-duplication, the bulk job) lives in ``routers/thumbnail_jobs.py``.
+#
+# A thumbnail is a set of renditions: each of ``THUMB_WIDTHS`` up to the
+# source width (a tiny source still gets the smallest) as WebP plus a JPEG
+# fallback, named
+# ``thumb_<key>_<width>.<ext>`` where ``<key>`` is the SHA-256 of the source
+# file — so re-rendering an unchanged source is a no-op and every name is
+# safe to cache forever. The widest JPEG is the item's ``thumbnail_url``;
+# ``rendition_manifest`` lists the whole set for ``srcset``.
+VIDEO_THUMB_EXTS = (".mp4", ".webm", ".mov", ".avi", ".mkv")
+PDF_THUMB_EXTS   = (".pdf",)
+FFMPEG_TIMEOUT_S = float(os.environ.get("THUMBNAIL_FFMPEG_TIMEOUT_S", "15"))
+THUMB_WIDTHS = (160, 320, 480)
+# (extension, MIME type, PIL save options) — WebP first: it is the
+# preferred source, JPEG the fallback.
+THUMB_FORMATS = (
+    ("webp", "image/webp", {"quality": 75, "method": 4}),
+    ("jpg",  "image/jpeg", {"quality": 80, "optimize": True, "progressive": True}),
+)
+_RENDITION_URL_RE = re.compile(r"^/api/uploads/thumbnails/thumb_([0-9a-f]{24})_\d+\.(?:jpg|webp)$")
+
+
+def source_digest(path: Path) -> str:
+    """SHA-256 (hex) of a thumbnail source file, read in 1 MB blocks."""
+    h = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def thumbnail_key(digest: str) -> str:
+    return digest[:24]
+
+
+def rendition_name(key: str, width: int, ext: str) -> str:
+    return f"thumb_{key}_{width}.{ext}"
+
+
+def thumbnail_kind(file_path: Path, content_type: str = "") -> Optional[str]:
+    """``"video"`` / ``"pdf"`` when ``file_path`` can be thumbnailed."""
+    ext = file_path.suffix.lower()
+    if ext in VIDEO_THUMB_EXTS or content_type == "video":
+        return "video"
+    if ext in PDF_THUMB_EXTS or content_type == "pdf":
+        return "pdf"
+    return None
+
+
+def existing_renditions(key: str) -> List[dict]:
+    """The renditions of ``key`` on disk: ``[{url, width, type}]`` by width,
+    WebP before JPEG."""
+    out = []
+    for width in THUMB_WIDTHS:
+        for ext, mime, _ in THUMB_FORMATS:
+            name = rendition_name(key, width, ext)
+            path = THUMBNAILS_DIR / name
+            if path.exists() and path.stat().st_size > 0:
+                out.append({"url": f"/api/uploads/thumbnails/{name}", "width": width, "type": mime})
+    return out
+
+
+def fallback_url(renditions: List[dict]) -> Optional[str]:
+    """The widest JPEG of a rendition set — what ``thumbnail_url`` points at."""
+    jpegs = [r for r in renditions if r["type"] == "image/jpeg"]
+    return max(jpegs, key=lambda r: r["width"])["url"] if jpegs else None
+
+
+def rendition_manifest(thumbnail_url: str) -> List[dict]:
+    """Rendition set behind a ``thumbnail_url``; ``[]`` for external
+    (YouTube / Drive) and legacy single-file thumbnails."""
+    match = _RENDITION_URL_RE.match(thumbnail_url or "")
+    return existing_renditions(match.group(1)) if match else []
+
+
+def write_renditions(image: Image.Image, key: str) -> List[dict]:
+    """Write every rendition of ``image`` (CPU-bound: PIL resize + encode)."""
+    if image.mode in ("RGBA", "LA", "P"):
+        rgba = image.convert("RGBA")
+        image = Image.new("RGB", rgba.size, (255, 255, 255))
+        image.paste(rgba, mask=rgba.split()[-1])
+    else:
+        image = image.convert("RGB")
+    widths = [w for w in THUMB_WIDTHS if w <= image.width] or [THUMB_WIDTHS[0]]
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.LANCZOS)
+        for ext, _, options in THUMB_FORMATS:
+            path = THUMBNAILS_DIR / rendition_name(key, width, ext)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+            try:
+                resized.save(str(tmp), "WEBP" if ext == "webp" else "JPEG", **options)
+                tmp.replace(path)
+            finally:
+                tmp.unlink(missing_ok=True)
+    return existing_renditions(key)
+
+
+def render_image_renditions(image_path: str, key: str) -> bool:
+    """Renditions of an image file (video frame, custom upload). Run it in
+    the thumbnail process pool, never on the event loop."""
     try:
-        thumb_name = f"thumb_{video_path.stem}.jpg"
-        thumb_path = THUMBNAILS_DIR / thumb_name
-        result = subprocess.run(
-            [
-                "ffmpeg", "-i", str(video_path), "-ss", "00:00:01", "-vframes", "1",
-                "-vf", f"scale={THUMB_MAX_SIZE[0]}:-1", "-q:v", "3", "-y", str(thumb_path),
-            ],
-            capture_output=True, timeout=15,
-        )
-        if result.returncode == 0 and thumb_path.exists() and thumb_path.stat().st_size > 0:
-            return f"/api/uploads/thumbnails/{thumb_name}"
+        with Image.open(image_path) as img:
+            img.thumbnail((THUMB_WIDTHS[-1], THUMB_WIDTHS[-1] * 4), Image.LANCZOS)
+            return bool(write_renditions(img, key))
     except Exception as e:
-        logging.warning(f"Video thumbnail generation failed: {e}")
-    return None
+        logging.warning(f"Thumbnail renditions failed: {e}")
+    return False
 
 
-def generate_pdf_thumbnail(pdf_path: Path) -> Optional[str]:
-    """Generate a thumbnail from the first page of a PDF."""
+def render_pdf_renditions(pdf_path: str, key: str) -> bool:
+    """Renditions of the first page of a PDF. CPU-bound (poppler + PIL):
+    run it in the thumbnail process pool, never on the event loop."""
     try:
-        images = convert_from_path(str(pdf_path), first_page=1, last_page=1, size=THUMB_MAX_SIZE)
+        images = convert_from_path(pdf_path, first_page=1, last_page=1, size=THUMB_MAX_SIZE)
         if images:
-            thumb_name = f"thumb_{pdf_path.stem}.jpg"
-            thumb_path = THUMBNAILS_DIR / thumb_name
-            images[0].save(str(thumb_path), "JPEG", quality=80)
-            return f"/api/uploads/thumbnails/{thumb_name}"
+            return bool(write_renditions(images[0], key))
     except Exception as e:
         logging.warning(f"PDF thumbnail generation failed: {e}")
-    return None
+    return False
+
+
+async def extract_video_frame(video_path: Path, frame_path: Path) -> bool:
+    """Extract the frame at 1s with an ffmpeg subprocess, without blocking
+    the event loop. Killed after ``FFMPEG_TIMEOUT_S``."""
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg", "-i", str(video_path), "-ss", "00:00:01", "-vframes", "1",
+            "-vf", f"scale={THUMB_MAX_SIZE[0]}:-1", "-q:v", "2", "-y", str(frame_path),
+            stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL,
+        )
+        try:
+            returncode = await asyncio.wait_for(proc.wait(), FFMPEG_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            proc.kill()
+            await proc.wait()
+            logging.warning(f"Video thumbnail timed out after {FFMPEG_TIMEOUT_S}s: {video_path.name}")
+            return False
+        return returncode == 0 and frame_path.exists() and frame_path.stat().st_size > 0
+    except Exception as e:
+        logging.warning(f"Video thumbnail generation failed: {e}")
+    return False
 
 
 _YT_PATTERNS = [
@@ -111,6 +217,7 @@ _YT_PATTERNS = [
     r"(?:youtube\.com\/live\/)([a-zA-Z0-9_-]+)",
     r"(?:youtube\.com\/v\/)([a-zA-Z0-9_-]+)",
 ]
+_DRIVE_PATTERN = r"drive\.google\.com\/file\/d\/([a-zA-Z0-9_-]+)"
 
 
 def get_youtube_thumbnail(url: str) -> Optional[str]:
@@ -122,27 +229,17 @@ def get_youtube_thumbnail(url: str) -> Optional[str]:
     return None
 
 
-def auto_generate_thumbnail(
-    file_path: Path,
-    content_url: str = "",
-    content_type: str = "",
-) -> Optional[str]:
-    """Dispatcher: pick the right thumbnail strategy (YouTube URL → video
-    frame → PDF page) or return ``None`` if nothing applies."""
-    if content_url:
-        yt_thumb = get_youtube_thumbnail(content_url)
-        if yt_thumb:
-            return yt_thumb
-
-    if not file_path or not file_path.exists():
-        return None
+def get_drive_thumbnail(url: str) -> Optional[str]:
+    """Return the Google-Drive thumbnail URL for a ``/file/d/<id>`` link."""
+    match = re.search(_DRIVE_PATTERN, url)
+    if match:
+        return f"https://drive.google.com/thumbnail?id={match.group(1)}&sz=w480"
+    return None
 
-    ext = file_path.suffix.lower()
-    video_exts = [".mp4", ".webm", ".mov", ".avi", ".mkv"]
-    pdf_exts   = [".pdf"]
 
-    if ext in video_exts or content_type == "video":
-        return generate_video_thumbnail(file_path)
-    if ext in pdf_exts or content_type == "pdf":
-        return generate_pdf_thumbnail(file_path)
-    return None
+def uploaded_file_for(url: str) -> Optional[Path]:
+    """The local file behind an ``/api/uploads/…`` URL, if it is on disk."""
+    if "/api/uploads/" not in (url or ""):
+        return None
+    file_path = UPLOADS_DIR / url.split("/api/uploads/")[-1]
+    return file_path if file_path.exists() else None
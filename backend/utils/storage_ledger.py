@@ -0,0 +1,285 @@
+"""
+Storage ledger — per-prefix byte / file counters for everything served
+under ``/api/uploads`` (local ``UPLOADS_DIR`` and Emergent object storage).
+
+Replaces the ``UPLOADS_DIR`` scan ``get_total_storage_used`` ran on every
+upload and stats call (which also skipped every subdirectory —
+``elevenlabs/``, ``recordings/``, ``thumbnails/`` … — so the quota never saw
+them):
+
+  * ``storage_objects`` — one doc per stored key (``abc_video.mp4``,
+                          ``elevenlabs/x.mp3`` …): size, prefix, and
+                          whether it reached object storage.
+  * ``storage_ledger``  — ``{prefix, bytes, files}`` per prefix (first path
+                          segment, ``root`` for top-level uploads) plus the
+                          ``*`` total row that quota checks read.
+
+Writers call ``record_put(key, size)`` / ``record_delete(key)``. The
+previous size of the key comes back from one atomic
+``find_one_and_update``, so an overwrite — or the same key recorded twice
+(object put + local copy) — moves the counters by the delta only; the
+prefix and total rows are ``$inc``-ed together in one ``bulk_write``.
+``tracked_put`` is the object-storage put that records itself: it is the
+``emergent_put`` every router receives.
+
+``reconcile()`` rebuilds both collections from a scan of ``UPLOADS_DIR``.
+Object storage has no list API, so keys known to be stored remotely are
+carried over from ``storage_objects``. It runs at startup until the ledger
+has been built once, and on ``POST /admin/storage/reconcile``. Writes
+recorded while it runs win over the scan; the counter rebuild is
+serialised with recording on an in-process lock, so with several app
+workers a write landing in another worker during that step can leave the
+counters off by that write until the next reconcile.
+
+Bound to the app's ``db`` once at startup (``bind_storage_ledger``) so the
+storage callables injected into the routers can record without threading
+``db`` through every factory; until then recording is a no-op. Recording
+never fails a write: errors are logged and ``reconcile`` repairs drift.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Optional
+
+from pymongo import ReturnDocument, UpdateOne
+
+import storage_helper
+from utils.storage import UPLOADS_DIR
+
+TOTAL = "*"
+ROOT_PREFIX = "root"
+
+_db = None
+_reconcile_task: Optional[asyncio.Task] = None
+# Serialises recording with the counter rebuild of ``reconcile`` (per loop).
+_lock: Optional[asyncio.Lock] = None
+_lock_loop = None
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _recording_lock() -> asyncio.Lock:
+    global _lock, _lock_loop
+    loop = asyncio.get_running_loop()
+    if _lock is None or _lock_loop is not loop:
+        _lock, _lock_loop = asyncio.Lock(), loop
+    return _lock
+
+
+def bind_storage_ledger(db) -> None:
+    global _db
+    _db = db
+
+
+def key_prefix(key: str) -> str:
+    return key.split("/", 1)[0] if "/" in key else ROOT_PREFIX
+
+
+async def create_ledger_indexes(db) -> None:
+    await db.storage_objects.create_index("key", unique=True)
+    await db.storage_objects.create_index("updated_at")
+    await db.storage_ledger.create_index("prefix", unique=True)
+
+
+# --------------------------------------------------------------------------- #
+# Recording
+# --------------------------------------------------------------------------- #
+async def _apply(prefix: str, d_bytes: int, d_files: int) -> None:
+    await _db.storage_ledger.bulk_write([
+        UpdateOne({"prefix": p}, {"$inc": {"bytes": d_bytes, "files": d_files}}, upsert=True)
+        for p in (prefix, TOTAL)
+    ], ordered=False)
+
+
+async def record_put(key: str, size: int, remote: bool = False) -> None:
+    """Record ``key`` as stored with ``size`` bytes (``remote``: in object
+    storage, not only on local disk)."""
+    if _db is None:
+        return
+    try:
+        prefix = key_prefix(key)
+        fields = {"size": size, "prefix": prefix, "updated_at": _now_iso()}
+        if remote:
+            fields["remote"] = True
+        async with _recording_lock():
+            old = await _db.storage_objects.find_one_and_update(
+                {"key": key}, {"$set": fields}, upsert=True,
+                projection={"_id": 0, "size": 1}, return_document=ReturnDocument.BEFORE)
+            d_bytes = size - (old["size"] if old else 0)
+            d_files = 0 if old else 1
+            if d_bytes or d_files:
+                await _apply(prefix, d_bytes, d_files)
+    except Exception as e:
+        logging.warning(f"Storage ledger: put {key} not recorded: {e}")
+
+
+async def record_delete(key: str) -> None:
+    if _db is None:
+        return
+    try:
+        async with _recording_lock():
+            old = await _db.storage_objects.find_one_and_delete({"key": key}, projection={"_id": 0, "size": 1})
+            if old:
+                await _apply(key_prefix(key), -old["size"], -1)
+    except Exception as e:
+        logging.warning(f"Storage ledger: delete {key} not recorded: {e}")
+
+
+async def record_local(*paths: Path) -> None:
+    """Record files already written under ``UPLOADS_DIR`` (sizes via stat)."""
+    def sizes():
+        root = UPLOADS_DIR.resolve()
+        out = []
+        for p in paths:
+            try:
+                out.append((Path(p).resolve().relative_to(root).as_posix(), Path(p).stat().st_size))
+            except (ValueError, OSError):
+                continue
+        return out
+
+    for key, size in await asyncio.to_thread(sizes):
+        await record_put(key, size)
+
+
+async def tracked_put(filename: str, data: bytes,
+                      content_type: str = "application/octet-stream") -> bool:
+    """``storage_helper.put_object_async`` that records the stored object."""
+    ok = await storage_helper.put_object_async(filename, data, content_type)
+    if ok:
+        await record_put(filename, len(data), remote=True)
+    return ok
+
+
+# --------------------------------------------------------------------------- #
+# Reading
+# --------------------------------------------------------------------------- #
+async def used_bytes() -> int:
+    """Total stored bytes: one indexed read of the ``*`` row."""
+    row = await _db.storage_ledger.find_one({"prefix": TOTAL}, {"_id": 0, "bytes": 1})
+    return row["bytes"] if row else 0
+
+
+async def stored_remotely(key: str) -> Optional[bool]:
+    """Whether ``key`` is recorded as stored in object storage; ``None``
+    while the ledger is unbound (nothing to check against)."""
+    if _db is None:
+        return None
+    return await _db.storage_objects.find_one({"key": key, "remote": True}, {"_id": 1}) is not None
+
+
+async def ledger_usage() -> dict:
+    rows = await _db.storage_ledger.find({}, {"_id": 0}).to_list(None)
+    total = next((r for r in rows if r["prefix"] == TOTAL), {})
+    return {
+        "bytes": total.get("bytes", 0),
+        "files": total.get("files", 0),
+        "prefixes": {r["prefix"]: {"bytes": r.get("bytes", 0), "files": r.get("files", 0)}
+                     for r in sorted(rows, key=lambda r: -r.get("bytes", 0)) if r["prefix"] != TOTAL},
+        "reconciled_at": total.get("reconciled_at"),
+        "reconciling": reconcile_running(),
+    }
+
+
+# --------------------------------------------------------------------------- #
+# Reconciliation
+# --------------------------------------------------------------------------- #
+def scan_uploads_dir() -> Dict[str, int]:
+    """``{key: size}`` for every file under ``UPLOADS_DIR``, subdirectories
+    included; dotfiles (staged / temporary writes) are skipped."""
+    out: Dict[str, int] = {}
+    for dirpath, dirnames, filenames in os.walk(UPLOADS_DIR):
+        dirnames[:] = [d for d in dirnames if not d.startswith(".")]
+        for name in filenames:
+            if name.startswith("."):
+                continue
+            path = Path(dirpath) / name
+            try:
+                out[path.relative_to(UPLOADS_DIR).as_posix()] = path.stat().st_size
+            except OSError:
+                continue
+    return out
+
+
+def _still_on_disk(keys) -> set:
+    return {k for k in keys if (UPLOADS_DIR / k).is_file()}
+
+
+async def reconcile(batch: int = 1000) -> dict:
+    """Rebuild ``storage_objects`` and ``storage_ledger``. Writes recorded
+    while it runs are kept: a key put or deleted after the rebuild started
+    is left as recorded (known keys are only updated while their row is
+    older than the rebuild, new ones only inserted if still absent and on
+    disk), and the counters are rebuilt from ``storage_objects`` under the
+    recording lock, so no ``$inc`` lands between the sum and its write."""
+    started = _now_iso()
+    objects = await asyncio.to_thread(scan_uploads_dir)
+    known = {o["key"]: o for o in await _db.storage_objects.find(
+        {}, {"_id": 0, "key": 1, "size": 1, "remote": 1}).to_list(None)}
+    for o in known.values():
+        if o.get("remote"):
+            objects.setdefault(o["key"], o["size"])
+
+    items = list(objects.items())
+    for i in range(0, len(items), batch):
+        chunk = items[i:i + batch]
+        on_disk = await asyncio.to_thread(_still_on_disk, [k for k, _ in chunk if k not in known])
+        ops = []
+        for k, s in chunk:
+            fields = {"size": s, "prefix": key_prefix(k), "updated_at": started}
+            if k in known:
+                ops.append(UpdateOne({"key": k, "updated_at": {"$lte": started}}, {"$set": fields}))
+            elif k in on_disk:
+                ops.append(UpdateOne({"key": k}, {"$setOnInsert": fields}, upsert=True))
+        if ops:
+            await _db.storage_objects.bulk_write(ops, ordered=False)
+    await _db.storage_objects.delete_many({"updated_at": {"$lt": started}})
+
+    async with _recording_lock():
+        rows = await _db.storage_objects.aggregate([
+            {"$group": {"_id": "$prefix", "bytes": {"$sum": "$size"}, "files": {"$sum": 1}}},
+        ]).to_list(None)
+        totals = {"bytes": sum(r["bytes"] for r in rows), "files": sum(r["files"] for r in rows)}
+        ops = [UpdateOne({"prefix": r["_id"]}, {"$set": {"bytes": r["bytes"], "files": r["files"]}}, upsert=True)
+               for r in rows]
+        ops.append(UpdateOne({"prefix": TOTAL}, {"$set": {**totals, "reconciled_at": _now_iso()}}, upsert=True))
+        await _db.storage_ledger.bulk_write(ops, ordered=False)
+        await _db.storage_ledger.delete_many({"prefix": {"$nin": [r["_id"] for r in rows] + [TOTAL]}})
+    logging.info(f"Storage ledger reconciled: {totals['files']} files, {totals['bytes']} bytes")
+    return {**totals, "prefixes": len(rows)}
+
+
+def reconcile_running() -> bool:
+    return _reconcile_task is not None and not _reconcile_task.done()
+
+
+def start_reconcile() -> bool:
+    """Run ``reconcile`` in the background. ``False`` if one is running."""
+    global _reconcile_task
+    if reconcile_running():
+        return False
+
+    async def run():
+        try:
+            await reconcile()
+        except Exception:
+            logging.exception("Storage ledger reconciliation failed")
+
+    _reconcile_task = asyncio.get_running_loop().create_task(run())
+    return True
+
+
+async def ensure_storage_ledger(db) -> bool:
+    """Startup: bind, index, and reconcile in the background while the
+    ledger has never been built. Returns whether a rebuild was started."""
+    bind_storage_ledger(db)
+    await create_ledger_indexes(db)
+    if await db.storage_ledger.find_one({"prefix": TOTAL, "reconciled_at": {"$exists": True}}, {"_id": 1}):
+        return False
+    return start_reconcile()
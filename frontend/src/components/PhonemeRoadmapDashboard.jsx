@@ -175,14 +175,29 @@ export default function PhonemeRoadmapDashboard({ existingCards = [], onRefresh
     try {
       const token = localStorage.getItem('vf_token');
       const API = process.env.REACT_APP_BACKEND_URL;
+      const headers = { 'Content-Type': 'application/json', Authorization: `Bearer ${token}` };
       const res = await fetch(`${API}/api/admin/phonemes/batch/regenerate-derived`, {
         method: 'POST',
-        headers: { 'Content-Type': 'application/json', Authorization: `Bearer ${token}` },
+        headers,
       });
-      const data = await res.json();
-      if (!res.ok) throw new Error(data.detail || 'Errore server');
+      const started = await res.json();
+      if (!res.ok) throw new Error(started.detail || 'Errore server');
+      // Background job — poll its status until it finishes.
+      let data;
+      for (;;) {
+        await new Promise((r) => setTimeout(r, 1500));
+        const poll = await fetch(
+          `${API}/api/admin/phonemes/batch/regenerate-derived/${started.jobId}?include_results=false`,
+          { headers },
+        );
+        data = await poll.json();
+        if (!poll.ok) throw new Error(data.detail || 'Errore server');
+        if (data.status === 'done' || data.status === 'failed') break;
+        setDerivedResult(`In corso: ${data.processed}/${data.total ?? '…'} card`);
+      }
+      if (data.status === 'failed') throw new Error(data.error || 'Job fallito');
       setDerivedResult(
-        `Rigenerate ${data.processed} card · ${data.errors?.length || 0} errori.` +
+        `Rigenerate ${data.processed} card (${data.written} modificate) · ${data.errors?.length || 0} errori.` +
         (data.errors?.length ? ` Errori: ${data.errors.slice(0, 5).join(', ')}` : '')
       );
       if (typeof onRefresh === 'function') await onRefresh();
@@ -233,9 +248,10 @@ export default function PhonemeRoadmapDashboard({ existingCards = [], onRefresh
   };
 
   // ─── Bulk audio: mass ElevenLabs generation across ALL cards ───
-  // Iterates card-by-card (backend keeps each request short ~30s), streams
-  // progress into the UI, collects all per-clip errors and shows them at
-  // the end (option E=c: "continue always, show errors at end").
+  // One catalogue-wide background job: the backend plans every missing clip,
+  // synthesises identical texts once and resumes after a restart. We poll
+  // its progress (ETA + characters consumed) and show all per-clip errors
+  // at the end (option E=c: "continue always, show errors at end").
   const [audioRunning,   setAudioRunning]   = useState(false);
   const [audioProgress,  setAudioProgress]  = useState({ done: 0, total: 0, current: '' });
   const [audioResult,    setAudioResult]    = useState(null);
@@ -255,50 +271,47 @@ export default function PhonemeRoadmapDashboard({ existingCards = [], onRefresh
     if (!ok) return;
 
     setAudioRunning(true);
-    setAudioProgress({ done: 0, total: cardsToProcess.length, current: '' });
+    setAudioProgress({ done: 0, total: 0, current: '' });
     setAudioResult(null);
 
-    const allErrors = [];
-    let totalGenerated = 0;
-    let totalSkipped   = 0;
     const token = localStorage.getItem('vf_token');
     const API = process.env.REACT_APP_BACKEND_URL;
-
-    for (let i = 0; i < cardsToProcess.length; i++) {
-      const card = cardsToProcess[i];
-      setAudioProgress({
-        done: i,
-        total: cardsToProcess.length,
-        current: card.subtitle || card.id,
+    const headers = { 'Content-Type': 'application/json', Authorization: `Bearer ${token}` };
+    try {
+      const res = await fetch(`${API}/api/admin/phonemes/batch/audio`, {
+        method:  'POST',
+        headers,
+        body:    JSON.stringify({ words_limit: 30, include_words_rp: true }),
       });
-      try {
-        const res = await fetch(
-          `${API}/api/admin/phonemes/${encodeURIComponent(card.id)}/batch-audio`,
-          {
-            method:  'POST',
-            headers: { 'Content-Type': 'application/json', Authorization: `Bearer ${token}` },
-            body:    JSON.stringify({ words_limit: 30, include_words_rp: true }),
-          },
-        );
-        const data = await res.json();
-        if (!res.ok) {
-          allErrors.push({ card: card.id, key: '(request)', error: data.detail || `HTTP ${res.status}` });
-          continue;
-        }
-        totalGenerated += (data.generated || []).length;
-        totalSkipped   += (data.skipped   || []).length;
-        (data.errors || []).forEach((e) => allErrors.push({ card: card.id, ...e }));
-      } catch (e) {
-        allErrors.push({ card: card.id, key: '(network)', error: e.message });
+      const started = await res.json();
+      if (!res.ok) throw new Error(started.detail || `HTTP ${res.status}`);
+      let data;
+      for (;;) {
+        await new Promise((r) => setTimeout(r, 2000));
+        const poll = await fetch(`${API}/api/admin/phonemes/batch/audio/${started.jobId}`, { headers });
+        data = await poll.json();
+        if (!poll.ok) throw new Error(data.detail || `HTTP ${poll.status}`);
+        const done = (data.clipsDone || 0) + (data.clipsFailed || 0);
+        const eta = data.eta_s != null ? ` · ETA ~${Math.ceil(data.eta_s / 60)} min` : '';
+        setAudioProgress({
+          done,
+          total: done + (data.clipsRemaining ?? 0),
+          current: `${data.charsConsumed || 0} caratteri${eta}`,
+        });
+        if (data.status === 'done' || data.status === 'failed') break;
       }
+      if (data.status === 'failed') throw new Error(data.error || 'Job fallito');
+      setAudioResult({
+        clips:     data.clipsDone || 0,
+        slots:     data.slotsFilled || 0,
+        cacheHits: data.cacheHits || 0,
+        chars:     data.charsConsumed || 0,
+        errors:    (data.errors || []).map((e) => ({ card: e.slots.join(', '), error: e.error })),
+      });
+    } catch (e) {
+      setAudioResult({ clips: 0, slots: 0, cacheHits: 0, chars: 0,
+                       errors: [{ card: '(job)', error: e.message }] });
     }
-    setAudioProgress({ done: cardsToProcess.length, total: cardsToProcess.length, current: '' });
-    setAudioResult({
-      processed: cardsToProcess.length,
-      generated: totalGenerated,
-      skipped:   totalSkipped,
-      errors:    allErrors,
-    });
     setAudioRunning(false);
     if (typeof onRefresh === 'function') await onRefresh();
   };
@@ -625,8 +638,9 @@ export default function PhonemeRoadmapDashboard({ existingCards = [], onRefresh
                 : <CheckCircle2 className="w-4 h-4 flex-shrink-0 mt-0.5" />}
               <div className="min-w-0 flex-1">
                 <p className="font-bold">
-                  {audioResult.processed} card processate · {audioResult.generated} clip generati ·{' '}
-                  {audioResult.skipped} già presenti · {audioResult.errors.length} errori
+                  {audioResult.clips} clip sintetizzati · {audioResult.slots} slot riempiti ·{' '}
+                  {audioResult.cacheHits} dalla cache · {audioResult.chars} caratteri ·{' '}
+                  {audioResult.errors.length} errori
                 </p>
                 {audioResult.errors.length > 0 && (
                   <details className="mt-2 text-xs opacity-90">
@@ -636,7 +650,7 @@ export default function PhonemeRoadmapDashboard({ existingCards = [], onRefresh
                     <ul className="mt-2 space-y-1 max-h-48 overflow-y-auto">
                       {audioResult.errors.slice(0, 40).map((e, i) => (
                         <li key={i} className="font-mono text-[10px]">
-                          <span className="text-orange-300">{e.card}</span> · {e.key} — {e.error}
+                          <span className="text-orange-300">{e.card}</span> — {e.error}
                         </li>
                       ))}
                       {audioResult.errors.length > 40 && (
@@ -513,11 +513,25 @@ const MembersAreaPage = () => {
                     {/* Thumbnail */}
                     {content.thumbnail_url ? (
                       <div className="aspect-video bg-slate-800 overflow-hidden">
-                        <img 
-                          src={content.thumbnail_url} 
-                          alt={content.title}
-                          className="w-full h-full object-cover group-hover:scale-105 transition-transform"
-                        />
+                        <picture>
+                          {['image/webp', 'image/jpeg'].map(type => {
+                            const set = (content.thumbnail_renditions || []).filter(r => r.type === type);
+                            return set.length > 0 && (
+                              <source
+                                key={type}
+                                type={type}
+                                srcSet={set.map(r => `${r.url} ${r.width}w`).join(', ')}
+                                sizes="(min-width: 1024px) 33vw, (min-width: 768px) 50vw, 100vw"
+                              />
+                            );
+                          })}
+                          <img 
+                            src={content.thumbnail_url} 
+                            alt={content.title}
+                            loading="lazy"
+                            className="w-full h-full object-cover group-hover:scale-105 transition-transform"
+                          />
+                        </picture>
                       </div>
                     ) : (
                       <div className="aspect-video bg-gradient-to-br from-blue-600/20 to-cyan-600/20 flex items-center justify-center">
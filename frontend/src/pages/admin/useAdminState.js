@@ -287,10 +287,20 @@ export const useAdminState = () => {
   const handleRegenerateAllThumbnails = async () => {
     setRegeneratingThumbs(true);
     try {
-      const response = await axios.post(`${backendUrl}/api/admin/content/regenerate-all-thumbnails`, {}, { headers: { Authorization: `Bearer ${token}` } });
-      showToast('success', language === 'it' ? `${response.data.updated} anteprime rigenerate su ${response.data.total} contenuti` : `${response.data.updated} thumbnails regenerated out of ${response.data.total} items`);
+      const headers = { Authorization: `Bearer ${token}` };
+      const started = await axios.post(`${backendUrl}/api/admin/content/regenerate-all-thumbnails`, {}, { headers });
+      // Background job — poll its status until it finishes.
+      let job;
+      for (;;) {
+        await new Promise((r) => setTimeout(r, 1500));
+        const poll = await axios.get(`${backendUrl}/api/admin/content/regenerate-all-thumbnails/${started.data.job_id}?include_results=false`, { headers });
+        job = poll.data;
+        if (job.status === 'done' || job.status === 'failed') break;
+      }
+      if (job.status === 'failed') throw new Error(job.error);
+      showToast('success', language === 'it' ? `${job.updated} anteprime rigenerate su ${job.total} contenuti` : `${job.updated} thumbnails regenerated out of ${job.total} items`);
       // Refresh content list
-      const res = await axios.get(`${backendUrl}/api/admin/content`, { headers: { Authorization: `Bearer ${token}` } });
+      const res = await axios.get(`${backendUrl}/api/admin/content`, { headers });
       setContents(res.data);
     } catch {
       showToast('error', 'Errore');